@@ -12,7 +12,7 @@ import requests
 from services.auth_service import AuthService
 from services.stripe_service import StripeService
 from firebase_admin import firestore
-from middleware.csrf_protection import csrf_protect
+from middleware.csrf_protection import csrf, csrf_protect
 
 auth_bp = Blueprint('auth', __name__)
 auth_service = AuthService()
@@ -30,7 +30,7 @@ def get_csrf_token():
     """Endpoint to refresh CSRF token."""
     return jsonify({
         'success': True,
-        'csrf_token': session.get('csrf_token')
+        'csrf_token': csrf.get_token()
     })
 
 
@@ -606,6 +606,65 @@ def logout():
     return redirect(url_for('index'))
 
 
+def _user_sessions():
+    """Per-user session operations from the active session interface."""
+    return getattr(current_app.session_interface, 'user_sessions', None)
+
+
+@auth_bp.route('/api/auth/sessions', methods=['GET'])
+@login_required
+def list_sessions():
+    """List the current user's active sessions (devices)."""
+    user_sessions = _user_sessions()
+    if user_sessions is None:
+        return jsonify({'success': False, 'error': 'Session listing not supported'}), 501
+
+    sessions = user_sessions.list_sessions(session['user_id'])
+    current_sid = getattr(session, 'sid', None)
+    return jsonify({
+        'success': True,
+        'sessions': [
+            {
+                'id': sid[:8],
+                'created_at': info.get('created_at'),
+                'user_agent': info.get('user_agent', ''),
+                'current': sid == current_sid
+            }
+            for sid, info in sorted(sessions.items(), key=lambda item: item[1].get('created_at') or 0, reverse=True)
+        ]
+    })
+
+
+@auth_bp.route('/api/auth/sessions/logout-others', methods=['POST'])
+@login_required
+@csrf_protect
+def logout_other_sessions():
+    """Log out every other device, keeping this session."""
+    user_sessions = _user_sessions()
+    if user_sessions is None:
+        return jsonify({'success': False, 'error': 'Session revocation not supported'}), 501
+
+    revoked = user_sessions.revoke_others(session['user_id'], keep_sid=session.sid)
+    logger.info(f"[sessions] Logged out {revoked} other sessions | user_id={session['user_id']}")
+    return jsonify({'success': True, 'revoked': revoked})
+
+
+@auth_bp.route('/api/auth/sessions/revoke-all', methods=['POST'])
+@login_required
+@csrf_protect
+def revoke_all_sessions():
+    """Log out everywhere, including this session."""
+    user_sessions = _user_sessions()
+    if user_sessions is None:
+        return jsonify({'success': False, 'error': 'Session revocation not supported'}), 501
+
+    user_id = session['user_id']
+    revoked = user_sessions.revoke_all(user_id)
+    session.clear()
+    logger.info(f"[sessions] Revoked all {revoked} sessions | user_id={user_id}")
+    return jsonify({'success': True, 'revoked': revoked})
+
+
 @auth_bp.route('/profile')
 @login_required
 def profile():
@@ -6,14 +6,33 @@ Endpoints:
 - GET /api/feed/explore - Public feed of published creations
 - GET /api/users/<username>/creations - User gallery
 - PATCH /api/creations/<id>/caption - Update caption
+- POST /api/creations/<id>/like - Like a creation
+- DELETE /api/creations/<id>/like - Unlike a creation
 - POST /api/creations/<id>/comments - Add comment
 - GET /api/creations/<id>/comments - Get comments
+- GET /api/creations/<id>/comments/<comment_id>/replies - Get a comment's thread
+
+GET endpoints answer If-None-Match with 304s (middleware.conditional_get); the
+Explore feed and galleries validate anonymous requests with a projected query
+before rendering anything.
 """
 import logging
 from flask import Blueprint, request, jsonify, session
 from firebase_admin import firestore
 
 from api.auth_routes import login_required
+from middleware.conditional_get import conditional_get, page_validator
+from services.author_hydration import get_author_hydrator
+from services.comment_service import (
+    CommenterNotFoundError,
+    CreationNotFoundError,
+    ParentCommentNotFoundError,
+    get_comment_service,
+)
+from services.creation_dto import FEED_FIELDS, GALLERY_FIELDS, GALLERY_KEYS, CreationDTO, redact_prompt
+from services.cursor_codec import apply_cursor, cursor_doc_id, encode_cursor
+from services.feed_cache import feed_item, get_explore_feed_cache, invalidate_explore_feed
+from services.like_service import CreationNotLikeableError, attach_is_liked, get_like_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,15 +41,69 @@ feed_bp = Blueprint('feed', __name__)
 # Initialize services
 db = firestore.client()
 
+# Field mask of validator queries - only IDs and update times are used
+VALIDATOR_FIELDS = ('publishedAt',)
+
+
+def _explore_query(fields, limit, cursor):
+    """Published creations, newest first, one page (+1 to check for more)."""
+    query = (db.collection('creations')
+            .where(filter=firestore.FieldFilter('status', '==', 'published'))
+            .order_by('publishedAt', direction=firestore.Query.DESCENDING)
+            .select(fields)
+            .limit(limit + 1))
+
+    # Keyset cursor: start after (publishedAt, creationId) without a read
+    return apply_cursor(query, db.collection('creations'), cursor,
+                        'publishedAt', firestore.Query.DESCENDING, 'explore')
+
+
+def _gallery_query(user_id, fields, limit, cursor):
+    """A user's published creations, newest first, one page (+1 to check for more)."""
+    query = (db.collection('creations')
+            .where(filter=firestore.FieldFilter('userId', '==', user_id))
+            .where(filter=firestore.FieldFilter('status', '==', 'published'))
+            .order_by('publishedAt', direction=firestore.Query.DESCENDING)
+            .select(fields)
+            .limit(limit + 1))
+
+    return apply_cursor(query, db.collection('creations'), cursor,
+                        'publishedAt', firestore.Query.DESCENDING, 'creations')
+
+
+def _explore_validator():
+    """ETag/Last-Modified of an Explore page from its creations' update times."""
+    limit = min(int(request.args.get('limit', 20)), 50)
+    query = _explore_query(VALIDATOR_FIELDS, limit, request.args.get('cursor'))
+    return page_validator(query.stream(), request.query_string.decode())
+
+
+def _gallery_validator(username):
+    """ETag/Last-Modified of a gallery page: the profile plus its creations' update times."""
+    username_doc = db.collection('usernames').document(username.lower()).get()
+    if not username_doc.exists:
+        return None  # The view renders the 404
+
+    user_id = username_doc.get('userId')
+    user_doc = db.collection('users').document(user_id).get(field_paths=['username'])
+    if not user_doc.exists:
+        return None
+
+    limit = min(int(request.args.get('limit', 20)), 50)
+    query = _gallery_query(user_id, VALIDATOR_FIELDS, limit, request.args.get('cursor'))
+    return page_validator([user_doc, *query.stream()], request.query_string.decode())
+
 
 @feed_bp.route('/api/feed/explore', methods=['GET'])
+@conditional_get(s_maxage=30, validator=_explore_validator)
 def get_explore_feed():
     """
     Get the public Explore feed of published creations.
 
     Query params:
         limit: Max creations to return (default 20, max 50)
-        cursor: Pagination cursor (last creationId from previous page)
+        cursor: Pagination cursor (nextCursor from the previous page; a
+            creationId is still accepted)
 
     Returns:
         200: {
@@ -38,7 +111,9 @@ def get_explore_feed():
             creations: [{
                 creationId: string,
                 userId: string,
-                username: string,  // denormalized for performance
+                username: string,  // current, via author hydration
+                displayName: string | null,
+                profileImageUrl: string | null,
                 prompt: string,
                 mediaUrl: string,
                 aspectRatio: string,
@@ -55,50 +130,32 @@ def get_explore_feed():
         limit = min(int(request.args.get('limit', 20)), 50)
         cursor = request.args.get('cursor')
 
-        # Query published creations
-        query = (db.collection('creations')
-                .where(filter=firestore.FieldFilter('status', '==', 'published'))
-                .order_by('publishedAt', direction=firestore.Query.DESCENDING)
-                .limit(limit + 1))  # +1 to check if there are more
-
-        if cursor:
-            # Get cursor document for pagination
-            cursor_doc = db.collection('creations').document(cursor).get()
-            if cursor_doc.exists:
-                query = query.start_after(cursor_doc)
+        # First pages come from the materialized feed cache
+        feed_cache = get_explore_feed_cache()
+        page = feed_cache.get_page(limit, cursor_doc_id(cursor, 'explore')) if feed_cache else None
 
-        # Execute query
-        docs = list(query.stream())
-        has_more = len(docs) > limit
-        if has_more:
-            docs = docs[:limit]  # Remove extra doc
+        if page is not None:
+            items, has_more = page
+        else:
+            # Query published creations
+            docs = list(_explore_query(FEED_FIELDS, limit, cursor).stream())
+            has_more = len(docs) > limit
+            if has_more:
+                docs = docs[:limit]  # Remove extra doc
+            items = [feed_item(doc.id, doc.to_dict()) for doc in docs]
 
         # Get current user ID for privacy checks
         current_user_id = session.get('user_id')
 
-        # Format response
-        creations = []
-        for doc in docs:
-            data = doc.to_dict()
-            creation_data = {
-                'creationId': doc.id,
-                'userId': data.get('userId'),
-                'username': data.get('username', 'Unknown'),  # Denormalized
-                'caption': data.get('caption', ''),
-                'mediaUrl': data.get('mediaUrl'),
-                'mediaType': data.get('mediaType', 'video'),
-                'aspectRatio': data.get('aspectRatio', '9:16'),
-                'duration': data.get('duration', 8),
-                'commentCount': data.get('commentCount', 0),  # NEW: Comment count
-                'publishedAt': data.get('publishedAt'),
-                # PRIVACY: Only include actual prompt if viewing own creation
-                'prompt': data.get('prompt', '') if (current_user_id and current_user_id == data.get('userId')) else ''
-            }
-            
-            creations.append(creation_data)
+        # PRIVACY: Only include actual prompt if viewing own creation
+        # (redact_prompt copies - cached items are shared)
+        creations = [redact_prompt(item, current_user_id) for item in items]
+        creations = get_author_hydrator().hydrate(creations)
+        creations = attach_is_liked(creations, current_user_id)  # One get_all per page
 
         # Determine next cursor
-        next_cursor = docs[-1].id if has_more and docs else None
+        next_cursor = (encode_cursor(items[-1]['publishedAt'], items[-1]['creationId'], 'explore')
+                       if has_more and items else None)
 
         return jsonify({
             'success': True,
@@ -116,6 +173,7 @@ def get_explore_feed():
 
 
 @feed_bp.route('/api/users/<username>/creations', methods=['GET'])
+@conditional_get(s_maxage=60, validator=_gallery_validator)
 def get_user_creations(username):
     """
     Get a user's published creations (public gallery).
@@ -129,6 +187,7 @@ def get_user_creations(username):
 
     Returns:
         200: { success: true, creations: [...], user: {...}, nextCursor: ... }
+            (creations carry isLiked for signed-in viewers)
         404: User not found
     """
     try:
@@ -162,49 +221,19 @@ def get_user_creations(username):
         cursor = request.args.get('cursor')
 
         # Query user's published creations
-        query = (db.collection('creations')
-                .where(filter=firestore.FieldFilter('userId', '==', user_id))
-                .where(filter=firestore.FieldFilter('status', '==', 'published'))
-                .order_by('publishedAt', direction=firestore.Query.DESCENDING)
-                .limit(limit + 1))
-
-        if cursor:
-            cursor_doc = db.collection('creations').document(cursor).get()
-            if cursor_doc.exists:
-                query = query.start_after(cursor_doc)
-
-        # Execute query
-        docs = list(query.stream())
+        docs = list(_gallery_query(user_id, GALLERY_FIELDS, limit, cursor).stream())
         has_more = len(docs) > limit
         if has_more:
             docs = docs[:limit]
 
-        # Check if current user is viewing their own profile
+        # Format creations (PRIVACY: prompt only on your own profile)
         current_user_id = session.get('user_id')
-        is_own_profile = (current_user_id == user_id)
-
-        # Format creations
-        creations = []
-        for doc in docs:
-            data = doc.to_dict()
-            creation_data = {
-                'creationId': doc.id,
-                'caption': data.get('caption', ''),
-                'mediaUrl': data.get('mediaUrl'),
-                'mediaType': data.get('mediaType', 'video'),
-                'aspectRatio': data.get('aspectRatio', '9:16'),
-                'duration': data.get('duration', 8),
-                'commentCount': data.get('commentCount', 0),  # NEW: Comment count
-                'publishedAt': data.get('publishedAt')
-            }
-            
-            # PRIVACY: Only include prompt if viewing own profile
-            if is_own_profile:
-                creation_data['prompt'] = data.get('prompt')
-            
-            creations.append(creation_data)
+        creations = [CreationDTO.from_snapshot(doc).to_json(GALLERY_KEYS, current_user_id, omit_redacted=True)
+                     for doc in docs]
+        creations = attach_is_liked(creations, current_user_id)
 
-        next_cursor = docs[-1].id if has_more and docs else None
+        next_cursor = (encode_cursor(docs[-1].to_dict().get('publishedAt'), docs[-1].id, 'creations')
+                       if has_more and docs else None)
 
         return jsonify({
             'success': True,
@@ -293,6 +322,9 @@ def update_caption(creation_id):
 
         logger.info(f"Updated caption for creation {creation_id} by user {user_id}")
 
+        if creation_data.get('status') == 'published':
+            invalidate_explore_feed(f"caption edited on {creation_id}")
+
         return jsonify({
             'success': True,
             'caption': caption
@@ -306,18 +338,89 @@ def update_caption(creation_id):
         }), 500
 
 
+@feed_bp.route('/api/creations/<creation_id>/like', methods=['POST'])
+@login_required
+def like_creation(creation_id):
+    """
+    Like a published creation. Liking twice is a no-op.
+
+    Path params:
+        creation_id: Creation document ID
+
+    Returns:
+        200: { success: true, liked: true, likeCount: number }
+        404: Creation not found (or not published)
+        500: Server error
+    """
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required'
+            }), 401
+
+        result = get_like_service().like(user_id, creation_id)
+        return jsonify({'success': True, **result})
+
+    except CreationNotLikeableError:
+        return jsonify({
+            'success': False,
+            'error': 'Creation not found'
+        }), 404
+    except Exception as e:
+        logger.error(f"Error liking creation {creation_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to like creation'
+        }), 500
+
+
+@feed_bp.route('/api/creations/<creation_id>/like', methods=['DELETE'])
+@login_required
+def unlike_creation(creation_id):
+    """
+    Remove a like. Unliking twice is a no-op.
+
+    Path params:
+        creation_id: Creation document ID
+
+    Returns:
+        200: { success: true, liked: false, likeCount: number }
+        500: Server error
+    """
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required'
+            }), 401
+
+        result = get_like_service().unlike(user_id, creation_id)
+        return jsonify({'success': True, **result})
+
+    except Exception as e:
+        logger.error(f"Error unliking creation {creation_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to unlike creation'
+        }), 500
+
+
 @feed_bp.route('/api/creations/<creation_id>/comments', methods=['POST'])
 @login_required
 def add_comment(creation_id):
     """
-    Add a comment to a creation.
+    Add a comment (or a reply) to a creation.
 
     Path params:
         creation_id: Creation document ID
 
     Request body:
         {
-            "commentText": "The comment text"
+            "commentText": "The comment text",
+            "replyToCommentId": "Comment being replied to" (optional)
         }
 
     Returns:
@@ -329,11 +432,14 @@ def add_comment(creation_id):
                 username: string,
                 avatarUrl: string,
                 commentText: string,
-                createdAt: timestamp
+                createdAt: timestamp,
+                replyToCommentId: string | null,
+                rootCommentId: string | null,
+                replyCount: number
             }
         }
         400: Invalid request
-        404: Creation not found
+        404: Creation or parent comment not found
         500: Server error
     """
     try:
@@ -365,82 +471,38 @@ def add_comment(creation_id):
                 'error': 'Comment text must be 500 characters or less'
             }), 400
 
-        # Get creation document
-        creation_ref = db.collection('creations').document(creation_id)
-        creation_doc = creation_ref.get()
+        reply_to = data.get('replyToCommentId')
+        if reply_to is not None and (not isinstance(reply_to, str) or not reply_to.strip()):
+            return jsonify({
+                'success': False,
+                'error': 'replyToCommentId must be a comment ID'
+            }), 400
 
-        if not creation_doc.exists:
+        # One batched write; a missing creation fails the commentCount update
+        try:
+            comment = get_comment_service().add_comment(creation_id, user_id, comment_text, reply_to)
+        except CreationNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'Creation not found'
             }), 404
-
-        # Get user data for denormalization
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-
-        if not user_doc.exists:
+        except CommenterNotFoundError:
             return jsonify({
                 'success': False,
                 'error': 'User not found'
             }), 404
-
-        user_data = user_doc.to_dict()
-
-        # Use transaction to atomically add comment and increment count
-        @firestore.transactional
-        def create_comment_transaction(transaction):
-            # Create comment document in subcollection
-            comment_ref = creation_ref.collection('comments').document()
-            comment_data = {
-                'userId': user_id,
-                'username': user_data.get('username', 'Unknown'),
-                'avatarUrl': user_data.get('profileImageUrl', ''),
-                'commentText': comment_text,
-                'createdAt': firestore.SERVER_TIMESTAMP,
-                'replyToCommentId': None  # Future-proofing for threaded comments
-            }
-
-            transaction.set(comment_ref, comment_data)
-
-            # Increment comment count on parent creation
-            transaction.update(creation_ref, {
-                'commentCount': firestore.Increment(1)
-            })
-
-            return comment_ref.id, comment_data
-
-        # Execute transaction
-        transaction = db.transaction()
-        comment_id, comment_data = create_comment_transaction(transaction)
+        except ParentCommentNotFoundError:
+            return jsonify({
+                'success': False,
+                'error': 'Comment not found'
+            }), 404
 
         logger.info(f"User {user_id} added comment to creation {creation_id}")
 
-        # Fetch the created comment to get the actual timestamp
-        comment_ref = creation_ref.collection('comments').document(comment_id)
-        created_comment = comment_ref.get()
-
-        if created_comment.exists:
-            final_comment_data = created_comment.to_dict()
-        else:
-            # Fallback if fetch fails - use current time
-            from datetime import datetime
-            final_comment_data = {
-                **comment_data,
-                'createdAt': datetime.utcnow()
-            }
-
-        # Return the created comment with actual timestamp
+        # createdAt is the commit time (the resolved server timestamp)
         return jsonify({
             'success': True,
-            'comment': {
-                'commentId': comment_id,
-                'userId': final_comment_data['userId'],
-                'username': final_comment_data['username'],
-                'avatarUrl': final_comment_data['avatarUrl'],
-                'commentText': final_comment_data['commentText'],
-                'createdAt': final_comment_data.get('createdAt')
-            }
+            'comment': comment
         })
 
     except Exception as e:
@@ -452,16 +514,18 @@ def add_comment(creation_id):
 
 
 @feed_bp.route('/api/creations/<creation_id>/comments', methods=['GET'])
+@conditional_get(s_maxage=10)
 def get_comments(creation_id):
     """
-    Get comments for a creation with pagination.
+    Get top-level comments for a creation with pagination.
 
     Path params:
         creation_id: Creation document ID
 
     Query params:
         limit: Max comments to return (default 20, max 50)
-        startAfter: Comment ID to start after (for pagination)
+        startAfter: nextCursor from the previous page (a comment ID is
+            still accepted)
 
     Returns:
         200: {
@@ -470,69 +534,112 @@ def get_comments(creation_id):
                 commentId: string,
                 userId: string,
                 username: string,
+                displayName: string | null,
+                profileImageUrl: string | null,
                 avatarUrl: string,
                 commentText: string,
-                createdAt: timestamp
+                createdAt: timestamp,
+                replyCount: number
             }],
+            nextCursor: string | null,
             hasMore: boolean
         }
         404: Creation not found
         500: Server error
     """
     try:
-        # Verify creation exists
-        creation_ref = db.collection('creations').document(creation_id)
-        creation_doc = creation_ref.get()
+        # Parse query params
+        limit = min(int(request.args.get('limit', 20)), 50)
+        start_after = request.args.get('startAfter')
 
-        if not creation_doc.exists:
+        # First pages come from the cached window; an empty page doubles as
+        # the existence check
+        page = get_comment_service().get_comments(creation_id, limit, start_after)
+        if page is None:
             return jsonify({
                 'success': False,
                 'error': 'Creation not found'
             }), 404
 
-        # Parse query params
+        comments, next_cursor, has_more = page
+        comments = get_author_hydrator().hydrate(comments, avatar_key='avatarUrl')
+
+        return jsonify({
+            'success': True,
+            'comments': comments,
+            'nextCursor': next_cursor,
+            'hasMore': has_more
+        })
+
+    except Exception as e:
+        logger.error(f"Error fetching comments for creation {creation_id}: {e}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch comments'
+        }), 500
+
+
+@feed_bp.route('/api/creations/<creation_id>/comments/<comment_id>/replies', methods=['GET'])
+@conditional_get(s_maxage=10)
+def get_replies(creation_id, comment_id):
+    """
+    Get the replies in a comment's thread with pagination.
+
+    Path params:
+        creation_id: Creation document ID
+        comment_id: Root comment ID of the thread
+
+    Query params:
+        limit: Max replies to return (default 20, max 50)
+        startAfter: nextCursor from the previous thread page
+
+    Returns:
+        200: {
+            success: true,
+            replies: [{
+                commentId: string,
+                userId: string,
+                username: string,
+                displayName: string | null,
+                profileImageUrl: string | null,
+                avatarUrl: string,
+                commentText: string,
+                createdAt: timestamp,
+                replyToCommentId: string,
+                rootCommentId: string
+            }],
+            nextCursor: string | null,
+            hasMore: boolean
+        }
+        404: Comment not found
+        500: Server error
+    """
+    try:
         limit = min(int(request.args.get('limit', 20)), 50)
         start_after = request.args.get('startAfter')
 
-        # Build query - chronological order (oldest first)
-        query = (creation_ref.collection('comments')
-                .order_by('createdAt', direction=firestore.Query.ASCENDING)
-                .limit(limit + 1))  # +1 to check if there are more
-
-        if start_after:
-            # Get cursor document for pagination
-            cursor_doc = creation_ref.collection('comments').document(start_after).get()
-            if cursor_doc.exists:
-                query = query.start_after(cursor_doc)
+        # One range query over the thread's keys; an empty page doubles as
+        # the existence check
+        page = get_comment_service().get_replies(creation_id, comment_id, limit, start_after)
+        if page is None:
+            return jsonify({
+                'success': False,
+                'error': 'Comment not found'
+            }), 404
 
-        # Execute query
-        docs = list(query.stream())
-        has_more = len(docs) > limit
-        if has_more:
-            docs = docs[:limit]  # Remove extra doc
-
-        # Format response
-        comments = []
-        for doc in docs:
-            data = doc.to_dict()
-            comments.append({
-                'commentId': doc.id,
-                'userId': data.get('userId'),
-                'username': data.get('username', 'Unknown'),
-                'avatarUrl': data.get('avatarUrl', ''),
-                'commentText': data.get('commentText'),
-                'createdAt': data.get('createdAt')
-            })
+        replies, next_cursor, has_more = page
+        replies = get_author_hydrator().hydrate(replies, avatar_key='avatarUrl')
 
         return jsonify({
             'success': True,
-            'comments': comments,
+            'replies': replies,
+            'nextCursor': next_cursor,
             'hasMore': has_more
         })
 
     except Exception as e:
-        logger.error(f"Error fetching comments for creation {creation_id}: {e}", exc_info=True)
+        logger.error(f"Error fetching replies to comment {comment_id}: {e}", exc_info=True)
         return jsonify({
             'success': False,
-            'error': 'Failed to fetch comments'
+            'error': 'Failed to fetch replies'
         }), 500
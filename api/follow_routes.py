@@ -11,15 +11,19 @@ Endpoints:
 import logging
 from typing import Optional
 from flask import Blueprint, request, jsonify, session
-from firebase_admin import firestore
 
 from api.auth_routes import login_required
+from services.author_hydration import get_author_hydrator
+from services.creation_dto import FEED_KEYS, CreationDTO
+from services.cursor_codec import encode_cursor
 from services.follow_service import (
     get_follow_service,
     FollowError,
     CannotFollowSelfError,
     UserNotFoundError
 )
+from services.like_service import attach_is_liked
+from services.timeline_service import get_timeline_service
 from services.user_service import UserService
 
 logger = logging.getLogger(__name__)
@@ -27,7 +31,6 @@ logger = logging.getLogger(__name__)
 follow_bp = Blueprint('follow', __name__)
 
 # Initialize services
-db = firestore.client()
 user_service = UserService()
 
 
@@ -218,7 +221,8 @@ def get_following_feed():
     
     Query params:
         limit: Max creations to return (default 20, max 50)
-        cursor: Pagination cursor (last creationId from previous page)
+        cursor: Pagination cursor (nextCursor from the previous page; a
+            creationId is still accepted)
         
     Returns:
         200: {
@@ -256,49 +260,19 @@ def get_following_feed():
                 'message': 'Follow some creators to see their posts here!'
             })
         
-        # Query creations from followed users
-        # Firestore 'in' operator supports up to 30 values
-        # For >30 follows, we chunk and merge (simplified: take first 30 for now)
-        query_user_ids = following_list[:30]
+        # One range read on the materialized timeline (plus any followed
+        # celebrities, who are read on demand instead of fanned out)
+        docs, has_more, next_position = get_timeline_service().get_page(
+            current_user_id, following_list, limit, cursor
+        )
         
-        query = (db.collection('creations')
-                .where(filter=firestore.FieldFilter('userId', 'in', query_user_ids))
-                .where(filter=firestore.FieldFilter('status', '==', 'published'))
-                .order_by('publishedAt', direction=firestore.Query.DESCENDING)
-                .limit(limit + 1))
+        # Format response (PRIVACY: prompt only for own creations)
+        creations = [CreationDTO(creation_id, data).to_json(FEED_KEYS, current_user_id)
+                     for creation_id, data in docs]
+        creations = get_author_hydrator().hydrate(creations)
+        creations = attach_is_liked(creations, current_user_id)  # One get_all per page
         
-        if cursor:
-            cursor_doc = db.collection('creations').document(cursor).get()
-            if cursor_doc.exists:
-                query = query.start_after(cursor_doc)
-        
-        # Execute query
-        docs = list(query.stream())
-        has_more = len(docs) > limit
-        if has_more:
-            docs = docs[:limit]
-        
-        # Format response
-        creations = []
-        for doc in docs:
-            data = doc.to_dict()
-            creation_data = {
-                'creationId': doc.id,
-                'userId': data.get('userId'),
-                'username': data.get('username', 'Unknown'),
-                'caption': data.get('caption', ''),
-                'mediaUrl': data.get('mediaUrl'),
-                'mediaType': data.get('mediaType', 'video'),
-                'aspectRatio': data.get('aspectRatio', '9:16'),
-                'duration': data.get('duration', 8),
-                'commentCount': data.get('commentCount', 0),
-                'publishedAt': data.get('publishedAt'),
-                # Only show prompt for own creations
-                'prompt': data.get('prompt', '') if data.get('userId') == current_user_id else ''
-            }
-            creations.append(creation_data)
-        
-        next_cursor = docs[-1].id if has_more and docs else None
+        next_cursor = encode_cursor(*next_position, 'following') if next_position else None
         
         return jsonify({
             'success': True,
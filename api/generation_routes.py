@@ -30,6 +30,7 @@ except ImportError:
 
 from api.auth_routes import login_required
 from middleware.csrf_protection import csrf_protect
+from services.creation_dto import DRAFT_FIELDS, DRAFT_KEYS, CreationDTO
 from services.creation_service import CreationService
 from services.token_service import InsufficientTokensError
 
@@ -317,27 +318,24 @@ def get_drafts():
         
         # Note: No order_by to avoid composite index requirement
         # We'll sort in Python after fetching
-        query = query.limit(limit)
+        query = query.select(DRAFT_FIELDS).limit(limit)
 
         docs = query.stream()
 
         creations = []
         for doc in docs:
-            creation_data = doc.to_dict()
-            creation_data['id'] = doc.id
-
-            status = creation_data.get('status')
+            draft = CreationDTO.from_snapshot(doc)
 
             # Filter out published and deleted drafts unless explicitly requested
-            if not status_filter and status in {'published', 'deleted'}:
+            if not status_filter and draft.status in {'published', 'deleted'}:
                 continue
-            if status == 'deleted' and status_filter != 'deleted':
+            if draft.status == 'deleted' and status_filter != 'deleted':
                 continue
 
-            creations.append(creation_data)
+            creations.append(draft.to_json(DRAFT_KEYS, include_prompt=True))
 
         # Sort by createdAt in Python (newest first)
-        creations.sort(key=lambda x: x.get('createdAt', 0), reverse=True)
+        creations.sort(key=lambda x: x.get('createdAt') or 0, reverse=True)
 
         logger.info(f"📋 Retrieved {len(creations)} drafts for user {user_id}")
 
@@ -4,6 +4,7 @@ import os
 import uuid as uuid_module
 from flask import Blueprint, request, session, jsonify
 from api.auth_routes import login_required
+from middleware.conditional_get import conditional_get
 from services.user_service import (
     UserService,
     UsernameValidationError,
@@ -187,6 +188,7 @@ def get_current_user():
 
 
 @user_bp.route('/api/users/<username>', methods=['GET'])
+@conditional_get(s_maxage=60)
 def get_user_by_username(username):
     """
     Get a user's public profile by username.
@@ -24,7 +24,7 @@ logger = logging.getLogger(__name__)
 from config.settings import (
     SECRET_KEY, FLASK_ENV, FLASK_DEBUG,
     SESSION_TYPE, SESSION_PERMANENT, SESSION_USE_SIGNER,
-    SESSION_FILE_DIR, SESSION_FILE_THRESHOLD
+    SESSION_FILE_DIR, SESSION_FILE_THRESHOLD, SESSION_KEY_PREFIX
 )
 
 # Initialize Firebase Admin SDK FIRST (before importing services)
@@ -104,34 +104,43 @@ def create_app():
     # --- Rate Limiting ---
     # Protects against brute force, DoS, and enumeration attacks
     # Uses Firestore storage for persistence across restarts and multi-instance support
+    # Endpoints that never need the session - reading it would cost a backend read
+    sessionless_endpoints = {'static', 'serve_momo_frontend', 'image.health_check'}
+
     def get_rate_limit_key():
         """Get rate limit key - prefer user_id if authenticated, else IP."""
+        if request.endpoint in sessionless_endpoints:
+            return get_remote_address()
         if 'user_id' in session:
             return f"user:{session['user_id']}"
         return get_remote_address()
 
     # Check if we should use Firestore (production) or memory (development/testing)
     use_firestore_limiter = os.getenv('USE_FIRESTORE_RATE_LIMITS', '1') == '1'
+    # fixed-window (default) or sliding-window-counter, which smooths window-boundary bursts
+    rate_limit_strategy = os.getenv('RATE_LIMIT_STRATEGY', 'fixed-window')
 
     if use_firestore_limiter:
-        # Register Firestore storage backend for rate limiting
-        from services.cache_service.limiter_storage import register_firestore_storage
-        register_firestore_storage()
+        # Shared storage: Firestore, or Redis when CACHE_BACKEND=redis
+        from services.cache_service.limiter_storage import get_limiter_storage_config
+        storage_uri, storage_options = get_limiter_storage_config()
 
         limiter = Limiter(
             app=app,
             key_func=get_rate_limit_key,
             default_limits=["200 per day", "50 per hour"],  # Default for all routes
-            storage_uri="firestore://",
-            storage_options={"collection_name": "rate_limits"}
+            storage_uri=storage_uri,
+            storage_options=storage_options,
+            strategy=rate_limit_strategy
         )
-        logger.info("Rate limiting initialized with Firestore storage")
+        logger.info(f"Rate limiting initialized with {storage_uri.split(':')[0]} storage ({rate_limit_strategy})")
     else:
         limiter = Limiter(
             app=app,
             key_func=get_rate_limit_key,
             default_limits=["200 per day", "50 per hour"],  # Default for all routes
             storage_uri="memory://",  # In-memory (resets on restart)
+            strategy=rate_limit_strategy
         )
         logger.info("Rate limiting initialized with in-memory storage")
     # Store limiter on app for use in blueprints
@@ -150,10 +159,12 @@ def create_app():
     # NOTE: Filesystem sessions don't work on Cloud Run (ephemeral containers)
     # We use Firestore-backed sessions via our cache service instead
     from services.cache_service.flask_adapter import CacheSessionInterface
+    from services.cache_service.codec import get_session_codec
 
     app.session_interface = CacheSessionInterface(
-        key_prefix='friedmomo:session:',
-        permanent_lifetime=2592000  # 30 days
+        key_prefix=SESSION_KEY_PREFIX,
+        permanent_lifetime=2592000,  # 30 days
+        codec=get_session_codec(os.getenv('SESSION_CODEC', 'msgpack'))  # Reads legacy pickle too
     )
 
     # Configure session cookies for cross-domain support (friedmomo.com → backend)
@@ -173,6 +184,8 @@ def create_app():
 
     # --- Centralized CSRF Protection ---
     from middleware.csrf_protection import csrf
+    # 'stateless' = HMAC tokens bound to the session cookie (no session write for anonymous visitors)
+    app.config['CSRF_MODE'] = os.getenv('CSRF_MODE', 'stateless')
     csrf.init_app(app)
     
     # Configure CSRF based on environment
@@ -181,7 +194,11 @@ def create_app():
     # Expose CSRF token via header for frontend
     @app.after_request
     def add_csrf_header(resp):
-        token = session.get('csrf_token')
+        # Shared-cacheable responses (middleware.conditional_get) must not
+        # carry one visitor's token to the next
+        if resp.cache_control.public:
+            return resp
+        token = csrf.get_token()
         if token:
             resp.headers['X-CSRF-Token'] = token
         return resp
@@ -236,17 +253,29 @@ def create_app():
     app.register_blueprint(follow_bp)  # Phase 5: Follow feature
 
     # --- Apply Rate Limits to Sensitive Endpoints ---
-    # These limits protect against brute force, enumeration, and DoS attacks
-    limiter.limit("30 per minute")(app.view_functions['token.get_balance'])
-    limiter.limit("5 per hour")(app.view_functions['token.transfer_tokens'])
-    limiter.limit("10 per minute")(app.view_functions['auth.login'])
-    limiter.limit("10 per minute")(app.view_functions['auth.signup'])
-    limiter.limit("20 per minute")(app.view_functions['auth.google_login'])
+    # These limits protect against brute force, enumeration, and DoS attacks.
+    # The wrapped view must replace the registered one or the limit never runs;
+    # the default limits still apply on top of the route limit.
+    sensitive_limits = {
+        'token.get_balance': "30 per minute",
+        'token.transfer_tokens': "5 per hour",
+        'auth.login': "10 per minute",
+        'auth.signup': "10 per minute",
+        'auth.google_login': "20 per minute",
+    }
+    for endpoint, limit_value in sensitive_limits.items():
+        app.view_functions[endpoint] = limiter.limit(limit_value, override_defaults=False)(
+            app.view_functions[endpoint]
+        )
 
     # Username enforcement middleware (Phase 4)
     @app.before_request
     def enforce_username_setup():
         """Redirect logged-in users without usernames to username setup page."""
+        # Skip requests that don't need the session (avoids loading it)
+        if request.endpoint in sessionless_endpoints:
+            return None
+
         # Skip for non-authenticated users
         if 'user_id' not in session:
             return None
@@ -404,6 +433,13 @@ def create_app():
         # Otherwise, serve index.html and let React Router handle the routing
         return send_from_directory('static/momo', 'index.html')
 
+    if use_firestore_limiter:
+        # Charge all of a request's limits in one Firestore transaction.
+        # Installed last: it moves the limit check behind every other
+        # before_request hook
+        from services.cache_service.limiter_storage import install_limit_prefetch
+        install_limit_prefetch(app, limiter)
+
     return app
 
 # Create the application
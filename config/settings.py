@@ -70,4 +70,7 @@ SESSION_TYPE = "filesystem"
 SESSION_PERMANENT = False
 SESSION_USE_SIGNER = True
 SESSION_FILE_DIR = "./flask_session"
-SESSION_FILE_THRESHOLD = 500
\ No newline at end of file
+SESSION_FILE_THRESHOLD = 500
+
+# Cache-backed session keys (CacheSessionInterface, account deletion, session index)
+SESSION_KEY_PREFIX = "friedmomo:session:"
@@ -0,0 +1,165 @@
+"""
+Conditional GET (ETag / Cache-Control) for read-heavy JSON endpoints.
+
+The React app polls the feed, gallery, profile and comment endpoints and got
+the full JSON back every time. Routes decorated with @conditional_get:
+
+- carry a strong ETag and a Last-Modified date. Routes can pass a
+  `validator` that derives both from a projected query over the page's
+  documents (IDs and update times, which move on captions and counter
+  rollups too), so a matching If-None-Match / If-Modified-Since is answered
+  before the view runs - no hydration, like lookups or serialization.
+  Signed-in viewers see per-viewer fields (isLiked, prompts) that the
+  documents don't reflect, and routes without a validator (comment pages
+  come from a cache already) fall back to a SHA-256 of the rendered body;
+- answer a matching If-None-Match with 304 Not Modified and no body;
+- never issue a session cookie to anonymous visitors: the wrapper is
+  marked `cookieless`, so CSRF skips require_cookie() on these GETs, and
+  visitors without a cookie all get the same shareable response;
+- are `public, max-age, s-maxage` for anonymous visitors, so browsers and
+  Firebase Hosting's CDN can serve repeats (Hosting keys its cache on the
+  __session cookie, and Vary: Cookie keeps other caches honest);
+- are `private, no-cache` for signed-in users, whose responses include
+  private fields (prompts, isFollowing) - they still revalidate to 304s -
+  and for any response that will set or clear a cookie (e.g. replacing an
+  expired sid), which a shared cache must never hand to other visitors.
+
+Public responses never carry the per-client X-CSRF-Token header (see
+app.add_csrf_header), since a shared cache would hand one visitor's token
+to everyone.
+
+Configuration:
+    HTTP_CACHE_ENABLED: Set to 0 to send plain responses (default 1)
+"""
+import functools
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from flask import current_app, make_response, request, session
+from werkzeug.http import is_resource_modified
+
+logger = logging.getLogger(__name__)
+
+_ETAG_BYTES = 16
+
+
+def conditional_get(
+    max_age: int = 0,
+    s_maxage: int = 30,
+    validator: Optional[Callable[..., Optional[Tuple[str, Optional[datetime]]]]] = None
+):
+    """
+    Add ETag/Last-Modified/Cache-Control handling to a GET route.
+
+    Args:
+        max_age: Seconds browsers may reuse an anonymous response without asking
+        s_maxage: Seconds shared caches (the CDN) may reuse it
+        validator: Called with the view's arguments for anonymous requests;
+            returns (etag, last_modified) for the page (see page_validator),
+            or None to fall back to hashing the body
+
+    Returns:
+        Route decorator
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            state = None
+            if (validator is not None and _enabled() and request.method in ('GET', 'HEAD')
+                    and not session.get('user_id')):
+                try:
+                    state = validator(*args, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Validator for {request.endpoint} failed, hashing the body: {e}")
+
+            if state is not None:
+                etag, last_modified = state
+                if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                    # Nothing changed - skip the view entirely
+                    response = current_app.response_class(status=304)
+                    _set_validators(response, etag, last_modified)
+                    _set_cache_control(response, max_age, s_maxage)
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if not _enabled() or request.method not in ('GET', 'HEAD') or response.status_code != 200:
+                return response
+
+            if state is not None:
+                _set_validators(response, *state)
+            else:
+                body = response.get_data()
+                response.set_etag(hashlib.sha256(body).hexdigest()[:2 * _ETAG_BYTES])
+            _set_cache_control(response, max_age, s_maxage)
+
+            # 304 with no body when If-None-Match / If-Modified-Since match
+            return response.make_conditional(request)
+
+        wrapper.cookieless = True
+        return wrapper
+    return decorator
+
+
+def page_validator(docs: Iterable[Any], *parts: Any) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag and Last-Modified of a page from its documents' IDs and update times.
+
+    Args:
+        docs: Snapshots of every document the page shows (a projected query
+            is enough - update_time comes with any field mask)
+        *parts: Anything else the page depends on (query string, cursor)
+
+    Returns:
+        (etag, last_modified); last_modified is None for an empty page
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(f'{part}\0'.encode('utf-8'))
+
+    last_modified = None
+    for doc in docs:
+        updated = getattr(doc, 'update_time', None)
+        digest.update(f'{doc.id}@{updated.isoformat() if updated else ""}\0'.encode('utf-8'))
+        if updated is not None and (last_modified is None or updated > last_modified):
+            last_modified = updated
+    return digest.hexdigest()[:2 * _ETAG_BYTES], last_modified
+
+
+def _set_validators(response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+
+
+def _set_cache_control(response, max_age: int, s_maxage: int) -> None:
+    if session.get('user_id') or not _shareable(response):
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.s_maxage = s_maxage
+    response.vary.add('Cookie')
+
+
+def _shareable(response) -> bool:
+    """
+    True if an anonymous response carries nothing client-specific.
+
+    Set-Cookie is only added by the session interface after the view
+    returns, so this predicts it from the session's state: the session must
+    be empty and have no new, changed or cleared cookie to send.
+    """
+    if 'Set-Cookie' in response.headers:
+        return False
+    if len(session) or session.modified or getattr(session, 'stale_cookie', False):
+        return False
+    # CacheSession issues a new sid cookie when one was required but not sent
+    return not (getattr(session, 'needs_cookie', False) and not getattr(session, 'sid_from_cookie', True))
+
+
+def _enabled() -> bool:
+    return os.getenv('HTTP_CACHE_ENABLED', '1') == '1'
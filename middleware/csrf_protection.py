@@ -3,11 +3,19 @@ Centralized CSRF protection middleware for Phoenix AI Platform.
 
 This module provides a unified, decorator-based approach to CSRF protection
 that can be consistently applied across all routes and apps.
+
+Modes (CSRF_MODE config):
+- 'stateless' (default): token = HMAC-SHA256(secret_key, session id). The session
+  id cookie is the nonce, so nothing is stored server-side until login.
+- 'session': random token stored in session['csrf_token'] (legacy behaviour).
 """
+import base64
 import functools
+import hashlib
+import hmac
 import secrets
 import logging
-from flask import session, request, jsonify, abort
+from flask import current_app, session, request, jsonify, abort
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -27,15 +35,54 @@ class CSRFProtection:
         
         # Add disable flag for development/testing
         self.disabled = app.config.get('DISABLE_CSRF', False)
+        self.mode = app.config.get('CSRF_MODE', 'stateless')
+        self.secret_key = app.secret_key
     
     def _ensure_csrf_token(self):
-        """Ensure CSRF token exists in session."""
+        """Ensure a CSRF token is available for this client."""
+        if request.method in ('GET', 'HEAD') and getattr(
+                current_app.view_functions.get(request.endpoint), 'cookieless', False):
+            # Shared-cacheable reads (middleware.conditional_get) must not
+            # hand out a session cookie - the response would be per-visitor
+            return
+        if self._is_stateless():
+            # Only the session id cookie is needed - no session write
+            if hasattr(session, 'require_cookie'):
+                session.require_cookie()
+            return
         if 'csrf_token' not in session:
             session['csrf_token'] = secrets.token_urlsafe(32)
     
     def _inject_csrf_token(self):
         """Inject CSRF token into template context."""
-        return {'csrf_token': lambda: session.get('csrf_token')}
+        return {'csrf_token': self.get_token}
+    
+    def _is_stateless(self) -> bool:
+        """Stateless mode needs a secret and a session id to bind tokens to."""
+        return (
+            getattr(self, 'mode', 'session') == 'stateless'
+            and bool(getattr(self, 'secret_key', None))
+            and bool(getattr(session, 'sid', None))
+        )
+    
+    def _signed_token(self, sid: str) -> str:
+        """Derive the stateless token for a session id."""
+        key = self.secret_key
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        digest = hmac.new(key, b'csrf:' + sid.encode('utf-8'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+    
+    def get_token(self) -> Optional[str]:
+        """
+        Get the CSRF token for the current client.
+        
+        Returns:
+            HMAC token in stateless mode, otherwise the session-stored token
+        """
+        if self._is_stateless():
+            return self._signed_token(session.sid)
+        return session.get('csrf_token')
     
     def _get_token_from_request(self) -> Optional[str]:
         """Extract CSRF token from request (headers, form, or JSON body)."""
@@ -63,13 +110,18 @@ class CSRFProtection:
         return None
     
     def _validate_token(self, sent_token: str) -> bool:
-        """Validate CSRF token against session."""
-        session_token = session.get('csrf_token')
-        
-        if not session_token or not sent_token:
+        """Validate CSRF token against the HMAC token or the session."""
+        if not sent_token:
             return False
         
         # Use secrets.compare_digest for timing attack protection
+        if self._is_stateless() and secrets.compare_digest(self._signed_token(session.sid), sent_token):
+            return True
+        
+        # Tokens issued before the switch to stateless mode stay valid
+        session_token = session.get('csrf_token')
+        if not session_token:
+            return False
         return secrets.compare_digest(session_token, sent_token)
     
     def protect(self, f):
@@ -93,7 +145,7 @@ class CSRFProtection:
                 sent_token = self._get_token_from_request()
                 
                 if not sent_token or not self._validate_token(sent_token):
-                    session_token = session.get('csrf_token', '')
+                    session_token = self.get_token() or ''
                     header_token = request.headers.get('X-CSRF-Token', '')
                     form_token = request.form.get('csrf_token', '')
                     json_token = self._get_json_token() or ''
@@ -113,6 +165,7 @@ class CSRFProtection:
                         'session_token_length': len(session_token) if session_token else 0,
                         'sent_token_length': len(sent_token) if sent_token else 0,
                         'sent_token_source': 'header' if header_token else ('form' if form_token else ('json' if json_token else 'none')),
+                        'csrf_mode': 'stateless' if self._is_stateless() else 'session',
                         'tokens_match': bool(sent_token and session_token and secrets.compare_digest(session_token, sent_token))
                     })
                     
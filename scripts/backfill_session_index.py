@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Backfill the User -> Session Index
+
+Registers sessions stored before the user -> sessions index existed, so
+revoke-all, logout-others and account deletion (which only look at the
+index) also reach them. Sessions are read once from the configured cache
+backend (the cache_sessions collection, or the Redis namespace) and each
+one with a user_id is added to that user's index entry. Sessions already
+indexed are left alone, so the script is safe to re-run.
+
+Run once after deploying the index; sessions loaded since then were
+registered on load already.
+
+Usage:
+    python scripts/backfill_session_index.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import firebase_admin
+from firebase_admin import credentials
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK if not already initialized"""
+    if not firebase_admin._apps:
+        cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred)
+
+
+def stored_sessions(backend, key_prefix):
+    """
+    Yield (sid, stored value) for every session in a Firestore or Redis backend.
+
+    Args:
+        backend: Unwrapped cache backend
+        key_prefix: Session key prefix (SESSION_KEY_PREFIX)
+    """
+    from services.cache_service.firestore_backend import FirestoreCache
+    from services.cache_service.redis_backend import RedisCache
+
+    if isinstance(backend, FirestoreCache):
+        for doc in backend.collection.stream():
+            if doc.id.startswith(key_prefix):
+                yield doc.id[len(key_prefix):], (doc.to_dict() or {}).get('data') or {}
+    elif isinstance(backend, RedisCache):
+        full_prefix = f"{backend.namespace}{key_prefix}"
+        for raw_key in backend.client.scan_iter(match=f"{full_prefix}*", count=500):
+            full_key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            value = backend.get(full_key[len(backend.namespace):])
+            if value is not None:
+                yield full_key[len(full_prefix):], value
+    else:
+        raise SystemExit(f"❌ Unsupported cache backend: {type(backend).__name__}")
+
+
+def backfill(dry_run=False):
+    """
+    Add every stored session with a user_id to the index.
+
+    Args:
+        dry_run (bool): If True, only count the sessions
+    """
+    init_firebase()
+    from config.settings import SESSION_KEY_PREFIX
+    from services.cache_service import get_cache_service
+    from services.cache_service.codec import get_session_codec
+    from services.cache_service.session_index import UserSessions, _unwrap_backend
+
+    cache = get_cache_service()
+    user_sessions = UserSessions(cache, SESSION_KEY_PREFIX)
+    codec = get_session_codec('msgpack')  # Reads legacy pickle too
+
+    scanned = 0
+    signed_in = 0
+    failed = 0
+    for sid, value in stored_sessions(_unwrap_backend(cache), SESSION_KEY_PREFIX):
+        scanned += 1
+        try:
+            user_id = codec.loads(value.get('session_data', b'')).get('user_id')
+        except Exception:
+            failed += 1
+            continue
+        if not user_id:
+            continue
+        signed_in += 1
+        if not dry_run and not user_sessions.backfill(user_id, sid):
+            failed += 1
+
+    print(f"\n{'🔍 DRY RUN' if dry_run else '✅ Done'}: {scanned} sessions scanned, "
+          f"{signed_in} signed in, {failed} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill the user -> session index')
+    parser.add_argument('--dry-run', action='store_true', help='Count sessions without writing')
+    args = parser.parse_args()
+    backfill(dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
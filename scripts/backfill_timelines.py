@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Backfill Home Timelines
+
+Builds timelines/{userId}/entries for follow relationships that existed
+before fan-out-on-write: for every user, copies each followed author's most
+recent published creations (TIMELINE_BACKFILL_LIMIT, default 20) into their
+timeline. Celebrity authors are skipped - the feed reads them on demand.
+Safe to re-run; entries are keyed by creation ID.
+
+Usage:
+    python scripts/backfill_timelines.py [--dry-run] [--user USER_ID]
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK if not already initialized"""
+    if not firebase_admin._apps:
+        cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+def backfill(dry_run=False, user_id=None):
+    """
+    Backfill timelines for one user or every user who follows someone.
+
+    Args:
+        dry_run (bool): If True, only count the follow relationships
+        user_id (str): Limit the backfill to this user
+    """
+    db = init_firebase()
+    from services.timeline_service import get_timeline_service
+    service = get_timeline_service()
+
+    if user_id:
+        users = [db.collection('users').document(user_id).get()]
+    else:
+        users = db.collection('users').stream()
+
+    relationships = 0
+    entries = 0
+    for user_doc in users:
+        if not user_doc.exists:
+            continue
+        following = (user_doc.to_dict() or {}).get('following', [])
+        relationships += len(following)
+        if dry_run or not following:
+            continue
+        for author_id in following:
+            future = service.backfill_author(user_doc.id, author_id)
+            entries += future.result() if future else 0
+        print(f"📬 {user_doc.id}: {len(following)} followed authors")
+
+    print(f"\n{'🔍 DRY RUN' if dry_run else '✅ Done'}: {relationships} follow relationships, "
+          f"{entries} timeline entries written")
+    print(f"   Stats: {service.get_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill home timelines for existing follows')
+    parser.add_argument('--dry-run', action='store_true', help='Count relationships without writing')
+    parser.add_argument('--user', help='Only backfill this user ID')
+    args = parser.parse_args()
+    backfill(dry_run=args.dry_run, user_id=args.user)
+
+
+if __name__ == '__main__':
+    main()
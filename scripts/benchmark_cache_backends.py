@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Cache Backend Benchmark: RedisCache vs FirestoreCache
+
+Measures session get/set throughput and latency for each backend using a
+realistic session payload (pickled user_id, id_token, csrf_token, OAuth state),
+the same shape CacheSessionInterface stores.
+
+Usage:
+    python scripts/benchmark_cache_backends.py [--backends redis,firestore] [--ops 500] [--threads 8]
+
+Examples:
+    # In-process fake Redis only (no infrastructure needed)
+    python scripts/benchmark_cache_backends.py --backends fakeredis
+
+    # Real Redis (REDIS_HOST/REDIS_PORT/REDIS_PASSWORD) vs Firestore (ADC or emulator)
+    python scripts/benchmark_cache_backends.py --backends redis,firestore --threads 8
+
+Firestore writes go to the 'cache_bench' collection and are deleted afterwards.
+"""
+
+import argparse
+import os
+import pickle
+import secrets
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def make_session_value():
+    """Build a cache value shaped like a real friedmomo session."""
+    session_dict = {
+        'user_id': secrets.token_hex(14),
+        'user_email': 'bench@example.com',
+        'id_token': secrets.token_urlsafe(900),  # Firebase ID tokens are ~1KB JWTs
+        'csrf_token': secrets.token_urlsafe(32),
+        'oauth_state': {'csrf': secrets.token_urlsafe(16), 'next': '/explore'},
+        '_permanent': True,
+    }
+    return {'session_data': pickle.dumps(session_dict)}
+
+
+def build_backend(name):
+    """Create a cache backend by name, or None if unavailable."""
+    if name == 'fakeredis':
+        import fakeredis
+        from services.cache_service.redis_backend import RedisCache
+        return RedisCache(client=fakeredis.FakeRedis(), namespace='bench:')
+
+    if name == 'redis':
+        from services.cache_service.redis_backend import RedisCache
+        return RedisCache(
+            host=os.getenv('REDIS_HOST', 'localhost'),
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            password=os.getenv('REDIS_PASSWORD'),
+            namespace='bench:'
+        )
+
+    if name == 'firestore':
+        import firebase_admin
+        from firebase_admin import credentials
+        from services.cache_service.firestore_backend import FirestoreCache
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.ApplicationDefault())
+        return FirestoreCache(collection_name='cache_bench', track_access=False)
+
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def run_ops(fn, keys, threads):
+    """Run fn(key) for every key; return (total_seconds, per-op latencies in ms)."""
+    def timed(key):
+        start = time.perf_counter()
+        fn(key)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(timed, keys))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, total, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"   {label:<4} {len(latencies) / total:>9.0f} ops/s | "
+          f"p50 {statistics.median(latencies):7.2f}ms | p95 {p95:7.2f}ms")
+
+
+def benchmark(name, ops, threads):
+    try:
+        cache = build_backend(name)
+    except Exception as e:
+        print(f"⚠️  Skipping {name}: {e}\n")
+        return
+
+    value = make_session_value()
+    keys = [f"friedmomo:session:{secrets.token_hex(16)}" for _ in range(ops)]
+
+    print(f"📊 {name} ({ops} ops, {threads} threads, payload {len(pickle.dumps(value))} bytes)")
+    total, latencies = run_ops(lambda k: cache.set(k, value, ttl=600), keys, threads)
+    report('SET', total, latencies)
+    total, latencies = run_ops(cache.get, keys, threads)
+    report('GET', total, latencies)
+
+    for key in keys:
+        cache.delete(key)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cache backends on session get/set')
+    parser.add_argument('--backends', default='fakeredis,redis,firestore',
+                        help='Comma-separated: fakeredis, redis, firestore')
+    parser.add_argument('--ops', type=int, default=500, help='Operations per phase')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Concurrent threads (gunicorn runs 8 per worker)')
+    args = parser.parse_args()
+
+    for name in args.backends.split(','):
+        benchmark(name.strip(), args.ops, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Explore Feed Benchmark: direct queries vs the materialized feed cache
+
+Seeds published creations into a scratch collection, then serves N feed
+views (each loads page 1; 30% scroll on to page 2 and 10% to page 3) two
+ways and reports views per second and Firestore document reads per 1k views:
+
+- direct: the pre-cache route (query + cursor document read per page)
+- cached: ExploreFeedCache in front of the same query
+
+Needs Firestore: Application Default Credentials, or the emulator
+(FIRESTORE_EMULATOR_HOST=localhost:8080). Creations are written to the
+'creations_bench' collection and deleted afterwards. The shared tier uses
+the in-memory cache backend unless --shared-backend is given.
+
+Usage:
+    python scripts/benchmark_feed_cache.py [--views 1000] [--limit 20] [--shared-backend]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from services.cache_service import MemoryCache, get_cache_service
+from services.feed_cache import ExploreFeedCache
+
+
+COLLECTION = 'creations_bench'
+PAGE_MIX = [1] * 7 + [2] * 2 + [3]
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK if not already initialized"""
+    if not firebase_admin._apps:
+        if os.getenv('FIRESTORE_EMULATOR_HOST'):
+            firebase_admin.initialize_app(options={'projectId': os.getenv('GOOGLE_CLOUD_PROJECT', 'demo-bench')})
+        else:
+            firebase_admin.initialize_app(credentials.ApplicationDefault())
+
+
+def seed(db, count):
+    now = datetime.now(timezone.utc)
+    batch = db.batch()
+    for i in range(count):
+        batch.set(db.collection(COLLECTION).document(f'bench{i:05d}'), {
+            'userId': f'user{i % 50}',
+            'username': f'user{i % 50}',
+            'prompt': 'benchmark prompt',
+            'caption': '',
+            'mediaUrl': f'https://example.com/{i}.mp4',
+            'status': 'published',
+            'publishedAt': now - timedelta(seconds=i),
+        })
+        if (i + 1) % 500 == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+
+def cleanup(db):
+    for doc in db.collection(COLLECTION).stream():
+        doc.reference.delete()
+
+
+def direct_page(db, limit, cursor, reads):
+    """The route's query path before the cache (mirrors get_explore_feed)."""
+    query = (db.collection(COLLECTION)
+             .where(filter=firestore.FieldFilter('status', '==', 'published'))
+             .order_by('publishedAt', direction=firestore.Query.DESCENDING)
+             .limit(limit + 1))
+    if cursor:
+        cursor_doc = db.collection(COLLECTION).document(cursor).get()
+        reads[0] += 1
+        if cursor_doc.exists:
+            query = query.start_after(cursor_doc)
+    docs = list(query.stream())
+    reads[0] += max(1, len(docs))
+    return [doc.id for doc in docs[:limit]]
+
+
+def run(views, limit, serve):
+    """Serve `views` scrolls; returns elapsed seconds."""
+    rng = random.Random(42)
+    start = time.perf_counter()
+    for _ in range(views):
+        cursor = None
+        for _ in range(rng.choice(PAGE_MIX)):
+            ids = serve(limit, cursor)
+            cursor = ids[-1] if ids else None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Explore feed cache')
+    parser.add_argument('--views', type=int, default=1000, help='Feed views per case')
+    parser.add_argument('--limit', type=int, default=20, help='Page size')
+    parser.add_argument('--shared-backend', action='store_true',
+                        help='Use the configured CACHE_BACKEND for the shared tier')
+    args = parser.parse_args()
+
+    logging.getLogger('services').setLevel(logging.ERROR)
+    init_firebase()
+    db = firestore.client()
+
+    print(f"🌱 Seeding {args.limit * 5} published creations into '{COLLECTION}'")
+    seed(db, args.limit * 5)
+
+    try:
+        direct_reads = [0]
+        elapsed = run(args.views, args.limit, lambda limit, cursor: direct_page(db, limit, cursor, direct_reads))
+
+        shared = get_cache_service() if args.shared_backend else MemoryCache()
+        feed_cache = ExploreFeedCache(db=db, cache=shared, collection_name=COLLECTION)
+        cached_reads = [0]
+
+        def cached_page(limit, cursor):
+            page = feed_cache.get_page(limit, cursor)
+            if page is None:
+                return direct_page(db, limit, cursor, cached_reads)
+            return [item['creationId'] for item in page[0]]
+
+        cached_elapsed = run(args.views, args.limit, cached_page)
+        cached_reads[0] += feed_cache.get_stats()['docs_read']
+
+        print(f"\n📊 {args.views} views, limit {args.limit}")
+        for label, seconds, reads in [('direct', elapsed, direct_reads[0]),
+                                      ('feed cache', cached_elapsed, cached_reads[0])]:
+            print(f"   {label:<11} {args.views / seconds:8.1f} views/s | "
+                  f"{reads * 1000 / args.views:8.1f} Firestore reads / 1k views")
+        print(f"\n   Feed cache stats: {feed_cache.get_stats()}")
+    finally:
+        cleanup(db)
+
+
+if __name__ == '__main__':
+    main()
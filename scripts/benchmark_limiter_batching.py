@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark: one transaction per limit vs one per request
+
+Sends requests through a Flask app wired like create_app() (default limits
+"200 per day" + "50 per hour", plus "5 per hour" on a transfer-style route)
+backed by FirestoreLimiterStorage, and reports per-request limiter latency
+with and without install_limit_prefetch.
+
+Needs Firestore: Application Default Credentials, or the emulator
+(FIRESTORE_EMULATOR_HOST=localhost:8080). Counters are written to the
+'rate_limits_bench' collection and deleted afterwards.
+
+Usage:
+    python scripts/benchmark_limiter_batching.py [--requests 200]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import firebase_admin
+from firebase_admin import credentials
+from flask import Flask, request
+from flask_limiter import Limiter
+
+from services.cache_service.limiter_storage import install_limit_prefetch, register_firestore_storage
+
+
+COLLECTION = 'rate_limits_bench'
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK if not already initialized"""
+    if not firebase_admin._apps:
+        if os.getenv('FIRESTORE_EMULATOR_HOST'):
+            firebase_admin.initialize_app(options={'projectId': os.getenv('GOOGLE_CLOUD_PROJECT', 'demo-bench')})
+        else:
+            firebase_admin.initialize_app(credentials.ApplicationDefault())
+
+
+def build_app(batched):
+    """Flask app with the production limit layout."""
+    app = Flask(__name__)
+    limiter = Limiter(
+        app=app,
+        # A fresh client per request: every limit is a new document, like
+        # real traffic spread across many users
+        key_func=lambda: request.headers['X-Client'],
+        default_limits=["200 per day", "50 per hour"],
+        storage_uri="firestore://",
+        storage_options={"collection_name": COLLECTION},
+    )
+
+    @app.route('/transfer', methods=['POST'])
+    def transfer():
+        return 'ok'
+
+    @app.route('/feed')
+    def feed():
+        return 'ok'
+
+    app.view_functions['transfer'] = limiter.limit("5 per hour", override_defaults=False)(
+        app.view_functions['transfer']
+    )
+    if batched:
+        install_limit_prefetch(app, limiter)
+    return app, limiter
+
+
+def run(app, method, path, requests):
+    client = app.test_client()
+    latencies = []
+    for _ in range(requests):
+        headers = {'X-Client': uuid.uuid4().hex}
+        start = time.perf_counter()
+        resp = getattr(client, method)(path, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, resp.status_code
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"   {label:<26} mean {statistics.mean(latencies):7.1f}ms | "
+          f"p50 {statistics.median(latencies):7.1f}ms | p95 {p95:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-request rate limit cost')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per case')
+    args = parser.parse_args()
+
+    logging.getLogger('services.cache_service').setLevel(logging.ERROR)
+    init_firebase()
+    register_firestore_storage()
+
+    print(f"📊 Limiter latency per request ({args.requests} requests per case)\n")
+    for method, path, limits in [('post', '/transfer', 3), ('get', '/feed', 2)]:
+        print(f"🧪 {method.upper()} {path} ({limits} limits)")
+        for batched in (False, True):
+            app, limiter = build_app(batched)
+            run(app, method, path, 5)  # warm up connections
+            label = 'one transaction / request' if batched else 'one transaction / limit'
+            report(label, run(app, method, path, args.requests))
+            limiter.limiter.storage.reset()
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Session Codec Micro-Benchmark: pickle vs msgpack vs msgpack+zlib
+
+Measures encode/decode time and stored payload size for realistic session
+dicts. These are the shapes friedmomo stores: anonymous (CSRF token only),
+email login, Google OAuth login with profile fields, and an OAuth
+round-trip state.
+
+Usage:
+    python scripts/benchmark_session_codec.py [--iterations 20000]
+"""
+
+import argparse
+import os
+import pickle
+import secrets
+import sys
+import timeit
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.cache_service.codec import MsgpackSessionCodec, PickleSessionCodec
+
+
+def make_sessions():
+    """Build session dicts shaped like real friedmomo sessions."""
+    user_id = secrets.token_hex(14)
+    id_token = secrets.token_urlsafe(900)  # Firebase ID tokens are ~1KB JWTs
+    return {
+        'anonymous': {
+            'csrf_token': secrets.token_urlsafe(32),
+        },
+        'email_login': {
+            'csrf_token': secrets.token_urlsafe(32),
+            'id_token': id_token,
+            'user_email': 'someone@example.com',
+            'user_id': user_id,
+            '_permanent': True,
+        },
+        'google_login': {
+            'csrf_token': secrets.token_urlsafe(32),
+            'id_token': id_token,
+            'user_id': user_id,
+            'user_email': 'someone@gmail.com',
+            'user_name': 'Some One',
+            'user_picture': 'https://lh3.googleusercontent.com/a/' + secrets.token_urlsafe(60),
+            '_permanent': True,
+        },
+        'oauth_state': {
+            'csrf_token': secrets.token_urlsafe(32),
+            'oauth_state': {'csrf': secrets.token_urlsafe(16), 'next': '/soho/explore'},
+            '_flashes': [('info', 'Please log in to continue')],
+        },
+    }
+
+
+def codecs():
+    return [
+        ('pickle', PickleSessionCodec()),
+        ('msgpack', MsgpackSessionCodec(compress_threshold=10 ** 9)),
+        ('msgpack+zlib', MsgpackSessionCodec(compress_threshold=0)),
+        ('default', MsgpackSessionCodec()),
+    ]
+
+
+def bench(codec, session, iterations):
+    """Return (bytes, encode µs/op, decode µs/op)."""
+    blob = codec.dumps(session)
+    encode = timeit.timeit(lambda: codec.dumps(session), number=iterations)
+    decode = timeit.timeit(lambda: codec.loads(blob), number=iterations)
+    return len(blob), encode / iterations * 1e6, decode / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark session codecs')
+    parser.add_argument('--iterations', type=int, default=20000, help='Encode/decode calls per case')
+    args = parser.parse_args()
+
+    print(f"📊 Session codec benchmark ({args.iterations} iterations per case)\n")
+    for name, session in make_sessions().items():
+        legacy = len(pickle.dumps(session))
+        print(f"🧪 {name} (pickle: {legacy} bytes)")
+        for label, codec in codecs():
+            size, enc, dec = bench(codec, session, args.iterations)
+            print(f"   {label:<13} {size:>6} bytes ({size / legacy:>5.0%}) | "
+                  f"encode {enc:6.2f}µs | decode {dec:6.2f}µs")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -109,6 +109,11 @@ if build_and_push "reel-stitching-job" "jobs/video_stitching"; then
     fi
 fi
 
+# Cache Sweeper Job (runs the web app image, nothing to build)
+if deploy_job "cache-sweeper-job" "config/cloud_run_jobs/cache-sweeper.yaml"; then
+    ((jobs_deployed++))
+fi
+
 # Future: Video Generation Job
 # if build_and_push "reel-generation-job" "jobs/video_generation"; then
 #     ((jobs_built++))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Anonymous Traffic Load Test: session writes per request by CSRF mode
+
+Replays anonymous traffic (crawlers without cookies, returning visitors that
+send their cookie back, frontend GET /api/csrf-token calls) through the real
+CacheSessionInterface + CSRFProtection stack and counts cache backend
+operations. With CSRF_MODE=session every new visitor costs a session write;
+with CSRF_MODE=stateless anonymous traffic should cause zero writes until a
+user actually logs in.
+
+The backend is an in-process MemoryCache that counts reads/writes, so this
+needs no Firestore credentials. Every write it counts would have been a
+Firestore document write in production.
+
+Usage:
+    python scripts/load_test_anonymous_sessions.py [--requests 1000] [--returning 0.3] [--logins 5]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify, session
+
+from middleware.csrf_protection import CSRFProtection
+from services.cache_service.flask_adapter import CacheSessionInterface
+from services.cache_service.memory_backend import MemoryCache
+
+
+COOKIE_NAME = '__session'
+
+
+def build_app(mode):
+    """Minimal app with the production session + CSRF wiring."""
+    app = Flask(__name__)
+    app.secret_key = 'load-test-secret'
+    app.config['SESSION_COOKIE_NAME'] = COOKIE_NAME
+    app.config['CSRF_MODE'] = mode
+
+    cache = MemoryCache()
+    app.session_interface = CacheSessionInterface(key_prefix='friedmomo:session:', cache=cache)
+
+    csrf = CSRFProtection(app)
+
+    @app.after_request
+    def add_csrf_header(resp):
+        token = csrf.get_token()
+        if token:
+            resp.headers['X-CSRF-Token'] = token
+        return resp
+
+    @app.route('/api/feed/explore')
+    def explore():
+        return jsonify({'success': True, 'creations': []})
+
+    @app.route('/api/csrf-token')
+    def csrf_token():
+        return jsonify({'success': True, 'csrf_token': csrf.get_token()})
+
+    @app.route('/api/auth/login', methods=['POST'])
+    @csrf.protect
+    def login():
+        session['user_id'] = 'load-test-user'
+        return jsonify({'success': True})
+
+    return app, cache
+
+
+def run(mode, total, returning_ratio, logins, seed):
+    """Replay the traffic mix; return backend stats and anonymous-phase counts."""
+    rng = random.Random(seed)
+    app, cache = build_app(mode)
+
+    # Anonymous phase
+    clients = []
+    start = time.perf_counter()
+    for _ in range(total):
+        if clients and rng.random() < returning_ratio:
+            client = rng.choice(clients)
+        else:
+            client = app.test_client()
+            clients.append(client)
+        path = '/api/csrf-token' if rng.random() < 0.2 else '/api/feed/explore'
+        client.get(path)
+    elapsed = time.perf_counter() - start
+    anonymous = cache.get_stats()
+
+    # Login phase: a few visitors fetch a token and log in
+    failures = 0
+    for client in clients[:logins]:
+        token = client.get('/api/csrf-token').get_json()['csrf_token']
+        resp = client.post('/api/auth/login', headers={'X-CSRF-Token': token})
+        if resp.status_code != 200:
+            failures += 1
+
+    return anonymous, cache.get_stats(), len(clients), elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count session backend writes for anonymous traffic')
+    parser.add_argument('--requests', type=int, default=1000, help='Anonymous requests to replay')
+    parser.add_argument('--returning', type=float, default=0.3,
+                        help='Fraction of requests from visitors that already have a cookie')
+    parser.add_argument('--logins', type=int, default=5, help='Visitors that log in afterwards')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Per-request session logging would drown the report
+    logging.getLogger('services.cache_service').setLevel(logging.ERROR)
+
+    print(f"🧪 Replaying {args.requests} anonymous requests "
+          f"({args.returning:.0%} returning visitors), then {args.logins} logins\n")
+
+    for mode in ('session', 'stateless'):
+        anonymous, final, visitors, elapsed, failures = run(
+            mode, args.requests, args.returning, args.logins, args.seed
+        )
+        print(f"📊 CSRF_MODE={mode}")
+        print(f"   visitors:                  {visitors}")
+        print(f"   backend writes (anonymous): {anonymous['writes']} "
+              f"({anonymous['writes'] / args.requests:.3f} per request)")
+        print(f"   backend reads (anonymous):  {anonymous['reads']} "
+              f"({anonymous['reads'] / args.requests:.3f} per request)")
+        print(f"   stored sessions:           {anonymous['entries']}")
+        print(f"   writes after logins:       {final['writes'] - anonymous['writes']}")
+        print(f"   login CSRF failures:       {failures}")
+        print(f"   throughput:                {args.requests / elapsed:.0f} req/s\n")
+
+
+if __name__ == '__main__':
+    main()
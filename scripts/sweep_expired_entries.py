@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Sweep Expired Cache Sessions and Rate-Limit Windows
+
+Deletes documents past their expiry from cache_sessions (expires_at) and
+rate_limits (expiry) when the Firestore TTL policy is lagging. Deletes go
+through a throttled BulkWriter; progress is checkpointed in
+sweeper_checkpoints/{collection}, so a run stopped by --max-seconds (or a
+crash) resumes where it left off on the next run.
+
+Runs as the `cache-sweeper` Cloud Run job (config/cloud_run_jobs.yaml).
+
+Usage:
+    python scripts/sweep_expired_entries.py [--collection all] [--max-seconds 3000]
+                                            [--max-ops-per-second 500] [--dry-run]
+
+Examples:
+    # How far behind is TTL deletion? (no changes)
+    python scripts/sweep_expired_entries.py --dry-run --max-docs 10000
+
+    # Sweep only rate limits, gently
+    python scripts/sweep_expired_entries.py --collection rate_limits --max-ops-per-second 100
+
+    # Ignore a previous run's checkpoint and start from the oldest doc
+    python scripts/sweep_expired_entries.py --restart
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from services.cache_service.sweeper import ExpiredEntrySweeper, SWEEP_TARGETS
+
+
+def init_firebase():
+    """Initialize Firebase Admin SDK if not already initialized"""
+    if not firebase_admin._apps:
+        cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Delete expired cache/rate-limit documents')
+    parser.add_argument('--collection', choices=['all', *SWEEP_TARGETS], default='all',
+                        help='Collection to sweep (default: all)')
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='Time budget per collection; stops with a checkpoint')
+    parser.add_argument('--max-docs', type=int, default=None,
+                        help='Document budget per collection; stops with a checkpoint')
+    parser.add_argument('--max-ops-per-second', type=int,
+                        default=int(os.getenv('SWEEPER_MAX_OPS_PER_SECOND', 500)),
+                        help='Delete throughput cap (default: 500)')
+    parser.add_argument('--page-size', type=int, default=1000, help='Documents per query page')
+    parser.add_argument('--restart', action='store_true', help='Ignore existing checkpoints')
+    parser.add_argument('--dry-run', action='store_true', help='Count expired documents without deleting')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(message)s')
+
+    db = init_firebase()
+    collections = list(SWEEP_TARGETS) if args.collection == 'all' else [args.collection]
+
+    print(f"{'🔍 DRY RUN MODE' if args.dry_run else '🧹 SWEEPING'}: {', '.join(collections)}\n")
+
+    incomplete = False
+    for name in collections:
+        sweeper = ExpiredEntrySweeper(
+            db,
+            name,
+            page_size=args.page_size,
+            max_ops_per_second=args.max_ops_per_second,
+        )
+        stats = sweeper.run(
+            max_seconds=args.max_seconds,
+            max_docs=args.max_docs,
+            resume=not args.restart,
+            dry_run=args.dry_run,
+        )
+        incomplete = incomplete or not stats['complete']
+
+        print(f"📋 {name}{' (resumed)' if stats['resumed'] else ''}")
+        print(f"   {'Expired' if args.dry_run else 'Deleted'}: {stats['deleted']}  Failed: {stats['failed']}")
+        print(f"   Throughput: {stats['docs_per_second']} docs/s over {stats['elapsed_seconds']}s")
+        print(f"   Lag: oldest expired doc was {stats['lag_seconds'] / 3600:.1f}h past expiry")
+        if not stats['complete']:
+            print("   ⏸️  Budget reached - next run resumes from checkpoint")
+        print()
+
+    if incomplete:
+        print("💡 Backlog remains; the next scheduled run will continue it")
+
+
+if __name__ == '__main__':
+    main()
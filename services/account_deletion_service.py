@@ -19,16 +19,17 @@ Collections Cleaned:
 --------------------
 1. users           - Main user document (contains profile, tokenBalance, etc.)
 2. usernames       - Username claim (releases username for reuse)
-3. creations       - All images/videos with comments subcollection
+3. creations       - All images/videos with comments and like_shards subcollections
 4. transactions    - Complete transaction/ledger history
 5. user_subscriptions - Stripe subscription records
 6. user_usage      - Daily usage tracking records
 7. user_social_accounts - Connected social media accounts
 8. social_posts    - Synced social media posts
 9. oauth_states    - OAuth temporary tokens
-10. cache_sessions - Flask session data
+10. cache_sessions - Flask session data (found via the session_index collection)
 11. security_alerts - Rate limit and security event logs
 12. image_generations - Legacy image generation history (from /api/image)
+13. likes          - Likes the user gave (counts on the liked creations are decremented)
 
 External Resources Cleaned:
 ---------------------------
@@ -226,6 +227,10 @@ class AccountDeletionService:
             cleanup_summary['firestore']['creations'] = count
             cleanup_summary['firestore']['creation_comments'] = 'included'
             logger.info(f"✅ Deleted {count} creations (with comments)")
+            if count:
+                # Published ones may be sitting in the cached Explore feed
+                from services.feed_cache import invalidate_explore_feed
+                invalidate_explore_feed(f"account {user_id} deleted")
         except Exception as e:
             media_urls = []
             errors.append(f"Failed to delete creations: {e}")
@@ -384,6 +389,31 @@ class AccountDeletionService:
             errors.append(f"Failed to clean follow relationships: {e}")
             logger.error(f"❌ Error cleaning follow relationships: {e}")
 
+        # ---------------------------------------------------------------------
+        # STEP 12c: Delete the user's home timeline
+        # ---------------------------------------------------------------------
+        try:
+            from services.timeline_service import TIMELINES_COLLECTION, ENTRIES_SUBCOLLECTION
+            timeline_ref = self.db.collection(TIMELINES_COLLECTION).document(user_id)
+            count = self._delete_subcollection(timeline_ref, ENTRIES_SUBCOLLECTION)
+            cleanup_summary['firestore']['timeline_entries'] = count
+            logger.info(f"✅ Deleted {count} timeline entries")
+        except Exception as e:
+            errors.append(f"Failed to delete timeline: {e}")
+            logger.error(f"❌ Error deleting timeline: {e}")
+
+        # ---------------------------------------------------------------------
+        # STEP 12d: Withdraw the user's likes (decrements the like counters)
+        # ---------------------------------------------------------------------
+        try:
+            from services.like_service import get_like_service
+            count = get_like_service().remove_all_likes(user_id)
+            cleanup_summary['firestore']['likes'] = count
+            logger.info(f"✅ Removed {count} likes")
+        except Exception as e:
+            errors.append(f"Failed to remove likes: {e}")
+            logger.error(f"❌ Error removing likes: {e}")
+
         # ---------------------------------------------------------------------
         # STEP 13: Delete Stripe customer (external API)
         # ---------------------------------------------------------------------
@@ -616,8 +646,9 @@ class AccountDeletionService:
             if thumbnail_url and thumbnail_url != media_url:
                 media_urls.append(thumbnail_url)
 
-            # Delete all comments on this creation (subcollection)
+            # Delete all comments and like counter shards (subcollections)
             self._delete_subcollection(doc.reference, 'comments')
+            self._delete_subcollection(doc.reference, 'like_shards')
 
             # Delete the creation document
             doc.reference.delete()
@@ -915,7 +946,8 @@ class AccountDeletionService:
     def _delete_user_sessions(self, user_id: str) -> int:
         """
         Delete session cache entries for the user.
-        Sessions are keyed by session ID, not user ID, so we must scan.
+        Sessions are found through the user -> sessions index, so this costs
+        O(user's sessions) instead of a scan of every stored session.
 
         Args:
             user_id: Firebase Auth UID
@@ -923,25 +955,11 @@ class AccountDeletionService:
         Returns:
             Number of sessions deleted
         """
-        deleted_count = 0
-
-        # Scan all sessions (necessary because sessions are keyed by session ID)
-        sessions = self.db.collection('cache_sessions').stream()
+        from config.settings import SESSION_KEY_PREFIX
+        from services.cache_service import get_cache_service
+        from services.cache_service.session_index import UserSessions
 
-        for doc in sessions:
-            try:
-                data = doc.to_dict()
-                session_data = data.get('data', {})
-
-                # Check if this session belongs to the user
-                if session_data.get('user_id') == user_id:
-                    doc.reference.delete()
-                    deleted_count += 1
-                    logger.debug(f"Deleted session: {doc.id}")
-            except Exception as e:
-                logger.debug(f"Error checking session {doc.id}: {e}")
-
-        return deleted_count
+        return UserSessions(get_cache_service(), SESSION_KEY_PREFIX).revoke_all(user_id)
 
     def _delete_user_comments_on_others(self, user_id: str) -> int:
         """
@@ -978,18 +996,31 @@ class AccountDeletionService:
                     .stream()
                 )
 
+                deleted_here = 0
                 for comment_doc in comments:
                     comment_doc.reference.delete()
                     deleted_count += 1
+                    deleted_here += 1
 
-                    # Decrement comment count on the creation
+                    # Decrement comment count on the creation (and the
+                    # thread's reply count for replies)
                     try:
                         creation_doc.reference.update({
                             'commentCount': firestore.Increment(-1)
                         })
+                        root_id = (comment_doc.to_dict() or {}).get('rootCommentId')
+                        if root_id:
+                            creation_doc.reference.collection('comments').document(root_id).update({
+                                'replyCount': firestore.Increment(-1)
+                            })
                     except Exception:
                         pass  # Non-critical if this fails
 
+                if deleted_here:
+                    # Drop the cached first comment page
+                    from services.comment_service import invalidate_comments
+                    invalidate_comments(creation_doc.id)
+
             except Exception as e:
                 logger.debug(f"Error processing creation {creation_doc.id}: {e}")
 
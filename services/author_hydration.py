@@ -0,0 +1,185 @@
+"""Author Hydration - Fresh Author Profiles for Feed and Comment Items
+
+Feed items and comments carry the `username` (and, for comments, the
+avatar) copied when they were written, so renamed users and new avatars
+never show up. Reading each author per item would be N+1 reads; instead a
+response runs one hydration stage:
+
+1. Collect the distinct `userId`s on the page.
+2. Resolve them through, in order:
+   - the per-request identity map (flask.g) - one lookup per author per
+     request, however many stages run;
+   - the in-process profile cache (LocalCache, AUTHOR_CACHE_TTL seconds);
+   - one `get_all()` for the rest, projected to AUTHOR_FIELDS.
+3. Attach `username`, `displayName` and `profileImageUrl` (plus
+   `avatarUrl` for comments) to copies of the items.
+
+Authors whose user document is gone keep their denormalized values.
+UserService.update_profile/set_username drop the local cache entry; other
+instances pick up the change within the TTL.
+
+Environment Variables:
+    AUTHOR_CACHE_TTL: Profile cache lifetime in seconds (default: 60)
+"""
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from firebase_admin import firestore
+from flask import g, has_app_context
+
+from services.cache_service.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+AUTHOR_FIELDS = ('username', 'displayName', 'profileImageUrl')
+
+
+class AuthorHydrator:
+    """Batched, cached author profile lookups."""
+
+    def __init__(self, db=None, ttl: float = 60.0, max_entries: int = 4096):
+        """
+        Initialize the hydrator.
+
+        Args:
+            db: Firestore client (uses default if not provided)
+            ttl: Seconds a profile is reused in this process
+            max_entries: Profiles kept before LRU eviction
+        """
+        self.db = db or firestore.client()
+        self.users_collection = 'users'
+        self.local = LocalCache(max_entries=max_entries, default_ttl=ttl)
+
+        self.batches = 0
+        self.profiles_read = 0
+
+    def get_profiles(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve author profiles with at most one Firestore round-trip.
+
+        Args:
+            user_ids: Firebase UIDs (duplicates and None are ignored)
+
+        Returns:
+            Dict of user_id -> profile fields ({} for users that don't exist)
+        """
+        identity_map = _identity_map()
+        profiles = {}
+        missing = []
+        for user_id in dict.fromkeys(uid for uid in user_ids if uid):
+            profile = identity_map.get(user_id)
+            if profile is None:
+                profile = self.local.get(user_id)
+            if profile is None:
+                missing.append(user_id)
+            else:
+                profiles[user_id] = profile
+
+        if missing:
+            versions = {user_id: self.local.next_version() for user_id in missing}
+            refs = [self.db.collection(self.users_collection).document(uid) for uid in missing]
+            found = {doc.id: doc.to_dict() or {}
+                     for doc in self.db.get_all(refs, field_paths=AUTHOR_FIELDS) if doc.exists}
+            self.batches += 1
+            self.profiles_read += len(missing)
+
+            for user_id in missing:
+                profile = {field: found[user_id].get(field) for field in AUTHOR_FIELDS} if user_id in found else {}
+                self.local.set(user_id, profile, version=versions[user_id])
+                profiles[user_id] = profile
+
+        identity_map.update(profiles)
+        return profiles
+
+    def hydrate(self, items: List[Dict[str, Any]], avatar_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Attach fresh author fields to a page of items.
+
+        Never raises: on a lookup error the items are returned unchanged.
+
+        Args:
+            items: Serialized items with a 'userId' (not modified - may be cached)
+            avatar_key: Also refresh this legacy avatar field (e.g. 'avatarUrl')
+
+        Returns:
+            Copies of the items with username, displayName and profileImageUrl
+        """
+        if not items:
+            return items
+        try:
+            profiles = self.get_profiles(item.get('userId') for item in items)
+        except Exception as e:
+            logger.error(f"Author hydration failed for {len(items)} items: {e}", exc_info=True)
+            return items
+
+        hydrated = []
+        for item in items:
+            profile = profiles.get(item.get('userId')) or {}
+            item = {
+                **item,
+                'username': profile.get('username') or item.get('username', 'Unknown'),
+                'displayName': profile.get('displayName') or item.get('displayName'),
+                'profileImageUrl': profile.get('profileImageUrl') or item.get('profileImageUrl'),
+            }
+            if avatar_key:
+                item[avatar_key] = item['profileImageUrl'] or item.get(avatar_key, '')
+            hydrated.append(item)
+        return hydrated
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a cached profile after the user changes it.
+
+        Args:
+            user_id: Firebase UID
+        """
+        self.local.delete(user_id)
+        _identity_map().pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of hydration counters.
+
+        Returns:
+            Dict with batches, profiles_read and the profile cache stats
+        """
+        return {
+            'batches': self.batches,
+            'profiles_read': self.profiles_read,
+            'cache': self.local.get_stats(),
+        }
+
+
+def _identity_map() -> Dict[str, Dict[str, Any]]:
+    """Profiles resolved during the current request ({} outside one)."""
+    if not has_app_context():
+        return {}
+    if 'author_profiles' not in g:
+        g.author_profiles = {}
+    return g.author_profiles
+
+
+# Singleton instance for easy import
+_hydrator_instance: Optional[AuthorHydrator] = None
+
+
+def get_author_hydrator() -> AuthorHydrator:
+    """Get or create the singleton AuthorHydrator."""
+    global _hydrator_instance
+    if _hydrator_instance is None:
+        _hydrator_instance = AuthorHydrator(ttl=float(os.getenv('AUTHOR_CACHE_TTL', '60')))
+    return _hydrator_instance
+
+
+def invalidate_author(user_id: str) -> None:
+    """
+    Drop a user's cached author profile. Never raises.
+
+    Args:
+        user_id: Firebase UID whose profile changed
+    """
+    try:
+        get_author_hydrator().invalidate(user_id)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate author profile {user_id}: {e}")
@@ -2,8 +2,8 @@
 Cache Service - Reusable Session & Key-Value Store
 
 A production-ready, backend-agnostic caching service that can be used
-across multiple projects. Currently implements Firestore backend with
-future support for Redis.
+across multiple projects. Implements Firestore (default), Redis and
+in-memory backends, selected with CACHE_BACKEND.
 
 Usage:
     from services.cache_service import get_cache_service
@@ -15,6 +15,9 @@ Usage:
 
 from .interface import CacheServiceInterface
 from .factory import get_cache_service
+from .local_cache import LocalCache, TieredCache
+from .memory_backend import MemoryCache
+from .single_flight import SingleFlight
 
-__all__ = ["CacheServiceInterface", "get_cache_service"]
+__all__ = ["CacheServiceInterface", "get_cache_service", "LocalCache", "TieredCache", "MemoryCache", "SingleFlight"]
 __version__ = "1.0.0"
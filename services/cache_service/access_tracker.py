@@ -0,0 +1,213 @@
+"""
+Background Access-Time Flusher
+
+Collects "this key was just read" touches in memory and writes the
+last_accessed timestamps to Firestore in batches from a daemon thread,
+so cache hits never wait on a write.
+
+- Repeat touches of a key within `dedupe_window` seconds are dropped
+- Pending touches are committed every `flush_interval` seconds in batched
+  writes of up to 500 operations (Firestore batch limit)
+- Whatever is pending is flushed on interpreter shutdown (atexit)
+
+Usage:
+    tracker = AccessTimeFlusher(db, collection, flush_interval=5, dedupe_window=60)
+    tracker.touch("friedmomo:session:abc")   # O(1), never blocks on I/O
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+
+logger = logging.getLogger(__name__)
+
+# Firestore batches are limited to 500 operations
+MAX_BATCH_SIZE = 500
+
+
+class AccessTimeFlusher:
+    """
+    Coalesces last_accessed updates and commits them from a daemon thread.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection,
+        flush_interval: float = 5.0,
+        dedupe_window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the flusher. The worker thread starts on the first touch.
+
+        Args:
+            db: Firestore client (used to create write batches)
+            collection: Firestore collection reference holding the entries
+            flush_interval: Seconds between background flushes
+            dedupe_window: Seconds during which repeat touches of a key are dropped
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.db = db
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._clock = clock
+
+        self._pending: Dict[str, datetime] = {}
+        self._last_touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.touches = 0
+        self.deduplicated = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+        atexit.register(self.stop)
+
+    def touch(self, key: str) -> None:
+        """
+        Record an access. Never performs I/O.
+
+        Args:
+            key: Cache key (document ID) that was read
+        """
+        now = self._clock()
+        with self._lock:
+            self.touches += 1
+            last = self._last_touched.get(key)
+            if last is not None and now - last < self.dedupe_window:
+                self.deduplicated += 1
+                return
+
+            self._last_touched[key] = now
+            self._pending[key] = datetime.now(timezone.utc)
+
+        self._ensure_started()
+
+    def flush(self) -> int:
+        """
+        Commit all pending access times now.
+
+        Returns:
+            Number of documents updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._prune_dedupe_state()
+
+            if not pending:
+                return 0
+
+            items = list(pending.items())
+            updated = 0
+            for start in range(0, len(items), MAX_BATCH_SIZE):
+                updated += self._commit_chunk(items[start:start + MAX_BATCH_SIZE])
+
+            logger.debug(f"Flushed {updated}/{len(items)} access times for {self.collection.id}")
+            return updated
+
+    def stop(self) -> None:
+        """Stop the worker thread and flush whatever is still pending."""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Final access-time flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of flusher counters.
+
+        Returns:
+            Dict with touches, deduplicated, pending, written, batches and errors
+        """
+        with self._lock:
+            return {
+                'touches': self.touches,
+                'deduplicated': self.deduplicated,
+                'pending': len(self._pending),
+                'written': self.written,
+                'batches': self.batches,
+                'errors': self.errors,
+            }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stop_event.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"access-flusher-{self.collection.id}",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the worker alive; next interval retries new touches
+                logger.warning(f"Background access-time flush failed: {e}")
+
+    def _commit_chunk(self, items: List[Tuple[str, datetime]]) -> int:
+        batch = self.db.batch()
+        for key, accessed_at in items:
+            batch.update(self.collection.document(key), {'last_accessed': accessed_at})
+
+        try:
+            batch.commit()
+            self._record_write(len(items), batches=1)
+            return len(items)
+        except google_exceptions.NotFound:
+            # A batch fails as a whole if any entry was deleted/expired
+            # in the meantime - retry the chunk per document
+            return self._commit_individually(items)
+        except Exception as e:
+            logger.warning(f"Access-time batch commit failed ({len(items)} keys): {e}")
+            with self._lock:
+                self.errors += 1
+            return 0
+
+    def _commit_individually(self, items: List[Tuple[str, datetime]]) -> int:
+        updated = 0
+        for key, accessed_at in items:
+            try:
+                self.collection.document(key).update({'last_accessed': accessed_at})
+                updated += 1
+            except google_exceptions.NotFound:
+                pass
+            except Exception as e:
+                logger.debug(f"Access-time update failed for {key}: {e}")
+                with self._lock:
+                    self.errors += 1
+        self._record_write(updated, batches=0)
+        return updated
+
+    def _record_write(self, count: int, batches: int) -> None:
+        with self._lock:
+            self.written += count
+            self.batches += batches
+
+    def _prune_dedupe_state(self) -> None:
+        """Forget touches older than the dedupe window (caller holds _lock)."""
+        cutoff = self._clock() - self.dedupe_window
+        stale = [key for key, ts in self._last_touched.items() if ts < cutoff]
+        for key in stale:
+            del self._last_touched[key]
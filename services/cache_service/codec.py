@@ -0,0 +1,165 @@
+"""
+Session Codecs
+
+Serializers for the session_data blob CacheSessionInterface stores. A codec
+exposes the same dumps/loads pair as pickle, so it drops in as the session
+interface's `serializer`.
+
+Wire format (MsgpackSessionCodec):
+    byte 0     : format version
+                 0x01 = msgpack
+                 0x02 = zlib-compressed msgpack
+    bytes 1..n : payload
+
+Legacy pickle blobs (protocol >= 2 always starts with 0x80) are still
+decoded, so sessions written before the switch keep working until they are
+next saved or expire.
+
+Usage:
+    codec = get_session_codec('msgpack')
+    blob = codec.dumps({'user_id': 'abc', 'csrf_token': '...'})
+    codec.loads(blob)
+"""
+
+import logging
+import pickle
+import zlib
+from datetime import datetime
+from typing import Any, Dict
+
+import msgpack
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_MSGPACK = 0x01
+FORMAT_MSGPACK_ZLIB = 0x02
+
+# First byte of any pickle written with protocol >= 2
+_PICKLE_MARKER = 0x80
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+
+
+def _encode_ext(obj):
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode('utf-8'))
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Cannot encode {type(obj).__name__} in session")
+
+
+def _decode_ext(code, data):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode('utf-8'))
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackSessionCodec:
+    """
+    Compact, versioned session codec: msgpack, zlib above a size threshold.
+
+    Reads both its own format and legacy pickle blobs.
+    """
+
+    name = 'msgpack'
+
+    def __init__(self, compress_threshold: int = 512, compress_level: int = 6):
+        """
+        Initialize codec.
+
+        Args:
+            compress_threshold: Payloads larger than this (bytes) are zlib-compressed
+                when that makes them smaller
+            compress_level: zlib compression level (1-9)
+        """
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encode a session dict.
+
+        Args:
+            data: Session dict (str keys; str/bytes/int/float/bool/None/
+                list/dict/datetime values)
+
+        Returns:
+            Version byte + payload
+
+        Raises:
+            TypeError: If the session holds a value msgpack can't represent
+        """
+        payload = msgpack.packb(data, use_bin_type=True, default=_encode_ext)
+        if len(payload) > self.compress_threshold:
+            compressed = zlib.compress(payload, self.compress_level)
+            if len(compressed) < len(payload):
+                return bytes([FORMAT_MSGPACK_ZLIB]) + compressed
+        return bytes([FORMAT_MSGPACK]) + payload
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        """
+        Decode a session blob in any supported format.
+
+        Args:
+            raw: Stored bytes
+
+        Returns:
+            Session dict
+
+        Raises:
+            ValueError: If the format byte is unknown
+        """
+        if not raw:
+            return {}
+
+        version = raw[0]
+        if version == FORMAT_MSGPACK:
+            return self._unpack(raw[1:])
+        if version == FORMAT_MSGPACK_ZLIB:
+            return self._unpack(zlib.decompress(raw[1:]))
+        if version == _PICKLE_MARKER:
+            # Written before the codec switch - rewritten in the new format on next save
+            return pickle.loads(raw)
+
+        raise ValueError(f"Unknown session format byte: 0x{version:02x}")
+
+    @staticmethod
+    def _unpack(payload: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(payload, raw=False, ext_hook=_decode_ext, strict_map_key=False)
+
+
+class PickleSessionCodec(MsgpackSessionCodec):
+    """
+    Legacy codec: writes plain pickle (the original CacheSessionInterface format).
+
+    Still reads msgpack blobs, so instances on either codec can share sessions
+    during a staged rollout.
+    """
+
+    name = 'pickle'
+
+    def dumps(self, data: Dict[str, Any]) -> bytes:
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def get_session_codec(name: str = 'msgpack'):
+    """
+    Get a session codec by name.
+
+    Args:
+        name: "msgpack" (default) or "pickle"
+
+    Returns:
+        Codec instance with dumps/loads
+
+    Raises:
+        ValueError: If invalid codec specified
+    """
+    name = (name or 'msgpack').lower()
+    if name == 'msgpack':
+        return MsgpackSessionCodec()
+    if name == 'pickle':
+        return PickleSessionCodec()
+    raise ValueError(f"Invalid SESSION_CODEC: {name}. Use 'msgpack' or 'pickle'")
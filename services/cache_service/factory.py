@@ -5,11 +5,15 @@ Creates appropriate cache backend based on configuration.
 Allows easy swapping between Firestore, Redis, etc.
 
 Environment Variables:
-    CACHE_BACKEND: "firestore" or "redis" (default: "firestore")
+    CACHE_BACKEND: "firestore", "redis" or "memory" (default: "firestore")
     CACHE_COLLECTION_NAME: Firestore collection name (default: "cache_sessions")
+    CACHE_TRACK_ACCESS: "1" to record last_accessed on hits, "0" to disable (default: "1")
     REDIS_HOST: Redis host (for Redis backend)
     REDIS_PORT: Redis port (for Redis backend)
     REDIS_PASSWORD: Redis password (for Redis backend)
+    REDIS_DB: Redis database number (for Redis backend, default: 0)
+    CACHE_L1_MAX_ENTRIES: Size of the in-process L1 tier (default: 0 = disabled)
+    CACHE_L1_TTL: L1 entry lifetime in seconds (default: 30)
 """
 
 import os
@@ -18,6 +22,7 @@ from typing import Optional
 
 from .interface import CacheServiceInterface
 from .firestore_backend import FirestoreCache
+from .local_cache import TieredCache
 
 
 logger = logging.getLogger(__name__)
@@ -49,22 +54,38 @@ def get_cache_service(force_recreate: bool = False) -> CacheServiceInterface:
 
     if backend == 'firestore':
         collection_name = os.getenv('CACHE_COLLECTION_NAME', 'cache_sessions')
-        _cache_instance = FirestoreCache(collection_name=collection_name)
+        track_access = os.getenv('CACHE_TRACK_ACCESS', '1') == '1'
+        _cache_instance = FirestoreCache(
+            collection_name=collection_name,
+            track_access=track_access
+        )
 
     elif backend == 'redis':
-        # Future implementation
         from .redis_backend import RedisCache
         redis_host = os.getenv('REDIS_HOST', 'localhost')
         redis_port = int(os.getenv('REDIS_PORT', 6379))
         redis_password = os.getenv('REDIS_PASSWORD')
+        redis_db = int(os.getenv('REDIS_DB', 0))
         _cache_instance = RedisCache(
             host=redis_host,
             port=redis_port,
-            password=redis_password
+            password=redis_password,
+            db=redis_db
         )
 
+    elif backend == 'memory':
+        # Process-local, for development and load tests only
+        from .memory_backend import MemoryCache
+        _cache_instance = MemoryCache()
+
     else:
-        raise ValueError(f"Invalid CACHE_BACKEND: {backend}. Use 'firestore' or 'redis'")
+        raise ValueError(f"Invalid CACHE_BACKEND: {backend}. Use 'firestore', 'redis' or 'memory'")
+
+    # Optional in-process L1 tier in front of the shared backend
+    l1_max_entries = int(os.getenv('CACHE_L1_MAX_ENTRIES', 0))
+    if l1_max_entries > 0:
+        l1_ttl = float(os.getenv('CACHE_L1_TTL', 30))
+        _cache_instance = TieredCache(_cache_instance, max_entries=l1_max_entries, ttl=l1_ttl)
 
     logger.debug(f"Cache service initialized: {type(_cache_instance).__name__}")
     return _cache_instance
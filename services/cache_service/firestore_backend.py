@@ -14,12 +14,13 @@ Latency: 5-20ms reads, 20-50ms writes
 """
 
 import logging
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List
 from datetime import datetime, timedelta, timezone
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
 
 from .interface import CacheServiceInterface
+from .access_tracker import AccessTimeFlusher, MAX_BATCH_SIZE
 
 
 logger = logging.getLogger(__name__)
@@ -41,19 +42,44 @@ class FirestoreCache(CacheServiceInterface):
     TTL Policy:
         Firestore automatically deletes documents where expires_at < now
         (within 24 hours of expiration)
+
+    Access Tracking:
+        Cache hits record last_accessed through a background AccessTimeFlusher
+        (deduplicated, batched), so reads never wait on a write. Pass
+        track_access=False for collections that don't need it.
     """
 
-    def __init__(self, collection_name: str = "cache_sessions"):
+    def __init__(
+        self,
+        collection_name: str = "cache_sessions",
+        track_access: bool = True,
+        access_flush_interval: float = 5.0,
+        access_dedupe_window: float = 60.0
+    ):
         """
         Initialize Firestore cache backend.
 
         Args:
             collection_name: Name of Firestore collection to use
+            track_access: Record last_accessed on cache hits (default: True)
+            access_flush_interval: Seconds between batched access-time writes
+            access_dedupe_window: Seconds during which repeat hits on a key are not re-recorded
         """
         self.collection_name = collection_name
         self.db = firestore.client()
         self.collection = self.db.collection(collection_name)
-        logger.debug(f"FirestoreCache initialized with collection: {collection_name}")
+        self.access_tracker = None
+        if track_access:
+            self.access_tracker = AccessTimeFlusher(
+                self.db,
+                self.collection,
+                flush_interval=access_flush_interval,
+                dedupe_window=access_dedupe_window
+            )
+        logger.debug(
+            f"FirestoreCache initialized with collection: {collection_name} "
+            f"(track_access={track_access})"
+        )
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -95,7 +121,7 @@ class FirestoreCache(CacheServiceInterface):
                     doc_ref.delete()
                     return None
 
-            # Update last_accessed timestamp asynchronously (don't block read)
+            # Queue last_accessed update for the background flusher (don't block read)
             self._async_update_access_time(key)
 
             logger.info(f"✅ Cache hit: {key}")
@@ -259,21 +285,173 @@ class FirestoreCache(CacheServiceInterface):
             logger.error(f"Error getting metadata: {key} - {e}", exc_info=True)
             return None
 
+    # =========================================================================
+    # MULTI-KEY OPERATIONS (get_all / batched writes of up to 500 operations)
+    # =========================================================================
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve several entries with one get_all() per 500 keys.
+
+        Expired entries are treated as misses and deleted in a batch.
+
+        Args:
+            keys: Cache keys (document IDs)
+
+        Returns:
+            Dict of key -> data for keys that were found and not expired
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        try:
+            now = datetime.now(timezone.utc)
+            results = {}
+            expired = []
+
+            for start in range(0, len(keys), MAX_BATCH_SIZE):
+                refs = [self.collection.document(key) for key in keys[start:start + MAX_BATCH_SIZE]]
+                for doc in self.db.get_all(refs):
+                    if not doc.exists:
+                        continue
+                    entry = doc.to_dict()
+                    if self._is_expired(entry, now):
+                        expired.append(doc.id)
+                        continue
+                    results[doc.id] = entry.get('data')
+                    self._async_update_access_time(doc.id)
+
+            if expired:
+                self._delete_in_batches(expired)
+
+            logger.info(f"📖 Cache GET_MANY: {len(results)}/{len(keys)} hits ({len(expired)} expired)")
+            return results
+
+        except Exception as e:
+            logger.error(f"💥 Error reading {len(keys)} keys from cache: {e}", exc_info=True)
+            return {}
+
+    def set_many(
+        self,
+        items: Dict[str, Dict[str, Any]],
+        ttl: int = 2592000,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Store several entries in batched writes of up to 500 operations.
+
+        Batches are committed in order; if one fails, earlier batches
+        stay written.
+
+        Args:
+            items: Dict of key -> data to cache
+            ttl: Time-to-live in seconds for every entry (default: 30 days)
+            ttls: Optional per-key TTL overrides
+
+        Returns:
+            True if every batch was committed
+        """
+        if not items:
+            return True
+
+        ttls = ttls or {}
+        entries = list(items.items())
+        try:
+            now = datetime.now(timezone.utc)
+            for start in range(0, len(entries), MAX_BATCH_SIZE):
+                batch = self.db.batch()
+                for key, value in entries[start:start + MAX_BATCH_SIZE]:
+                    batch.set(self.collection.document(key), {
+                        'data': value,
+                        'created_at': now,
+                        'expires_at': now + timedelta(seconds=ttls.get(key, ttl)),  # TTL field
+                        'last_accessed': now
+                    })
+                batch.commit()
+
+            logger.info(f"💾 Cache SET_MANY: {len(entries)} keys")
+            return True
+
+        except Exception as e:
+            logger.error(f"💥 Error writing {len(entries)} keys to cache: {e}", exc_info=True)
+            return False
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete several entries in batched writes of up to 500 operations.
+
+        Unlike delete(), no read is done first; deleting a missing
+        document is a no-op, so the count includes keys that were absent.
+
+        Args:
+            keys: Cache keys to delete
+
+        Returns:
+            Number of keys whose deletes were committed
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+
+        try:
+            deleted = self._delete_in_batches(keys)
+            logger.info(f"🗑️  Cache DELETE_MANY: {deleted} keys")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"💥 Error deleting {len(keys)} keys from cache: {e}", exc_info=True)
+            return 0
+
+    def _delete_in_batches(self, keys: List[str]) -> int:
+        """Delete documents in batches of MAX_BATCH_SIZE; returns keys committed."""
+        deleted = 0
+        for start in range(0, len(keys), MAX_BATCH_SIZE):
+            chunk = keys[start:start + MAX_BATCH_SIZE]
+            batch = self.db.batch()
+            for key in chunk:
+                batch.delete(self.collection.document(key))
+            batch.commit()
+            deleted += len(chunk)
+        return deleted
+
+    @staticmethod
+    def _is_expired(entry: Dict[str, Any], now: datetime) -> bool:
+        """Check an entry's expires_at (Firestore TTL may not have run yet)."""
+        expires_at = entry.get('expires_at')
+        if not expires_at:
+            return False
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at < now
+
     def _async_update_access_time(self, key: str):
         """
         Asynchronously update access time (non-blocking).
 
         This is called after successful cache hits to track activity.
-        Failures are logged but don't affect the read operation.
+        The key is handed to the background flusher, which deduplicates
+        touches and commits them in batches; no I/O happens here.
         """
+        if self.access_tracker is None:
+            return
         try:
-            # Use Firestore's server timestamp for consistency
-            doc_ref = self.collection.document(key)
-            doc_ref.update({'last_accessed': firestore.SERVER_TIMESTAMP})
+            self.access_tracker.touch(key)
         except Exception as e:
-            # Don't block reads if access time update fails
+            # Don't block reads if access tracking fails
             logger.debug(f"Async access time update failed for {key}: {e}")
 
+    def flush_access_times(self) -> int:
+        """
+        Commit queued last_accessed updates immediately.
+
+        Returns:
+            Number of entries updated (0 if access tracking is off)
+        """
+        if self.access_tracker is None:
+            return 0
+        return self.access_tracker.flush()
+
     def cleanup_expired(self) -> int:
         """
         Manually cleanup expired entries.
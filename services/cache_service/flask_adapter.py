@@ -12,32 +12,135 @@ Usage in Flask app:
     app.session_interface = CacheSessionInterface()
 """
 
-import pickle
+import re
+import time
 import logging
+from typing import Any, Callable, Dict, Optional
 from uuid import uuid4
 from datetime import datetime, timedelta
+from flask import has_request_context, request as current_request
 from flask.sessions import SessionInterface, SessionMixin
 from werkzeug.datastructures import CallbackDict
 
+from .codec import MsgpackSessionCodec
 from .factory import get_cache_service
+from .interface import CacheServiceInterface
+from .session_index import SessionIndex, UserSessions
 
 
 logger = logging.getLogger(__name__)
 
+# Session IDs with this prefix are never persisted (anonymous, nothing stored yet)
+EPHEMERAL_SID_PREFIX = 'anon-'
+
+# Accepted cookie values: ephemeral 'anon-<hex32>' or persistent UUID4 strings
+_VALID_SID = re.compile(r'^(anon-[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$')
+
+
+def _loads_first(name):
+    """Wrap a dict method so the backend data is loaded before it runs."""
+    method = getattr(CallbackDict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._ensure_loaded()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
 
 class CacheSession(CallbackDict, SessionMixin):
     """
     Custom session class that works with our cache service.
+
+    Sessions start with an ephemeral sid ('anon-...') that is never stored in
+    the backend. The first time data is written, the session moves to a fresh
+    persistent sid, so a planted or observed anonymous cookie can't be used
+    to fixate a logged-in session.
+
+    Persistent sessions are loaded lazily: the backend is only read the first
+    time a key is accessed, so requests that never look at the session cost
+    no backend I/O.
     """
 
-    def __init__(self, initial=None, sid=None, new=False):
+    def __init__(
+        self,
+        initial=None,
+        sid=None,
+        new=False,
+        sid_from_cookie=False,
+        loader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+    ):
         def on_update(self):
             self.modified = True
+            if self.ephemeral and len(self) > 0:
+                self.sid = str(uuid4())
 
         CallbackDict.__init__(self, initial, on_update)
         self.sid = sid
         self.new = new
         self.modified = False
+        self.sid_from_cookie = sid_from_cookie
+        self.needs_cookie = False
+        self.stale_cookie = False
+        self.expires_at: Optional[float] = None
+        self.indexed_user_id: Optional[str] = None
+        self._loader = loader
+        self.loaded = loader is None
+
+    @property
+    def ephemeral(self) -> bool:
+        """True while the sid has never been (and can't be) stored in the backend."""
+        return bool(self.sid) and self.sid.startswith(EPHEMERAL_SID_PREFIX)
+
+    def require_cookie(self):
+        """
+        Issue the sid cookie even if the session stays empty.
+
+        Used by stateless CSRF, which binds tokens to the sid without
+        storing anything server-side.
+        """
+        self.needs_cookie = True
+
+    def _ensure_loaded(self):
+        """Fetch the stored session data on first access."""
+        if self.loaded:
+            return
+        self.loaded = True
+
+        cached = self._loader(self.sid)
+        if cached is None:
+            # Unknown/expired sid - never reuse a client-chosen id for new data
+            self.sid = f"{EPHEMERAL_SID_PREFIX}{uuid4().hex}"
+            self.new = True
+            self.sid_from_cookie = False
+            self.stale_cookie = True
+            return
+
+        self.expires_at = cached.get('expires_at')
+        self.indexed_user_id = cached['session'].get('user_id')
+        # Bypass on_update - loading is not a modification
+        dict.update(self, cached['session'])
+
+    __getitem__ = _loads_first('__getitem__')
+    __contains__ = _loads_first('__contains__')
+    __iter__ = _loads_first('__iter__')
+    __len__ = _loads_first('__len__')
+    __eq__ = _loads_first('__eq__')
+    __repr__ = _loads_first('__repr__')
+    get = _loads_first('get')
+    keys = _loads_first('keys')
+    values = _loads_first('values')
+    items = _loads_first('items')
+    copy = _loads_first('copy')
+    __setitem__ = _loads_first('__setitem__')
+    __delitem__ = _loads_first('__delitem__')
+    setdefault = _loads_first('setdefault')
+    pop = _loads_first('pop')
+    popitem = _loads_first('popitem')
+    update = _loads_first('update')
+    clear = _loads_first('clear')
+    __hash__ = None
 
 
 class CacheSessionInterface(SessionInterface):
@@ -52,27 +155,51 @@ class CacheSessionInterface(SessionInterface):
     - Configurable TTL (default: 30 days)
     - Secure session cookies
     - Works with any cache backend (Firestore, Redis, etc.)
+    - Lazy loading: untouched sessions cause no backend read, write or Set-Cookie
+    - Unmodified sessions are re-saved at most once per refresh_interval
+    - user_id -> sessions index (see session_index.UserSessions)
     """
 
-    serializer = pickle  # Use pickle for session serialization
+    serializer = MsgpackSessionCodec()  # Versioned msgpack; still reads legacy pickle
     session_class = CacheSession
 
-    def __init__(self, key_prefix: str = 'session:', permanent_lifetime: int = 2592000):
+    def __init__(
+        self,
+        key_prefix: str = 'session:',
+        permanent_lifetime: int = 2592000,
+        cache: Optional[CacheServiceInterface] = None,
+        refresh_interval: int = 86400,
+        codec=None,
+        index: Optional[SessionIndex] = None
+    ):
         """
         Initialize session interface.
 
+        Set CACHE_L1_MAX_ENTRIES to put an in-process L1 tier in front of
+        the backend so repeat requests on one instance skip the round-trip.
+
         Args:
             key_prefix: Prefix for session keys (default: 'session:')
             permanent_lifetime: Session TTL in seconds (default: 30 days)
+            cache: Cache backend to use (default: get_cache_service())
+            refresh_interval: Extend the TTL of a read-only session once less than
+                lifetime - refresh_interval remains (default: 1 day, capped at
+                half the lifetime)
+            codec: Session serializer with dumps/loads (default: MsgpackSessionCodec)
+            index: User -> session index (default: matches the cache backend)
         """
         self.key_prefix = key_prefix
         self.permanent_lifetime = permanent_lifetime
-        self.cache = get_cache_service()
+        self.refresh_interval = refresh_interval
+        if codec is not None:
+            self.serializer = codec
+        self.cache = cache if cache is not None else get_cache_service()
+        self.user_sessions = UserSessions(self.cache, key_prefix, index=index)
         logger.debug(f"CacheSessionInterface initialized with {type(self.cache).__name__}")
 
     def _generate_sid(self) -> str:
-        """Generate a unique session ID."""
-        return str(uuid4())
+        """Generate a unique ephemeral session ID (replaced on first write)."""
+        return f"{EPHEMERAL_SID_PREFIX}{uuid4().hex}"
 
     def _get_cache_key(self, sid: str) -> str:
         """Convert session ID to cache key."""
@@ -80,9 +207,10 @@ class CacheSessionInterface(SessionInterface):
 
     def open_session(self, app, request):
         """
-        Load session from cache.
+        Open session for the request without touching the cache.
 
-        Called by Flask for each request to load the session.
+        Called by Flask for each request. Stored data is fetched by
+        _load_session the first time the session is accessed.
 
         Args:
             app: Flask app instance
@@ -101,40 +229,75 @@ class CacheSessionInterface(SessionInterface):
         logger.info(f"🍪 All cookies received: {all_cookies}")
         logger.info(f"🌐 Request headers - Host: {request.headers.get('Host')} | Origin: {request.headers.get('Origin')} | Referer: {request.headers.get('Referer', 'none')[:50] if request.headers.get('Referer') else 'none'}")
 
-        if not sid:
-            # No session cookie - create new session
+        if not sid or not _VALID_SID.match(sid):
+            # No (usable) session cookie - create new session
             sid = self._generate_sid()
-            logger.warning(f"🆕 Creating new session (no cookie named '{cookie_name}'): {sid[:8]}... | cookies_present={all_cookies}")
+            logger.warning(f"🆕 Creating new session (no cookie named '{cookie_name}'): {sid[:13]}... | cookies_present={all_cookies}")
             return self.session_class(sid=sid, new=True)
 
-        logger.info(f"🔑 Found session cookie: {sid[:8]}...")
+        if sid.startswith(EPHEMERAL_SID_PREFIX):
+            # Anonymous session - nothing was ever stored, skip the backend read
+            logger.info(f"👤 Ephemeral session cookie: {sid[:13]}...")
+            return self.session_class(sid=sid, new=True, sid_from_cookie=True)
+
+        logger.info(f"🔑 Found session cookie: {sid[:8]}... (loaded on first access)")
+        return self.session_class(sid=sid, sid_from_cookie=True, loader=self._load_session)
 
-        # Try to load existing session from cache
-        cache_key = self._get_cache_key(sid)
-        cached_data = self.cache.get(cache_key)
+    def _load_session(self, sid: str) -> Optional[Dict[str, Any]]:
+        """
+        Load and deserialize a stored session.
+
+        Args:
+            sid: Persistent session ID
+
+        Returns:
+            {'session': dict, 'expires_at': float or None} or None if not found
+        """
+        cached_data = self.cache.get(self._get_cache_key(sid))
 
         if cached_data is None:
-            # Session not found or expired - create new one
-            logger.warning(f"⚠️  Session not found in cache, creating new: {sid[:8]}...")
-            sid = self._generate_sid()
-            return self.session_class(sid=sid, new=True)
+            logger.warning(f"⚠️  Session not found in cache: {sid[:8]}...")
+            return None
 
-        # Deserialize session data
         try:
             session_data = self.serializer.loads(cached_data.get('session_data', b''))
             logger.info(f"✅ Loaded session: {sid[:8]}... | keys={list(session_data.keys())}")
-            return self.session_class(session_data, sid=sid)
         except Exception as e:
             logger.error(f"💥 Error deserializing session {sid[:8]}...: {e}")
-            # Create new session on deserialization error
-            sid = self._generate_sid()
-            return self.session_class(sid=sid, new=True)
+            return None
+
+        if session_data.get('user_id'):
+            # Sessions stored before the index existed are registered on first load
+            self.user_sessions.backfill(session_data['user_id'], sid)
+        return {'session': session_data, 'expires_at': cached_data.get('expires_at')}
+
+    def _needs_refresh(self, session: CacheSession, ttl: int) -> bool:
+        """True if an unmodified session's remaining TTL fell below the threshold."""
+        if session.expires_at is None:
+            # Stored before expiry tracking - rewrite once to record it
+            return True
+        threshold = ttl - min(self.refresh_interval, ttl // 2)
+        return session.expires_at - time.time() < threshold
+
+    def _update_index(self, session: CacheSession) -> None:
+        """Keep the user -> sessions index in step when the session's user_id changes."""
+        user_id = session.get('user_id')
+        if user_id == session.indexed_user_id:
+            return
+
+        if session.indexed_user_id:
+            self.user_sessions.unregister(session.indexed_user_id, session.sid)
+        if user_id:
+            user_agent = current_request.headers.get('User-Agent', '') if has_request_context() else ''
+            self.user_sessions.register(user_id, session.sid, user_agent=user_agent)
+        session.indexed_user_id = user_id
 
     def save_session(self, app, session, response):
         """
         Save session to cache.
 
-        Called by Flask after each request to save the session.
+        Called by Flask after each request. Sessions that were never
+        accessed are left alone (no backend write, no Set-Cookie).
 
         Args:
             app: Flask app instance
@@ -143,19 +306,38 @@ class CacheSessionInterface(SessionInterface):
         """
         domain = self.get_cookie_domain(app)
         path = self.get_cookie_path(app)
+        cookie_name = self.get_cookie_name(app)
+        httponly = self.get_cookie_httponly(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+
+        if not session.loaded:
+            # Never accessed - stored data and cookie are unchanged
+            return
 
         logger.info(f"💾 SAVE_SESSION: sid={session.sid[:8]}... | modified={session.modified} | new={session.new}")
 
-        # If session is empty and not new, delete it
+        # If session is empty, nothing is stored - delete it if it was cleared
         if not session:
-            logger.info(f"🗑️  Session empty, deleting: {session.sid[:8]}...")
-            if session.modified:
-                self.cache.delete(self._get_cache_key(session.sid))
-                response.delete_cookie(
-                    self.get_cookie_name(app),
+            if session.modified or session.stale_cookie:
+                logger.info(f"🗑️  Session empty, deleting: {session.sid[:8]}...")
+                if session.modified and not session.ephemeral:
+                    self.cache.delete(self._get_cache_key(session.sid))
+                    if session.indexed_user_id:
+                        self.user_sessions.unregister(session.indexed_user_id, session.sid)
+            if session.ephemeral and session.needs_cookie and not session.sid_from_cookie:
+                # Cookie-only session (e.g. stateless CSRF nonce) - no backend write
+                response.set_cookie(
+                    cookie_name,
+                    session.sid,
+                    httponly=httponly,
                     domain=domain,
-                    path=path
+                    path=path,
+                    secure=secure,
+                    samesite=samesite
                 )
+            elif session.modified or session.stale_cookie:
+                response.delete_cookie(cookie_name, domain=domain, path=path)
             return
 
         # Determine session expiration
@@ -164,40 +346,42 @@ class CacheSessionInterface(SessionInterface):
         else:
             ttl = int(timedelta(hours=24).total_seconds())  # 24 hours for non-permanent
 
+        if not (session.modified or session.new or self._needs_refresh(session, ttl)):
+            # Read-only request and TTL still fresh - no write, no Set-Cookie
+            return
+
         logger.info(f"⏱️  Session TTL: {ttl}s ({ttl/3600:.1f}h) | permanent={session.permanent}")
 
         # Set cookie expiration
-        httponly = self.get_cookie_httponly(app)
-        secure = self.get_cookie_secure(app)
-        samesite = self.get_cookie_samesite(app)
+        expires_at = time.time() + ttl
         expires = datetime.utcnow() + timedelta(seconds=ttl)
 
         # Serialize and save session data to cache
-        if session.modified or session.new:
-            try:
-                session_dict = dict(session)
-                session_data = self.serializer.dumps(session_dict)
-                cache_key = self._get_cache_key(session.sid)
-
-                logger.info(f"📝 Session data keys: {list(session_dict.keys())}")
-
-                # Store in cache
-                success = self.cache.set(
-                    key=cache_key,
-                    value={'session_data': session_data},
-                    ttl=ttl
-                )
-
-                if success:
-                    logger.info(f"✅ Saved session: {session.sid[:8]}... (TTL: {ttl}s)")
-                else:
-                    logger.error(f"❌ Failed to save session: {session.sid[:8]}...")
+        try:
+            session_dict = dict(session)
+            session_data = self.serializer.dumps(session_dict)
+            cache_key = self._get_cache_key(session.sid)
+
+            logger.info(f"📝 Session data keys: {list(session_dict.keys())}")
+
+            # Store in cache
+            success = self.cache.set(
+                key=cache_key,
+                value={'session_data': session_data, 'expires_at': expires_at},
+                ttl=ttl
+            )
+
+            if success:
+                session.expires_at = expires_at
+                self._update_index(session)
+                logger.info(f"✅ Saved session: {session.sid[:8]}... (TTL: {ttl}s)")
+            else:
+                logger.error(f"❌ Failed to save session: {session.sid[:8]}...")
 
-            except Exception as e:
-                logger.error(f"💥 Error saving session {session.sid[:8]}...: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"💥 Error saving session {session.sid[:8]}...: {e}", exc_info=True)
 
         # Set session cookie
-        cookie_name = self.get_cookie_name(app)
         logger.info(f"🍪 Setting cookie: {cookie_name} | value={session.sid[:8]}... | domain={domain} | path={path} | secure={secure} | httponly={httponly} | samesite={samesite} | expires={expires}")
         
         # Log the actual Set-Cookie header that will be sent
@@ -6,10 +6,21 @@ This allows swapping between Firestore, Redis, Memcached without
 changing application code.
 """
 
+import copy
+import math
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, List
 from datetime import datetime
 
+from .single_flight import SingleFlight
+
+
+# Guards lazy creation of each backend's SingleFlight
+_single_flight_lock = threading.Lock()
+
 
 class CacheServiceInterface(ABC):
     """
@@ -100,3 +111,173 @@ class CacheServiceInterface(ABC):
             Metadata dict or None if not found
         """
         pass
+
+    # =========================================================================
+    # MULTI-KEY OPERATIONS
+    # Default implementations loop over the single-key methods; backends
+    # override them to use one round-trip (or one per batch) instead.
+    # =========================================================================
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve several entries.
+
+        Args:
+            keys: Unique identifiers to fetch
+
+        Returns:
+            Dict of key -> data for keys that were found and not expired
+        """
+        results = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                results[key] = value
+        return results
+
+    def set_many(
+        self,
+        items: Dict[str, Dict[str, Any]],
+        ttl: int = 2592000,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Store several entries.
+
+        Args:
+            items: Dict of key -> data to cache
+            ttl: Time-to-live in seconds for every entry (default: 30 days)
+            ttls: Optional per-key TTL overrides
+
+        Returns:
+            True if every entry was stored, False otherwise
+        """
+        ttls = ttls or {}
+        success = True
+        for key, value in items.items():
+            success = self.set(key, value, ttls.get(key, ttl)) and success
+        return success
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Remove several entries.
+
+        Args:
+            keys: Unique identifiers to delete
+
+        Returns:
+            Number of entries deleted
+        """
+        return sum(1 for key in keys if self.delete(key))
+
+    # =========================================================================
+    # READ-THROUGH WITH STAMPEDE PROTECTION
+    # =========================================================================
+
+    def _single_flight(self) -> SingleFlight:
+        """Per-backend SingleFlight (created on first use)."""
+        flight = getattr(self, '_flight', None)
+        if flight is None:
+            with _single_flight_lock:
+                flight = getattr(self, '_flight', None)
+                if flight is None:
+                    flight = SingleFlight()
+                    self._flight = flight
+        return flight
+
+    def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: int = 300,
+        beta: float = 1.0
+    ) -> Any:
+        """
+        Read-through cache lookup that protects the loader from stampedes.
+
+        Concurrent misses for the same key within this process run loader
+        once; the other callers wait for and share its result. Entries store
+        how long they took to compute, and a caller may refresh an entry
+        shortly before it expires (XFetch: refresh when
+        now - delta * beta * ln(rand) >= expiry), so popular keys are
+        rebuilt by one request instead of all of them at expiry. While an
+        early refresh runs, other callers keep getting the cached value.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument function building the value (must be
+                storable by the backend: dicts, lists, strings, numbers)
+            ttl: Time-to-live in seconds (default: 5 minutes)
+            beta: Early refresh eagerness (0 disables early refresh, >1
+                refreshes earlier)
+
+        Returns:
+            Cached or freshly computed value (None values are not cached).
+            Each caller gets its own copy, so callers may mutate it without
+            affecting the L1 cache or threads that shared the same load.
+
+        Raises:
+            Whatever loader raised, in every caller waiting on that load
+        """
+        flight = self._single_flight()
+        entry = self.get(key)
+
+        if _is_computed_entry(entry):
+            if not _should_refresh_early(entry, beta):
+                flight.incr('hits')
+                return copy.deepcopy(entry['value'])
+            if flight.in_flight(key):
+                # Another thread is already refreshing - serve what we have
+                flight.incr('hits')
+                return copy.deepcopy(entry['value'])
+            flight.incr('early_refreshes')
+        else:
+            flight.incr('misses')
+
+        value, _ = flight.do(key, lambda: self._compute_and_store(key, loader, ttl))
+        return copy.deepcopy(value)
+
+    def _compute_and_store(self, key: str, loader: Callable[[], Any], ttl: int) -> Any:
+        """Run loader, then cache its value with the compute time and expiry."""
+        started = time.monotonic()
+        value = loader()
+        delta = time.monotonic() - started
+
+        if value is not None:
+            self.set(key, {
+                'value': value,
+                'delta': delta,
+                'expiry': time.time() + ttl,
+            }, ttl=ttl)
+        return value
+
+    def get_compute_stats(self) -> Dict[str, int]:
+        """
+        Counters for get_or_compute.
+
+        Returns:
+            Dict with hits, misses, early_refreshes, executions (loader runs),
+            collapsed (callers that shared another caller's load),
+            wait_timeouts and in_flight
+        """
+        stats = {'hits': 0, 'misses': 0, 'early_refreshes': 0}
+        stats.update(self._single_flight().get_stats())
+        return stats
+
+
+def _is_computed_entry(entry: Optional[Dict[str, Any]]) -> bool:
+    """True if entry was written by get_or_compute."""
+    return isinstance(entry, dict) and 'value' in entry and 'expiry' in entry
+
+
+def _should_refresh_early(entry: Dict[str, Any], beta: float) -> bool:
+    """XFetch: probabilistically refresh more often the closer we are to expiry."""
+    if beta <= 0:
+        return False
+    try:
+        delta = float(entry.get('delta') or 0)
+        expiry = float(entry['expiry'])
+    except (TypeError, ValueError):
+        return True
+    # 1 - random() is in (0, 1], so log() is defined and <= 0
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
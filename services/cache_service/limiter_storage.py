@@ -18,18 +18,32 @@ Usage:
     )
 """
 
+import atexit
 import logging
+import math
+import os
+import random
+import threading
 import time
-from typing import Optional, Tuple, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
+from urllib.parse import quote
 from datetime import datetime, timezone, timedelta
 from firebase_admin import firestore
 from google.api_core import exceptions as google_exceptions
 from limits.storage import Storage
 
+from .access_tracker import MAX_BATCH_SIZE
+
+try:
+    from limits.storage import SlidingWindowCounterSupport
+    _SLIDING_WINDOW_BASES: Tuple[type, ...] = (SlidingWindowCounterSupport,)
+except ImportError:  # limits < 4.1 has no sliding-window-counter strategy
+    _SLIDING_WINDOW_BASES = ()
+
 logger = logging.getLogger(__name__)
 
 
-class FirestoreLimiterStorage(Storage):
+class FirestoreLimiterStorage(Storage, *_SLIDING_WINDOW_BASES):
     """
     Firestore storage backend for Flask-Limiter.
 
@@ -40,6 +54,30 @@ class FirestoreLimiterStorage(Storage):
             - count: int - Current request count
             - expiry: datetime - When this window expires
             - created_at: datetime - When first request in window occurred
+            - shards: int - Present once the key is hot (see below)
+
+    Hot keys:
+        One document sustains roughly one write per second, so a key hit
+        faster than that (many users behind one NAT IP, abuse bursts) makes
+        the transaction retry and eventually fail. A key is promoted to
+        sharded counting once this instance sees more than
+        `hot_key_threshold` hits in `hot_key_window` seconds, or its
+        transaction fails. The base document gets `shards: N`; further hits
+        in that window do a blind Increment on a random shard document
+        {key}__{window}__shard{i} (no transaction), and the count is the
+        base count plus the sum of that window's shards (one get_all).
+        Every window starts unsharded; a key is only promoted again while
+        it is still hot.
+
+    Sliding window counter:
+        With strategy="sliding-window-counter" the same document instead
+        holds two epoch-aligned sub-windows - window_start, curr_count and
+        prev_count - and a hit is allowed while
+        prev_count * (time left in the current window / expiry) + curr_count
+        stays within the limit. That smooths the 2x burst a fixed window
+        allows at its boundary with O(1) storage per key (no per-hit
+        timestamps). The check and increment run in one transaction;
+        these keys are never sharded.
 
     TTL Policy:
         Documents auto-delete after expiry via Firestore TTL policy.
@@ -47,13 +85,28 @@ class FirestoreLimiterStorage(Storage):
 
     STORAGE_SCHEME = ["firestore"]
 
-    def __init__(self, uri: str = None, collection_name: str = "rate_limits", **options):
+    def __init__(
+        self,
+        uri: str = None,
+        collection_name: str = "rate_limits",
+        shard_count: int = 10,
+        hot_key_threshold: int = 10,
+        hot_key_window: float = 5.0,
+        fail_open: bool = True,
+        **options
+    ):
         """
         Initialize Firestore limiter storage.
 
         Args:
             uri: Storage URI (not used, just for compatibility)
             collection_name: Firestore collection for rate limits
+            shard_count: Shard documents per hot key
+            hot_key_threshold: Hits per hot_key_window (on this instance)
+                that promote a key to sharded counting
+            hot_key_window: Seconds over which hits are counted for promotion
+            fail_open: On Firestore errors, allow the hit (True) or raise so a
+                wrapper can fall back (False, see BudgetedLimiterStorage)
             **options: Additional options
         """
         # Call parent __init__ to properly initialize the Storage base class
@@ -61,6 +114,17 @@ class FirestoreLimiterStorage(Storage):
         self.collection_name = options.get('collection_name', collection_name)
         self.db = firestore.client()
         self.collection = self.db.collection(self.collection_name)
+        # Counts already incremented (and hits already recorded) by
+        # incr_many for the current request
+        self._prefetched = threading.local()
+
+        self.shard_count = max(2, int(shard_count))
+        self.hot_key_threshold = int(hot_key_threshold)
+        self.hot_key_window = float(hot_key_window)
+        self._hits: Dict[str, Tuple[float, int]] = {}      # doc_key -> (bucket start, hits)
+        self._sharded: Dict[str, Tuple[datetime, int]] = {}  # doc_key -> (window expiry, shards)
+        self._hot_lock = threading.Lock()
+        self.fail_open = fail_open
         logger.info(f"FirestoreLimiterStorage initialized with collection: {self.collection_name}")
 
     @property
@@ -97,8 +161,29 @@ class FirestoreLimiterStorage(Storage):
         Returns:
             New counter value
         """
+        prefetched = getattr(self._prefetched, 'counts', None)
+        if prefetched and key in prefetched:
+            # Already incremented in this request's incr_many transaction
+            return prefetched.pop(key)
+
         doc_key = self._make_key(key)
         doc_ref = self.collection.document(doc_key)
+        recorded = getattr(self._prefetched, 'hot', None)
+        if recorded and doc_key in recorded:
+            # incr_many already counted this hit and left the key to incr()
+            hot = recorded.pop(doc_key)
+        else:
+            hot = self._record_hit(doc_key)
+
+        sharded = self._sharded_window(doc_key)
+        if sharded is not None:
+            try:
+                return self._incr_sharded(doc_key, key, sharded[0], sharded[1], amount)
+            except Exception as e:
+                logger.error(f"Error incrementing sharded rate limit {key}: {e}")
+                if not self.fail_open:
+                    raise
+                return 1
 
         try:
             # Use transaction for atomic increment
@@ -110,42 +195,398 @@ class FirestoreLimiterStorage(Storage):
                 if doc.exists:
                     data = doc.to_dict()
                     expiry_time = data.get('expiry')
+                    shards = data.get('shards')
 
                     # Check if window has expired
                     if expiry_time and expiry_time.tzinfo is None:
                         expiry_time = expiry_time.replace(tzinfo=timezone.utc)
 
                     if expiry_time and expiry_time > now:
+                        if shards:
+                            # Another instance promoted the key - count on shards
+                            return None, (expiry_time, shards)
+
                         # Window still valid - increment
                         new_count = data.get('count', 0) + amount
 
                         update_data = {'count': new_count}
                         if elastic_expiry:
                             update_data['expiry'] = now + timedelta(seconds=expiry)
+                        if hot:
+                            update_data['shards'] = self.shard_count
 
                         transaction.update(doc_ref, update_data)
-                        return new_count
+                        sharded = (update_data.get('expiry', expiry_time), self.shard_count) if hot else None
+                        return new_count, sharded
 
                 # Window expired or doesn't exist - create new
                 new_expiry = now + timedelta(seconds=expiry)
-                transaction.set(doc_ref, {
+                new_doc = {
                     'count': amount,
                     'expiry': new_expiry,
                     'created_at': now,
                     'key': key  # Store original key for debugging
-                })
-                return amount
+                }
+                if hot:
+                    new_doc['shards'] = self.shard_count
+                transaction.set(doc_ref, new_doc)
+                return amount, ((new_expiry, self.shard_count) if hot else None)
 
             transaction = self.db.transaction()
-            result = increment_in_transaction(transaction, doc_ref)
+            result, sharded = increment_in_transaction(transaction, doc_ref)
+
+            if sharded is not None:
+                self._remember_sharded(doc_key, *sharded)
+                if result is None:
+                    result = self._incr_sharded(doc_key, key, sharded[0], sharded[1], amount)
+
             logger.debug(f"Rate limit incr: {key} -> {result}")
             return result
 
         except Exception as e:
+            # Most often contention on a hot document: shard it and count there
+            result = self._promote_and_incr(doc_key, key, amount)
+            if result is not None:
+                logger.warning(f"🔥 Rate limit key {key} sharded after failed transaction: {e}")
+                return result
             logger.error(f"Error incrementing rate limit {key}: {e}")
+            if not self.fail_open:
+                raise
             # On error, be permissive (don't block user)
             return 1
 
+    def incr_many(self, hits: List[Tuple[str, int, int, Optional[int]]]) -> Dict[str, int]:
+        """
+        Evaluate and increment several limit keys in one transaction.
+
+        All documents are read with one get_all and written with one commit.
+        Hits are applied in order and stop after the first one that exceeds
+        its limit, like Flask-Limiter's evaluation (fail_on_first_breach):
+        later limits are not charged for a rejected request.
+
+        Args:
+            hits: (key, expiry seconds, amount, limit amount or None) tuples
+
+        Returns:
+            Dict of key -> new counter value for every key that was
+            incremented, or {} on error (callers fall back to incr)
+        """
+        if not hits:
+            return {}
+
+        refs = {}
+        for key, _, _, _ in hits:
+            doc_key = self._make_key(key)
+            refs.setdefault(doc_key, self.collection.document(doc_key))
+
+        try:
+            sharded_keys = {doc_key for doc_key in refs if self._sharded_window(doc_key)}
+            hot_flags = {doc_key: self._record_hit(doc_key) for doc_key in refs}
+            hot_keys = {doc_key for doc_key, hot in hot_flags.items() if hot}
+            # Keys left to incr() (sharded, or all on error) reuse these hits
+            self._prefetched.hot = hot_flags
+
+            @firestore.transactional
+            def increment_all_in_transaction(transaction):
+                snapshots = {snap.id: snap for snap in transaction.get_all(list(refs.values()))}
+                now = datetime.now(timezone.utc)
+                windows: Dict[str, Dict[str, Any]] = {}
+                results: Dict[str, int] = {}
+
+                for key, expiry, amount, limit in hits:
+                    doc_key = self._make_key(key)
+                    window = windows.get(doc_key)
+                    if window is None:
+                        window = self._window_from_snapshot(snapshots.get(doc_key), key, expiry, now)
+                        windows[doc_key] = window
+                    if window['shards'] or doc_key in sharded_keys:
+                        # Hot key: left to incr(), which counts on its shards
+                        continue
+
+                    window['count'] += amount
+                    window['touched'] = True
+                    results[key] = window['count']
+                    if limit is not None and window['count'] > limit:
+                        break
+
+                promoted = {}
+                for doc_key, window in windows.items():
+                    if not window['touched']:
+                        continue
+                    data = {'count': window['count']}
+                    if doc_key in hot_keys:
+                        data['shards'] = self.shard_count
+                        promoted[doc_key] = window['expiry']
+                    if window['new']:
+                        transaction.set(refs[doc_key], {
+                            **data,
+                            'expiry': window['expiry'],
+                            'created_at': now,
+                            'key': window['key'],
+                        })
+                    else:
+                        transaction.update(refs[doc_key], data)
+                return results, promoted
+
+            results, promoted = increment_all_in_transaction(self.db.transaction())
+            for key in results:
+                self._prefetched.hot.pop(self._make_key(key), None)
+            for doc_key, window_expiry in promoted.items():
+                self._remember_sharded(doc_key, window_expiry, self.shard_count)
+            logger.debug(f"Rate limit incr_many: {results}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error incrementing {len(hits)} rate limits in one transaction: {e}")
+            return {}
+
+    @staticmethod
+    def _window_from_snapshot(snapshot, key: str, expiry: int, now: datetime) -> Dict[str, Any]:
+        """Counter state for key's live window (a fresh, unsharded one if missing/expired)."""
+        if snapshot is not None and snapshot.exists:
+            data = snapshot.to_dict() or {}
+            expiry_time = data.get('expiry')
+            if expiry_time and expiry_time.tzinfo is None:
+                expiry_time = expiry_time.replace(tzinfo=timezone.utc)
+            if expiry_time and expiry_time > now:
+                return {'count': data.get('count', 0), 'expiry': expiry_time, 'key': key,
+                        'new': False, 'touched': False, 'shards': data.get('shards')}
+
+        return {'count': 0, 'expiry': now + timedelta(seconds=expiry), 'key': key,
+                'new': True, 'touched': False, 'shards': None}
+
+    def prefetch(self, hits: List[Tuple[str, int, int, Optional[int]]]) -> int:
+        """
+        Run incr_many now and serve the following incr() calls from its results.
+
+        Used by install_limit_prefetch: the counts are stored per thread and
+        each is handed out once, to the matching incr(key) later in the same
+        request. Call clear_prefetch() when the request ends.
+
+        Args:
+            hits: Same as incr_many
+
+        Returns:
+            Number of keys prefetched
+        """
+        counts = self.incr_many(hits)
+        self._prefetched.counts = counts
+        return len(counts)
+
+    def clear_prefetch(self) -> None:
+        """Drop prefetched counts that weren't consumed by this request."""
+        self._prefetched.counts = None
+        self._prefetched.hot = None
+
+    # =========================================================================
+    # SLIDING WINDOW COUNTER
+    # =========================================================================
+
+    @staticmethod
+    def _sliding_window_state(data: Optional[Dict[str, Any]], expiry: int, now: float) -> Tuple[int, int, int]:
+        """
+        (window_start, prev_count, curr_count) as of now.
+
+        A document written during the previous sub-window rolls over (its
+        current count becomes the previous one); anything older is stale.
+        """
+        window_start = int(now // expiry) * expiry
+        data = data or {}
+        stored_start = data.get('window_start')
+        if stored_start == window_start:
+            return window_start, data.get('prev_count', 0), data.get('curr_count', 0)
+        if stored_start == window_start - expiry:
+            return window_start, data.get('curr_count', 0), 0
+        return window_start, 0, 0
+
+    @staticmethod
+    def _sliding_window_info(window_start: int, prev_count: int, curr_count: int,
+                             expiry: int, now: float) -> Tuple[int, float, int, float]:
+        """Same tuple as get_sliding_window (TTLs like limits' MemoryStorage)."""
+        remaining = window_start + expiry - now
+        previous_ttl = remaining if prev_count else 0.0
+        return prev_count, previous_ttl, curr_count, remaining + expiry
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        """
+        Take `amount` entries if the weighted count stays within `limit`.
+
+        Args:
+            key: Rate limit key
+            limit: Entries allowed per `expiry` seconds
+            expiry: Window length in seconds
+            amount: Entries to acquire (default: 1)
+
+        Returns:
+            True if the entries were acquired, False if the limit is reached
+        """
+        if amount > limit:
+            return False
+
+        doc_ref = self.collection.document(self._make_key(key))
+
+        try:
+            @firestore.transactional
+            def acquire_in_transaction(transaction, doc_ref):
+                doc = doc_ref.get(transaction=transaction)
+                now = time.time()
+                window_start, prev_count, curr_count = self._sliding_window_state(
+                    doc.to_dict() if doc.exists else None, expiry, now
+                )
+                prev_count, previous_ttl, curr_count, _ = self._sliding_window_info(
+                    window_start, prev_count, curr_count, expiry, now
+                )
+
+                weighted_count = prev_count * previous_ttl / expiry + curr_count
+                if math.floor(weighted_count) + amount > limit:
+                    return False
+
+                transaction.set(doc_ref, {
+                    'window_start': window_start,
+                    'prev_count': prev_count,
+                    'curr_count': curr_count + amount,
+                    # The previous count stops mattering one window after this one ends
+                    'expiry': datetime.fromtimestamp(window_start + 2 * expiry, tz=timezone.utc),
+                    'key': key,
+                })
+                return True
+
+            acquired = acquire_in_transaction(self.db.transaction(), doc_ref)
+            logger.debug(f"Rate limit sliding window acquire: {key} -> {acquired}")
+            return acquired
+
+        except Exception as e:
+            logger.error(f"Error acquiring sliding window entry {key}: {e}")
+            if not self.fail_open:
+                raise
+            # On error, be permissive (don't block user)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        """
+        Get the previous and current sub-window counters for a key.
+
+        Args:
+            key: Rate limit key
+            expiry: Window length in seconds
+
+        Returns:
+            (previous count, previous TTL, current count, current TTL),
+            or zero counts if not found
+        """
+        now = time.time()
+        data = None
+
+        try:
+            doc = self.collection.document(self._make_key(key)).get()
+            if doc.exists:
+                data = doc.to_dict()
+        except Exception as e:
+            logger.error(f"Error getting sliding window {key}: {e}")
+            if not self.fail_open:
+                raise
+
+        return self._sliding_window_info(*self._sliding_window_state(data, expiry, now), expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        """
+        Clear a sliding window key (both sub-windows live in one document).
+
+        Args:
+            key: Rate limit key to clear
+            expiry: Window length in seconds (unused)
+        """
+        self.clear(key)
+
+    # =========================================================================
+    # HOT KEY SHARDING
+    # =========================================================================
+
+    def _record_hit(self, doc_key: str) -> bool:
+        """Count a hit on this instance; True if the key is hot."""
+        now = time.monotonic()
+        with self._hot_lock:
+            start, hits = self._hits.get(doc_key, (now, 0))
+            if now - start >= self.hot_key_window:
+                start, hits = now, 0
+            hits += 1
+            self._hits[doc_key] = (start, hits)
+
+            if len(self._hits) > 10000:
+                # Drop idle keys so the tracker stays bounded
+                self._hits = {
+                    k: v for k, v in self._hits.items() if now - v[0] < self.hot_key_window
+                }
+            return hits > self.hot_key_threshold
+
+    def _sharded_window(self, doc_key: str) -> Optional[Tuple[datetime, int]]:
+        """(window expiry, shards) if this instance knows the key is sharded."""
+        with self._hot_lock:
+            entry = self._sharded.get(doc_key)
+            if entry is None:
+                return None
+            if entry[0] <= datetime.now(timezone.utc):
+                # Window over - the next transaction starts a new one
+                del self._sharded[doc_key]
+                return None
+            return entry
+
+    def _remember_sharded(self, doc_key: str, window_expiry: datetime, shards: int) -> None:
+        with self._hot_lock:
+            self._sharded[doc_key] = (window_expiry, shards)
+
+    def _shard_refs(self, doc_key: str, window_expiry: datetime, shards: int) -> List[Any]:
+        window = int(window_expiry.timestamp())
+        return [self.collection.document(f"{doc_key}__{window}__shard{i}") for i in range(shards)]
+
+    def _incr_sharded(self, doc_key: str, key: str, window_expiry: datetime, shards: int, amount: int) -> int:
+        """Blind-increment a random shard, then return the aggregated count."""
+        ref = random.choice(self._shard_refs(doc_key, window_expiry, shards))
+        ref.set({
+            'count': firestore.Increment(amount),
+            'expiry': window_expiry,
+            'key': key,
+        }, merge=True)
+        return self._sharded_count(doc_key, window_expiry, shards)
+
+    def _sharded_count(self, doc_key: str, window_expiry: datetime, shards: int) -> int:
+        """Base count plus this window's shards, read with one get_all."""
+        refs = [self.collection.document(doc_key)] + self._shard_refs(doc_key, window_expiry, shards)
+        total = 0
+        for snap in self.db.get_all(refs):
+            if snap.exists:
+                total += (snap.to_dict() or {}).get('count', 0)
+        return total
+
+    def _promote_and_incr(self, doc_key: str, key: str, amount: int) -> Optional[int]:
+        """
+        Shard a key whose transaction failed and count the hit on a shard.
+
+        Returns:
+            Aggregated count, or None if the key has no live window to shard
+        """
+        try:
+            doc_ref = self.collection.document(doc_key)
+            doc = doc_ref.get()
+            if not doc.exists:
+                return None
+            data = doc.to_dict() or {}
+            expiry_time = data.get('expiry')
+            if expiry_time and expiry_time.tzinfo is None:
+                expiry_time = expiry_time.replace(tzinfo=timezone.utc)
+            if not expiry_time or expiry_time <= datetime.now(timezone.utc):
+                return None
+
+            shards = data.get('shards')
+            if not shards:
+                shards = self.shard_count
+                doc_ref.update({'shards': shards})
+            self._remember_sharded(doc_key, expiry_time, shards)
+            return self._incr_sharded(doc_key, key, expiry_time, shards, amount)
+        except Exception as e:
+            logger.error(f"Error sharding rate limit {key}: {e}")
+            return None
+
     def get(self, key: str) -> int:
         """
         Get current counter value for a rate limit key.
@@ -175,10 +616,15 @@ class FirestoreLimiterStorage(Storage):
                 if expiry_time < now:
                     return 0
 
+            if data.get('shards') and expiry_time:
+                return self._sharded_count(doc_key, expiry_time, data['shards'])
+
             return data.get('count', 0)
 
         except Exception as e:
             logger.error(f"Error getting rate limit {key}: {e}")
+            if not self.fail_open:
+                raise
             return 0
 
     def get_expiry(self, key: str) -> int:
@@ -211,6 +657,8 @@ class FirestoreLimiterStorage(Storage):
 
         except Exception as e:
             logger.error(f"Error getting expiry for {key}: {e}")
+            if not self.fail_open:
+                raise
             return int(time.time())
 
     def check(self) -> bool:
@@ -277,14 +725,895 @@ class FirestoreLimiterStorage(Storage):
             logger.error(f"Error clearing rate limit {key}: {e}")
 
 
+class _LocalWindow:
+    """This instance's view of one key's current window."""
+
+    __slots__ = ('doc_id', 'expiry', 'window_end', 'base', 'pending', 'last_pull')
+
+    def __init__(self, doc_id: str, expiry: int, window_end: float):
+        self.doc_id = doc_id
+        self.expiry = expiry
+        self.window_end = window_end
+        self.base = 0        # Global count as of the last pull (+ our flushes since)
+        self.pending = 0     # Local hits not yet flushed to Firestore
+        self.last_pull = 0.0
+
+
+class ApproximateFirestoreLimiterStorage(FirestoreLimiterStorage):
+    """
+    Approximate distributed limiter: counts locally, syncs in the background.
+
+    incr() only touches memory. A daemon thread flushes each key's local
+    delta to Firestore with an Increment every `flush_interval` seconds (or
+    sooner once a key has `flush_threshold` unflushed hits) and pulls the
+    global count of active keys every `pull_interval` seconds with one
+    get_all. No transactions are needed: windows are aligned to the epoch
+    (window = floor(now / expiry)), so every instance writes the same
+    document, {key}__{window_start}, for the same window.
+
+    Accuracy: a client can exceed a limit by what other instances counted
+    but this one hasn't pulled yet, plus at most `max_overshoot` unflushed
+    hits per instance; reaching `max_overshoot` forces a synchronous
+    flush + pull for that key on the request path.
+
+    Storage Format:
+        Collection: rate_limits (shared with FirestoreLimiterStorage)
+        Document ID: {key}__{window_start}
+        Fields: count, expiry (window end, TTL/sweeper field), key
+    """
+
+    STORAGE_SCHEME = ["firestore+approx"]
+
+    def __init__(
+        self,
+        uri: str = None,
+        collection_name: str = "rate_limits",
+        flush_interval: float = 1.0,
+        pull_interval: float = 5.0,
+        flush_threshold: int = 10,
+        max_overshoot: int = 50,
+        **options
+    ):
+        """
+        Initialize approximate limiter storage.
+
+        Args:
+            uri: Storage URI (not used, just for compatibility)
+            collection_name: Firestore collection for rate limits
+            flush_interval: Seconds between background flushes
+            pull_interval: Seconds between global count refreshes per key
+            flush_threshold: Unflushed hits on a key that wake the flusher early
+            max_overshoot: Unflushed hits on a key that force a synchronous sync
+            **options: Additional options
+        """
+        super().__init__(uri, collection_name=collection_name, **options)
+        self.flush_interval = float(flush_interval)
+        self.pull_interval = float(pull_interval)
+        self.flush_threshold = max(1, int(flush_threshold))
+        self.max_overshoot = max(self.flush_threshold, int(max_overshoot))
+
+        self._windows: Dict[str, _LocalWindow] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.local_hits = 0
+        self.flushed = 0
+        self.pulls = 0
+        self.forced_syncs = 0
+        self.errors = 0
+
+        atexit.register(self.stop)
+        logger.info(
+            f"ApproximateFirestoreLimiterStorage: flush every {self.flush_interval}s, "
+            f"pull every {self.pull_interval}s, max overshoot {self.max_overshoot}"
+        )
+
+    def _local_window(self, key: str, expiry: int, now: float) -> _LocalWindow:
+        """Get (or roll over to) the local window for key. Caller holds _lock."""
+        window = self._windows.get(key)
+        if window is None or window.window_end <= now or window.expiry != expiry:
+            window_start = int(now // expiry) * expiry
+            window = _LocalWindow(
+                doc_id=f"{self._make_key(key)}__{window_start}",
+                expiry=expiry,
+                window_end=window_start + expiry,
+            )
+            self._windows[key] = window
+        return window
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        """
+        Count a hit locally.
+
+        Args:
+            key: Rate limit key
+            expiry: Window length in seconds
+            elastic_expiry: Ignored (windows are epoch-aligned)
+            amount: Amount to increment (default: 1)
+
+        Returns:
+            Estimated counter value for the current window
+        """
+        with self._lock:
+            window = self._local_window(key, expiry, time.time())
+            window.pending += amount
+            self.local_hits += 1
+            estimate = window.base + window.pending
+            forced = window.pending >= self.max_overshoot
+            if window.pending >= self.flush_threshold:
+                self._wake.set()
+
+        self._ensure_started()
+
+        if forced:
+            # Too much unshared drift on this key - sync before answering
+            with self._lock:
+                self.forced_syncs += 1
+            self.sync(keys=[key], force_pull=True)
+            with self._lock:
+                estimate = window.base + window.pending
+
+        return estimate
+
+    def incr_many(self, hits: List[Tuple[str, int, int, Optional[int]]]) -> Dict[str, int]:
+        """
+        Count several hits locally (same contract as FirestoreLimiterStorage.incr_many).
+
+        Args:
+            hits: (key, expiry seconds, amount, limit amount or None) tuples
+
+        Returns:
+            Dict of key -> estimated counter value for every key incremented
+        """
+        results = {}
+        for key, expiry, amount, limit in hits:
+            results[key] = self.incr(key, expiry, amount=amount)
+            if limit is not None and results[key] > limit:
+                break
+        return results
+
+    def prefetch(self, hits: List[Tuple[str, int, int, Optional[int]]]) -> int:
+        """No-op: incr() never does I/O here, so there is nothing to batch."""
+        return 0
+
+    def get(self, key: str) -> int:
+        """
+        Get the estimated counter value for a key's current window.
+
+        Args:
+            key: Rate limit key
+
+        Returns:
+            Estimated count, or 0 if this instance hasn't seen the key this window
+        """
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window.window_end <= time.time():
+                return 0
+            return window.base + window.pending
+
+    def get_expiry(self, key: str) -> int:
+        """
+        Get the end of a key's current window.
+
+        Args:
+            key: Rate limit key
+
+        Returns:
+            Unix timestamp of the window end, or current time if unknown
+        """
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window.window_end <= time.time():
+                return int(time.time())
+            return int(window.window_end)
+
+    def clear(self, key: str) -> None:
+        """
+        Clear a specific rate limit key (local state and current window doc).
+
+        Args:
+            key: Rate limit key to clear
+        """
+        with self._lock:
+            window = self._windows.pop(key, None)
+        if window is None:
+            return
+        try:
+            self.collection.document(window.doc_id).delete()
+        except Exception as e:
+            logger.error(f"Error clearing rate limit {key}: {e}")
+
+    def reset(self) -> Optional[int]:
+        """
+        Reset all rate limits (local state and every document).
+
+        WARNING: Use only for testing!
+
+        Returns:
+            Number of documents deleted
+        """
+        with self._lock:
+            self._windows.clear()
+        return super().reset()
+
+    # =========================================================================
+    # BACKGROUND SYNC
+    # =========================================================================
+
+    def sync(self, keys: Optional[List[str]] = None, force_pull: bool = False) -> None:
+        """
+        Flush local deltas, then pull global counts that are due.
+
+        Args:
+            keys: Limit to these keys (default: all tracked keys)
+            force_pull: Pull the selected keys even if pulled recently
+        """
+        with self._sync_lock:
+            self._flush(keys)
+            self._pull(keys, force_pull)
+            self._prune()
+
+    def stop(self) -> None:
+        """Stop the worker thread and flush whatever is still pending."""
+        self._stop_event.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+        try:
+            with self._sync_lock:
+                self._flush(None)
+        except Exception as e:
+            logger.warning(f"Final rate limit flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of sync counters.
+
+        Returns:
+            Dict with tracked_keys, unflushed, local_hits, flushed, pulls,
+            forced_syncs and errors
+        """
+        with self._lock:
+            return {
+                'tracked_keys': len(self._windows),
+                'unflushed': sum(w.pending for w in self._windows.values()),
+                'local_hits': self.local_hits,
+                'flushed': self.flushed,
+                'pulls': self.pulls,
+                'forced_syncs': self.forced_syncs,
+                'errors': self.errors,
+            }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stop_event.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"limiter-sync-{self.collection_name}",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.sync()
+            except Exception as e:
+                # Keep the worker alive; unflushed deltas are retried next round
+                logger.warning(f"Background rate limit sync failed: {e}")
+
+    def _select(self, keys: Optional[List[str]]) -> List[Tuple[str, _LocalWindow]]:
+        if keys is None:
+            return list(self._windows.items())
+        return [(k, self._windows[k]) for k in keys if k in self._windows]
+
+    def _flush(self, keys: Optional[List[str]]) -> None:
+        with self._lock:
+            deltas = []
+            for key, window in self._select(keys):
+                if window.pending > 0:
+                    deltas.append((key, window, window.pending))
+                    # Count our own flush right away so the estimate doesn't dip
+                    # until the next pull sees it
+                    window.base += window.pending
+                    window.pending = 0
+
+        for start in range(0, len(deltas), MAX_BATCH_SIZE):
+            chunk = deltas[start:start + MAX_BATCH_SIZE]
+            batch = self.db.batch()
+            for key, window, delta in chunk:
+                batch.set(self.collection.document(window.doc_id), {
+                    'count': firestore.Increment(delta),
+                    'expiry': datetime.fromtimestamp(window.window_end, tz=timezone.utc),
+                    'key': key,
+                }, merge=True)
+            try:
+                batch.commit()
+                with self._lock:
+                    self.flushed += sum(delta for _, _, delta in chunk)
+            except Exception as e:
+                logger.warning(f"Rate limit flush failed ({len(chunk)} keys): {e}")
+                with self._lock:
+                    self.errors += 1
+                    for _, window, delta in chunk:
+                        window.base -= delta
+                        window.pending += delta
+
+    def _pull(self, keys: Optional[List[str]], force: bool) -> None:
+        now = time.time()
+        with self._lock:
+            due = [
+                (key, window) for key, window in self._select(keys)
+                if force or now - window.last_pull >= self.pull_interval
+            ]
+
+        for start in range(0, len(due), MAX_BATCH_SIZE):
+            chunk = due[start:start + MAX_BATCH_SIZE]
+            by_id = {window.doc_id: window for _, window in chunk}
+            try:
+                snapshots = self.db.get_all([self.collection.document(d) for d in by_id])
+                counts = {snap.id: (snap.to_dict() or {}).get('count', 0) for snap in snapshots if snap.exists}
+            except Exception as e:
+                logger.warning(f"Rate limit pull failed ({len(chunk)} keys): {e}")
+                with self._lock:
+                    self.errors += 1
+                continue
+
+            with self._lock:
+                self.pulls += 1
+                for doc_id, window in by_id.items():
+                    # The global count already includes everything we flushed
+                    window.base = max(window.base, counts.get(doc_id, 0))
+                    window.last_pull = now
+
+    def _prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            for key in [k for k, w in self._windows.items() if w.window_end <= now and w.pending == 0]:
+                del self._windows[key]
+
+
+class BudgetedLimiterStorage(Storage, *_SLIDING_WINDOW_BASES):
+    """
+    Firestore limiter with a per-call latency budget and a local fallback.
+
+    Every call to the wrapped FirestoreLimiterStorage (created with
+    fail_open=False) runs on a small thread pool and gets `latency_budget`
+    seconds. A call that is too slow or fails is answered by an in-memory
+    limits MemoryStorage instead, with conservative counts: after the first
+    hit each local hit counts `fallback_cost` times, so roughly
+    limit / fallback_cost requests pass per instance.
+
+    A hit is counted once: a timed-out incr/acquire that hasn't started is
+    cancelled, and one that still commits late takes the hit back out of
+    the fallback (late_commits in get_stats()).
+
+    Circuit breaker:
+        `failure_threshold` consecutive slow/failed calls open the breaker
+        and all calls go straight to the fallback. Every `probe_interval`
+        seconds a background probe runs the primary's check() on its own
+        thread, so it never waits behind stuck calls in the pool; the
+        breaker closes when it succeeds. get_stats() exposes the state and
+        counters.
+
+    incr_many/prefetch are not available through this wrapper (the primary
+    runs on pool threads), so install_limit_prefetch leaves it alone.
+    """
+
+    STORAGE_SCHEME = ["firestore+budget"]
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        uri: str = None,
+        collection_name: str = "rate_limits",
+        latency_budget: float = 0.25,
+        failure_threshold: int = 5,
+        probe_interval: float = 5.0,
+        fallback_cost: int = 2,
+        max_workers: int = 8,
+        **options
+    ):
+        """
+        Initialize budgeted limiter storage.
+
+        Args:
+            uri: Storage URI (not used, just for compatibility)
+            collection_name: Firestore collection for rate limits
+            latency_budget: Seconds a Firestore call may take before the
+                fallback answers
+            failure_threshold: Consecutive slow/failed calls that open the breaker
+            probe_interval: Seconds between health probes while open
+            fallback_cost: How many times each local hit (after the first) counts
+            max_workers: Threads available for Firestore calls
+            **options: Passed to FirestoreLimiterStorage (shard_count, ...)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from limits.storage import MemoryStorage
+
+        super().__init__(uri, **options)
+        self.primary = FirestoreLimiterStorage(
+            uri, collection_name=collection_name, fail_open=False, **options
+        )
+        self.fallback = MemoryStorage()
+        self.latency_budget = float(latency_budget)
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.probe_interval = float(probe_interval)
+        self.fallback_cost = max(1, int(fallback_cost))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='limiter-budget')
+        self._probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='limiter-probe')
+
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe = None
+
+        self.primary_calls = 0
+        self.fallback_calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.trips = 0
+        self.probes = 0
+        self.late_commits = 0
+        logger.info(
+            f"BudgetedLimiterStorage: {self.latency_budget * 1000:.0f}ms budget, "
+            f"breaker opens after {self.failure_threshold} failures"
+        )
+
+    @property
+    def base_exceptions(self) -> Tuple[Type[Exception], ...]:
+        """Errors are handled by falling back, so nothing is wrapped."""
+        return ()
+
+    def _call(self, op: str, primary_fn, fallback_fn, undo_fallback=None):
+        """
+        Run primary_fn within the budget, else answer with fallback_fn.
+
+        undo_fallback(result) takes a write back out of the fallback; it runs
+        if a timed-out primary_fn commits after all.
+        """
+        from concurrent.futures import TimeoutError as FuturesTimeout
+
+        if not self._allow_primary():
+            return self._use_fallback(fallback_fn)
+
+        future = self._executor.submit(primary_fn)
+        try:
+            result = future.result(timeout=self.latency_budget)
+        except FuturesTimeout:
+            self._record_failure(f"{op} exceeded {self.latency_budget * 1000:.0f}ms", timeout=True)
+            if future.cancel() or undo_fallback is None:
+                # Not started (the fallback is the only writer) or read-only
+                return self._use_fallback(fallback_fn)
+            result = self._use_fallback(fallback_fn)
+            future.add_done_callback(lambda late: self._late_primary(late, undo_fallback, result))
+            return result
+        except Exception as e:
+            self._record_failure(f"{op} failed: {e}")
+            return self._use_fallback(fallback_fn)
+
+        with self._lock:
+            self.primary_calls += 1
+            self._failures = 0
+        return result
+
+    def _use_fallback(self, fallback_fn):
+        with self._lock:
+            self.fallback_calls += 1
+        return fallback_fn()
+
+    def _late_primary(self, future, undo_fallback, fallback_result) -> None:
+        """A timed-out write finished: if it committed, the fallback's charge is a duplicate."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            undo_fallback(fallback_result)
+        except Exception as e:
+            logger.warning(f"Could not take a late-committed hit out of the fallback: {e}")
+            return
+        with self._lock:
+            self.late_commits += 1
+
+    def _allow_primary(self) -> bool:
+        """True if the breaker is closed; starts a probe when one is due."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            probe = None
+            if self._probe is None and time.monotonic() - self._opened_at >= self.probe_interval:
+                self.state = self.HALF_OPEN
+                self.probes += 1
+                probe = self._probe = self._probe_executor.submit(self.primary.check)
+        if probe is not None:
+            # Outside the lock: a probe that already finished runs the callback here
+            probe.add_done_callback(self._probe_done)
+        return False
+
+    def _probe_done(self, future) -> None:
+        try:
+            healthy = future.result()
+        except Exception:
+            healthy = False
+
+        with self._lock:
+            self._probe = None
+            if healthy:
+                self.state = self.CLOSED
+                self._failures = 0
+            else:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+        if healthy:
+            logger.info("✅ Rate limiter circuit closed - back on Firestore")
+        else:
+            logger.warning("🔌 Rate limiter health probe failed - staying on local fallback")
+
+    def _record_failure(self, reason: str, timeout: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+            self._failures += 1
+            tripped = self.state == self.CLOSED and self._failures >= self.failure_threshold
+            if tripped:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+
+        if tripped:
+            logger.warning(f"🔌 Rate limiter circuit opened after {self.failure_threshold} failures ({reason})")
+        else:
+            logger.warning(f"⏱️ Rate limit {reason} - using local fallback")
+
+    def _conservative(self, count: int) -> int:
+        """Scale a local count: the first hit counts once, later ones fallback_cost times."""
+        return 0 if count <= 0 else 1 + (count - 1) * self.fallback_cost
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        """
+        Increment the counter for a rate limit key.
+
+        Args:
+            key: Rate limit key
+            expiry: Window expiry in seconds
+            elastic_expiry: If True, extend expiry on each request
+            amount: Amount to increment (default: 1)
+
+        Returns:
+            New counter value (scaled local count on fallback)
+        """
+        return self._call(
+            'incr',
+            lambda: self.primary.incr(key, expiry, elastic_expiry=elastic_expiry, amount=amount),
+            lambda: self._conservative(self.fallback.incr(key, expiry, amount=amount)),
+            undo_fallback=lambda _: self.fallback.decr(key, amount),
+        )
+
+    def get(self, key: str) -> int:
+        """
+        Get current counter value for a rate limit key.
+
+        Args:
+            key: Rate limit key
+
+        Returns:
+            Current count (scaled local count on fallback)
+        """
+        return self._call(
+            'get',
+            lambda: self.primary.get(key),
+            lambda: self._conservative(self.fallback.get(key)),
+        )
+
+    def get_expiry(self, key: str) -> int:
+        """
+        Get expiry timestamp for a rate limit key.
+
+        Args:
+            key: Rate limit key
+
+        Returns:
+            Unix timestamp of expiry
+        """
+        return self._call(
+            'get_expiry',
+            lambda: self.primary.get_expiry(key),
+            lambda: int(self.fallback.get_expiry(key)),
+        )
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        """
+        Take `amount` entries if the weighted count stays within `limit`.
+
+        The local fallback allows ceil(limit / fallback_cost) entries.
+
+        Args:
+            key: Rate limit key
+            limit: Entries allowed per `expiry` seconds
+            expiry: Window length in seconds
+            amount: Entries to acquire (default: 1)
+
+        Returns:
+            True if the entries were acquired
+        """
+        now = time.time()
+
+        def release_local(acquired: bool) -> None:
+            if acquired:
+                _, current_key = self.fallback.sliding_window_keys(key, expiry, now)
+                self.fallback.decr(current_key, amount)
+
+        return self._call(
+            'acquire_sliding_window_entry',
+            lambda: self.primary.acquire_sliding_window_entry(key, limit, expiry, amount),
+            lambda: self.fallback.acquire_sliding_window_entry(
+                key, math.ceil(limit / self.fallback_cost), expiry, amount
+            ),
+            undo_fallback=release_local,
+        )
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        """
+        Get the previous and current sub-window counters for a key.
+
+        Args:
+            key: Rate limit key
+            expiry: Window length in seconds
+
+        Returns:
+            (previous count, previous TTL, current count, current TTL)
+        """
+        return self._call(
+            'get_sliding_window',
+            lambda: self.primary.get_sliding_window(key, expiry),
+            lambda: self.fallback.get_sliding_window(key, expiry),
+        )
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        """
+        Clear a sliding window key in both stores.
+
+        Args:
+            key: Rate limit key to clear
+            expiry: Window length in seconds
+        """
+        self.fallback.clear_sliding_window(key, expiry)
+        self.primary.clear_sliding_window(key, expiry)
+
+    def check(self) -> bool:
+        """
+        Check if the storage can answer.
+
+        Returns:
+            True - the local fallback covers Firestore outages; see
+            get_stats() for the breaker state
+        """
+        return True
+
+    def reset(self) -> Optional[int]:
+        """
+        Reset all rate limits in both stores.
+
+        WARNING: Use only for testing!
+
+        Returns:
+            Number of Firestore documents deleted
+        """
+        self.fallback.reset()
+        return self.primary.reset()
+
+    def clear(self, key: str) -> None:
+        """
+        Clear a specific rate limit key in both stores.
+
+        Args:
+            key: Rate limit key to clear
+        """
+        self.fallback.clear(key)
+        self.primary.clear(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of breaker state and counters.
+
+        Returns:
+            Dict with state, consecutive_failures, primary_calls,
+            fallback_calls, timeouts, errors, late_commits, trips, probes
+            and latency_budget_ms
+        """
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'primary_calls': self.primary_calls,
+                'fallback_calls': self.fallback_calls,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'late_commits': self.late_commits,
+                'trips': self.trips,
+                'probes': self.probes,
+                'latency_budget_ms': int(self.latency_budget * 1000),
+            }
+
+
+def _request_hits(limiter) -> List[Tuple[str, int, int, Optional[int]]]:
+    """
+    Limit keys Flask-Limiter will hit for the current request, in its order.
+
+    Mirrors Flask-Limiter 3.x resolution: decorated endpoints evaluate their
+    route limits (plus defaults when override_defaults=False) when the view
+    runs; other endpoints evaluate the default limits in before_request.
+    Limits with deduct_when/exemptions are left to Flask-Limiter.
+    """
+    from flask import current_app, request
+    from flask_limiter.util import get_qualified_name
+
+    endpoint = request.endpoint
+    if not endpoint or endpoint.split('.')[-1] == 'static' or not limiter.enabled:
+        return []
+    if any(fn() for fn in getattr(limiter, '_request_filters', [])):
+        return []
+
+    view_func = current_app.view_functions.get(endpoint)
+    name = get_qualified_name(view_func) if view_func else ''
+    marked = name in getattr(limiter, '_marked_for_limiting', ()) or limiter.limit_manager.has_hints(endpoint)
+
+    defaults, decorated = limiter.limit_manager.resolve_limits(
+        current_app, endpoint, request.blueprint, name,
+        in_middleware=not marked, marked_for_limiting=False
+    )
+
+    hits = []
+    for lim in sorted(list(defaults) + list(decorated), key=lambda x: x.limit):
+        if lim.is_exempt or lim.method_exempt or lim.deduct_when:
+            continue
+        args = [lim.key_func(), lim.scope_for(endpoint, request.method)]
+        if not all(args):
+            continue
+        if getattr(limiter, '_key_prefix', None):
+            args = [limiter._key_prefix, *args]
+        hits.append((lim.limit.key_for(*args), lim.limit.get_expiry(), lim.cost, lim.limit.amount))
+    return hits
+
+
+def install_limit_prefetch(app, limiter) -> bool:
+    """
+    Charge all of a request's rate limits in one Firestore transaction.
+
+    Without this, Flask-Limiter calls storage.incr() once per limit and each
+    call is its own transaction (2-3 per request). This registers a
+    before_request hook that resolves the request's limit keys and
+    increments them together with incr_many; the incr() calls Flask-Limiter
+    makes afterwards are answered from those results. Any key the hook
+    didn't predict still goes through incr().
+
+    The hook and Flask-Limiter's own check run last, in that order, so a
+    request another before_request hook answers (a redirect, an error) is
+    charged for nothing. Call this after every other app-level
+    before_request hook is registered.
+
+    Args:
+        app: Flask app
+        limiter: Flask-Limiter instance (already initialized on app)
+
+    Returns:
+        True if installed (fixed-window strategy on a batching storage), False otherwise
+    """
+    from limits.strategies import FixedWindowRateLimiter
+
+    storage = limiter.limiter.storage
+    if not isinstance(storage, FirestoreLimiterStorage) or isinstance(storage, ApproximateFirestoreLimiterStorage):
+        return False
+    if not isinstance(limiter.limiter, FixedWindowRateLimiter):
+        # Other strategies don't count through incr() - prefetching would double-charge
+        return False
+
+    def prefetch_rate_limits():
+        try:
+            hits = _request_hits(limiter)
+            if len(hits) > 1:
+                storage.prefetch(hits)
+        except Exception as e:
+            # Flask-Limiter still charges every limit through incr()
+            logger.warning(f"Rate limit prefetch skipped: {e}")
+
+    def clear_rate_limit_prefetch(_exc=None):
+        storage.clear_prefetch()
+
+    hooks = app.before_request_funcs.setdefault(None, [])
+    check = limiter._check_request_limit
+    if check in hooks:
+        # Flask-Limiter's check must follow the prefetch it reads from
+        hooks.remove(check)
+        hooks.extend([prefetch_rate_limits, check])
+    else:
+        hooks.append(prefetch_rate_limits)
+    app.teardown_request(clear_rate_limit_prefetch)
+    logger.info("Rate limit prefetch installed (one transaction per request)")
+    return True
+
+
 def register_firestore_storage():
     """
     Register FirestoreLimiterStorage with Flask-Limiter's storage registry.
 
     Call this before creating the Limiter instance.
     """
-    from limits.storage.registry import SCHEMES
+    try:
+        from limits.storage.registry import SCHEMES
+    except ImportError:
+        # limits >= 4 keeps the registry on limits.storage
+        from limits.storage import SCHEMES
 
-    # Register our custom scheme
+    # Register our custom schemes
     SCHEMES['firestore'] = FirestoreLimiterStorage
-    logger.info("Registered 'firestore://' storage scheme for Flask-Limiter")
+    SCHEMES['firestore+approx'] = ApproximateFirestoreLimiterStorage
+    SCHEMES['firestore+budget'] = BudgetedLimiterStorage
+    logger.info("Registered 'firestore://', 'firestore+approx://' and 'firestore+budget://' storage schemes for Flask-Limiter")
+
+
+def get_limiter_storage_config() -> Tuple[str, Dict[str, Any]]:
+    """
+    Pick the Flask-Limiter storage that matches the cache backend.
+
+    CACHE_BACKEND=redis reuses the same Redis instance (REDIS_HOST/PORT/PASSWORD/DB)
+    through limits' native redis:// storage; anything else uses Firestore.
+    With RATE_LIMIT_MODE=approximate, Firestore counting moves off the request
+    path (ApproximateFirestoreLimiterStorage); RATE_LIMIT_MAX_OVERSHOOT,
+    RATE_LIMIT_FLUSH_INTERVAL and RATE_LIMIT_PULL_INTERVAL tune it.
+    RATE_LIMIT_SHARDS and RATE_LIMIT_HOT_KEY_THRESHOLD tune hot-key sharding.
+    RATE_LIMIT_LATENCY_BUDGET_MS > 0 wraps exact mode in BudgetedLimiterStorage
+    (RATE_LIMIT_BREAKER_THRESHOLD, RATE_LIMIT_PROBE_INTERVAL and
+    RATE_LIMIT_FALLBACK_COST tune its breaker and fallback).
+
+    Returns:
+        Tuple of (storage_uri, storage_options) for the Limiter constructor
+    """
+    if os.getenv('CACHE_BACKEND', 'firestore').lower() == 'redis':
+        host = os.getenv('REDIS_HOST', 'localhost')
+        port = int(os.getenv('REDIS_PORT', 6379))
+        db = int(os.getenv('REDIS_DB', 0))
+        password = os.getenv('REDIS_PASSWORD')
+        auth = f":{quote(password, safe='')}@" if password else ''
+        return f"redis://{auth}{host}:{port}/{db}", {}
+
+    register_firestore_storage()
+    if os.getenv('RATE_LIMIT_MODE', 'exact').lower() == 'approximate':
+        return "firestore+approx://", {
+            "collection_name": "rate_limits",
+            "max_overshoot": int(os.getenv('RATE_LIMIT_MAX_OVERSHOOT', 50)),
+            "flush_interval": float(os.getenv('RATE_LIMIT_FLUSH_INTERVAL', 1.0)),
+            "pull_interval": float(os.getenv('RATE_LIMIT_PULL_INTERVAL', 5.0)),
+        }
+    options = {
+        "collection_name": "rate_limits",
+        "shard_count": int(os.getenv('RATE_LIMIT_SHARDS', 10)),
+        "hot_key_threshold": int(os.getenv('RATE_LIMIT_HOT_KEY_THRESHOLD', 10)),
+    }
+    latency_budget_ms = float(os.getenv('RATE_LIMIT_LATENCY_BUDGET_MS', 0))
+    if latency_budget_ms > 0:
+        return "firestore+budget://", {
+            **options,
+            "latency_budget": latency_budget_ms / 1000,
+            "failure_threshold": int(os.getenv('RATE_LIMIT_BREAKER_THRESHOLD', 5)),
+            "probe_interval": float(os.getenv('RATE_LIMIT_PROBE_INTERVAL', 5.0)),
+            "fallback_cost": int(os.getenv('RATE_LIMIT_FALLBACK_COST', 2)),
+        }
+    return "firestore://", options
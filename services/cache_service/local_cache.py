@@ -0,0 +1,336 @@
+"""
+In-Process L1 Cache Tier
+
+Bounded LRU cache with per-entry TTL that sits in front of a shared cache
+backend (Firestore, Redis). Repeat reads of the same key on the same Cloud Run
+instance are served from memory without a network round-trip.
+
+Consistency model:
+- Writes and deletes go through to the backend first, then update L1
+  (write-through), so an instance always sees its own writes.
+- Every L1 entry carries a version. A read that started before a newer
+  write/delete cannot overwrite the newer entry when it fills L1.
+- Other instances may serve a stale value for at most the L1 TTL, so keep
+  it short (seconds, not minutes).
+
+Usage:
+    from services.cache_service.local_cache import TieredCache
+
+    cache = TieredCache(FirestoreCache(), max_entries=2048, ttl=30)
+    cache.get("key")          # L1 hit or backend read + L1 fill
+    cache.get_stats()         # hit/miss/eviction counters
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .interface import CacheServiceInterface
+
+
+logger = logging.getLogger(__name__)
+
+# Sentinel stored for deleted keys so an in-flight read can't resurrect them
+_TOMBSTONE = object()
+
+
+class _Entry:
+    """Single L1 slot: value (or tombstone), monotonic expiry and version."""
+
+    __slots__ = ('value', 'expires_at', 'version')
+
+    def __init__(self, value: Any, expires_at: float, version: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.version = version
+
+
+class LocalCache:
+    """
+    Thread-safe bounded LRU cache with TTL and per-entry versions.
+
+    Values are dicts (same contract as CacheServiceInterface). A shallow copy
+    is stored and returned so callers can't mutate each other's view.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the L1 cache.
+
+        Args:
+            max_entries: Maximum number of keys held before LRU eviction
+            default_ttl: Entry lifetime in seconds when none is given
+            clock: Monotonic time source (injectable for tests)
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = itertools.count(1)
+
+        # Counters for sizing against real traffic
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_fills = 0
+
+    def next_version(self) -> int:
+        """
+        Reserve a version number.
+
+        Reserve one *before* reading the backend and pass it to set() when
+        filling, so a concurrent write-through with a newer version wins.
+        """
+        with self._lock:
+            return next(self._versions)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a value if present and not expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached dict, or None on miss/expiry/tombstone
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry.value is _TOMBSTONE:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry.value)
+
+    def set(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        ttl: Optional[float] = None,
+        version: Optional[int] = None
+    ) -> bool:
+        """
+        Store a value unless a newer version is already cached.
+
+        Args:
+            key: Cache key
+            value: Dict to cache
+            ttl: Lifetime in seconds (default: default_ttl)
+            version: Version from next_version(); a fresh one is used if None
+
+        Returns:
+            True if stored, False if rejected as stale
+        """
+        return self._put(key, dict(value), ttl, version)
+
+    def delete(self, key: str, version: Optional[int] = None) -> None:
+        """
+        Invalidate a key, leaving a tombstone that blocks older fills.
+
+        Args:
+            key: Cache key
+            version: Version from next_version(); a fresh one is used if None
+        """
+        self._put(key, _TOMBSTONE, None, version)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of L1 counters.
+
+        Returns:
+            Dict with size, capacity, hits, misses, hit_rate, evictions,
+            expirations and stale_fills (fills rejected by the version check)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale_fills': self.stale_fills,
+            }
+
+    def _put(self, key: str, value: Any, ttl: Optional[float], version: Optional[int]) -> bool:
+        with self._lock:
+            if version is None:
+                version = next(self._versions)
+
+            current = self._entries.get(key)
+            if current is not None and current.version > version:
+                self.stale_fills += 1
+                return False
+
+            lifetime = self.default_ttl if ttl is None else ttl
+            self._entries[key] = _Entry(value, self._clock() + lifetime, version)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            return True
+
+
+class TieredCache(CacheServiceInterface):
+    """
+    Two-tier cache: in-process LocalCache (L1) in front of a shared backend (L2).
+
+    Reads check L1 first and fill it from the backend on a miss. Writes and
+    deletes go to the backend, then update L1. Metadata and access-time
+    calls always go to the backend.
+    """
+
+    def __init__(
+        self,
+        backend: CacheServiceInterface,
+        max_entries: int = 1024,
+        ttl: float = 30.0,
+        local: Optional[LocalCache] = None
+    ):
+        """
+        Initialize tiered cache.
+
+        Args:
+            backend: Shared cache backend (source of truth)
+            max_entries: L1 capacity
+            ttl: L1 entry lifetime in seconds (upper bound on cross-instance staleness)
+            local: Pre-built LocalCache (overrides max_entries/ttl)
+        """
+        self.backend = backend
+        self.local = local or LocalCache(max_entries=max_entries, default_ttl=ttl)
+        logger.debug(
+            f"TieredCache initialized: L1 max_entries={self.local.max_entries} "
+            f"ttl={self.local.default_ttl}s → {type(backend).__name__}"
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve from L1, falling back to the backend and filling L1."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        version = self.local.next_version()
+        value = self.backend.get(key)
+        if value is not None:
+            self.local.set(key, value, version=version)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int = 2592000) -> bool:
+        """Write to the backend, then to L1 (never outliving the backend TTL)."""
+        success = self.backend.set(key, value, ttl)
+        if success:
+            self.local.set(key, value, ttl=min(ttl, self.local.default_ttl))
+        else:
+            # Backend state is unknown - don't serve a possibly stale copy
+            self.local.delete(key)
+        return success
+
+    def delete(self, key: str) -> bool:
+        """Delete from the backend and invalidate L1."""
+        try:
+            return self.backend.delete(key)
+        finally:
+            self.local.delete(key)
+
+    def exists(self, key: str) -> bool:
+        """Check L1 first, then the backend."""
+        if self.local.get(key) is not None:
+            return True
+        return self.backend.exists(key)
+
+    def update_access_time(self, key: str) -> bool:
+        """Delegate to the backend."""
+        return self.backend.update_access_time(key)
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """Delegate to the backend (L1 keeps no metadata)."""
+        return self.backend.get_metadata(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Serve what L1 has; fetch the rest from the backend in one call and fill L1."""
+        results = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                results[key] = value
+            else:
+                missing.append(key)
+
+        if missing:
+            version = self.local.next_version()
+            fetched = self.backend.get_many(missing)
+            for key, value in fetched.items():
+                self.local.set(key, value, version=version)
+            results.update(fetched)
+        return results
+
+    def set_many(
+        self,
+        items: Dict[str, Dict[str, Any]],
+        ttl: int = 2592000,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Write to the backend, then to L1 (never outliving the backend TTLs)."""
+        success = self.backend.set_many(items, ttl, ttls)
+        ttls = ttls or {}
+        for key, value in items.items():
+            if success:
+                self.local.set(key, value, ttl=min(ttls.get(key, ttl), self.local.default_ttl))
+            else:
+                self.local.delete(key)
+        return success
+
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete from the backend and invalidate L1."""
+        try:
+            return self.backend.delete_many(keys)
+        finally:
+            for key in keys:
+                self.local.delete(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        L1 counters plus the backend type.
+
+        Returns:
+            Dict from LocalCache.get_stats() with a 'backend' entry
+        """
+        stats = self.local.get_stats()
+        stats['backend'] = type(self.backend).__name__
+        return stats
@@ -0,0 +1,184 @@
+"""
+In-Memory Cache Backend
+
+Implements the CacheServiceInterface with a process-local dict. Intended for
+local development, tests and load tests - entries are not shared between
+instances and are lost on restart.
+
+Every backend call is counted (reads/writes/deletes), which makes it easy to
+measure how many backend operations a request pattern causes.
+"""
+
+import copy
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from .interface import CacheServiceInterface
+
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache(CacheServiceInterface):
+    """
+    Dict-backed implementation of cache service.
+
+    Storage Format:
+        Key: cache key
+        Value: {'data': dict, 'created_at': float, 'expires_at': float, 'last_accessed': float}
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initialize in-memory cache backend.
+
+        Args:
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self._clock = clock
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve data from memory.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached data or None if not found/expired
+        """
+        with self._lock:
+            self.reads += 1
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            return copy.deepcopy(entry['data'])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int = 2592000) -> bool:
+        """
+        Store data in memory.
+
+        Args:
+            key: Cache key
+            value: Data to cache
+            ttl: Time-to-live in seconds (default: 30 days)
+
+        Returns:
+            True if successful
+        """
+        now = self._clock()
+        with self._lock:
+            self.writes += 1
+            self._entries[key] = {
+                'data': copy.deepcopy(value),
+                'created_at': now,
+                'expires_at': now + ttl,
+                'last_accessed': now,
+            }
+        return True
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete entry from memory.
+
+        Args:
+            key: Cache key to delete
+
+        Returns:
+            True if deleted, False if not found
+        """
+        with self._lock:
+            self.deletes += 1
+            return self._entries.pop(key, None) is not None
+
+    def exists(self, key: str) -> bool:
+        """
+        Check if key exists and is not expired.
+
+        Args:
+            key: Cache key to check
+
+        Returns:
+            True if exists and valid
+        """
+        with self._lock:
+            self.reads += 1
+            return self._live_entry(key) is not None
+
+    def update_access_time(self, key: str) -> bool:
+        """
+        Update last_accessed timestamp.
+
+        Args:
+            key: Cache key to update
+
+        Returns:
+            True if updated, False if not found
+        """
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return False
+            self.writes += 1
+            entry['last_accessed'] = self._clock()
+            return True
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get metadata about cache entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Metadata dict or None
+        """
+        with self._lock:
+            self.reads += 1
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            return {
+                'created_at': self._to_datetime(entry['created_at']),
+                'expires_at': self._to_datetime(entry['expires_at']),
+                'last_accessed': self._to_datetime(entry['last_accessed']),
+                'is_expired': False
+            }
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Snapshot of operation counters.
+
+        Returns:
+            Dict with entries, reads, writes and deletes
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'reads': self.reads,
+                'writes': self.writes,
+                'deletes': self.deletes,
+            }
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry if present and unexpired (caller holds _lock)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] <= self._clock():
+            del self._entries[key]
+            return None
+        return entry
+
+    @staticmethod
+    def _to_datetime(ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
@@ -0,0 +1,350 @@
+"""
+Redis Cache Backend
+
+Implements the CacheServiceInterface using Redis (e.g. Google Cloud Memorystore).
+
+Features:
+- Pooled connections shared by all request threads
+- Native TTLs (EXPIRE) - no cleanup jobs
+- Pipelined multi-key operations (one round-trip for N keys)
+- Compact binary value encoding (the versioned msgpack codec from codec.py,
+  zlib above a size threshold)
+
+Latency: <1ms reads/writes within the same VPC
+Requires: redis (pip install redis)
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+
+from .codec import MsgpackSessionCodec
+from .interface import CacheServiceInterface
+
+
+logger = logging.getLogger(__name__)
+
+# Hash fields for each entry
+_FIELD_VALUE = 'v'
+_FIELD_CREATED = 'c'
+_FIELD_ACCESSED = 'a'
+
+
+class RedisCache(CacheServiceInterface):
+    """
+    Redis implementation of cache service.
+
+    Storage Format:
+        Key: {namespace}{key}
+        Type: Hash
+        Fields:
+            - v: bytes - Cached data (codec.py wire format: version byte + msgpack)
+            - c: float - Unix time the entry was written
+            - a: float - Unix time of last update_access_time() (optional)
+        TTL: Native Redis expiry set on every write
+    """
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 6379,
+        password: Optional[str] = None,
+        db: int = 0,
+        namespace: str = '',
+        max_connections: int = 50,
+        socket_timeout: float = 2.0,
+        compress_threshold: int = 1024,
+        client=None
+    ):
+        """
+        Initialize Redis cache backend.
+
+        Args:
+            host: Redis host
+            port: Redis port
+            password: Redis AUTH password
+            db: Redis database number
+            namespace: Prefix added to every key (for sharing one Redis instance)
+            max_connections: Connection pool size
+            socket_timeout: Socket connect/read timeout in seconds
+            compress_threshold: Encoded values larger than this (bytes) are zlib-compressed
+            client: Pre-built redis.Redis client (e.g. fakeredis in tests)
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    "CACHE_BACKEND=redis requires the 'redis' package (pip install redis)"
+                ) from e
+
+            pool = redis.ConnectionPool(
+                host=host,
+                port=port,
+                password=password,
+                db=db,
+                max_connections=max_connections,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=socket_timeout,
+                health_check_interval=30,
+            )
+            client = redis.Redis(connection_pool=pool)
+
+        self.client = client
+        self.namespace = namespace
+        self.codec = MsgpackSessionCodec(compress_threshold=compress_threshold)
+        logger.debug(f"RedisCache initialized: {host}:{port}/{db} namespace='{namespace}'")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve data from Redis.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached data or None if not found/expired
+        """
+        try:
+            raw = self.client.hget(self._key(key), _FIELD_VALUE)
+            if raw is None:
+                logger.debug(f"Cache miss: {key}")
+                return None
+            return self._decode(key, raw)
+
+        except Exception as e:
+            logger.error(f"💥 Error reading from Redis cache: {key} - {e}", exc_info=True)
+            return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int = 2592000) -> bool:
+        """
+        Store data in Redis with a native TTL.
+
+        Args:
+            key: Cache key
+            value: Data to cache
+            ttl: Time-to-live in seconds (default: 30 days)
+
+        Returns:
+            True if successful
+        """
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            self._queue_set(pipe, key, value, ttl)
+            pipe.execute()
+            logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
+            return True
+
+        except Exception as e:
+            logger.error(f"💥 Error writing to Redis cache: {key} - {e}", exc_info=True)
+            return False
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete entry from Redis.
+
+        Args:
+            key: Cache key to delete
+
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            return self.client.delete(self._key(key)) > 0
+        except Exception as e:
+            logger.error(f"💥 Error deleting from Redis cache: {key} - {e}", exc_info=True)
+            return False
+
+    def exists(self, key: str) -> bool:
+        """
+        Check if key exists (Redis never returns expired keys).
+
+        Args:
+            key: Cache key to check
+
+        Returns:
+            True if exists
+        """
+        try:
+            return self.client.exists(self._key(key)) > 0
+        except Exception as e:
+            logger.error(f"Error checking Redis cache existence: {key} - {e}", exc_info=True)
+            return False
+
+    def update_access_time(self, key: str) -> bool:
+        """
+        Update last_accessed timestamp.
+
+        Uses WATCH/MULTI so an entry that expires concurrently is not
+        re-created without a TTL.
+
+        Args:
+            key: Cache key to update
+
+        Returns:
+            True if updated, False if not found
+        """
+        redis_key = self._key(key)
+
+        def _touch(pipe):
+            if not pipe.exists(redis_key):
+                return False
+            pipe.multi()
+            pipe.hset(redis_key, _FIELD_ACCESSED, time.time())
+            return True
+
+        try:
+            return self.client.transaction(_touch, redis_key, value_from_callable=True)
+        except Exception as e:
+            logger.debug(f"Could not update access time for {key}: {e}")
+            return False
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get metadata about cache entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Metadata dict or None
+        """
+        try:
+            redis_key = self._key(key)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hmget(redis_key, [_FIELD_CREATED, _FIELD_ACCESSED])
+            pipe.pttl(redis_key)
+            (created, accessed), pttl = pipe.execute()
+
+            if created is None:
+                return None
+
+            created_at = self._to_datetime(created)
+            expires_at = None
+            if pttl is not None and pttl >= 0:
+                expires_at = datetime.fromtimestamp(time.time() + pttl / 1000.0, tz=timezone.utc)
+
+            return {
+                'created_at': created_at,
+                'expires_at': expires_at,
+                'last_accessed': self._to_datetime(accessed) if accessed else created_at,
+                'is_expired': False
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting Redis metadata: {key} - {e}", exc_info=True)
+            return None
+
+    # =========================================================================
+    # MULTI-KEY OPERATIONS (pipelined - one round-trip)
+    # =========================================================================
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve several keys in one round-trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dict of key -> data for keys that were found
+        """
+        if not keys:
+            return {}
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hget(self._key(key), _FIELD_VALUE)
+            raw_values = pipe.execute()
+
+            found = {}
+            for key, raw in zip(keys, raw_values):
+                value = self._decode(key, raw) if raw is not None else None
+                if value is not None:
+                    found[key] = value
+            return found
+
+        except Exception as e:
+            logger.error(f"💥 Error reading {len(keys)} keys from Redis cache: {e}", exc_info=True)
+            return {}
+
+    def set_many(
+        self,
+        items: Dict[str, Dict[str, Any]],
+        ttl: int = 2592000,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Store several keys in one round-trip.
+
+        Args:
+            items: Dict of key -> data
+            ttl: Time-to-live in seconds applied to every entry
+            ttls: Optional per-key TTL overrides
+
+        Returns:
+            True if successful
+        """
+        if not items:
+            return True
+        ttls = ttls or {}
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            for key, value in items.items():
+                self._queue_set(pipe, key, value, ttls.get(key, ttl))
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"💥 Error writing {len(items)} keys to Redis cache: {e}", exc_info=True)
+            return False
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete several keys in one round-trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Number of entries deleted
+        """
+        if not keys:
+            return 0
+        try:
+            return self.client.delete(*[self._key(key) for key in keys])
+        except Exception as e:
+            logger.error(f"💥 Error deleting {len(keys)} keys from Redis cache: {e}", exc_info=True)
+            return 0
+
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}{key}"
+
+    def _queue_set(self, pipe, key: str, value: Dict[str, Any], ttl: int) -> None:
+        redis_key = self._key(key)
+        pipe.delete(redis_key)
+        pipe.hset(redis_key, mapping={
+            _FIELD_VALUE: self._encode(value),
+            _FIELD_CREATED: time.time(),
+        })
+        pipe.expire(redis_key, int(ttl))
+
+    def _encode(self, value: Dict[str, Any]) -> bytes:
+        return self.codec.dumps(value)
+
+    def _decode(self, key: str, raw: bytes) -> Optional[Dict[str, Any]]:
+        """Decode a stored value; unreadable entries (e.g. pre-codec zlib pickles) are misses."""
+        try:
+            return self.codec.loads(raw)
+        except Exception as e:
+            logger.warning(f"Unreadable Redis cache entry treated as a miss: {key} - {e}")
+            return None
+
+    @staticmethod
+    def _to_datetime(raw) -> datetime:
+        return datetime.fromtimestamp(float(raw), tz=timezone.utc)
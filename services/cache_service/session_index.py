@@ -0,0 +1,431 @@
+"""
+User → Session Secondary Index
+
+Sessions are keyed by random session ID, so "which sessions belong to this
+user?" used to need a scan of every stored session. The session interface
+now records each session in a per-user index when the session gains a
+user_id, and removes it on logout. Every operation below costs
+O(sessions of that user).
+
+Storage (one entry per user, members added/removed atomically):
+    Firestore: {collection}/{user_id} with a `sessions` map {sid: info}
+    Redis:     hash {namespace}session_index:{user_id} with fields sid -> JSON info
+    Memory:    dict (development/tests)
+
+Sessions stored before the index existed are registered the first time
+they are loaded; scripts/backfill_session_index.py registers the rest in
+one offline pass.
+
+Usage:
+    sessions = UserSessions(get_cache_service(), key_prefix=SESSION_KEY_PREFIX)
+    sessions.list_sessions(user_id)                       # live sessions + info
+    sessions.revoke_all(user_id)                          # log out everywhere
+    sessions.revoke_others(user_id, keep_sid=session.sid) # log out other devices
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from firebase_admin import firestore
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from .firestore_backend import FirestoreCache
+from .interface import CacheServiceInterface
+from .local_cache import TieredCache
+
+
+logger = logging.getLogger(__name__)
+
+# Sessions per process remembered as already indexed (bounds backfill reads)
+_BACKFILL_MEMORY = 10000
+
+
+class SessionIndex(ABC):
+    """Set of session IDs per user, with small per-session info dicts."""
+
+    @abstractmethod
+    def add(self, user_id: str, sid: str, info: Dict[str, Any]) -> bool:
+        """
+        Record a session for a user.
+
+        Args:
+            user_id: Firebase Auth UID
+            sid: Session ID
+            info: Small dict stored with the entry (created_at, user_agent)
+
+        Returns:
+            True if recorded
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, user_id: str, sids: List[str]) -> bool:
+        """
+        Remove sessions from a user's entry.
+
+        Args:
+            user_id: Firebase Auth UID
+            sids: Session IDs to remove
+
+        Returns:
+            True if the index was updated (missing entries count as success)
+        """
+        pass
+
+    @abstractmethod
+    def members(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a user's indexed sessions.
+
+        Args:
+            user_id: Firebase Auth UID
+
+        Returns:
+            Dict of sid -> info (may include sessions that have since expired)
+        """
+        pass
+
+    @abstractmethod
+    def clear(self, user_id: str) -> bool:
+        """
+        Drop a user's entry entirely.
+
+        Args:
+            user_id: Firebase Auth UID
+
+        Returns:
+            True if successful
+        """
+        pass
+
+
+class FirestoreSessionIndex(SessionIndex):
+    """
+    Firestore implementation: one document per user.
+
+    Adds use set(merge=True) and removals use DELETE_FIELD, so concurrent
+    logins/logouts of the same user never overwrite each other.
+    """
+
+    def __init__(self, db, collection_name: str = 'session_index'):
+        self.db = db
+        self.collection = db.collection(collection_name)
+
+    def add(self, user_id: str, sid: str, info: Dict[str, Any]) -> bool:
+        try:
+            self.collection.document(user_id).set({'sessions': {sid: info}}, merge=True)
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error indexing session {sid[:8]}... for user {user_id}: {e}", exc_info=True)
+            return False
+
+    def remove(self, user_id: str, sids: List[str]) -> bool:
+        if not sids:
+            return True
+        try:
+            self.collection.document(user_id).update({
+                FieldPath('sessions', sid).to_api_repr(): firestore.DELETE_FIELD for sid in sids
+            })
+            return True
+        except google_exceptions.NotFound:
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error removing {len(sids)} sessions from index for user {user_id}: {e}", exc_info=True)
+            return False
+
+    def members(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            doc = self.collection.document(user_id).get()
+            if not doc.exists:
+                return {}
+            return dict((doc.to_dict() or {}).get('sessions') or {})
+        except Exception as e:
+            logger.error(f"💥 Error reading session index for user {user_id}: {e}", exc_info=True)
+            return {}
+
+    def clear(self, user_id: str) -> bool:
+        try:
+            self.collection.document(user_id).delete()
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error clearing session index for user {user_id}: {e}", exc_info=True)
+            return False
+
+
+class RedisSessionIndex(SessionIndex):
+    """Redis implementation: one hash per user (HSET/HDEL are atomic)."""
+
+    def __init__(self, client, namespace: str = ''):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.namespace}session_index:{user_id}"
+
+    def add(self, user_id: str, sid: str, info: Dict[str, Any]) -> bool:
+        try:
+            self.client.hset(self._key(user_id), sid, json.dumps(info))
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error indexing session {sid[:8]}... for user {user_id}: {e}", exc_info=True)
+            return False
+
+    def remove(self, user_id: str, sids: List[str]) -> bool:
+        if not sids:
+            return True
+        try:
+            self.client.hdel(self._key(user_id), *sids)
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error removing {len(sids)} sessions from index for user {user_id}: {e}", exc_info=True)
+            return False
+
+    def members(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            raw = self.client.hgetall(self._key(user_id))
+            return {
+                (sid.decode() if isinstance(sid, bytes) else sid): json.loads(info)
+                for sid, info in raw.items()
+            }
+        except Exception as e:
+            logger.error(f"💥 Error reading session index for user {user_id}: {e}", exc_info=True)
+            return {}
+
+    def clear(self, user_id: str) -> bool:
+        try:
+            self.client.delete(self._key(user_id))
+            return True
+        except Exception as e:
+            logger.error(f"💥 Error clearing session index for user {user_id}: {e}", exc_info=True)
+            return False
+
+
+class MemorySessionIndex(SessionIndex):
+    """Process-local implementation for development and tests."""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, sid: str, info: Dict[str, Any]) -> bool:
+        with self._lock:
+            self._entries.setdefault(user_id, {})[sid] = dict(info)
+        return True
+
+    def remove(self, user_id: str, sids: List[str]) -> bool:
+        with self._lock:
+            entry = self._entries.get(user_id, {})
+            for sid in sids:
+                entry.pop(sid, None)
+        return True
+
+    def members(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {sid: dict(info) for sid, info in self._entries.get(user_id, {}).items()}
+
+    def clear(self, user_id: str) -> bool:
+        with self._lock:
+            self._entries.pop(user_id, None)
+        return True
+
+
+def _unwrap_backend(cache: CacheServiceInterface) -> CacheServiceInterface:
+    """Return the shared backend behind any TieredCache (L1) wrappers."""
+    while isinstance(cache, TieredCache):
+        cache = cache.backend
+    return cache
+
+
+def create_session_index(cache: CacheServiceInterface) -> SessionIndex:
+    """
+    Create the index implementation matching a cache backend.
+
+    The index is stored next to the sessions: same Firestore project, same
+    Redis instance/namespace. TieredCache is unwrapped (the index is never
+    L1-cached).
+
+    Args:
+        cache: Session cache backend
+
+    Returns:
+        SessionIndex instance
+    """
+    from .redis_backend import RedisCache
+
+    backend = _unwrap_backend(cache)
+
+    if isinstance(backend, FirestoreCache):
+        return FirestoreSessionIndex(backend.db)
+
+    if isinstance(backend, RedisCache):
+        return RedisSessionIndex(backend.client, namespace=backend.namespace)
+
+    return MemorySessionIndex()
+
+
+class UserSessions:
+    """
+    Per-user session operations: list, revoke all, log out other devices.
+
+    Works without a Flask app context, so account deletion jobs and admin
+    scripts can use it directly.
+    """
+
+    def __init__(
+        self,
+        cache: CacheServiceInterface,
+        key_prefix: str,
+        index: Optional[SessionIndex] = None
+    ):
+        """
+        Initialize.
+
+        Args:
+            cache: Session cache backend
+            key_prefix: Session key prefix (SESSION_KEY_PREFIX)
+            index: Index to use (default: create_session_index(cache))
+        """
+        self.cache = cache
+        self.key_prefix = key_prefix
+        self.index = index if index is not None else create_session_index(cache)
+        self._backfilled: OrderedDict = OrderedDict()
+        self._backfill_lock = threading.Lock()
+
+    def _key(self, sid: str) -> str:
+        return f"{self.key_prefix}{sid}"
+
+    def register(self, user_id: str, sid: str, user_agent: str = '') -> bool:
+        """
+        Record that a session now belongs to a user.
+
+        Entries don't expire on their own (sessions are refreshed without
+        touching the index), so sessions that expired since the user's last
+        login are pruned here.
+
+        Args:
+            user_id: Firebase Auth UID
+            sid: Session ID
+            user_agent: Client User-Agent (shown when listing sessions)
+
+        Returns:
+            True if recorded
+        """
+        info = {'created_at': time.time(), 'user_agent': (user_agent or '')[:200]}
+        if not self.index.add(user_id, sid, info):
+            return False
+        self._remember_indexed(user_id, sid)
+        self.list_sessions(user_id)
+        return True
+
+    def backfill(self, user_id: str, sid: str) -> bool:
+        """
+        Register a loaded session if it isn't in the index yet.
+
+        Sessions stored before the index existed are only found this way.
+        Each session is checked once per process, so steady-state loads cost
+        no index reads.
+
+        Args:
+            user_id: Firebase Auth UID stored in the session
+            sid: Session ID
+
+        Returns:
+            True if the session is (now) indexed
+        """
+        with self._backfill_lock:
+            if (user_id, sid) in self._backfilled:
+                self._backfilled.move_to_end((user_id, sid))
+                return True
+
+        if sid not in self.index.members(user_id):
+            info = {'created_at': time.time(), 'user_agent': ''}
+            if not self.index.add(user_id, sid, info):
+                return False
+            logger.info(f"🗂️  Backfilled session {sid[:8]}... into index for user {user_id}")
+
+        self._remember_indexed(user_id, sid)
+        return True
+
+    def _remember_indexed(self, user_id: str, sid: str) -> None:
+        with self._backfill_lock:
+            self._backfilled[(user_id, sid)] = True
+            self._backfilled.move_to_end((user_id, sid))
+            while len(self._backfilled) > _BACKFILL_MEMORY:
+                self._backfilled.popitem(last=False)
+
+    def unregister(self, user_id: str, sid: str) -> bool:
+        """
+        Remove a session from a user's index (e.g. on logout).
+
+        Args:
+            user_id: Firebase Auth UID
+            sid: Session ID
+
+        Returns:
+            True if successful
+        """
+        return self.index.remove(user_id, [sid])
+
+    def list_sessions(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        List a user's live sessions.
+
+        Index entries whose session has expired are pruned on the way.
+
+        Args:
+            user_id: Firebase Auth UID
+
+        Returns:
+            Dict of sid -> info (created_at, user_agent)
+        """
+        members = self.index.members(user_id)
+        if not members:
+            return {}
+
+        live = self.cache.get_many([self._key(sid) for sid in members])
+        dead = [sid for sid in members if self._key(sid) not in live]
+        if dead:
+            self.index.remove(user_id, dead)
+
+        return {sid: info for sid, info in members.items() if sid not in dead}
+
+    def revoke_all(self, user_id: str) -> int:
+        """
+        Delete every session of a user and drop the index entry.
+
+        Args:
+            user_id: Firebase Auth UID
+
+        Returns:
+            Number of session keys deleted
+        """
+        sids = list(self.index.members(user_id))
+        deleted = self.cache.delete_many([self._key(sid) for sid in sids]) if sids else 0
+        self.index.clear(user_id)
+        logger.info(f"🔒 Revoked {deleted} sessions for user {user_id}")
+        return deleted
+
+    def revoke_others(self, user_id: str, keep_sid: str) -> int:
+        """
+        Log out every other device, keeping the current session.
+
+        Args:
+            user_id: Firebase Auth UID
+            keep_sid: Session ID to keep (the caller's)
+
+        Returns:
+            Number of session keys deleted
+        """
+        sids = [sid for sid in self.index.members(user_id) if sid != keep_sid]
+        if not sids:
+            return 0
+        deleted = self.cache.delete_many([self._key(sid) for sid in sids])
+        self.index.remove(user_id, sids)
+        logger.info(f"🔒 Revoked {deleted} other sessions for user {user_id}")
+        return deleted
@@ -0,0 +1,118 @@
+"""
+Single-Flight Call Collapsing
+
+Ensures that concurrent callers asking for the same key run the expensive
+function once per process: the first caller (leader) runs it, everyone else
+arriving while it runs waits and receives the leader's result (or error).
+
+Used by CacheServiceInterface.get_or_compute so that a popular entry expiring
+doesn't make all gunicorn threads rebuild it in parallel.
+
+Usage:
+    flight = SingleFlight()
+    value, shared = flight.do("feed:explore", build_feed)
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    """One in-flight execution that followers can wait on."""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Per-key call collapsing within a process.
+    """
+
+    def __init__(self, wait_timeout: Optional[float] = 10.0):
+        """
+        Initialize.
+
+        Args:
+            wait_timeout: Max seconds a follower waits for the leader before
+                running the function itself (None = wait forever)
+        """
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            'executions': 0,
+            'collapsed': 0,
+            'wait_timeouts': 0,
+        }
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers of the same key.
+
+        Args:
+            key: Collapse key
+            fn: Zero-argument function producing the value
+
+        Returns:
+            (value, shared) - shared is True if another caller's run was reused
+
+        Raises:
+            Whatever fn raised (re-raised in every waiting caller)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._counters['executions'] += 1
+            else:
+                self._counters['collapsed'] += 1
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                # Leader is stuck (e.g. backend timeout) - don't wait forever
+                self.incr('wait_timeouts')
+                return fn(), False
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self, key: str) -> bool:
+        """True if a call for key is currently running."""
+        with self._lock:
+            return key in self._calls
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Bump a named counter (callers can add their own, e.g. hits)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Snapshot of counters.
+
+        Returns:
+            Dict with executions, collapsed, wait_timeouts, in_flight and any
+            counters added through incr()
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = len(self._calls)
+            return stats
@@ -0,0 +1,270 @@
+"""
+Expired-Entry Sweeper
+
+Deletes documents whose expiry field is in the past, for when the Firestore
+TTL policy falls behind (TTL deletion is best-effort and can lag by days on
+large collections). Unlike FirestoreCache.cleanup_expired (one batch of 500)
+or FirestoreLimiterStorage.reset (serial full scan), the sweeper:
+
+- pages through `{expiry_field} < cutoff` ordered by (expiry, doc id) with
+  query cursors, projecting only the expiry field
+- deletes through a BulkWriter, which sends batches in parallel and ramps up
+  to `max_ops_per_second` (500/50/5 rule), retrying failed deletes
+- keeps reading the next page while earlier deletes are still in flight
+- checkpoints its cutoff and cursor to Firestore every few pages, so a run
+  that hits its time budget or crashes resumes where it stopped
+- reports docs/sec and lag (how far past expiry the oldest dead doc was)
+
+Usage:
+    sweeper = ExpiredEntrySweeper(db, "cache_sessions", "expires_at")
+    stats = sweeper.run(max_seconds=3000)
+
+See scripts/sweep_expired_entries.py for the command / Cloud Run job.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions, SendMode
+
+
+logger = logging.getLogger(__name__)
+
+# Collections with expiring documents and the field holding their expiry
+SWEEP_TARGETS: Dict[str, str] = {
+    'cache_sessions': 'expires_at',   # FirestoreCache
+    'rate_limits': 'expiry',          # FirestoreLimiterStorage
+}
+
+CHECKPOINT_COLLECTION = 'sweeper_checkpoints'
+
+
+class ExpiredEntrySweeper:
+    """
+    Streams expired documents of one collection into a throttled BulkWriter.
+    """
+
+    def __init__(
+        self,
+        db,
+        collection_name: str,
+        expiry_field: Optional[str] = None,
+        page_size: int = 1000,
+        max_ops_per_second: int = 500,
+        checkpoint_every: int = 10,
+        checkpoint_collection: str = CHECKPOINT_COLLECTION,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the sweeper.
+
+        Args:
+            db: Firestore client
+            collection_name: Collection to sweep
+            expiry_field: Timestamp field to compare against now
+                (default: looked up in SWEEP_TARGETS)
+            page_size: Documents read per query page
+            max_ops_per_second: Upper bound on delete throughput
+            checkpoint_every: Pages between checkpoints
+            checkpoint_collection: Collection holding sweeper checkpoints
+            clock: Monotonic time source (injectable for tests)
+        """
+        if expiry_field is None:
+            if collection_name not in SWEEP_TARGETS:
+                raise ValueError(f"No expiry field known for collection '{collection_name}'")
+            expiry_field = SWEEP_TARGETS[collection_name]
+
+        self.db = db
+        self.collection_name = collection_name
+        self.collection = db.collection(collection_name)
+        self.expiry_field = expiry_field
+        self.page_size = page_size
+        self.max_ops_per_second = max_ops_per_second
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.checkpoint_ref = db.collection(checkpoint_collection).document(collection_name)
+        self.clock = clock
+
+    # =========================================================================
+    # CHECKPOINTS
+    # =========================================================================
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the checkpoint left by an unfinished run.
+
+        Returns:
+            Checkpoint dict (cutoff, cursor_value, cursor_id, deleted, ...) or None
+        """
+        try:
+            doc = self.checkpoint_ref.get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"💥 Error reading sweeper checkpoint for {self.collection_name}: {e}", exc_info=True)
+            return None
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        try:
+            self.checkpoint_ref.set({**state, 'updated_at': datetime.now(timezone.utc)})
+        except Exception as e:
+            # Losing a checkpoint only means redoing some reads next run
+            logger.error(f"💥 Error saving sweeper checkpoint for {self.collection_name}: {e}", exc_info=True)
+
+    def _clear_checkpoint(self) -> None:
+        try:
+            self.checkpoint_ref.delete()
+        except Exception as e:
+            logger.error(f"💥 Error clearing sweeper checkpoint for {self.collection_name}: {e}", exc_info=True)
+
+    # =========================================================================
+    # SWEEP
+    # =========================================================================
+
+    def _page(self, cutoff: datetime, cursor: Optional[Dict[str, Any]]):
+        query = (
+            self.collection
+            .where(filter=FieldFilter(self.expiry_field, '<', cutoff))
+            .order_by(self.expiry_field)
+            .order_by('__name__')
+            .select([self.expiry_field])
+            .limit(self.page_size)
+        )
+        if cursor is not None:
+            query = query.start_after(cursor)
+        return list(query.stream())
+
+    def _bulk_writer(self, counters: Dict[str, int]):
+        writer = self.db.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=min(500, self.max_ops_per_second),
+            max_ops_per_second=self.max_ops_per_second,
+            mode=SendMode.parallel,
+        ))
+
+        def on_error(failure, _writer) -> bool:
+            if failure.attempts < 5:
+                return True
+            counters['failed'] += 1
+            logger.warning(f"⚠️ Giving up deleting {failure.operation.reference.id}: {failure.message}")
+            return False
+
+        writer.on_write_error(on_error)
+        return writer
+
+    def run(
+        self,
+        max_seconds: Optional[float] = None,
+        max_docs: Optional[int] = None,
+        resume: bool = True,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Delete expired documents until none are left or a budget runs out.
+
+        Args:
+            max_seconds: Stop (leaving a checkpoint) after this many seconds
+            max_docs: Stop (leaving a checkpoint) after this many documents
+            resume: Continue from an unfinished run's checkpoint if present
+            dry_run: Count matching documents without deleting them
+
+        Returns:
+            Dict with collection, deleted, failed, pages, elapsed_seconds,
+            docs_per_second, lag_seconds (age of the oldest expired doc when
+            the run started), complete (False if a budget stopped the run)
+            and resumed
+        """
+        now = datetime.now(timezone.utc)
+        checkpoint = self.load_checkpoint() if resume and not dry_run else None
+
+        if checkpoint:
+            cutoff = checkpoint['cutoff']
+            cursor = {self.expiry_field: checkpoint['cursor_value'], '__name__': checkpoint['cursor_id']}
+            previously_deleted = checkpoint.get('deleted', 0)
+            logger.info(f"🔁 Resuming {self.collection_name} sweep at {checkpoint['cursor_id']} "
+                        f"({previously_deleted} already deleted)")
+        else:
+            cutoff, cursor, previously_deleted = now, None, 0
+
+        counters = {'deleted': 0, 'failed': 0, 'pages': 0}
+        writer = None if dry_run else self._bulk_writer(counters)
+        started = self.clock()
+        lag_seconds = None
+        complete = False
+        last = None
+
+        try:
+            while True:
+                if max_seconds is not None and self.clock() - started >= max_seconds:
+                    break
+                if max_docs is not None and counters['deleted'] >= max_docs:
+                    break
+
+                docs = self._page(cutoff, cursor)
+                if not docs:
+                    complete = True
+                    break
+
+                if lag_seconds is None:
+                    oldest = docs[0].get(self.expiry_field)
+                    if oldest is not None:
+                        if oldest.tzinfo is None:
+                            oldest = oldest.replace(tzinfo=timezone.utc)
+                        lag_seconds = max(0.0, (now - oldest).total_seconds())
+
+                for doc in docs:
+                    if writer is not None:
+                        writer.delete(doc.reference)
+                counters['deleted'] += len(docs)
+                counters['pages'] += 1
+
+                last = docs[-1]
+                cursor = {self.expiry_field: last.get(self.expiry_field), '__name__': last.id}
+
+                if writer is not None and counters['pages'] % self.checkpoint_every == 0:
+                    # Only checkpoint past deletes that have actually been sent
+                    writer.flush()
+                    self._save_checkpoint(self._checkpoint_state(
+                        cutoff, cursor, previously_deleted + counters['deleted']
+                    ))
+
+                if len(docs) < self.page_size:
+                    complete = True
+                    break
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if not dry_run:
+            if complete:
+                self._clear_checkpoint()
+            elif last is not None:
+                self._save_checkpoint(self._checkpoint_state(
+                    cutoff, cursor, previously_deleted + counters['deleted']
+                ))
+
+        elapsed = self.clock() - started
+        stats = {
+            'collection': self.collection_name,
+            'deleted': counters['deleted'] - counters['failed'],
+            'failed': counters['failed'],
+            'pages': counters['pages'],
+            'elapsed_seconds': round(elapsed, 2),
+            'docs_per_second': round(counters['deleted'] / elapsed, 1) if elapsed > 0 else 0.0,
+            'lag_seconds': round(lag_seconds, 1) if lag_seconds is not None else 0.0,
+            'complete': complete,
+            'resumed': bool(checkpoint),
+            'dry_run': dry_run,
+        }
+        logger.info(f"🧹 Swept {self.collection_name}: {stats['deleted']} deleted, "
+                    f"{stats['failed']} failed, {stats['docs_per_second']} docs/s, "
+                    f"lag {stats['lag_seconds']}s{'' if complete else ' (checkpointed)'}")
+        return stats
+
+    def _checkpoint_state(self, cutoff: datetime, cursor: Dict[str, Any], deleted: int) -> Dict[str, Any]:
+        return {
+            'cutoff': cutoff,
+            'cursor_value': cursor[self.expiry_field],
+            'cursor_id': cursor['__name__'],
+            'deleted': deleted,
+        }
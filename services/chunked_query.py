@@ -0,0 +1,151 @@
+"""Chunked IN-Query Executor - `field IN (long list)` over Firestore
+
+Firestore caps `in` filters at 30 values. Paths that need "documents where
+field IN (large list)" used to truncate the list; this executor splits it
+into chunks of 30 instead and runs the chunk queries concurrently on a
+bounded, shared thread pool.
+
+Ordered reads:
+    Every chunk runs the same ORDER BY <fields>, __name__ with limit + 1, and
+    the ordered streams are k-way merged with a heap (heapq.merge), stopping
+    as soon as limit + 1 documents have been produced. The continuation is a
+    composite keyset {<fields>..., '__name__': docId} of the last document
+    returned; passed back as start_after it positions every chunk, so pages
+    stay gap- and duplicate-free across chunks.
+
+Unordered reads (fetch_all) just union the chunk results.
+
+Configuration:
+    IN_QUERY_MAX_WORKERS: Threads shared by all chunked queries (default 8)
+"""
+import heapq
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+IN_QUERY_LIMIT = 30
+
+
+class ChunkedInQueryExecutor:
+    """
+    Runs a query once per 30-value chunk of an `in` list and merges the results.
+    """
+
+    def __init__(self, max_workers: int = 8, chunk_size: int = IN_QUERY_LIMIT):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Threads running chunk queries (shared by all callers)
+            chunk_size: Values per `in` filter (Firestore allows 30)
+        """
+        if not 0 < chunk_size <= IN_QUERY_LIMIT:
+            raise ValueError(f"chunk_size must be between 1 and {IN_QUERY_LIMIT}")
+
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='in-query')
+
+    def query(
+        self,
+        build_query: Callable[[List[Any]], Any],
+        values: Sequence[Any],
+        order_by: Sequence[str],
+        direction: str,
+        limit: int,
+        start_after: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Any], bool, Optional[Dict[str, Any]]]:
+        """
+        Read one ordered page of `field IN values`.
+
+        Args:
+            build_query: Returns the filtered query for one chunk of values
+                (e.g. lambda chunk: col.where(filter=FieldFilter('userId', 'in', chunk)));
+                ordering, cursor and limit are added here
+            values: All values for the `in` filter (duplicates are ignored)
+            order_by: Fields to order by, most significant first
+            direction: firestore.Query.DESCENDING or ASCENDING (all fields)
+            limit: Page size
+            start_after: Continuation from the previous page
+
+        Returns:
+            (documents in order, has_more, continuation for the next page or None)
+        """
+        chunks = self._chunks(values)
+        if not chunks:
+            return [], False, None
+
+        def run_chunk(chunk):
+            query = build_query(chunk)
+            for field in order_by:
+                query = query.order_by(field, direction=direction)
+            query = query.order_by('__name__', direction=direction)
+            if start_after is not None:
+                query = query.start_after(start_after)
+            return list(query.limit(limit + 1).stream())
+
+        def sort_key(doc):
+            data = doc.to_dict()
+            return tuple(data.get(field) for field in order_by) + (doc.id,)
+
+        streams = self._map(run_chunk, chunks)
+        merged = heapq.merge(*streams, key=sort_key, reverse=direction == 'DESCENDING')
+        docs = list(itertools.islice(merged, limit + 1))
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        continuation = None
+        if has_more:
+            last = docs[-1].to_dict()
+            continuation = {field: last.get(field) for field in order_by}
+            continuation['__name__'] = docs[-1].id
+        return docs, has_more, continuation
+
+    def fetch_all(self, build_query: Callable[[List[Any]], Any], values: Sequence[Any]) -> List[Any]:
+        """
+        Read every document matching `field IN values`, in no particular order.
+
+        Args:
+            build_query: Returns the filtered query for one chunk of values
+            values: All values for the `in` filter (duplicates are ignored)
+
+        Returns:
+            Matching documents (each at most once)
+        """
+        docs = {}
+        for stream in self._map(lambda chunk: list(build_query(chunk).stream()), self._chunks(values)):
+            for doc in stream:
+                docs.setdefault(doc.id, doc)
+        return list(docs.values())
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=True)
+
+    def _chunks(self, values: Sequence[Any]) -> List[List[Any]]:
+        unique = list(dict.fromkeys(values))
+        return [unique[i:i + self.chunk_size] for i in range(0, len(unique), self.chunk_size)]
+
+    def _map(self, fn, chunks: List[List[Any]]) -> List[List[Any]]:
+        # A single chunk runs inline - no thread hop for the common case
+        if len(chunks) == 1:
+            return [fn(chunks[0])]
+        return list(self._pool.map(fn, chunks))
+
+
+# Singleton instance for easy import
+_executor_instance: Optional[ChunkedInQueryExecutor] = None
+
+
+def get_chunked_query_executor() -> ChunkedInQueryExecutor:
+    """Get or create the shared ChunkedInQueryExecutor."""
+    global _executor_instance
+    if _executor_instance is None:
+        _executor_instance = ChunkedInQueryExecutor(
+            max_workers=int(os.getenv('IN_QUERY_MAX_WORKERS', '8'))
+        )
+    return _executor_instance
@@ -0,0 +1,508 @@
+"""Comment Service - Lean Writes and a Cached First Page for Comments
+
+Adding a comment used to cost four sequential round-trips (read the
+creation, read the user, a transaction, then re-read the comment for its
+server timestamp), and every comment sheet opened with a creation read
+before the comments query.
+
+Writes:
+    One batch: set the comment (createdAt = SERVER_TIMESTAMP) and
+    Increment the creation's commentCount. The creation's existence is
+    checked by the update itself - a missing creation fails the whole
+    batch with NotFound. The commenter's username/avatar come from the
+    author hydrator's cache. The response's createdAt is the commit time
+    from the WriteResult (the value SERVER_TIMESTAMP resolved to), falling
+    back to the client clock taken before the commit.
+
+Reads:
+    The first `window` comments of each creation are cached as one
+    {'exists', 'items', 'complete'} entry (get_or_compute, `ttl` seconds).
+    Deeper pages run the comments query; only an empty page costs a
+    creation read to tell "no more comments" from "no such creation".
+    A new top-level comment drops the cached window unless the window
+    already holds it or is full (appends can't be made atomic across
+    instances); a reply drops the window if it shows the reply's root, whose
+    replyCount changed.
+
+Threads:
+    Replies live in the same `comments` subcollection (so per-user queries
+    and deletion still see them) with `replyToCommentId` (the comment
+    answered), `rootCommentId` and a path-encoded `threadKey`:
+
+        <rootCommentId>#<sequence, zero-padded>
+
+    The reply transaction reads the root, allocates the next sequence from
+    its `lastReplySeq` and increments its `replyCount` and the creation's
+    `commentCount`. A thread page is one range query on the single-field
+    threadKey index (`rootId# < threadKey < rootId$`), whatever the depth
+    of the conversation; the thread cursor is the last threadKey, signed.
+    Top-level pages filter on `replyToCommentId == None`.
+
+Environment Variables:
+    COMMENT_CACHE_ENABLED: "0" to always query Firestore (default: "1")
+    COMMENT_CACHE_TTL: First-page entry lifetime in seconds (default: 60)
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+
+from services.author_hydration import get_author_hydrator
+from services.cache_service import get_cache_service
+from services.cursor_codec import apply_cursor, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'comments:first:'
+CURSOR_SCOPE = 'comments'
+REPLIES_CURSOR_SCOPE = 'replies'
+SEQUENCE_DIGITS = 10
+
+
+class CommentError(Exception):
+    """Base exception for comment operations."""
+
+
+class CreationNotFoundError(CommentError):
+    """The creation being commented on doesn't exist."""
+
+
+class CommenterNotFoundError(CommentError):
+    """The commenting user has no user document."""
+
+
+class ParentCommentNotFoundError(CommentError):
+    """The comment being replied to (or its thread root) doesn't exist."""
+
+
+def thread_key(root_id: str, sequence: int) -> str:
+    """
+    Ordering key of a reply: sorts by thread, then by reply sequence.
+
+    Args:
+        root_id: Root comment ID of the thread
+        sequence: Reply sequence within the thread (1, 2, ...)
+
+    Returns:
+        '<root_id>#<zero-padded sequence>'
+    """
+    return f"{root_id}#{sequence:0{SEQUENCE_DIGITS}d}"
+
+
+def _thread_range(root_id: str) -> Tuple[str, str]:
+    """Exclusive (start, end) threadKey bounds of a thread ('$' sorts right after '#')."""
+    return f"{root_id}#", f"{root_id}$"
+
+
+def comment_item(comment_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Response fields of a comment document.
+
+    Args:
+        comment_id: Comment document ID
+        data: Comment document data
+
+    Returns:
+        Dict with the fields the comments endpoints return
+    """
+    return {
+        'commentId': comment_id,
+        'userId': data.get('userId'),
+        'username': data.get('username', 'Unknown'),
+        'avatarUrl': data.get('avatarUrl', ''),
+        'commentText': data.get('commentText'),
+        'createdAt': data.get('createdAt'),
+        'replyToCommentId': data.get('replyToCommentId'),
+        'rootCommentId': data.get('rootCommentId'),
+        'replyCount': data.get('replyCount', 0),
+    }
+
+
+class CommentService:
+    """Comment writes and paginated reads for creations."""
+
+    def __init__(self, db=None, cache=None, window: int = 50, ttl: int = 60, collection_name: str = 'creations'):
+        """
+        Initialize the comment service.
+
+        Args:
+            db: Firestore client (uses default if not provided)
+            cache: Cache backend for first pages (None disables caching)
+            window: Comments kept in each cached first page (>= max page size)
+            ttl: First-page entry lifetime in seconds
+            collection_name: Creations collection
+        """
+        self.db = db or firestore.client()
+        self.cache = cache
+        self.window = max(1, int(window))
+        self.ttl = int(ttl)
+        self.collection_name = collection_name
+
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.queries = 0
+        self.existence_reads = 0
+        self.first_pages = 0
+        self.errors = 0
+
+    def add_comment(
+        self,
+        creation_id: str,
+        user_id: str,
+        text: str,
+        reply_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a comment and increment the creation's commentCount atomically.
+
+        Args:
+            creation_id: Creation document ID
+            user_id: Firebase UID of the commenter
+            text: Validated comment text
+            reply_to: Comment ID being replied to (None for a top-level comment)
+
+        Returns:
+            The new comment (comment_item fields)
+
+        Raises:
+            CommenterNotFoundError: The user has no user document
+            CreationNotFoundError: The creation doesn't exist
+            ParentCommentNotFoundError: reply_to (or its root) doesn't exist
+        """
+        profile = get_author_hydrator().get_profiles([user_id]).get(user_id)
+        if not profile:
+            raise CommenterNotFoundError(user_id)
+
+        creation_ref = self.db.collection(self.collection_name).document(creation_id)
+        comment_ref = creation_ref.collection('comments').document()
+        comment_data = {
+            'userId': user_id,
+            'username': profile.get('username') or 'Unknown',
+            'avatarUrl': profile.get('profileImageUrl') or '',
+            'commentText': text,
+            'createdAt': firestore.SERVER_TIMESTAMP,
+            'replyToCommentId': reply_to,
+            'rootCommentId': None,
+        }
+        if reply_to:
+            return self._add_reply(creation_id, creation_ref, comment_ref, comment_data)
+        comment_data['replyCount'] = 0
+
+        batch = self.db.batch()
+        batch.set(comment_ref, comment_data)
+        batch.update(creation_ref, {'commentCount': firestore.Increment(1)})
+
+        client_time = datetime.now(timezone.utc)
+        try:
+            results = batch.commit()
+        except NotFound:
+            raise CreationNotFoundError(creation_id)
+
+        with self._lock:
+            self.writes += 1
+
+        # The commit time is what SERVER_TIMESTAMP resolved to
+        committed_at = getattr(results[0], 'update_time', None) if results else None
+        comment = comment_item(comment_ref.id, {**comment_data, 'createdAt': committed_at or client_time})
+
+        self._refresh_first_page(creation_id, comment['commentId'])
+        return comment
+
+    def _add_reply(
+        self,
+        creation_id: str,
+        creation_ref,
+        reply_ref,
+        reply_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Write a reply, its thread position and both counters in one transaction."""
+        comments_ref = creation_ref.collection('comments')
+        parent_id = reply_data['replyToCommentId']
+
+        @firestore.transactional
+        def write_reply(transaction):
+            parent = comments_ref.document(parent_id).get(transaction=transaction)
+            if not parent.exists:
+                raise ParentCommentNotFoundError(parent_id)
+
+            # Replies to replies join the parent's thread
+            root_id = (parent.to_dict() or {}).get('rootCommentId') or parent.id
+            root = parent if root_id == parent.id else comments_ref.document(root_id).get(transaction=transaction)
+            if not root.exists:
+                raise ParentCommentNotFoundError(root_id)
+
+            sequence = (root.to_dict() or {}).get('lastReplySeq', 0) + 1
+            data = {**reply_data, 'rootCommentId': root_id, 'threadKey': thread_key(root_id, sequence)}
+            transaction.set(reply_ref, data)
+            transaction.update(comments_ref.document(root_id), {
+                'replyCount': firestore.Increment(1),
+                'lastReplySeq': sequence,
+            })
+            transaction.update(creation_ref, {'commentCount': firestore.Increment(1)})
+            return data
+
+        client_time = datetime.now(timezone.utc)
+        try:
+            data = write_reply(self.db.transaction())
+        except NotFound:
+            raise CreationNotFoundError(creation_id)
+
+        with self._lock:
+            self.writes += 1
+
+        # The transactional wrapper doesn't expose the commit's WriteResults
+        reply = comment_item(reply_ref.id, {**data, 'createdAt': client_time})
+
+        self._recount_first_page(creation_id, data['rootCommentId'])
+        return reply
+
+    def get_replies(
+        self,
+        creation_id: str,
+        comment_id: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[str], bool]]:
+        """
+        Get a page of a thread's replies, in reply order.
+
+        Args:
+            creation_id: Creation document ID
+            comment_id: Root comment ID of the thread
+            limit: Page size
+            cursor: nextCursor from the previous thread page
+
+        Returns:
+            (replies, next_cursor, has_more), or None if the root comment
+            doesn't exist
+        """
+        comments_ref = self.db.collection(self.collection_name).document(creation_id).collection('comments')
+        start, end = _thread_range(comment_id)
+
+        decoded = decode_cursor(cursor, REPLIES_CURSOR_SCOPE)
+        if decoded is not None and start < decoded[1] < end:
+            start = decoded[1]
+
+        query = (comments_ref
+                 .where(filter=firestore.FieldFilter('threadKey', '>', start))
+                 .where(filter=firestore.FieldFilter('threadKey', '<', end))
+                 .order_by('threadKey')
+                 .limit(limit + 1))  # +1 to check if there are more
+        docs = list(query.stream())
+        with self._lock:
+            self.queries += 1
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        if not docs:
+            with self._lock:
+                self.existence_reads += 1
+            if not comments_ref.document(comment_id).get().exists:
+                return None
+            return [], None, False
+
+        # The threadKey is unique, so it is the whole position
+        next_cursor = (encode_cursor(None, docs[-1].to_dict()['threadKey'], REPLIES_CURSOR_SCOPE)
+                       if has_more else None)
+        return [comment_item(doc.id, doc.to_dict()) for doc in docs], next_cursor, has_more
+
+    def get_comments(
+        self,
+        creation_id: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], Optional[str], bool]]:
+        """
+        Get a page of top-level comments, oldest first.
+
+        Args:
+            creation_id: Creation document ID
+            limit: Page size (at most `window` for cached first pages)
+            cursor: nextCursor from the previous page (None for the first)
+
+        Returns:
+            (comments, next_cursor, has_more), or None if the creation
+            doesn't exist
+        """
+        if not cursor and self.cache is not None and limit <= self.window:
+            window = self._first_window(creation_id)
+            if window is not None:
+                if not window['exists']:
+                    return None
+                items = window['items']
+                has_more = len(items) > limit or not window['complete']
+                comments = items[:limit]
+                return comments, self._next_cursor(comments, has_more), has_more
+
+        docs, has_more = self._query(creation_id, limit, cursor)
+        if not docs and not self._creation_exists(creation_id):
+            return None
+
+        comments = [comment_item(doc.id, doc.to_dict()) for doc in docs]
+        return comments, self._next_cursor(comments, has_more), has_more
+
+    def invalidate(self, creation_id: str) -> None:
+        """
+        Drop a creation's cached first page (e.g. after comments are deleted).
+
+        Args:
+            creation_id: Creation document ID
+        """
+        if self.cache is None:
+            return
+        try:
+            self.cache.delete(f'{KEY_PREFIX}{creation_id}')
+        except Exception as e:
+            logger.error(f"Error invalidating comments cache for {creation_id}: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of comment service counters.
+
+        Returns:
+            Dict with writes, queries, existence_reads, first_pages
+            and errors
+        """
+        with self._lock:
+            return {
+                'writes': self.writes,
+                'queries': self.queries,
+                'existence_reads': self.existence_reads,
+                'first_pages': self.first_pages,
+                'errors': self.errors,
+            }
+
+    def _first_window(self, creation_id: str) -> Optional[Dict[str, Any]]:
+        """The cached {'exists', 'items', 'complete'} window (None if the cache failed)."""
+        try:
+            window = self.cache.get_or_compute(
+                f'{KEY_PREFIX}{creation_id}', lambda: self._load(creation_id), ttl=self.ttl
+            )
+        except Exception as e:
+            logger.error(f"Error loading comments window for {creation_id}: {e}", exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return None
+
+        with self._lock:
+            self.first_pages += 1
+        return window
+
+    def _load(self, creation_id: str) -> Dict[str, Any]:
+        """Query the first `window` comments of a creation."""
+        docs, has_more = self._query(creation_id, self.window)
+        return {
+            'exists': bool(docs) or self._creation_exists(creation_id),
+            'items': [comment_item(doc.id, doc.to_dict()) for doc in docs],
+            'complete': not has_more,
+        }
+
+    def _refresh_first_page(self, creation_id: str, comment_id: str) -> None:
+        """
+        Make a new top-level comment visible on the cached first page.
+
+        Appending it in place would be a read-modify-write that the process
+        lock can't protect across instances (concurrent appends overwrite
+        each other), so the window is dropped unless it already holds the
+        comment (rebuilt after the commit) or ends before it.
+        """
+        if self.cache is None:
+            return
+        try:
+            entry = self.cache.get(f'{KEY_PREFIX}{creation_id}')
+        except Exception as e:
+            logger.error(f"Error reading comments window for {creation_id}: {e}", exc_info=True)
+            entry = None
+        if entry is None:
+            return
+        window = entry.get('value') if isinstance(entry, dict) else None
+        if isinstance(window, dict):
+            if not window.get('complete'):
+                # Full window - the newest comment lands past it
+                return
+            if any(item['commentId'] == comment_id for item in window.get('items', [])):
+                return
+        self.invalidate(creation_id)
+
+    def _recount_first_page(self, creation_id: str, root_id: str) -> None:
+        """
+        Make a reply's new replyCount visible on the cached first page.
+
+        Bumping the count in place would be the same cross-instance
+        read-modify-write as appending a comment, so the window is dropped
+        if it shows the thread's root.
+        """
+        if self.cache is None:
+            return
+        try:
+            entry = self.cache.get(f'{KEY_PREFIX}{creation_id}')
+        except Exception as e:
+            logger.error(f"Error reading comments window for {creation_id}: {e}", exc_info=True)
+            entry = None
+        if entry is None:
+            return
+        window = entry.get('value') if isinstance(entry, dict) else None
+        if isinstance(window, dict) and not any(item['commentId'] == root_id for item in window.get('items', [])):
+            # The root is past the cached page
+            return
+        self.invalidate(creation_id)
+
+    def _query(self, creation_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[list, bool]:
+        """Run the top-level comments query for one page."""
+        comments_ref = self.db.collection(self.collection_name).document(creation_id).collection('comments')
+        query = (comments_ref
+                 .where(filter=firestore.FieldFilter('replyToCommentId', '==', None))
+                 .order_by('createdAt', direction=firestore.Query.ASCENDING)
+                 .limit(limit + 1))  # +1 to check if there are more
+        query = apply_cursor(query, comments_ref, cursor, 'createdAt', firestore.Query.ASCENDING, CURSOR_SCOPE)
+
+        docs = list(query.stream())
+        with self._lock:
+            self.queries += 1
+        return docs[:limit], len(docs) > limit
+
+    def _creation_exists(self, creation_id: str) -> bool:
+        """One creation read, for empty pages only."""
+        with self._lock:
+            self.existence_reads += 1
+        return self.db.collection(self.collection_name).document(creation_id).get().exists
+
+    @staticmethod
+    def _next_cursor(comments: List[Dict[str, Any]], has_more: bool) -> Optional[str]:
+        if not (has_more and comments):
+            return None
+        last = comments[-1]
+        return encode_cursor(last['createdAt'], last['commentId'], CURSOR_SCOPE)
+
+
+# Singleton instance for easy import
+_comment_service_instance: Optional[CommentService] = None
+
+
+def get_comment_service() -> CommentService:
+    """Get or create the singleton CommentService."""
+    global _comment_service_instance
+    if _comment_service_instance is None:
+        cache_enabled = os.getenv('COMMENT_CACHE_ENABLED', '1') == '1'
+        _comment_service_instance = CommentService(
+            cache=get_cache_service() if cache_enabled else None,
+            ttl=int(os.getenv('COMMENT_CACHE_TTL', '60')),
+        )
+    return _comment_service_instance
+
+
+def invalidate_comments(creation_id: str) -> None:
+    """
+    Drop a creation's cached first comment page. Never raises.
+
+    Args:
+        creation_id: Creation whose comments were removed
+    """
+    try:
+        get_comment_service().invalidate(creation_id)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate comments cache for {creation_id}: {e}")
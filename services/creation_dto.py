@@ -0,0 +1,167 @@
+"""Creation Projections - Field Masks and Compact DTOs for List Endpoints
+
+Creation documents carry far more than a list item shows: transaction IDs,
+costs, model names, generation timings and error blobs. The feed, gallery,
+following-feed and drafts endpoints used to fetch whole documents, call
+to_dict() and hand-build (or, for drafts, return) the result.
+
+Each list endpoint now:
+
+1. Passes its field mask to Firestore (`query.select(FEED_FIELDS)`,
+   `get_all(refs, field_paths=FEED_FIELDS)`), so only those fields cross
+   the wire.
+2. Maps each snapshot to a CreationDTO (`__slots__`, defaults applied once).
+3. Serializes it with to_json(keys) - the one serializer, with the
+   prompt privacy rule (owner only) built in. Feeds send other viewers an
+   empty prompt; galleries leave the key out (omit_redacted=True).
+
+Usage:
+    query = query.select(GALLERY_FIELDS)
+    items = [CreationDTO.from_snapshot(doc).to_json(GALLERY_KEYS, viewer_id, omit_redacted=True)
+             for doc in docs]
+"""
+from typing import Any, Dict, Optional, Sequence
+
+# Firestore field masks, per endpoint
+FEED_FIELDS = (
+    'userId', 'username', 'caption', 'mediaUrl', 'mediaType', 'aspectRatio',
+    'duration', 'commentCount', 'likeCount', 'publishedAt', 'prompt', 'status',
+)
+GALLERY_FIELDS = FEED_FIELDS
+DRAFT_FIELDS = FEED_FIELDS + ('thumbnailUrl', 'progress', 'error', 'createdAt')
+
+# JSON keys returned, per endpoint
+FEED_KEYS = (
+    'creationId', 'userId', 'username', 'caption', 'mediaUrl', 'mediaType',
+    'aspectRatio', 'duration', 'commentCount', 'likeCount', 'publishedAt', 'prompt',
+)
+GALLERY_KEYS = (
+    'creationId', 'caption', 'mediaUrl', 'mediaType', 'aspectRatio',
+    'duration', 'commentCount', 'likeCount', 'publishedAt', 'prompt',
+)
+DRAFT_KEYS = (
+    'id', 'creationId', 'userId', 'username', 'status', 'prompt', 'caption',
+    'mediaUrl', 'thumbnailUrl', 'mediaType', 'aspectRatio', 'duration',
+    'progress', 'error', 'createdAt',
+)
+
+# JSON key -> DTO attribute
+_ATTRIBUTES = {
+    'id': 'creation_id',
+    'creationId': 'creation_id',
+    'userId': 'user_id',
+    'username': 'username',
+    'status': 'status',
+    'prompt': 'prompt',
+    'caption': 'caption',
+    'mediaUrl': 'media_url',
+    'thumbnailUrl': 'thumbnail_url',
+    'mediaType': 'media_type',
+    'aspectRatio': 'aspect_ratio',
+    'duration': 'duration',
+    'commentCount': 'comment_count',
+    'likeCount': 'like_count',
+    'progress': 'progress',
+    'error': 'error',
+    'createdAt': 'created_at',
+    'publishedAt': 'published_at',
+}
+
+
+class CreationDTO:
+    """
+    Compact, read-only view of a creation for list responses.
+    """
+
+    __slots__ = tuple(dict.fromkeys(_ATTRIBUTES.values()))
+
+    def __init__(self, creation_id: str, data: Dict[str, Any]):
+        """
+        Build the DTO from (possibly projected) document data.
+
+        Args:
+            creation_id: Creation document ID
+            data: Document fields (missing ones get the list defaults)
+        """
+        self.creation_id = creation_id
+        self.user_id = data.get('userId')
+        self.username = data.get('username', 'Unknown')  # Denormalized
+        self.status = data.get('status')
+        self.prompt = data.get('prompt', '')
+        self.caption = data.get('caption', '')
+        self.media_url = data.get('mediaUrl')
+        self.thumbnail_url = data.get('thumbnailUrl')
+        self.media_type = data.get('mediaType', 'video')
+        self.aspect_ratio = data.get('aspectRatio', '9:16')
+        self.duration = data.get('duration', 8)
+        self.comment_count = data.get('commentCount', 0)
+        self.like_count = data.get('likeCount', 0)  # Rolled up from the like shards
+        self.progress = data.get('progress')
+        self.error = data.get('error')
+        self.created_at = data.get('createdAt')
+        self.published_at = data.get('publishedAt')
+
+    @classmethod
+    def from_snapshot(cls, doc) -> 'CreationDTO':
+        """
+        Build the DTO from a Firestore document snapshot.
+
+        Args:
+            doc: DocumentSnapshot (from a projected query or get_all)
+
+        Returns:
+            CreationDTO
+        """
+        return cls(doc.id, doc.to_dict() or {})
+
+    def to_json(
+        self,
+        keys: Sequence[str],
+        viewer_id: Optional[str] = None,
+        include_prompt: bool = False,
+        omit_redacted: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Serialize the fields an endpoint returns.
+
+        Args:
+            keys: JSON keys to emit (FEED_KEYS, GALLERY_KEYS, DRAFT_KEYS)
+            viewer_id: Firebase UID of the requester (None if anonymous)
+            include_prompt: Keep the prompt regardless of viewer (for
+                caches that redact per viewer after lookup)
+            omit_redacted: Drop the prompt key for other viewers instead
+                of sending it empty (the gallery's format)
+
+        Returns:
+            JSON-ready dict
+        """
+        item = {key: getattr(self, _ATTRIBUTES[key]) for key in keys}
+        if 'prompt' in item and not include_prompt:
+            return redact_prompt(item, viewer_id, self.user_id, omit=omit_redacted)
+        return item
+
+
+def redact_prompt(
+    item: Dict[str, Any],
+    viewer_id: Optional[str],
+    owner_id: Optional[str] = None,
+    omit: bool = False
+) -> Dict[str, Any]:
+    """
+    Apply the prompt privacy rule: only the creation's owner sees it.
+
+    Args:
+        item: Serialized creation (not modified - may be shared/cached)
+        viewer_id: Firebase UID of the requester (None if anonymous)
+        owner_id: Owner UID (default: item['userId'])
+        omit: Leave the prompt key out instead of emptying it
+
+    Returns:
+        The item, or a copy with an empty (or no) prompt
+    """
+    owner_id = owner_id if owner_id is not None else item.get('userId')
+    if viewer_id and viewer_id == owner_id:
+        return item
+    if omit:
+        return {key: value for key, value in item.items() if key != 'prompt'}
+    return {**item, 'prompt': ''}
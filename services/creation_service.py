@@ -15,6 +15,8 @@ from typing import Dict, Tuple, Optional
 from datetime import datetime
 from firebase_admin import firestore
 
+from services.feed_cache import invalidate_explore_feed
+from services.timeline_service import fan_out_creation
 from services.token_service import TokenService, InsufficientTokensError
 from services.transaction_service import TransactionService, TransactionType
 
@@ -474,8 +476,10 @@ class CreationService:
                 update_data['commentCount'] = 0
 
             creation_ref.update(update_data)
+            invalidate_explore_feed(f"published {creation_id}")
 
             updated_doc = creation_ref.get().to_dict()
+            fan_out_creation(creation_id, user_id, updated_doc.get('publishedAt'))
             return True, None, updated_doc
 
         except Exception as e:
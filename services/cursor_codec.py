@@ -0,0 +1,180 @@
+"""Keyset Cursor Codec - Opaque, Signed Pagination Cursors
+
+Feed and comment endpoints page with `ORDER BY <timestamp>` queries. The old
+cursor was the last document ID, so every page after the first started with
+an extra `document(cursor).get()` just to rebuild the position. A cursor now
+carries the position itself:
+
+    token = base64url(json([version, <timestamp µs>, docId])) "." base64url(hmac)
+
+The HMAC (SECRET_KEY, truncated to 128 bits) covers the payload and a scope
+such as 'explore' or 'comments', so clients can't forge positions or reuse a
+cursor on another endpoint. apply_cursor() turns a token into
+`order_by('__name__').start_after({field: value, '__name__': docId})` -
+the same position a snapshot cursor gives, with no read.
+
+Transition:
+    Anything that doesn't verify is treated as a legacy document-ID cursor
+    and resolved with the old read, unless CURSOR_ACCEPT_LEGACY_IDS=0.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MAC_BYTES = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _secret(secret: Optional[str]) -> bytes:
+    """Signing key: explicit, else the Flask app's, else settings.SECRET_KEY."""
+    if secret is None:
+        try:
+            from flask import current_app
+            secret = current_app.secret_key
+        except RuntimeError:
+            secret = None  # No app context
+        if not secret:
+            from config.settings import SECRET_KEY
+            secret = SECRET_KEY
+    return secret.encode('utf-8') if isinstance(secret, str) else secret
+
+
+def _mac(payload: str, scope: str, secret: Optional[str]) -> str:
+    message = f"cursor:{scope}:{payload}".encode('utf-8')
+    return _b64encode(hmac.new(_secret(secret), message, hashlib.sha256).digest()[:_MAC_BYTES])
+
+
+def _to_micros(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(order_value: Optional[datetime], doc_id: str, scope: str, secret: Optional[str] = None) -> str:
+    """
+    Encode a keyset position as an opaque, signed token.
+
+    Args:
+        order_value: Value of the ordered timestamp field (publishedAt, createdAt)
+        doc_id: Document ID (tie-breaker for equal timestamps)
+        scope: Endpoint the cursor is valid for (e.g. 'explore')
+        secret: Signing key (default: the app's SECRET_KEY)
+
+    Returns:
+        URL-safe cursor token
+    """
+    payload = _b64encode(json.dumps(
+        [CURSOR_VERSION, _to_micros(order_value), doc_id], separators=(',', ':')
+    ).encode('utf-8'))
+    return f"{payload}.{_mac(payload, scope, secret)}"
+
+
+def decode_cursor(token: Optional[str], scope: str, secret: Optional[str] = None) -> Optional[Tuple[Optional[datetime], str]]:
+    """
+    Verify and decode a cursor token.
+
+    Args:
+        token: Cursor from the client
+        scope: Endpoint the cursor must have been issued for
+        secret: Signing key (default: the app's SECRET_KEY)
+
+    Returns:
+        (order value, doc ID), or None if the token is missing, malformed,
+        forged or from another scope (it may be a legacy document ID)
+    """
+    if not token or '.' not in token:
+        return None
+
+    payload, mac = token.rsplit('.', 1)
+    if not hmac.compare_digest(mac, _mac(payload, scope, secret)):
+        return None
+
+    try:
+        version, micros, doc_id = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if version != CURSOR_VERSION or not isinstance(doc_id, str):
+        return None
+
+    order_value = None if micros is None else _EPOCH + timedelta(microseconds=micros)
+    return order_value, doc_id
+
+
+def cursor_doc_id(token: Optional[str], scope: str, secret: Optional[str] = None) -> Optional[str]:
+    """
+    Document ID a cursor points at (decoded token, or the legacy ID itself).
+
+    Args:
+        token: Cursor from the client
+        scope: Endpoint the cursor must have been issued for
+        secret: Signing key (default: the app's SECRET_KEY)
+
+    Returns:
+        Document ID, or None if there is no cursor
+    """
+    if not token:
+        return None
+    decoded = decode_cursor(token, scope, secret)
+    if decoded is not None:
+        return decoded[1]
+    return token if _accept_legacy_ids() else None
+
+
+def apply_cursor(query, collection_ref, token: Optional[str], order_field: str, direction: str, scope: str):
+    """
+    Start a query after the position a cursor points at.
+
+    Args:
+        query: Query ordered by order_field (and nothing else)
+        collection_ref: Collection the query runs over (for legacy cursors
+            and the '__name__' reference)
+        token: Cursor from the client (opaque token or legacy document ID)
+        order_field: Field the query is ordered by
+        direction: Direction of that order (firestore.Query.DESCENDING/ASCENDING)
+        scope: Endpoint the cursor must have been issued for
+
+    Returns:
+        Query positioned after the cursor (unchanged if there is none or a
+        legacy cursor's document no longer exists)
+    """
+    if not token:
+        return query
+
+    decoded = decode_cursor(token, scope)
+    if decoded is not None:
+        order_value, doc_id = decoded
+        # The explicit __name__ order is what a snapshot cursor adds implicitly
+        return (query.order_by('__name__', direction=direction)
+                .start_after({order_field: order_value, '__name__': doc_id}))
+
+    if not _accept_legacy_ids():
+        return query
+
+    # Legacy document-ID cursor: one read to find the position
+    cursor_doc = collection_ref.document(token).get()
+    if cursor_doc.exists:
+        logger.debug(f"Legacy {scope} cursor resolved with a document read")
+        return query.start_after(cursor_doc)
+    return query
+
+
+def _accept_legacy_ids() -> bool:
+    return os.getenv('CURSOR_ACCEPT_LEGACY_IDS', '1') == '1'
@@ -0,0 +1,260 @@
+"""Explore Feed Cache - Materialized First Pages of the Public Feed
+
+Every visitor of the Explore feed used to run the same
+`status == published ORDER BY publishedAt DESC LIMIT n+1` query. This
+service keeps the first `pages` pages for each page size as one window of
+`pages * limit + 1` feed items:
+
+- In-process (LocalCache, `local_ttl` seconds), so repeat views on an
+  instance cost no I/O
+- In the shared cache backend (get_or_compute, `ttl` seconds), so one
+  rebuild serves every instance and concurrent misses run one query
+
+Invalidation:
+    Shared entries live under a generation key. invalidate() writes a new
+    generation (one cache write) and clears this instance's L1; other
+    instances pick it up within `local_ttl`. CreationService.publish_creation,
+    caption edits and account deletion call invalidate_explore_feed().
+
+Items are cached with their `prompt`; callers apply the per-viewer privacy
+rule (owner only) after the lookup.
+
+Environment Variables:
+    FEED_CACHE_ENABLED: "0" to always query Firestore (default: "1")
+    FEED_CACHE_PAGES: Pages per page size kept materialized (default: 3)
+    FEED_CACHE_TTL: Shared entry lifetime in seconds (default: 60)
+    FEED_CACHE_LOCAL_TTL: In-process entry lifetime in seconds (default: 5)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from firebase_admin import firestore
+
+from services.cache_service import LocalCache, get_cache_service
+from services.creation_dto import FEED_FIELDS, FEED_KEYS, CreationDTO
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'feed:explore:'
+GENERATION_KEY = f'{KEY_PREFIX}generation'
+GENERATION_TTL = 86400  # Outlives every page entry written under it
+
+
+def feed_item(doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Explore feed fields of a creation document (prompt included).
+
+    Args:
+        doc_id: Creation document ID
+        data: Creation document data (FEED_FIELDS projection)
+
+    Returns:
+        Dict with the fields the Explore feed returns
+    """
+    return CreationDTO(doc_id, data).to_json(FEED_KEYS, include_prompt=True)
+
+
+class ExploreFeedCache:
+    """Two-level cache of the first pages of the Explore feed."""
+
+    def __init__(
+        self,
+        db=None,
+        cache=None,
+        pages: int = 3,
+        ttl: int = 60,
+        local_ttl: float = 5.0,
+        collection_name: str = 'creations'
+    ):
+        """
+        Initialize the feed cache.
+
+        Args:
+            db: Firestore client (uses default if not provided)
+            cache: Shared cache backend (uses get_cache_service() if not provided)
+            pages: Pages per page size kept materialized
+            ttl: Shared entry lifetime in seconds
+            local_ttl: In-process entry lifetime in seconds
+            collection_name: Creations collection
+        """
+        self.db = db or firestore.client()
+        self.cache = cache or get_cache_service()
+        self.pages = max(1, int(pages))
+        self.ttl = int(ttl)
+        self.local_ttl = float(local_ttl)
+        self.collection_name = collection_name
+        self.local = LocalCache(max_entries=256, default_ttl=self.local_ttl)
+
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.docs_read = 0
+        self.window_misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def get_page(self, limit: int, cursor: Optional[str] = None) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Serve a feed page from the materialized window.
+
+        Args:
+            limit: Page size
+            cursor: creationId of the last item of the previous page
+
+        Returns:
+            (items, has_more), or None if the page isn't in the window
+            (cursor too deep or unknown) or the cache failed - query
+            Firestore instead. Items are shared: copy before modifying.
+        """
+        if limit < 1:
+            return None
+
+        try:
+            window = self._window(limit)
+        except Exception as e:
+            logger.error(f"Error loading explore feed window (limit={limit}): {e}", exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return None
+
+        items = window['items']
+        start = 0
+        if cursor:
+            start = next((i + 1 for i, item in enumerate(items) if item['creationId'] == cursor), None)
+            if start is None:
+                return self._window_miss()
+
+        end = start + limit
+        if end < len(items):
+            return items[start:end], True
+        if window['complete']:
+            # The window holds the whole feed
+            return items[start:end], False
+        return self._window_miss()
+
+    def invalidate(self, reason: str = '') -> None:
+        """
+        Drop every cached page, on this instance and in the shared backend.
+
+        Args:
+            reason: Logged with the invalidation
+        """
+        generation = str(time.time_ns())
+        try:
+            self.cache.set(GENERATION_KEY, {'generation': generation}, ttl=GENERATION_TTL)
+        except Exception as e:
+            logger.error(f"Error invalidating explore feed cache: {e}", exc_info=True)
+        self.local.clear()
+        with self._lock:
+            self.invalidations += 1
+        logger.info(f"🧹 Explore feed cache invalidated{f' ({reason})' if reason else ''}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of feed cache counters.
+
+        Returns:
+            Dict with builds (Firestore queries), docs_read, window_misses
+            (pages served by the caller's own query), invalidations, errors
+            and the in-process tier's hit/miss counters
+        """
+        with self._lock:
+            stats = {
+                'builds': self.builds,
+                'docs_read': self.docs_read,
+                'window_misses': self.window_misses,
+                'invalidations': self.invalidations,
+                'errors': self.errors,
+            }
+        local = self.local.get_stats()
+        stats.update({'local_hits': local['hits'], 'local_misses': local['misses']})
+        return stats
+
+    def _window_miss(self) -> None:
+        with self._lock:
+            self.window_misses += 1
+        return None
+
+    def _generation(self) -> str:
+        """Current generation, cached in-process like the pages."""
+        entry = self.local.get(GENERATION_KEY)
+        if entry is None:
+            entry = self.cache.get(GENERATION_KEY) or {'generation': '0'}
+            self.local.set(GENERATION_KEY, entry)
+        return entry['generation']
+
+    def _window(self, limit: int) -> Dict[str, Any]:
+        """The {'items', 'complete'} window for a page size (L1, then shared)."""
+        key = f"{KEY_PREFIX}{self._generation()}:{limit}"
+        version = self.local.next_version()
+        window = self.local.get(key)
+        if window is None:
+            window = self.cache.get_or_compute(key, lambda: self._load(limit), ttl=self.ttl)
+            self.local.set(key, window, version=version)
+        return window
+
+    def _load(self, limit: int) -> Dict[str, Any]:
+        """Query the first pages * limit + 1 published creations."""
+        size = self.pages * limit
+        query = (self.db.collection(self.collection_name)
+                 .where(filter=firestore.FieldFilter('status', '==', 'published'))
+                 .order_by('publishedAt', direction=firestore.Query.DESCENDING)
+                 .select(FEED_FIELDS)
+                 .limit(size + 1))
+        docs = list(query.stream())
+
+        with self._lock:
+            self.builds += 1
+            self.docs_read += max(1, len(docs))  # An empty result still bills one read
+        return {
+            'items': [feed_item(doc.id, doc.to_dict()) for doc in docs],
+            'complete': len(docs) <= size,
+        }
+
+
+# Global feed cache instance (singleton pattern)
+_feed_cache: Optional[ExploreFeedCache] = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_explore_feed_cache() -> Optional[ExploreFeedCache]:
+    """
+    Get the Explore feed cache (singleton).
+
+    Returns:
+        ExploreFeedCache, or None if FEED_CACHE_ENABLED=0
+    """
+    global _feed_cache
+
+    if os.getenv('FEED_CACHE_ENABLED', '1') != '1':
+        return None
+
+    if _feed_cache is None:
+        with _feed_cache_lock:
+            if _feed_cache is None:
+                _feed_cache = ExploreFeedCache(
+                    pages=int(os.getenv('FEED_CACHE_PAGES', 3)),
+                    ttl=int(os.getenv('FEED_CACHE_TTL', 60)),
+                    local_ttl=float(os.getenv('FEED_CACHE_LOCAL_TTL', 5)),
+                )
+    return _feed_cache
+
+
+def invalidate_explore_feed(reason: str = '') -> None:
+    """
+    Invalidate the Explore feed cache after a change to published creations.
+
+    Never raises: a failed invalidation leaves pages stale for at most the
+    cache TTL.
+
+    Args:
+        reason: Logged with the invalidation
+    """
+    try:
+        feed_cache = get_explore_feed_cache()
+        if feed_cache is not None:
+            feed_cache.invalidate(reason)
+    except Exception as e:
+        logger.error(f"Error invalidating explore feed cache: {e}", exc_info=True)
@@ -115,6 +115,7 @@ class FollowService:
             follow_transaction(transaction)
             
             logger.info(f"User {follower_id} now follows {target_user_id}")
+            self._sync_timeline('backfill_author', follower_id, target_user_id)
             return {
                 'success': True,
                 'following': True,
@@ -164,6 +165,7 @@ class FollowService:
             unfollow_transaction(transaction)
             
             logger.info(f"User {follower_id} unfollowed {target_user_id}")
+            self._sync_timeline('remove_author', follower_id, target_user_id)
             return {
                 'success': True,
                 'following': False,
@@ -193,6 +195,14 @@ class FollowService:
         else:
             return self.follow_user(follower_id, target_user_id)
     
+    def _sync_timeline(self, operation: str, follower_id: str, target_user_id: str) -> None:
+        """Schedule the follower's home timeline update (never fails the follow)."""
+        try:
+            from services.timeline_service import get_timeline_service
+            getattr(get_timeline_service(), operation)(follower_id, target_user_id)
+        except Exception as e:
+            logger.warning(f"Timeline {operation} for {follower_id} -> {target_user_id} failed: {e}")
+    
     # =========================================================================
     # QUERY OPERATIONS
     # =========================================================================
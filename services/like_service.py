@@ -0,0 +1,328 @@
+"""Like Service - Idempotent Like Edges and Sharded Like Counters
+
+Data model:
+    likes/{userId}_{creationId}                  - like edge (deterministic ID,
+        userId: string                             as firestore.rules expects)
+        creationId: string
+        createdAt: timestamp
+    creations/{creationId}/like_shards/{0..N-1}  - counter shards (server-only)
+        count: int
+    creations/{creationId}.likeCount             - rolled-up total for lists
+
+Like / unlike:
+    One batch, no reads of hot documents. Liking creates the edge with a
+    create() precondition and Increments one random shard; unliking deletes
+    the edge with an exists precondition and decrements one. A repeated
+    like (or unlike) fails the precondition and rolls back the whole batch,
+    so double-taps and retries never count twice. The current total is the
+    sum of the shards (one get_all).
+
+    The creation document's likeCount - what feed, gallery and following
+    lists return - is rewritten from the shard total at most once per
+    `rollup_interval` seconds per creation per instance, so a viral post
+    costs its creation document a write every few seconds, not one per like.
+    Likes that land inside the interval schedule one trailing roll-up, so
+    the list count settles once a burst ends.
+
+isLiked:
+    The edge IDs a viewer would have for a page are known up front, so
+    attach_is_liked() resolves a whole page with one get_all of
+    likes/{uid}_{creationId} - no query, no per-item lookups.
+
+Environment Variables:
+    LIKE_COUNTER_SHARDS: Shards per creation (default: 10). Only ever
+        raise it - shards past the count are not summed.
+    LIKE_ROLLUP_INTERVAL: Seconds between likeCount roll-ups (default: 5)
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+
+logger = logging.getLogger(__name__)
+
+LIKES_COLLECTION = 'likes'
+SHARDS_SUBCOLLECTION = 'like_shards'
+
+
+class LikeError(Exception):
+    """Base exception for like operations."""
+
+
+class CreationNotLikeableError(LikeError):
+    """The creation doesn't exist or isn't published."""
+
+
+class LikeService:
+    """Like/unlike with sharded counters and batched isLiked lookups."""
+
+    def __init__(self, db=None, shard_count: int = 10, rollup_interval: float = 5.0):
+        """
+        Initialize the like service.
+
+        Args:
+            db: Firestore client (uses default if not provided)
+            shard_count: Counter shards per creation
+            rollup_interval: Minimum seconds between likeCount roll-ups of a
+                creation on this instance
+        """
+        self.db = db or firestore.client()
+        self.shard_count = max(1, int(shard_count))
+        self.rollup_interval = float(rollup_interval)
+        self.creations_collection = 'creations'
+
+        self._lock = threading.Lock()
+        self._rolled_up: Dict[str, float] = {}  # creation_id -> monotonic time of last roll-up
+        self._trailing: set = set()  # creation_ids with a trailing roll-up scheduled
+        self.likes = 0
+        self.unlikes = 0
+        self.duplicates = 0
+        self.rollups = 0
+        self.lookups = 0
+
+    def like(self, user_id: str, creation_id: str) -> Dict[str, Any]:
+        """
+        Like a published creation. Idempotent.
+
+        Args:
+            user_id: Firebase UID of the viewer
+            creation_id: Creation document ID
+
+        Returns:
+            {'liked': True, 'likeCount': int}
+
+        Raises:
+            CreationNotLikeableError: Creation missing or not published
+        """
+        self._require_published(creation_id)
+
+        batch = self.db.batch()
+        batch.create(self._edge_ref(user_id, creation_id), {
+            'userId': user_id,
+            'creationId': creation_id,
+            'createdAt': firestore.SERVER_TIMESTAMP,
+        })
+        batch.set(self._shard_ref(creation_id), {'count': firestore.Increment(1)}, merge=True)
+        try:
+            batch.commit()
+            with self._lock:
+                self.likes += 1
+        except AlreadyExists:
+            with self._lock:
+                self.duplicates += 1  # Already liked - nothing was written
+
+        return {'liked': True, 'likeCount': self._count_and_roll_up(creation_id)}
+
+    def unlike(self, user_id: str, creation_id: str) -> Dict[str, Any]:
+        """
+        Remove a like. Idempotent.
+
+        Args:
+            user_id: Firebase UID of the viewer
+            creation_id: Creation document ID
+
+        Returns:
+            {'liked': False, 'likeCount': int}
+        """
+        batch = self.db.batch()
+        batch.delete(self._edge_ref(user_id, creation_id), option=self.db.write_option(exists=True))
+        batch.set(self._shard_ref(creation_id), {'count': firestore.Increment(-1)}, merge=True)
+        try:
+            batch.commit()
+            with self._lock:
+                self.unlikes += 1
+        except NotFound:
+            with self._lock:
+                self.duplicates += 1  # Not liked - nothing was written
+
+        return {'liked': False, 'likeCount': self._count_and_roll_up(creation_id)}
+
+    def get_like_count(self, creation_id: str) -> int:
+        """
+        Current like total: the sum of the creation's shards (one get_all).
+
+        Args:
+            creation_id: Creation document ID
+
+        Returns:
+            Number of likes
+        """
+        shards = self.db.collection(self.creations_collection).document(creation_id).collection(SHARDS_SUBCOLLECTION)
+        refs = [shards.document(str(i)) for i in range(self.shard_count)]
+        total = sum((doc.to_dict() or {}).get('count', 0)
+                    for doc in self.db.get_all(refs, field_paths=['count']) if doc.exists)
+        return max(0, total)
+
+    def liked_ids(self, user_id: str, creation_ids: Iterable[str]) -> set:
+        """
+        Which of a page of creations the user has liked (one get_all).
+
+        Args:
+            user_id: Firebase UID of the viewer
+            creation_ids: Creation IDs on the page
+
+        Returns:
+            Set of liked creation IDs
+        """
+        ids = list(dict.fromkeys(cid for cid in creation_ids if cid))
+        if not ids:
+            return set()
+        refs = [self._edge_ref(user_id, cid) for cid in ids]
+        with self._lock:
+            self.lookups += 1
+        return {(doc.to_dict() or {}).get('creationId')
+                for doc in self.db.get_all(refs, field_paths=['creationId']) if doc.exists}
+
+    def attach_is_liked(self, items: List[Dict[str, Any]], user_id: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Add `isLiked` to a page of serialized creations.
+
+        Never raises: on a lookup error the items are returned unchanged.
+
+        Args:
+            items: Items with a 'creationId' (not modified - may be cached)
+            user_id: Firebase UID of the viewer (None leaves items unchanged)
+
+        Returns:
+            Copies of the items with isLiked
+        """
+        if not user_id or not items:
+            return items
+        try:
+            liked = self.liked_ids(user_id, (item.get('creationId') for item in items))
+        except Exception as e:
+            logger.error(f"isLiked lookup failed for {len(items)} items: {e}", exc_info=True)
+            return items
+        return [{**item, 'isLiked': item.get('creationId') in liked} for item in items]
+
+    def remove_all_likes(self, user_id: str) -> int:
+        """
+        Withdraw every like a user has given (account deletion).
+
+        Args:
+            user_id: Firebase UID
+
+        Returns:
+            Number of likes removed
+        """
+        edges = (self.db.collection(LIKES_COLLECTION)
+                 .where(filter=firestore.FieldFilter('userId', '==', user_id))
+                 .select(['creationId']))
+        removed = 0
+        for doc in edges.stream():
+            creation_id = (doc.to_dict() or {}).get('creationId')
+            try:
+                self.unlike(user_id, creation_id)
+                removed += 1
+            except Exception as e:
+                logger.warning(f"Failed to remove like {doc.id}: {e}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of like counters.
+
+        Returns:
+            Dict with likes, unlikes, duplicates (idempotent no-ops),
+            rollups and lookups (isLiked get_alls)
+        """
+        with self._lock:
+            return {
+                'likes': self.likes,
+                'unlikes': self.unlikes,
+                'duplicates': self.duplicates,
+                'rollups': self.rollups,
+                'lookups': self.lookups,
+            }
+
+    def _require_published(self, creation_id: str) -> None:
+        doc = self.db.collection(self.creations_collection).document(creation_id).get(field_paths=['status'])
+        if not doc.exists or (doc.to_dict() or {}).get('status') != 'published':
+            raise CreationNotLikeableError(creation_id)
+
+    def _count_and_roll_up(self, creation_id: str) -> int:
+        """Sum the shards and copy the total to likeCount, throttled per creation."""
+        count = self.get_like_count(creation_id)
+
+        now = time.monotonic()
+        with self._lock:
+            last = self._rolled_up.get(creation_id)
+            if last is not None and now - last < self.rollup_interval:
+                if creation_id not in self._trailing:
+                    self._trailing.add(creation_id)
+                    timer = threading.Timer(self.rollup_interval - (now - last),
+                                            self._trailing_roll_up, args=(creation_id,))
+                    timer.daemon = True
+                    timer.start()
+                return count
+            self._rolled_up[creation_id] = now
+            if len(self._rolled_up) > 10000:
+                self._rolled_up = {cid: t for cid, t in self._rolled_up.items()
+                                   if now - t < self.rollup_interval}
+
+        self._write_like_count(creation_id, count)
+        return count
+
+    def _trailing_roll_up(self, creation_id: str) -> None:
+        """Roll up the likes a throttled burst left out of likeCount."""
+        with self._lock:
+            self._trailing.discard(creation_id)
+            self._rolled_up[creation_id] = time.monotonic()
+        try:
+            self._write_like_count(creation_id, self.get_like_count(creation_id))
+        except Exception as e:
+            logger.warning(f"Failed trailing likeCount roll-up for {creation_id}: {e}")
+
+    def _write_like_count(self, creation_id: str, count: int) -> None:
+        try:
+            self.db.collection(self.creations_collection).document(creation_id).update({'likeCount': count})
+            with self._lock:
+                self.rollups += 1
+        except Exception as e:
+            logger.warning(f"Failed to roll up likeCount for {creation_id}: {e}")
+
+    def _edge_ref(self, user_id: str, creation_id: str):
+        return self.db.collection(LIKES_COLLECTION).document(f"{user_id}_{creation_id}")
+
+    def _shard_ref(self, creation_id: str):
+        return (self.db.collection(self.creations_collection).document(creation_id)
+                .collection(SHARDS_SUBCOLLECTION).document(str(random.randrange(self.shard_count))))
+
+
+# Singleton instance for easy import
+_like_service_instance: Optional[LikeService] = None
+
+
+def get_like_service() -> LikeService:
+    """Get or create the singleton LikeService."""
+    global _like_service_instance
+    if _like_service_instance is None:
+        _like_service_instance = LikeService(
+            shard_count=int(os.getenv('LIKE_COUNTER_SHARDS', '10')),
+            rollup_interval=float(os.getenv('LIKE_ROLLUP_INTERVAL', '5')),
+        )
+    return _like_service_instance
+
+
+def attach_is_liked(items: List[Dict[str, Any]], user_id: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Add `isLiked` to a page of serialized creations. Never raises.
+
+    Args:
+        items: Items with a 'creationId'
+        user_id: Firebase UID of the viewer (None for anonymous viewers)
+
+    Returns:
+        Copies of the items with isLiked (the items themselves if anonymous
+        or on error)
+    """
+    try:
+        return get_like_service().attach_is_liked(items, user_id)
+    except Exception as e:
+        logger.error(f"Error attaching isLiked: {e}", exc_info=True)
+        return items
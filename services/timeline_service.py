@@ -0,0 +1,434 @@
+"""Timeline Service - Fan-out-on-Write Home Timelines
+
+The following feed used to query `creations` with `userId in following[:30]`
+on every request, so anyone following more than 30 creators never saw most
+of their feed. Each user now has a materialized home timeline:
+
+    timelines/{userId}/entries/{creationId}
+        creationId: str
+        authorId: str
+        publishedAt: timestamp   - copied from the creation
+
+Write path:
+    publish_creation() calls fan_out(), which pushes one lightweight entry to
+    every follower's timeline in batched writes on a background executor -
+    publishing never waits for it. Authors with more than
+    TIMELINE_CELEBRITY_THRESHOLD followers are not fanned out; they are added
+    to `timeline_meta/celebrities` and readers pull their posts instead
+    (fan-out-on-read), so one publish never costs millions of writes.
+
+Read path:
+    get_page() is one indexed range read on the user's timeline (ordered by
+    publishedAt, keyset cursor from services.cursor_codec), merged with a
+    read of any followed celebrities' recent posts (services.chunked_query,
+    30 authors per parallel `in` query), then hydrated with a
+    single get_all(). Entries whose creation is no longer published, or
+    whose author is no longer followed, are dropped at hydration.
+
+Follow/unfollow backfill and trim the follower's timeline in the
+background; scripts/backfill_timelines.py builds timelines for existing
+follow relationships.
+"""
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from firebase_admin import firestore
+
+from services.cache_service.local_cache import LocalCache
+from services.chunked_query import ChunkedInQueryExecutor, get_chunked_query_executor
+from services.creation_dto import FEED_FIELDS
+from services.cursor_codec import cursor_doc_id, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+TIMELINES_COLLECTION = 'timelines'
+ENTRIES_SUBCOLLECTION = 'entries'
+CELEBRITIES_DOC = ('timeline_meta', 'celebrities')
+CURSOR_SCOPE = 'following'
+
+# Firestore limit
+MAX_BATCH_SIZE = 500
+
+# Published creations copied into a timeline when its owner follows someone
+BACKFILL_LIMIT = 20
+
+
+class TimelineService:
+    """
+    Materialized per-user home timelines for the following feed.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        celebrity_threshold: int = 1000,
+        backfill_limit: int = BACKFILL_LIMIT,
+        celebrity_cache_ttl: float = 60.0,
+        executor: Optional[ThreadPoolExecutor] = None,
+        in_query: Optional[ChunkedInQueryExecutor] = None
+    ):
+        """
+        Initialize the timeline service.
+
+        Args:
+            db: Firestore client (uses default if not provided)
+            celebrity_threshold: Followers above which an author is read
+                on demand instead of fanned out
+            backfill_limit: Recent creations copied on follow
+            celebrity_cache_ttl: Seconds the celebrity set is cached per instance
+            executor: Executor for fan-out writes (default: 2 worker threads)
+            in_query: Executor for celebrity reads (default: the shared one)
+        """
+        self.db = db or firestore.client()
+        self.celebrity_threshold = celebrity_threshold
+        self.backfill_limit = backfill_limit
+        self.celebrity_cache_ttl = celebrity_cache_ttl
+        self._executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix='timeline-fanout')
+        self.in_query = in_query or get_chunked_query_executor()
+        self._local = LocalCache(max_entries=1, default_ttl=celebrity_cache_ttl)
+        self._lock = threading.Lock()
+
+        self.fanouts = 0
+        self.entries_written = 0
+        self.celebrity_skips = 0
+        self.backfills = 0
+        self.entries_removed = 0
+        self.pages = 0
+        self.errors = 0
+
+        if executor is None:
+            atexit.register(self._executor.shutdown, wait=True)
+
+    # =========================================================================
+    # WRITE PATH
+    # =========================================================================
+
+    def fan_out(self, creation_id: str, author_id: str, published_at: Optional[datetime]) -> Optional[Future]:
+        """
+        Push a newly published creation to its author's followers in the background.
+
+        Args:
+            creation_id: Published creation ID
+            author_id: Firebase UID of the author
+            published_at: The creation's publishedAt (as stored)
+
+        Returns:
+            Future resolving to the number of entries written, or None if the
+            job couldn't be scheduled
+        """
+        return self._submit(self._fan_out, creation_id, author_id, published_at)
+
+    def backfill_author(self, follower_id: str, author_id: str) -> Optional[Future]:
+        """
+        Copy an author's recent creations into a new follower's timeline.
+
+        Args:
+            follower_id: Firebase UID of the user who followed
+            author_id: Firebase UID of the followed author
+
+        Returns:
+            Future resolving to the number of entries written, or None
+        """
+        return self._submit(self._backfill_author, follower_id, author_id)
+
+    def remove_author(self, follower_id: str, author_id: str) -> Optional[Future]:
+        """
+        Drop an author's entries from a former follower's timeline.
+
+        Args:
+            follower_id: Firebase UID of the user who unfollowed
+            author_id: Firebase UID of the unfollowed author
+
+        Returns:
+            Future resolving to the number of entries deleted, or None
+        """
+        return self._submit(self._remove_author, follower_id, author_id)
+
+    def _fan_out(self, creation_id: str, author_id: str, published_at: Optional[datetime]) -> int:
+        if published_at is None:
+            logger.warning(f"Not fanning out {creation_id}: no publishedAt")
+            return 0
+
+        if author_id in self.get_celebrities():
+            self._count('celebrity_skips')
+            return 0
+
+        author_doc = self.db.collection('users').document(author_id).get()
+        author = (author_doc.to_dict() or {}) if author_doc.exists else {}
+        followers = author.get('followers', [])
+        followers_count = max(author.get('followersCount', 0), len(followers))
+
+        if followers_count > self.celebrity_threshold:
+            self._mark_celebrity(author_id, followers_count)
+            self._count('celebrity_skips')
+            return 0
+
+        entry = self._entry(creation_id, author_id, published_at)
+        written = self._write_entries((follower_id, entry) for follower_id in followers)
+        self._count('fanouts')
+        logger.info(f"📬 Fanned out {creation_id} to {written} timelines")
+        return written
+
+    def _backfill_author(self, follower_id: str, author_id: str) -> int:
+        if author_id in self.get_celebrities():
+            return 0  # Read on demand
+
+        docs = (self.db.collection('creations')
+                .where(filter=firestore.FieldFilter('userId', '==', author_id))
+                .where(filter=firestore.FieldFilter('status', '==', 'published'))
+                .order_by('publishedAt', direction=firestore.Query.DESCENDING)
+                .limit(self.backfill_limit)
+                .stream())
+        written = self._write_entries(
+            (follower_id, self._entry(doc.id, author_id, doc.to_dict().get('publishedAt')))
+            for doc in docs
+        )
+        self._count('backfills')
+        return written
+
+    def _remove_author(self, follower_id: str, author_id: str) -> int:
+        entries = (self._entries(follower_id)
+                   .where(filter=firestore.FieldFilter('authorId', '==', author_id))
+                   .stream())
+        refs = [doc.reference for doc in entries]
+        for start in range(0, len(refs), MAX_BATCH_SIZE):
+            batch = self.db.batch()
+            for ref in refs[start:start + MAX_BATCH_SIZE]:
+                batch.delete(ref)
+            batch.commit()
+        self._count('entries_removed', len(refs))
+        return len(refs)
+
+    def _write_entries(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Set timeline entries in batches of MAX_BATCH_SIZE."""
+        written = 0
+        batch, pending = self.db.batch(), 0
+        for user_id, entry in entries:
+            batch.set(self._entries(user_id).document(entry['creationId']), entry)
+            pending += 1
+            if pending == MAX_BATCH_SIZE:
+                batch.commit()
+                written += pending
+                batch, pending = self.db.batch(), 0
+        if pending:
+            batch.commit()
+            written += pending
+        self._count('entries_written', written)
+        return written
+
+    def _mark_celebrity(self, author_id: str, followers_count: int) -> None:
+        self.db.collection(CELEBRITIES_DOC[0]).document(CELEBRITIES_DOC[1]).set(
+            {'authorIds': firestore.ArrayUnion([author_id])}, merge=True
+        )
+        self._local.clear()
+        logger.info(f"⭐ Author {author_id} ({followers_count} followers) moved to fan-out-on-read")
+
+    # =========================================================================
+    # READ PATH
+    # =========================================================================
+
+    def get_page(
+        self,
+        user_id: str,
+        following: List[str],
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, Dict[str, Any]]], bool, Optional[Tuple[Any, str]]]:
+        """
+        Read one page of a user's home timeline.
+
+        Args:
+            user_id: Firebase UID of the reader
+            following: UIDs the reader follows
+            limit: Page size
+            cursor: nextCursor from the previous page (a creationId is still accepted)
+
+        Returns:
+            (creations as (creationId, data) newest first, has_more,
+            (publishedAt, creationId) to encode as the next cursor or None)
+        """
+        position = self._position(cursor)
+        followed = set(following)
+
+        # Candidates are (publishedAt, creationId, data or None until hydrated)
+        candidates: Dict[str, Tuple[Any, str, Optional[Dict[str, Any]]]] = {}
+        query = self._entries(user_id).order_by('publishedAt', direction=firestore.Query.DESCENDING)
+        for doc in self._after(query, position).limit(limit + 1).stream():
+            entry = doc.to_dict()
+            candidates[doc.id] = (entry.get('publishedAt'), doc.id, None)
+
+        celebrities = sorted(followed & self.get_celebrities())
+        creations_ref = self.db.collection('creations')
+        celebrity_docs, more_celebrity_posts, _ = self.in_query.query(
+            lambda chunk: (creations_ref
+                           .where(filter=firestore.FieldFilter('userId', 'in', chunk))
+                           .where(filter=firestore.FieldFilter('status', '==', 'published'))
+                           .select(FEED_FIELDS)),
+            celebrities, ['publishedAt'], firestore.Query.DESCENDING, limit,
+            start_after=self._keyset(position)
+        )
+        for doc in celebrity_docs:
+            data = doc.to_dict()
+            candidates[doc.id] = (data.get('publishedAt'), doc.id, data)
+
+        ordered = sorted(candidates.values(), key=lambda c: (c[0], c[1]), reverse=True)
+        has_more = len(ordered) > limit or more_celebrity_posts
+        ordered = ordered[:limit]
+
+        hydrated = self._hydrate([c[1] for c in ordered if c[2] is None])
+        creations = []
+        for _, creation_id, data in ordered:
+            data = data if data is not None else hydrated.get(creation_id)
+            if data and data.get('status') == 'published' and data.get('userId') in followed:
+                creations.append((creation_id, data))
+
+        self._count('pages')
+        next_position = (ordered[-1][0], ordered[-1][1]) if has_more else None
+        return creations, has_more, next_position
+
+    def get_celebrities(self) -> Set[str]:
+        """
+        Authors served by fan-out-on-read (cached for celebrity_cache_ttl).
+
+        Returns:
+            Set of author UIDs
+        """
+        cached = self._local.get('celebrities')
+        if cached is not None:
+            return set(cached['authorIds'])
+
+        version = self._local.next_version()
+        doc = self.db.collection(CELEBRITIES_DOC[0]).document(CELEBRITIES_DOC[1]).get()
+        author_ids = (doc.to_dict() or {}).get('authorIds', []) if doc.exists else []
+        self._local.set('celebrities', {'authorIds': list(author_ids)}, version=version)
+        return set(author_ids)
+
+    def _position(self, cursor: Optional[str]) -> Optional[Tuple[Any, str]]:
+        """(publishedAt, creationId) a cursor points at; legacy IDs cost one read."""
+        if not cursor:
+            return None
+        decoded = decode_cursor(cursor, CURSOR_SCOPE)
+        if decoded is not None:
+            return decoded
+
+        creation_id = cursor_doc_id(cursor, CURSOR_SCOPE)
+        if creation_id is None:
+            return None
+        doc = self.db.collection('creations').document(creation_id).get()
+        if not doc.exists:
+            return None
+        return doc.to_dict().get('publishedAt'), creation_id
+
+    @staticmethod
+    def _keyset(position: Optional[Tuple[Any, str]]) -> Optional[Dict[str, Any]]:
+        if position is None:
+            return None
+        published_at, creation_id = position
+        return {'publishedAt': published_at, '__name__': creation_id}
+
+    def _after(self, query, position: Optional[Tuple[Any, str]]):
+        if position is None:
+            return query
+        return (query.order_by('__name__', direction=firestore.Query.DESCENDING)
+                .start_after(self._keyset(position)))
+
+    def _hydrate(self, creation_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not creation_ids:
+            return {}
+        refs = [self.db.collection('creations').document(cid) for cid in creation_ids]
+        return {doc.id: doc.to_dict() for doc in self.db.get_all(refs, field_paths=FEED_FIELDS) if doc.exists}
+
+    # =========================================================================
+    # HELPERS
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of timeline counters.
+
+        Returns:
+            Dict with fanouts, entries_written, celebrity_skips, backfills,
+            entries_removed, pages, errors and celebrity_threshold
+        """
+        with self._lock:
+            return {
+                'fanouts': self.fanouts,
+                'entries_written': self.entries_written,
+                'celebrity_skips': self.celebrity_skips,
+                'backfills': self.backfills,
+                'entries_removed': self.entries_removed,
+                'pages': self.pages,
+                'errors': self.errors,
+                'celebrity_threshold': self.celebrity_threshold,
+            }
+
+    def _entries(self, user_id: str):
+        return (self.db.collection(TIMELINES_COLLECTION).document(user_id)
+                .collection(ENTRIES_SUBCOLLECTION))
+
+    @staticmethod
+    def _entry(creation_id: str, author_id: str, published_at: Any) -> Dict[str, Any]:
+        return {'creationId': creation_id, 'authorId': author_id, 'publishedAt': published_at}
+
+    def _submit(self, fn, *args) -> Optional[Future]:
+        def run():
+            try:
+                return fn(*args)
+            except Exception as e:
+                logger.error(f"Timeline job {fn.__name__}{args} failed: {e}", exc_info=True)
+                self._count('errors')
+                return 0
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError as e:
+            # Executor shut down (interpreter exiting)
+            logger.warning(f"Timeline job {fn.__name__} not scheduled: {e}")
+            return None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+
+# Singleton instance for easy import
+_timeline_service_instance: Optional[TimelineService] = None
+
+
+def get_timeline_service() -> TimelineService:
+    """
+    Get or create the singleton TimelineService.
+
+    Configured from TIMELINE_CELEBRITY_THRESHOLD (default 1000) and
+    TIMELINE_BACKFILL_LIMIT (default 20).
+    """
+    global _timeline_service_instance
+    if _timeline_service_instance is None:
+        _timeline_service_instance = TimelineService(
+            celebrity_threshold=int(os.getenv('TIMELINE_CELEBRITY_THRESHOLD', '1000')),
+            backfill_limit=int(os.getenv('TIMELINE_BACKFILL_LIMIT', str(BACKFILL_LIMIT))),
+        )
+    return _timeline_service_instance
+
+
+def fan_out_creation(creation_id: str, author_id: str, published_at: Optional[datetime]) -> None:
+    """
+    Schedule fan-out of a newly published creation to its author's followers.
+
+    Never raises: a creation that isn't fanned out still appears in the
+    author's profile and the Explore feed.
+
+    Args:
+        creation_id: Published creation ID
+        author_id: Firebase UID of the author
+        published_at: The creation's publishedAt (as stored)
+    """
+    try:
+        get_timeline_service().fan_out(creation_id, author_id, published_at)
+    except Exception as e:
+        logger.error(f"Error scheduling timeline fan-out for {creation_id}: {e}", exc_info=True)
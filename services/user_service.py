@@ -17,6 +17,8 @@ from typing import Optional, Dict, Any
 from google.cloud import firestore
 from firebase_admin import firestore as admin_firestore
 
+from services.author_hydration import invalidate_author
+
 logger = logging.getLogger(__name__)
 
 
@@ -236,6 +238,7 @@ class UserService:
             claim_username_transaction(transaction)
 
             logger.info(f"User {user_id} claimed username '{validated_username}'")
+            invalidate_author(user_id)
 
             # Return updated user data
             return user_ref.get().to_dict()
@@ -351,6 +354,7 @@ class UserService:
             user_ref.set(update_data, merge=True)
 
             logger.info(f"Updated profile for user {user_id}")
+            invalidate_author(user_id)
 
             return user_ref.get().to_dict()
 
@@ -0,0 +1,283 @@
+"""
+Shared test fixtures.
+
+FakeFirestore is a small in-memory stand-in for the Firestore client, for
+service tests that need real query, batch and precondition behaviour
+rather than MagicMock call assertions. Documents are stored by path
+('creations/c1/comments/m0') in `db.docs`, and every read, query and
+commit is recorded so tests can assert on round-trip counts.
+"""
+
+import functools
+import itertools
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore import ArrayUnion
+
+
+_EXISTS = 'exists'
+
+
+class FakeSnapshot:
+    """DocumentSnapshot: id, exists, reference and a copy of the data."""
+
+    def __init__(self, db, path, data):
+        self.id = path.rsplit('/', 1)[-1]
+        self.exists = data is not None
+        self.reference = FakeRef(db, path)
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeQuery:
+    """Filters (==, in, <, <=, >, >=), order_by in either direction, start_after, limit, select."""
+
+    def __init__(self, db, path, filters=(), orders=(), after=None, limit=None):
+        self.db = db
+        self.path = path
+        self.filters = tuple(filters)
+        self.orders = tuple(orders)
+        self.after = after
+        self._limit = limit
+
+    def _with(self, **changes):
+        state = dict(filters=self.filters, orders=self.orders, after=self.after, limit=self._limit)
+        state.update(changes)
+        return FakeQuery(self.db, self.path, **state)
+
+    def where(self, filter):
+        return self._with(filters=self.filters + (filter,))
+
+    def order_by(self, field, direction=firestore.Query.ASCENDING):
+        return self._with(orders=self.orders + ((field, direction),))
+
+    def start_after(self, position):
+        if isinstance(position, FakeSnapshot):
+            position = {**position.to_dict(), '__name__': position.id}
+        return self._with(after=position)
+
+    def limit(self, n):
+        return self._with(limit=n)
+
+    def select(self, field_paths):
+        self.db.selects.append(tuple(field_paths))
+        return self
+
+    def stream(self):
+        self.db.queries.append(self)
+        docs = [doc for doc in self.db.children(self.path)
+                if all(_matches(f, doc.to_dict()) for f in self.filters)
+                and all(field == '__name__' or field in doc.to_dict() for field, _ in self.orders)]
+        docs.sort(key=functools.cmp_to_key(lambda a, b: self._compare(_position(a), _position(b))))
+        if self.after is not None:
+            docs = [doc for doc in docs if self._compare(_position(doc), self.after) > 0]
+        return iter(docs if self._limit is None else docs[:self._limit])
+
+    def _compare(self, left, right):
+        for field, direction in self.orders:
+            a, b = left.get(field), right.get(field)
+            if a != b:
+                result = -1 if a < b else 1
+                return -result if direction == firestore.Query.DESCENDING else result
+        return 0
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id=None):
+        return FakeRef(self.db, f'{self.path}/{doc_id or self.db.next_id()}')
+
+
+class FakeRef:
+    """DocumentReference; writes apply immediately."""
+
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name):
+        return FakeCollection(self.db, f'{self.path}/{name}')
+
+    def get(self, field_paths=None, transaction=None):
+        self.db.reads.append(self.path)
+        return FakeSnapshot(self.db, self.path, self.db.docs.get(self.path))
+
+    def create(self, data):
+        self.db.apply([('create', self, data)])
+
+    def set(self, data, merge=False):
+        self.db.apply([('set', self, (data, merge))])
+
+    def update(self, data):
+        self.db.apply([('update', self, data)])
+
+    def delete(self, option=None):
+        self.db.apply([('delete', self, option)])
+
+
+class FakeBatch:
+    """WriteBatch: preconditions are checked for every write before any applies."""
+
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def create(self, ref, data):
+        self.ops.append(('create', ref, data))
+
+    def set(self, ref, data, merge=False):
+        self.ops.append(('set', ref, (data, merge)))
+
+    def update(self, ref, data):
+        self.ops.append(('update', ref, data))
+
+    def delete(self, ref, option=None):
+        self.ops.append(('delete', ref, option))
+
+    def commit(self):
+        self.db.apply(self.ops)
+        self.db.commits.append(len(self.ops))
+        if self.db.commit_time is None:
+            return []
+        return [SimpleNamespace(update_time=self.db.commit_time) for _ in self.ops]
+
+
+class FakeTransaction(FakeBatch):
+    """
+    Transaction whose writes apply immediately.
+
+    Tests replace firestore.transactional with a plain call, so nothing
+    commits it.
+    """
+
+    def create(self, ref, data):
+        self.db.apply([('create', ref, data)])
+
+    def set(self, ref, data, merge=False):
+        self.db.apply([('set', ref, (data, merge))])
+
+    def update(self, ref, data):
+        self.db.apply([('update', ref, data)])
+
+    def delete(self, ref, option=None):
+        self.db.apply([('delete', ref, option)])
+
+    def get_all(self, refs, field_paths=None):
+        return self.db.get_all(refs, field_paths=field_paths)
+
+
+class FakeFirestore:
+    """In-memory Firestore client (see module docstring)."""
+
+    def __init__(self, docs=None, ids=None):
+        """
+        Args:
+            docs: Initial documents by path
+            ids: Auto-generated document IDs to hand out (default: auto0, auto1, ...)
+        """
+        self.docs = dict(docs or {})
+        self.reads = []           # Paths read one at a time
+        self.get_all_calls = []   # Paths of each get_all
+        self.queries = []         # Every streamed query
+        self.selects = []         # Field masks of select() and get_all()
+        self.commits = []         # Writes per batch commit
+        self.updates = []         # (path, data) of every update
+        self.commit_time = datetime.now(timezone.utc)  # update_time of commit results (None: no results)
+        self.server_time = lambda: datetime.now(timezone.utc)  # What SERVER_TIMESTAMP resolves to
+        self.ids = iter(ids) if ids is not None else (f'auto{i}' for i in itertools.count())
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def write_option(self, exists):
+        return _EXISTS if exists else None
+
+    def get_all(self, refs, field_paths=None):
+        refs = list(refs)
+        self.get_all_calls.append([ref.path for ref in refs])
+        self.selects.append(tuple(field_paths or ()))
+        return [FakeSnapshot(self, ref.path, self.docs.get(ref.path)) for ref in refs]
+
+    def next_id(self):
+        return next(self.ids)
+
+    def children(self, path):
+        """Snapshots of the documents directly under a collection path."""
+        return [FakeSnapshot(self, doc_path, data) for doc_path, data in self.docs.items()
+                if doc_path.rsplit('/', 1)[0] == path]
+
+    def apply(self, ops):
+        """Check every precondition, then apply (op, ref, arg) writes in order."""
+        for op, ref, arg in ops:
+            if op == 'create' and ref.path in self.docs:
+                raise AlreadyExists(ref.path)
+            if op == 'update' and ref.path not in self.docs:
+                raise NotFound(ref.path)
+            if op == 'delete' and arg == _EXISTS and ref.path not in self.docs:
+                raise NotFound(ref.path)
+
+        for op, ref, arg in ops:
+            if op == 'delete':
+                self.docs.pop(ref.path, None)
+                continue
+            if op == 'set':
+                data, merge = arg
+                current = dict(self.docs.get(ref.path, {})) if merge else {}
+            else:
+                data, current = arg, dict(self.docs.get(ref.path, {}))
+                if op == 'update':
+                    self.updates.append((ref.path, data))
+            for field, value in data.items():
+                current[field] = self._resolve(current.get(field), value)
+            self.docs[ref.path] = current
+
+    def _resolve(self, current, value):
+        if isinstance(value, firestore.Increment):
+            return (current or 0) + value.value
+        if isinstance(value, ArrayUnion):
+            current = list(current or [])
+            return current + [v for v in value._values if v not in current]
+        if value is firestore.SERVER_TIMESTAMP:
+            return self.server_time()
+        return value
+
+
+def _position(doc):
+    return {**doc.to_dict(), '__name__': doc.id}
+
+
+def _matches(f, data):
+    value = data.get(f.field_path)
+    if f.value is None:
+        # `== None` becomes a unary IS_NULL filter
+        return value is None
+    if f.op_string == 'in':
+        return value in f.value
+    if f.op_string == '==':
+        return value == f.value
+    if value is None:
+        return False
+    return {
+        '<': value < f.value,
+        '<=': value <= f.value,
+        '>': value > f.value,
+        '>=': value >= f.value,
+    }[f.op_string]
+
+
+@pytest.fixture
+def fake_firestore():
+    """Empty in-memory Firestore client."""
+    return FakeFirestore()
@@ -0,0 +1,152 @@
+"""
+Tests for the background access-time flusher.
+
+These tests verify that FirestoreCache hits no longer write on the request
+thread and that touches are deduplicated and committed in batches.
+
+Run with: pytest tests/test_access_tracker.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from google.api_core import exceptions as google_exceptions
+
+from services.cache_service.access_tracker import AccessTimeFlusher, MAX_BATCH_SIZE
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAccessTimeFlusher:
+    """Test suite for AccessTimeFlusher."""
+
+    @pytest.fixture
+    def mock_db(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def flusher(self, mock_db, clock):
+        flusher = AccessTimeFlusher(
+            mock_db, mock_db.collection.return_value,
+            flush_interval=3600, dedupe_window=60, clock=clock
+        )
+        # Keep the background thread out of the way; tests flush explicitly
+        flusher._ensure_started = lambda: None
+        return flusher
+
+    def test_touch_does_not_write(self, flusher, mock_db):
+        """Test that touch only queues the key."""
+        flusher.touch("k1")
+
+        mock_db.batch.assert_not_called()
+        assert flusher.get_stats()['pending'] == 1
+
+    def test_duplicate_touches_within_window_are_dropped(self, flusher, clock):
+        """Test that repeat touches inside the dedupe window are coalesced."""
+        flusher.touch("k1")
+        clock.now += 10
+        flusher.touch("k1")
+
+        stats = flusher.get_stats()
+        assert stats['pending'] == 1
+        assert stats['deduplicated'] == 1
+
+    def test_touch_after_window_is_recorded_again(self, flusher, clock):
+        """Test that a key is re-recorded once the window has passed."""
+        flusher.touch("k1")
+        flusher.flush()
+        clock.now += 61
+        flusher.touch("k1")
+
+        assert flusher.get_stats()['pending'] == 1
+
+    def test_flush_commits_one_batch(self, flusher, mock_db):
+        """Test that pending touches are committed in a single batch."""
+        for i in range(3):
+            flusher.touch(f"k{i}")
+
+        written = flusher.flush()
+
+        assert written == 3
+        mock_db.batch.assert_called_once()
+        batch = mock_db.batch.return_value
+        assert batch.update.call_count == 3
+        batch.commit.assert_called_once()
+        assert flusher.get_stats()['pending'] == 0
+
+    def test_flush_chunks_at_batch_limit(self, flusher, mock_db):
+        """Test that more than 500 touches are split across batches."""
+        for i in range(MAX_BATCH_SIZE + 1):
+            flusher.touch(f"k{i}")
+
+        flusher.flush()
+
+        assert mock_db.batch.call_count == 2
+
+    def test_missing_document_falls_back_to_single_updates(self, flusher, mock_db):
+        """Test that a deleted entry doesn't drop the other updates in its batch."""
+        mock_db.batch.return_value.commit.side_effect = google_exceptions.NotFound("gone")
+        doc_ref = mock_db.collection.return_value.document.return_value
+        doc_ref.update.side_effect = [google_exceptions.NotFound("gone"), None]
+
+        flusher.touch("deleted")
+        flusher.touch("alive")
+        written = flusher.flush()
+
+        assert written == 1
+        assert doc_ref.update.call_count == 2
+
+    def test_stop_flushes_pending(self, flusher, mock_db):
+        """Test that shutdown commits whatever is still queued."""
+        flusher.touch("k1")
+        flusher.stop()
+
+        mock_db.batch.return_value.commit.assert_called_once()
+
+
+class TestFirestoreCacheAccessTracking:
+    """Test FirestoreCache wiring of the flusher."""
+
+    @pytest.fixture
+    def mock_db(self):
+        with patch('services.cache_service.firestore_backend.firestore.client') as client:
+            yield client.return_value
+
+    def _hit(self, mock_db):
+        doc = MagicMock()
+        doc.exists = True
+        doc.to_dict.return_value = {'data': {'v': 1}, 'expires_at': None}
+        mock_db.collection.return_value.document.return_value.get.return_value = doc
+
+    def test_cache_hit_does_not_update_synchronously(self, mock_db):
+        """Test that get() no longer writes last_accessed on the request thread."""
+        from services.cache_service.firestore_backend import FirestoreCache
+        self._hit(mock_db)
+        cache = FirestoreCache("cache_test")
+        cache.access_tracker._ensure_started = lambda: None
+
+        assert cache.get("k") == {'v': 1}
+
+        mock_db.collection.return_value.document.return_value.update.assert_not_called()
+        assert cache.access_tracker.get_stats()['pending'] == 1
+
+    def test_tracking_can_be_disabled(self, mock_db):
+        """Test that track_access=False skips access tracking entirely."""
+        from services.cache_service.firestore_backend import FirestoreCache
+        self._hit(mock_db)
+        cache = FirestoreCache("cache_test", track_access=False)
+
+        assert cache.get("k") == {'v': 1}
+        assert cache.access_tracker is None
+        assert cache.flush_access_times() == 0
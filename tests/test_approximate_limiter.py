@@ -0,0 +1,129 @@
+"""
+Tests for the approximate (locally counted) Firestore limiter storage.
+
+These tests verify that hits are counted in memory, that deltas are flushed
+with Increment on epoch-aligned window documents, that global counts from
+other instances are pulled back, and that max_overshoot bounds local drift.
+
+Run with: pytest tests/test_approximate_limiter.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.strategies import FixedWindowRateLimiter
+
+
+def make_snapshot(doc_id, count):
+    snap = MagicMock()
+    snap.id = doc_id
+    snap.exists = True
+    snap.to_dict.return_value = {'count': count}
+    return snap
+
+
+class TestApproximateFirestoreLimiterStorage:
+    """Test suite for ApproximateFirestoreLimiterStorage."""
+
+    @pytest.fixture
+    def mock_db(self):
+        with patch('services.cache_service.limiter_storage.firestore.client') as client:
+            yield client.return_value
+
+    @pytest.fixture
+    def storage(self, mock_db):
+        from services.cache_service.limiter_storage import ApproximateFirestoreLimiterStorage
+        storage = ApproximateFirestoreLimiterStorage(
+            collection_name='rate_limits_test', flush_threshold=10, max_overshoot=20
+        )
+        storage._ensure_started = lambda: None
+        return storage
+
+    def test_incr_is_local(self, storage, mock_db):
+        """Test that counting hits does no Firestore I/O."""
+        for expected in range(1, 6):
+            assert storage.incr('user:u1/5/1/minute', expiry=60) == expected
+
+        mock_db.transaction.assert_not_called()
+        mock_db.batch.assert_not_called()
+        assert storage.get('user:u1/5/1/minute') == 5
+
+    def test_limiter_blocks_on_local_count(self, storage):
+        """Test that a single instance enforces the limit exactly."""
+        limiter = FixedWindowRateLimiter(storage)
+        item = RateLimitItemPerMinute(3)
+
+        results = [limiter.hit(item, 'u1') for _ in range(5)]
+
+        assert results == [True, True, True, False, False]
+
+    def test_flush_uses_increment_on_window_doc(self, storage, mock_db):
+        """Test that sync writes one batched Increment per key."""
+        storage.incr('user:u1/5/1/minute', expiry=60, amount=3)
+        storage.incr('user:u2/5/1/minute', expiry=60)
+        mock_db.get_all.return_value = []
+
+        storage.sync()
+
+        batch = mock_db.batch.return_value
+        assert batch.set.call_count == 2
+        batch.commit.assert_called_once()
+        data = batch.set.call_args_list[0][0][1]
+        assert data['count'].value == 3
+        assert batch.set.call_args_list[0][1] == {'merge': True}
+        doc_id = mock_db.collection.return_value.document.call_args_list[0][0][0]
+        assert doc_id.startswith('user:u1__5__1__minute__')
+        assert int(doc_id.rsplit('__', 1)[1]) % 60 == 0
+        assert storage.get_stats()['unflushed'] == 0
+
+    def test_pull_adds_other_instances(self, storage, mock_db):
+        """Test that the global count replaces the local estimate."""
+        key = 'user:u1/5/1/minute'
+        storage.incr(key, expiry=60, amount=2)
+        doc_id = storage._windows[key].doc_id
+        mock_db.get_all.return_value = [make_snapshot(doc_id, 9)]
+
+        storage.sync()
+
+        assert storage.get(key) == 9
+        assert storage.incr(key, expiry=60) == 10
+
+    def test_failed_flush_keeps_delta(self, storage, mock_db):
+        """Test that deltas survive a failed commit and are retried."""
+        key = 'user:u1/5/1/minute'
+        storage.incr(key, expiry=60, amount=4)
+        mock_db.batch.return_value.commit.side_effect = Exception('unavailable')
+        mock_db.get_all.return_value = []
+
+        storage.sync()
+
+        assert storage.get_stats()['unflushed'] == 4
+        assert storage.get(key) == 4
+
+    def test_max_overshoot_forces_sync(self, storage, mock_db):
+        """Test that too much unflushed drift syncs on the request path."""
+        key = 'user:u1/100/1/minute'
+        mock_db.get_all.return_value = []
+        for _ in range(19):
+            storage.incr(key, expiry=60)
+        mock_db.batch.assert_not_called()
+
+        storage.incr(key, expiry=60)
+
+        mock_db.batch.return_value.commit.assert_called_once()
+        mock_db.get_all.assert_called_once()
+        assert storage.get_stats()['forced_syncs'] == 1
+
+    def test_approximate_mode_config(self, monkeypatch):
+        """Test that RATE_LIMIT_MODE=approximate selects the approximate storage."""
+        from services.cache_service.limiter_storage import get_limiter_storage_config
+        monkeypatch.setenv('CACHE_BACKEND', 'firestore')
+        monkeypatch.setenv('RATE_LIMIT_MODE', 'approximate')
+        monkeypatch.setenv('RATE_LIMIT_MAX_OVERSHOOT', '5')
+
+        with patch('services.cache_service.limiter_storage.register_firestore_storage'):
+            uri, options = get_limiter_storage_config()
+
+        assert uri == 'firestore+approx://'
+        assert options['max_overshoot'] == 5
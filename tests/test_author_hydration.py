@@ -0,0 +1,120 @@
+"""
+Tests for batched author hydration.
+
+These tests verify that a page of items resolves its distinct authors with
+one projected get_all, that repeat lookups come from the per-request
+identity map and the in-process cache, and that missing users and lookup
+errors leave the denormalized values in place.
+
+Run with: pytest tests/test_author_hydration.py -v
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from services.author_hydration import AUTHOR_FIELDS, AuthorHydrator
+
+
+USERS = {
+    'u1': {'username': 'alice', 'displayName': 'Alice A.', 'profileImageUrl': 'https://img/alice.png'},
+    'u2': {'username': 'bob_renamed', 'displayName': 'Bob', 'profileImageUrl': None},
+}
+
+
+def make_snapshot(user_id):
+    doc = MagicMock()
+    doc.id = user_id
+    doc.exists = user_id in USERS
+    doc.to_dict.return_value = dict(USERS[user_id]) if doc.exists else None
+    return doc
+
+
+class TestAuthorHydrator:
+    """Test suite for AuthorHydrator."""
+
+    @pytest.fixture
+    def mock_db(self):
+        db = MagicMock()
+        db.collection.return_value.document.side_effect = lambda uid: uid
+        db.get_all.side_effect = lambda refs, field_paths=None: [make_snapshot(uid) for uid in refs]
+        return db
+
+    @pytest.fixture
+    def hydrator(self, mock_db):
+        return AuthorHydrator(db=mock_db, ttl=60)
+
+    @pytest.fixture
+    def items(self):
+        return [
+            {'creationId': 'c1', 'userId': 'u1', 'username': 'alice'},
+            {'creationId': 'c2', 'userId': 'u2', 'username': 'bob'},
+            {'creationId': 'c3', 'userId': 'u1', 'username': 'alice'},
+        ]
+
+    def test_one_projected_read_per_page(self, hydrator, mock_db, items):
+        """Test that distinct authors are fetched in one get_all with a field mask."""
+        hydrated = hydrator.hydrate(items)
+
+        mock_db.get_all.assert_called_once_with(['u1', 'u2'], field_paths=AUTHOR_FIELDS)
+        assert hydrated[0]['displayName'] == 'Alice A.'
+        assert hydrated[0]['profileImageUrl'] == 'https://img/alice.png'
+        assert hydrated[1]['username'] == 'bob_renamed'  # Renames show up
+
+    def test_items_are_not_mutated(self, hydrator, items):
+        """Test that cached items passed in are left unchanged."""
+        hydrator.hydrate(items)
+
+        assert 'displayName' not in items[0]
+        assert items[1]['username'] == 'bob'
+
+    def test_profiles_are_cached(self, hydrator, mock_db, items):
+        """Test that the next page reuses cached profiles."""
+        hydrator.hydrate(items)
+        hydrator.hydrate(items)
+
+        assert mock_db.get_all.call_count == 1
+        assert hydrator.get_stats()['profiles_read'] == 2
+
+    def test_identity_map_per_request(self, mock_db, items):
+        """Test that one request looks each author up once, even with the cache off."""
+        hydrator = AuthorHydrator(db=mock_db, ttl=0)
+        app = Flask(__name__)
+
+        with app.test_request_context():
+            hydrator.hydrate(items)
+            hydrator.hydrate([{'userId': 'u1'}], avatar_key='avatarUrl')
+        with app.test_request_context():
+            hydrator.hydrate(items)
+
+        assert mock_db.get_all.call_count == 2
+
+    def test_missing_user_keeps_denormalized_values(self, hydrator):
+        """Test that deleted authors fall back to the stored username."""
+        hydrated = hydrator.hydrate([{'userId': 'gone', 'username': 'old_name', 'avatarUrl': 'https://img/old.png'}],
+                                    avatar_key='avatarUrl')
+
+        assert hydrated[0]['username'] == 'old_name'
+        assert hydrated[0]['avatarUrl'] == 'https://img/old.png'
+        assert hydrated[0]['displayName'] is None
+
+    def test_avatar_key_is_refreshed(self, hydrator):
+        """Test that comment avatars follow the current profile image."""
+        hydrated = hydrator.hydrate([{'userId': 'u1', 'avatarUrl': 'https://img/stale.png'}], avatar_key='avatarUrl')
+
+        assert hydrated[0]['avatarUrl'] == 'https://img/alice.png'
+
+    def test_invalidate(self, hydrator, mock_db, items):
+        """Test that a profile change forces a re-read."""
+        hydrator.hydrate(items)
+        hydrator.invalidate('u1')
+        hydrator.hydrate(items)
+
+        assert mock_db.get_all.call_args_list[-1].args[0] == ['u1']
+
+    def test_lookup_error_returns_items(self, hydrator, mock_db, items):
+        """Test that a failed lookup doesn't fail the response."""
+        mock_db.get_all.side_effect = Exception('unavailable')
+
+        assert hydrator.hydrate(items) is items
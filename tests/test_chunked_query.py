@@ -0,0 +1,148 @@
+"""
+Tests for the chunked IN-query executor.
+
+These tests verify that long `in` lists are split into chunks of 30 and run
+concurrently, that the ordered chunk streams are heap-merged into one page
+with the correct has_more flag, and that the composite keyset continuation
+pages through every chunk without gaps or duplicates.
+
+Run with: pytest tests/test_chunked_query.py -v
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.chunked_query import ChunkedInQueryExecutor
+
+
+T0 = datetime(2025, 11, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def make_doc(i, author):
+    doc = MagicMock()
+    doc.id = f'c{i:03d}'
+    doc.to_dict.return_value = {'userId': author, 'publishedAt': T0 + timedelta(minutes=i % 17)}
+    return doc
+
+
+class FakeInQuery:
+    """Ordered `userId in chunk` query over a list of docs (DESCENDING only)."""
+
+    def __init__(self, docs, chunk, log, orders=(), after=None, limit=None):
+        self.docs, self.chunk, self.log = docs, chunk, log
+        self.orders, self.after, self._limit = list(orders), after, limit
+
+    def order_by(self, field, direction):
+        return FakeInQuery(self.docs, self.chunk, self.log, self.orders + [field], self.after, self._limit)
+
+    def start_after(self, values):
+        return FakeInQuery(self.docs, self.chunk, self.log, self.orders, values, self._limit)
+
+    def limit(self, n):
+        return FakeInQuery(self.docs, self.chunk, self.log, self.orders, self.after, n)
+
+    def stream(self):
+        self.log.append((list(self.chunk), self._limit, threading.current_thread().name))
+        key = lambda d: tuple(d.id if f == '__name__' else d.to_dict()[f] for f in self.orders)
+        docs = sorted((d for d in self.docs if d.to_dict()['userId'] in self.chunk), key=key, reverse=True)
+        if self.after is not None:
+            docs = [d for d in docs if key(d) < tuple(self.after[f] for f in self.orders)]
+        return iter(docs[:self._limit])
+
+
+class TestChunkedInQueryExecutor:
+    """Test suite for ChunkedInQueryExecutor."""
+
+    @pytest.fixture
+    def authors(self):
+        return [f'u{i:02d}' for i in range(70)]
+
+    @pytest.fixture
+    def docs(self, authors):
+        return [make_doc(i, authors[i % len(authors)]) for i in range(210)]
+
+    @pytest.fixture
+    def log(self):
+        return []
+
+    @pytest.fixture
+    def build_query(self, docs, log):
+        return lambda chunk: FakeInQuery(docs, chunk, log)
+
+    @pytest.fixture
+    def executor(self):
+        executor = ChunkedInQueryExecutor(max_workers=4)
+        yield executor
+        executor.shutdown()
+
+    def expected(self, docs, authors):
+        wanted = set(authors)
+        return [d.id for d in sorted((d for d in docs if d.to_dict()['userId'] in wanted),
+                                     key=lambda d: (d.to_dict()['publishedAt'], d.id), reverse=True)]
+
+    def test_splits_into_chunks_of_thirty(self, executor, build_query, authors, log):
+        """Test that 70 IDs become three chunk queries of at most 30."""
+        executor.query(build_query, authors, ['publishedAt'], 'DESCENDING', 10)
+
+        assert sorted(len(chunk) for chunk, _, _ in log) == [10, 30, 30]
+        assert all(limit == 11 for _, limit, _ in log)  # limit + 1 per chunk
+        assert all(name.startswith('in-query') for _, _, name in log)
+
+    def test_single_chunk_runs_inline(self, executor, build_query, authors, log):
+        """Test that a short list doesn't hop to the thread pool."""
+        executor.query(build_query, authors[:5], ['publishedAt'], 'DESCENDING', 10)
+
+        assert log[0][2] == threading.current_thread().name
+
+    def test_merge_matches_global_order(self, executor, build_query, docs, authors):
+        """Test that the heap merge yields the same page as one big query."""
+        page, has_more, continuation = executor.query(build_query, authors, ['publishedAt'], 'DESCENDING', 25)
+
+        assert [d.id for d in page] == self.expected(docs, authors)[:25]
+        assert has_more is True
+        assert continuation == {'publishedAt': page[-1].to_dict()['publishedAt'], '__name__': page[-1].id}
+
+    def test_keyset_continuation_across_chunks(self, executor, build_query, docs, authors):
+        """Test that paging with the continuation visits every document once."""
+        seen, continuation = [], None
+        while True:
+            page, has_more, continuation = executor.query(
+                build_query, authors, ['publishedAt'], 'DESCENDING', 40, start_after=continuation
+            )
+            seen.extend(d.id for d in page)
+            if not has_more:
+                break
+
+        assert seen == self.expected(docs, authors)
+        assert continuation is None
+
+    def test_duplicates_and_empty_lists(self, executor, build_query, docs, authors, log):
+        """Test that repeated IDs are queried once and empty lists skip I/O."""
+        assert executor.query(build_query, [], ['publishedAt'], 'DESCENDING', 10) == ([], False, None)
+
+        page, _, _ = executor.query(build_query, authors[:3] * 20, ['publishedAt'], 'DESCENDING', 50)
+
+        assert len(log) == 1
+        assert [d.id for d in page] == self.expected(docs, authors[:3])
+
+    def test_fetch_all(self, executor, build_query, docs, authors):
+        """Test that unordered lookups return every match once."""
+        found = executor.fetch_all(build_query, authors[:40] + authors[:10])
+
+        assert sorted(d.id for d in found) == sorted(self.expected(docs, authors[:40]))
+
+    def test_chunk_errors_propagate(self, executor, authors):
+        """Test that a failing chunk fails the read instead of returning a partial page."""
+        def build_query(chunk):
+            raise Exception('unavailable')
+
+        with pytest.raises(Exception, match='unavailable'):
+            executor.query(build_query, authors, ['publishedAt'], 'DESCENDING', 10)
+
+    def test_chunk_size_is_capped(self):
+        """Test that chunks can't exceed Firestore's `in` limit."""
+        with pytest.raises(ValueError):
+            ChunkedInQueryExecutor(chunk_size=31)
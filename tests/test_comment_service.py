@@ -0,0 +1,335 @@
+"""
+Tests for the comment service.
+
+These tests verify that adding a comment is one batched write that returns
+the commit time, that a missing creation is detected by the write and by
+empty comment pages (not an extra read per request), that the cached
+first page is served without queries and dropped (never duplicated) on write, and
+that threaded replies get ordered thread keys and per-root reply counters
+and load one thread page per range query.
+
+Run with: pytest tests/test_comment_service.py -v
+"""
+
+import itertools
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.cache_service.memory_backend import MemoryCache
+from services.comment_service import (
+    CommenterNotFoundError,
+    CommentService,
+    CreationNotFoundError,
+    ParentCommentNotFoundError,
+    thread_key,
+)
+
+
+BASE = datetime(2025, 11, 16, 10, 0, tzinfo=timezone.utc)
+COMMIT_TIME = datetime(2025, 11, 16, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+CREATION = 'creations/c1'
+COMMENTS = f'{CREATION}/comments'
+
+
+def add_root(db, i):
+    db.docs[f'{COMMENTS}/m{i}'] = {
+        'userId': 'u1',
+        'username': 'alice',
+        'avatarUrl': '',
+        'commentText': f'comment {i}',
+        'createdAt': BASE + timedelta(minutes=i),
+        'replyToCommentId': None,
+    }
+
+
+def clear_comments(db):
+    for path in [path for path in db.docs if path.startswith(f'{COMMENTS}/')]:
+        del db.docs[path]
+
+
+@pytest.fixture
+def db(fake_firestore):
+    """One creation with five top-level comments; new IDs and timestamps are predictable."""
+    ticks = itertools.count(1)
+    fake_firestore.ids = itertools.chain(['new-comment'], (f'new-comment-{i}' for i in itertools.count(2)))
+    fake_firestore.server_time = lambda: COMMIT_TIME + timedelta(seconds=next(ticks))
+    fake_firestore.commit_time = COMMIT_TIME
+    fake_firestore.docs[CREATION] = {'commentCount': 0}
+    for i in range(5):
+        add_root(fake_firestore, i)
+    return fake_firestore
+
+
+def _rebuild_then(writes, service):
+    """Batch whose commit is followed by a first-page load (another request)."""
+    commit = writes.commit
+
+    def commit_and_rebuild():
+        results = commit()
+        service.get_comments('c1', 10)
+        return results
+
+    writes.commit = commit_and_rebuild
+    return writes
+
+
+@pytest.fixture(autouse=True)
+def profiles(monkeypatch):
+    hydrator = MagicMock()
+    hydrator.get_profiles.side_effect = lambda ids: {
+        uid: ({'username': 'bob', 'profileImageUrl': 'https://img/bob.png'} if uid == 'u2' else {})
+        for uid in ids
+    }
+    monkeypatch.setattr('services.comment_service.get_author_hydrator', lambda: hydrator)
+    return hydrator
+
+
+@pytest.fixture
+def service(db):
+    return CommentService(db=db, cache=MemoryCache(), window=10, ttl=60)
+
+
+class TestCommentService:
+    """Test suite for top-level comments in CommentService."""
+
+    def test_add_comment_is_one_batch(self, service, db):
+        """Test that a comment costs one commit and returns the commit time."""
+        comment = service.add_comment('c1', 'u2', 'nice!')
+
+        assert len(db.commits) == 1
+        assert db.reads == []
+        assert db.docs[CREATION]['commentCount'] == 1
+        assert comment == {
+            'commentId': 'new-comment',
+            'userId': 'u2',
+            'username': 'bob',
+            'avatarUrl': 'https://img/bob.png',
+            'commentText': 'nice!',
+            'createdAt': COMMIT_TIME,
+            'replyToCommentId': None,
+            'rootCommentId': None,
+            'replyCount': 0,
+        }
+
+    def test_add_comment_falls_back_to_client_time(self, service, db):
+        """Test that a result without a commit time gets the client clock."""
+        db.commit_time = None
+
+        comment = service.add_comment('c1', 'u2', 'nice!')
+
+        assert isinstance(comment['createdAt'], datetime)
+        assert comment['createdAt'].tzinfo is not None
+
+    def test_add_comment_missing_creation(self, service, db):
+        """Test that the failed commentCount update reports a missing creation."""
+        del db.docs[CREATION]
+
+        with pytest.raises(CreationNotFoundError):
+            service.add_comment('c1', 'u2', 'nice!')
+
+    def test_add_comment_missing_user(self, service, db):
+        """Test that users without a profile can't comment."""
+        with pytest.raises(CommenterNotFoundError):
+            service.add_comment('c1', 'ghost', 'hello')
+
+        assert db.commits == []
+
+    def test_first_page_is_cached(self, service, db):
+        """Test that repeat first pages run one query and no existence read."""
+        first = service.get_comments('c1', 3)
+        second = service.get_comments('c1', 3)
+
+        comments, next_cursor, has_more = first
+        assert [c['commentId'] for c in comments] == ['m0', 'm1', 'm2']
+        assert has_more is True and next_cursor
+        assert second == first
+        assert service.get_stats()['queries'] == 1
+        assert db.reads == []
+
+    def test_next_page_follows_cursor(self, service):
+        """Test that the cached page's cursor continues with a query."""
+        _, next_cursor, _ = service.get_comments('c1', 3)
+
+        comments, cursor, has_more = service.get_comments('c1', 3, next_cursor)
+
+        assert [c['commentId'] for c in comments] == ['m3', 'm4']
+        assert has_more is False and cursor is None
+
+    def test_write_refreshes_first_page(self, service):
+        """Test that a new comment drops the cached page instead of appending to it."""
+        service.get_comments('c1', 10)
+        service.add_comment('c1', 'u2', 'nice!')
+
+        comments, _, has_more = service.get_comments('c1', 10)
+
+        assert [c['commentId'] for c in comments][-1] == 'new-comment'
+        assert has_more is False
+        assert service.get_stats()['queries'] == 2
+
+    def test_window_rebuilt_after_commit_is_kept(self, service, db, monkeypatch):
+        """Test that a window already holding the new comment is left alone."""
+        batch = db.batch
+        monkeypatch.setattr(db, 'batch', lambda: _rebuild_then(batch(), service))
+
+        service.add_comment('c1', 'u2', 'nice!')
+        comments, _, _ = service.get_comments('c1', 10)
+
+        assert [c['commentId'] for c in comments].count('new-comment') == 1
+        assert service.get_stats()['queries'] == 1
+
+    def test_full_window_stops_growing(self, service, db):
+        """Test that a comment past the window marks the page incomplete."""
+        for i in range(5, 10):
+            add_root(db, i)
+        service.get_comments('c1', 10)
+        service.add_comment('c1', 'u2', 'eleventh')
+
+        comments, next_cursor, has_more = service.get_comments('c1', 10)
+
+        assert len(comments) == 10
+        assert 'new-comment' not in [c['commentId'] for c in comments]
+        assert has_more is True and next_cursor
+
+    def test_missing_creation_from_empty_page(self, service, db):
+        """Test that only an empty page costs the existence read."""
+        clear_comments(db)
+        del db.docs[CREATION]
+
+        assert service.get_comments('c1', 10) is None
+        assert service.get_comments('c1', 10) is None
+        assert db.reads == [CREATION]
+
+    def test_no_comments_yet(self, service, db):
+        """Test that an existing creation without comments gets an empty page."""
+        clear_comments(db)
+
+        assert service.get_comments('c1', 10) == ([], None, False)
+
+    def test_works_without_cache(self, db):
+        """Test that COMMENT_CACHE_ENABLED=0 queries every time."""
+        service = CommentService(db=db, cache=None)
+
+        service.get_comments('c1', 3)
+        service.get_comments('c1', 3)
+        service.add_comment('c1', 'u2', 'nice!')
+
+        assert service.get_stats()['queries'] == 2
+
+    def test_invalidate(self, service):
+        """Test that invalidation forces a rebuild."""
+        service.get_comments('c1', 3)
+        service.invalidate('c1')
+        service.get_comments('c1', 3)
+
+        assert service.get_stats()['queries'] == 2
+
+
+class TestThreadedReplies:
+    """Test suite for threaded replies in CommentService."""
+
+    @pytest.fixture(autouse=True)
+    def plain_transactions(self):
+        with patch('services.comment_service.firestore.transactional', lambda fn: fn):
+            yield
+
+    def test_reply_gets_thread_key_and_counters(self, service, db):
+        """Test that a reply is keyed under its root and bumps both counters."""
+        reply = service.add_comment('c1', 'u2', 'agreed', reply_to='m1')
+
+        stored = db.docs[f"{COMMENTS}/{reply['commentId']}"]
+        assert stored['threadKey'] == thread_key('m1', 1)
+        assert reply['rootCommentId'] == 'm1'
+        assert reply['replyToCommentId'] == 'm1'
+        assert db.docs[f'{COMMENTS}/m1']['replyCount'] == 1
+        assert db.docs[f'{COMMENTS}/m1']['lastReplySeq'] == 1
+        assert db.docs[CREATION]['commentCount'] == 1
+
+    def test_reply_to_reply_joins_root_thread(self, service, db):
+        """Test that answering a reply stays in the root's thread, in order."""
+        first = service.add_comment('c1', 'u2', 'agreed', reply_to='m1')
+        second = service.add_comment('c1', 'u2', '@bob yes', reply_to=first['commentId'])
+
+        assert second['rootCommentId'] == 'm1'
+        assert second['replyToCommentId'] == first['commentId']
+        assert db.docs[f"{COMMENTS}/{second['commentId']}"]['threadKey'] == thread_key('m1', 2)
+        assert db.docs[f'{COMMENTS}/m1']['replyCount'] == 2
+
+    def test_thread_keys_sort_numerically(self):
+        """Test that zero padding keeps reply 10 after reply 9."""
+        assert thread_key('m1', 9) < thread_key('m1', 10) < thread_key('m1', 100)
+
+    def test_reply_to_missing_comment(self, service, db):
+        """Test that replying to a deleted comment fails without writing."""
+        with pytest.raises(ParentCommentNotFoundError):
+            service.add_comment('c1', 'u2', 'hello?', reply_to='gone')
+
+        assert db.docs[CREATION]['commentCount'] == 0
+
+    def test_thread_page_is_one_range_query(self, service, db):
+        """Test that a thread page is a single threadKey range query."""
+        for i in range(3):
+            service.add_comment('c1', 'u2', f'reply {i}', reply_to='m1')
+        service.add_comment('c1', 'u2', 'other thread', reply_to='m2')
+        db.queries.clear()
+
+        replies, next_cursor, has_more = service.get_replies('c1', 'm1', 10)
+
+        assert [r['commentText'] for r in replies] == ['reply 0', 'reply 1', 'reply 2']
+        assert has_more is False and next_cursor is None
+        assert len(db.queries) == 1
+        assert db.queries[0].orders == (('threadKey', 'ASCENDING'),)
+
+    def test_thread_cursor(self, service):
+        """Test that the thread cursor continues after the last reply."""
+        for i in range(5):
+            service.add_comment('c1', 'u2', f'reply {i}', reply_to='m1')
+
+        first, cursor, has_more = service.get_replies('c1', 'm1', 2)
+        second, cursor2, _ = service.get_replies('c1', 'm1', 2, cursor)
+        third, cursor3, more = service.get_replies('c1', 'm1', 2, cursor2)
+
+        assert has_more is True
+        assert [r['commentText'] for r in first + second + third] == [f'reply {i}' for i in range(5)]
+        assert more is False and cursor3 is None
+
+    def test_foreign_cursor_is_ignored(self, service):
+        """Test that another thread's cursor can't jump across threads."""
+        service.add_comment('c1', 'u2', 'in m1', reply_to='m1')
+        service.add_comment('c1', 'u2', 'in m1 again', reply_to='m1')
+        service.add_comment('c1', 'u2', 'in m2', reply_to='m2')
+        service.add_comment('c1', 'u2', 'in m2 again', reply_to='m2')
+        _, m2_cursor, _ = service.get_replies('c1', 'm2', 1)
+
+        replies, _, _ = service.get_replies('c1', 'm1', 10, m2_cursor)
+
+        assert [r['commentText'] for r in replies] == ['in m1', 'in m1 again']
+
+    def test_empty_thread_and_missing_root(self, service):
+        """Test that an empty page tells a quiet thread from a missing comment."""
+        assert service.get_replies('c1', 'm1', 10) == ([], None, False)
+        assert service.get_replies('c1', 'gone', 10) is None
+
+    def test_top_level_pages_exclude_replies(self, service):
+        """Test that replies stay out of the top-level list and refresh the root's count."""
+        service.get_comments('c1', 10)
+        service.add_comment('c1', 'u2', 'agreed', reply_to='m1')
+
+        comments, _, _ = service.get_comments('c1', 10)
+
+        assert [c['commentId'] for c in comments] == ['m0', 'm1', 'm2', 'm3', 'm4']
+        assert comments[1]['replyCount'] == 1
+        assert service.get_stats()['queries'] == 2  # Dropped, not patched
+
+    def test_reply_past_the_cached_page_keeps_it(self, service):
+        """Test that a reply to a root beyond the cached window leaves the window alone."""
+        service.window = 2
+        service.get_comments('c1', 2)
+        service.add_comment('c1', 'u2', 'agreed', reply_to='m4')
+
+        service.get_comments('c1', 2)
+
+        assert service.get_stats()['queries'] == 1
@@ -0,0 +1,228 @@
+"""
+Tests for conditional GET handling on JSON endpoints.
+
+These tests verify that decorated routes send strong ETags, answer a
+matching If-None-Match with an empty 304 (before running the view when
+the route has a validator), mark anonymous responses as
+CDN-cacheable (without issuing them a session cookie) and signed-in
+responses as private, never let a shared cache store a response that sets
+a session cookie, and leave errors alone.
+
+Run with: pytest tests/test_conditional_get.py -v
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, jsonify
+
+from middleware.conditional_get import conditional_get, page_validator
+from middleware.csrf_protection import CSRFProtection
+from services.cache_service.flask_adapter import CacheSessionInterface
+from services.cache_service.memory_backend import MemoryCache
+
+
+def _doc(doc_id, second):
+    return SimpleNamespace(id=doc_id, update_time=datetime(2026, 1, 1, 0, 0, second, tzinfo=timezone.utc))
+
+
+class TestConditionalGet:
+    """Test suite for the conditional_get decorator."""
+
+    @pytest.fixture
+    def state(self):
+        return {'items': ['c1', 'c2'], 'status': 200, 'renders': 0,
+                'docs': [_doc('c1', 10), _doc('c2', 20)]}
+
+    @pytest.fixture
+    def app(self, state):
+        app = Flask(__name__)
+        app.secret_key = 'test-secret'
+
+        @app.route('/feed')
+        @conditional_get(max_age=5, s_maxage=30)
+        def feed():
+            return jsonify({'success': True, 'creations': state['items']}), state['status']
+
+        @app.route('/gallery')
+        @conditional_get(s_maxage=60, validator=lambda: page_validator(state['docs'], 'gallery'))
+        def gallery():
+            state['renders'] += 1
+            return jsonify({'success': True, 'creations': [doc.id for doc in state['docs']]})
+
+        return app
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def test_matching_etag_gets_304(self, client):
+        """Test that a repeat request with the ETag gets an empty 304."""
+        first = client.get('/feed')
+        etag = first.headers['ETag']
+
+        second = client.get('/feed', headers={'If-None-Match': etag})
+
+        assert first.status_code == 200
+        assert not etag.startswith('W/')  # Strong validator
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_etag_changes_with_content(self, client, state):
+        """Test that any change to the body (even in place) changes the ETag."""
+        etag = client.get('/feed').headers['ETag']
+        state['items'] = ['c1', 'c2 (edited caption)']
+
+        response = client.get('/feed', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_anonymous_is_public(self, client):
+        """Test that anonymous responses are cacheable by browsers and the CDN."""
+        client.set_cookie('session', 'anonymous')
+
+        response = client.get('/feed')
+
+        cache_control = response.cache_control
+        assert cache_control.public is True
+        assert cache_control.max_age == 5
+        assert cache_control.s_maxage == 30
+        assert 'Cookie' in response.headers['Vary']
+
+    def test_cookieless_request_is_public(self, client):
+        """Test that a first visit without a session cookie is shared too."""
+        response = client.get('/feed')
+
+        assert 'Set-Cookie' not in response.headers
+        assert response.cache_control.public is True
+
+    def test_signed_in_is_private(self, client):
+        """Test that signed-in responses stay out of shared caches but revalidate."""
+        with client.session_transaction() as sess:
+            sess['user_id'] = 'user-1'
+
+        response = client.get('/feed')
+
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+        assert client.get('/feed', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    def test_validator_answers_304_without_rendering(self, client, state):
+        """Test that a validated route skips the view when nothing changed."""
+        client.set_cookie('session', 'anonymous')
+        first = client.get('/gallery')
+
+        second = client.get('/gallery', headers={'If-None-Match': first.headers['ETag']})
+
+        assert second.status_code == 304
+        assert state['renders'] == 1
+        assert second.cache_control.s_maxage == 60
+        assert first.headers['Last-Modified'] == 'Thu, 01 Jan 2026 00:00:20 GMT'
+
+    def test_validator_follows_update_times(self, client, state):
+        """Test that an in-place update (new update_time) changes the ETag."""
+        etag = client.get('/gallery').headers['ETag']
+        state['docs'][0] = _doc('c1', 30)
+
+        response = client.get('/gallery', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['Last-Modified'] == 'Thu, 01 Jan 2026 00:00:30 GMT'
+
+    def test_if_modified_since_gets_304(self, client, state):
+        """Test that Last-Modified revalidates without an ETag."""
+        last_modified = client.get('/gallery').headers['Last-Modified']
+
+        response = client.get('/gallery', headers={'If-Modified-Since': last_modified})
+
+        assert response.status_code == 304
+        assert state['renders'] == 1
+
+    def test_signed_in_hashes_the_body(self, client, state):
+        """Test that signed-in requests skip the validator (per-viewer fields)."""
+        with client.session_transaction() as sess:
+            sess['user_id'] = 'user-1'
+
+        response = client.get('/gallery')
+        repeat = client.get('/gallery', headers={'If-None-Match': response.headers['ETag']})
+
+        assert 'Last-Modified' not in response.headers
+        assert repeat.status_code == 304
+        assert state['renders'] == 2
+
+    def test_errors_pass_through(self, client, state):
+        """Test that non-200 responses get no validators."""
+        state['status'] = 500
+
+        response = client.get('/feed')
+
+        assert response.status_code == 500
+        assert 'ETag' not in response.headers
+        assert 'Cache-Control' not in response.headers
+
+    def test_can_be_disabled(self, client, monkeypatch):
+        """Test that HTTP_CACHE_ENABLED=0 sends plain responses."""
+        monkeypatch.setenv('HTTP_CACHE_ENABLED', '0')
+
+        response = client.get('/feed')
+
+        assert 'ETag' not in response.headers
+
+
+class TestConditionalGetWithCacheSessions:
+    """Test public/private decisions with the real session interface and CSRF."""
+
+    COOKIE_NAME = '__session'
+
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        app.secret_key = 'test-secret'
+        app.config['SESSION_COOKIE_NAME'] = self.COOKIE_NAME
+        app.session_interface = CacheSessionInterface(cache=MemoryCache())
+        CSRFProtection().init_app(app)
+
+        @app.route('/feed')
+        @conditional_get(max_age=0, s_maxage=30)
+        def feed():
+            return jsonify({'success': True, 'creations': ['c1']})
+
+        @app.route('/page')
+        def page():
+            return 'ok'
+
+        return app.test_client()
+
+    def test_first_visit_gets_no_cookie(self, client):
+        """Test that an anonymous GET issues no sid, so the response is shareable."""
+        response = client.get('/feed')
+
+        assert 'Set-Cookie' not in response.headers
+        assert response.cache_control.public is True
+        assert response.cache_control.s_maxage == 30
+
+    def test_other_routes_still_issue_the_csrf_cookie(self, client):
+        """Test that undecorated routes keep handing out the sid for CSRF."""
+        response = client.get('/page')
+
+        assert 'anon-' in response.headers['Set-Cookie']
+
+    def test_returning_anonymous_visitor_is_public(self, client):
+        """Test that visitors who already hold a sid cookie share responses too."""
+        client.get('/page')
+
+        response = client.get('/feed')
+
+        assert 'Set-Cookie' not in response.headers
+        assert response.cache_control.public is True
+        assert response.cache_control.s_maxage == 30
+
+    def test_expired_cookie_is_private(self, client):
+        """Test that a response clearing an expired sid cookie isn't shared."""
+        client.set_cookie(self.COOKIE_NAME, '12345678-1234-1234-1234-123456789abc')
+
+        response = client.get('/feed')
+
+        assert 'Set-Cookie' in response.headers
+        assert response.cache_control.public is False
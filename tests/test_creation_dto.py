@@ -0,0 +1,119 @@
+"""
+Tests for creation field masks and list DTOs.
+
+These tests verify that DTOs apply the list defaults once, serialize only
+an endpoint's keys (never internal fields like transaction IDs), and apply
+the owner-only prompt rule without mutating shared cached items.
+
+Run with: pytest tests/test_creation_dto.py -v
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.creation_dto import (
+    DRAFT_FIELDS,
+    DRAFT_KEYS,
+    FEED_FIELDS,
+    FEED_KEYS,
+    GALLERY_KEYS,
+    CreationDTO,
+    redact_prompt,
+)
+
+
+PUBLISHED_AT = datetime(2025, 11, 16, 10, 30, tzinfo=timezone.utc)
+
+
+class TestCreationDTO:
+    """Test suite for CreationDTO and redact_prompt."""
+
+    @pytest.fixture
+    def document(self):
+        doc = MagicMock()
+        doc.id = 'creation-1'
+        doc.to_dict.return_value = {
+            'userId': 'owner',
+            'username': 'alice',
+            'prompt': 'a secret prompt',
+            'mediaUrl': 'https://cdn.example.com/1.mp4',
+            'status': 'published',
+            'publishedAt': PUBLISHED_AT,
+            'originalTransactionId': 'txn-1',
+            'cost': 50,
+        }
+        return doc
+
+    def test_is_slotted(self, document):
+        """Test that DTOs carry no per-instance __dict__."""
+        dto = CreationDTO.from_snapshot(document)
+
+        assert not hasattr(dto, '__dict__')
+        with pytest.raises(AttributeError):
+            dto.extra = 1
+
+    def test_feed_json_has_only_feed_keys(self, document):
+        """Test that internal fields never reach the response."""
+        item = CreationDTO.from_snapshot(document).to_json(FEED_KEYS, viewer_id='owner')
+
+        assert tuple(item) == FEED_KEYS
+        assert item['creationId'] == 'creation-1'
+        assert item['prompt'] == 'a secret prompt'
+        assert item['publishedAt'] == PUBLISHED_AT
+
+    def test_defaults_for_missing_fields(self):
+        """Test that projected-away or absent fields get the list defaults."""
+        item = CreationDTO('c1', {}).to_json(FEED_KEYS)
+
+        assert item['username'] == 'Unknown'
+        assert item['mediaType'] == 'video'
+        assert item['aspectRatio'] == '9:16'
+        assert item['duration'] == 8
+        assert item['commentCount'] == 0
+        assert item['likeCount'] == 0
+        assert item['caption'] == ''
+
+    def test_prompt_is_owner_only(self, document):
+        """Test that anonymous and other viewers get an empty prompt."""
+        dto = CreationDTO.from_snapshot(document)
+
+        assert dto.to_json(GALLERY_KEYS, viewer_id=None)['prompt'] == ''
+        assert dto.to_json(GALLERY_KEYS, viewer_id='someone-else')['prompt'] == ''
+        assert dto.to_json(GALLERY_KEYS, viewer_id='owner')['prompt'] == 'a secret prompt'
+        assert 'userId' not in dto.to_json(GALLERY_KEYS, viewer_id='owner')
+
+    def test_gallery_omits_prompt_for_other_viewers(self, document):
+        """Test that the gallery format drops the prompt key rather than emptying it."""
+        dto = CreationDTO.from_snapshot(document)
+
+        assert 'prompt' not in dto.to_json(GALLERY_KEYS, viewer_id=None, omit_redacted=True)
+        assert 'prompt' not in dto.to_json(GALLERY_KEYS, viewer_id='someone-else', omit_redacted=True)
+        assert dto.to_json(GALLERY_KEYS, viewer_id='owner', omit_redacted=True)['prompt'] == 'a secret prompt'
+
+    def test_redact_prompt_copies(self, document):
+        """Test that redaction leaves the cached item untouched."""
+        cached = CreationDTO.from_snapshot(document).to_json(FEED_KEYS, include_prompt=True)
+
+        redacted = redact_prompt(cached, 'someone-else')
+
+        assert redacted['prompt'] == ''
+        assert cached['prompt'] == 'a secret prompt'
+        assert redact_prompt(cached, 'owner') is cached
+
+    def test_draft_keys(self):
+        """Test that drafts keep the fields the drafts view needs."""
+        item = CreationDTO('c1', {'status': 'failed', 'error': 'quota', 'progress': 0.4}).to_json(
+            DRAFT_KEYS, include_prompt=True
+        )
+
+        assert item['id'] == item['creationId'] == 'c1'
+        assert item['error'] == 'quota'
+        assert item['progress'] == 0.4
+
+    def test_masks_cover_serialized_fields(self):
+        """Test that every stored field a list returns is in its Firestore mask."""
+        assert 'originalTransactionId' not in DRAFT_FIELDS
+        assert set(FEED_FIELDS) <= set(DRAFT_FIELDS)
+        assert {'userId', 'status', 'publishedAt', 'prompt'} <= set(FEED_FIELDS)
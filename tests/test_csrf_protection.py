@@ -0,0 +1,167 @@
+"""
+Tests for stateless CSRF tokens and ephemeral anonymous sessions.
+
+These tests verify that anonymous visitors get a working CSRF token without
+any session being written to the cache backend, and that the session moves to
+a fresh persistent id once something (e.g. a login) is stored.
+
+Run with: pytest tests/test_csrf_protection.py -v
+"""
+
+import pytest
+from flask import Flask, jsonify, session
+
+from middleware.csrf_protection import CSRFProtection
+from services.cache_service.flask_adapter import CacheSessionInterface, EPHEMERAL_SID_PREFIX
+from services.cache_service.memory_backend import MemoryCache
+
+
+COOKIE_NAME = '__session'
+
+
+def build_app(mode='stateless'):
+    app = Flask(__name__)
+    app.secret_key = 'test-secret'
+    app.config['SESSION_COOKIE_NAME'] = COOKIE_NAME
+    app.config['CSRF_MODE'] = mode
+
+    cache = MemoryCache()
+    app.session_interface = CacheSessionInterface(key_prefix='test:session:', cache=cache)
+    csrf = CSRFProtection(app)
+
+    @app.route('/api/csrf-token')
+    def csrf_token():
+        return jsonify({'csrf_token': csrf.get_token()})
+
+    @app.route('/api/feed')
+    def feed():
+        return jsonify({'success': True})
+
+    @app.route('/api/login', methods=['POST'])
+    @csrf.protect
+    def login():
+        session['user_id'] = 'u1'
+        return jsonify({'success': True, 'csrf_token': csrf.get_token()})
+
+    @app.route('/api/action', methods=['POST'])
+    @csrf.protect
+    def action():
+        return jsonify({'success': True})
+
+    return app, cache
+
+
+def session_cookie(client):
+    cookie = client.get_cookie(COOKIE_NAME)
+    return cookie.value if cookie else None
+
+
+class TestStatelessCSRF:
+    """Test suite for CSRF_MODE=stateless."""
+
+    @pytest.fixture
+    def app_and_cache(self):
+        return build_app('stateless')
+
+    @pytest.fixture
+    def client(self, app_and_cache):
+        return app_and_cache[0].test_client()
+
+    @pytest.fixture
+    def cache(self, app_and_cache):
+        return app_and_cache[1]
+
+    def test_anonymous_requests_do_not_touch_backend(self, client, cache):
+        """Test that anonymous GETs neither read nor write sessions."""
+        client.get('/api/feed')
+        client.get('/api/csrf-token')
+        client.get('/api/feed')
+
+        stats = cache.get_stats()
+        assert stats['writes'] == 0
+        assert stats['reads'] == 0
+
+    def test_token_is_stable_for_cookie(self, client):
+        """Test that the token is bound to the ephemeral session cookie."""
+        first = client.get('/api/csrf-token').get_json()['csrf_token']
+        sid = session_cookie(client)
+        second = client.get('/api/csrf-token').get_json()['csrf_token']
+
+        assert sid.startswith(EPHEMERAL_SID_PREFIX)
+        assert first == second
+        assert session_cookie(client) == sid
+
+    def test_valid_token_is_accepted(self, client):
+        """Test that a POST with the issued token passes."""
+        token = client.get('/api/csrf-token').get_json()['csrf_token']
+
+        resp = client.post('/api/action', headers={'X-CSRF-Token': token})
+
+        assert resp.status_code == 200
+
+    def test_missing_or_forged_token_is_rejected(self, client):
+        """Test that POSTs without a matching token fail."""
+        client.get('/api/csrf-token')
+
+        assert client.post('/api/action').status_code == 400
+        assert client.post('/api/action', headers={'X-CSRF-Token': 'forged'}).status_code == 400
+
+    def test_token_from_other_cookie_is_rejected(self, app_and_cache):
+        """Test that a token can't be replayed with a different session cookie."""
+        app, _ = app_and_cache
+        attacker, victim = app.test_client(), app.test_client()
+        token = attacker.get('/api/csrf-token').get_json()['csrf_token']
+        victim.get('/api/csrf-token')
+
+        resp = victim.post('/api/action', headers={'X-CSRF-Token': token})
+
+        assert resp.status_code == 400
+
+    def test_login_persists_session_under_new_sid(self, client, cache):
+        """Test that the first session write rotates away from the anonymous sid."""
+        token = client.get('/api/csrf-token').get_json()['csrf_token']
+        anon_sid = session_cookie(client)
+
+        resp = client.post('/api/login', headers={'X-CSRF-Token': token})
+
+        new_sid = session_cookie(client)
+        assert resp.status_code == 200
+        assert new_sid != anon_sid
+        assert not new_sid.startswith(EPHEMERAL_SID_PREFIX)
+        assert cache.get_stats()['writes'] == 1
+        assert cache.get(f'test:session:{new_sid}') is not None
+        # Token rotates with the sid
+        assert resp.get_json()['csrf_token'] != token
+
+    def test_legacy_session_token_still_accepted(self, client):
+        """Test that tokens stored by session mode keep working after the switch."""
+        with client.session_transaction() as sess:
+            sess['csrf_token'] = 'legacy-token'
+
+        resp = client.post('/api/action', headers={'X-CSRF-Token': 'legacy-token'})
+
+        assert resp.status_code == 200
+
+    def test_malformed_cookie_gets_fresh_sid(self, client, cache):
+        """Test that arbitrary cookie values are never looked up in the backend."""
+        client.set_cookie(COOKIE_NAME, '../../etc/passwd')
+
+        client.get('/api/csrf-token')
+
+        assert session_cookie(client).startswith(EPHEMERAL_SID_PREFIX)
+        assert cache.get_stats()['reads'] == 0
+
+
+class TestSessionModeCSRF:
+    """Test suite for CSRF_MODE=session (legacy behaviour)."""
+
+    def test_token_is_stored_in_session(self):
+        """Test that session mode persists a random token per visitor."""
+        app, cache = build_app('session')
+        client = app.test_client()
+
+        token = client.get('/api/csrf-token').get_json()['csrf_token']
+
+        assert token
+        assert cache.get_stats()['writes'] == 1
+        assert client.post('/api/action', headers={'X-CSRF-Token': token}).status_code == 200
@@ -0,0 +1,109 @@
+"""
+Tests for the opaque keyset cursor codec.
+
+These tests verify that cursors round-trip (timestamp, docId), reject forged
+or cross-endpoint tokens, position queries with start_after on field values
+instead of a cursor-document read, and still accept legacy ID cursors.
+
+Run with: pytest tests/test_cursor_codec.py -v
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.cursor_codec import apply_cursor, cursor_doc_id, decode_cursor, encode_cursor
+
+
+SECRET = 'test-secret'
+PUBLISHED_AT = datetime(2025, 11, 16, 10, 30, 0, 123456, tzinfo=timezone.utc)
+
+
+class TestCursorCodec:
+    """Test suite for encode_cursor/decode_cursor."""
+
+    def test_round_trip(self):
+        """Test that a token decodes to the exact position."""
+        token = encode_cursor(PUBLISHED_AT, 'creation-1', 'explore', secret=SECRET)
+
+        assert decode_cursor(token, 'explore', secret=SECRET) == (PUBLISHED_AT, 'creation-1')
+        assert 'creation-1' not in token
+
+    def test_naive_timestamp_is_utc(self):
+        """Test that naive datetimes are treated as UTC."""
+        token = encode_cursor(PUBLISHED_AT.replace(tzinfo=None), 'c1', 'explore', secret=SECRET)
+
+        assert decode_cursor(token, 'explore', secret=SECRET)[0] == PUBLISHED_AT
+
+    def test_tampered_token_rejected(self):
+        """Test that changing the payload invalidates the signature."""
+        token = encode_cursor(PUBLISHED_AT, 'creation-1', 'explore', secret=SECRET)
+        forged = encode_cursor(PUBLISHED_AT, 'creation-2', 'explore', secret='other')
+        payload = forged.split('.')[0]
+
+        assert decode_cursor(f"{payload}.{token.split('.')[1]}", 'explore', secret=SECRET) is None
+
+    def test_scope_mismatch_rejected(self):
+        """Test that a cursor can't be replayed on another endpoint."""
+        token = encode_cursor(PUBLISHED_AT, 'creation-1', 'explore', secret=SECRET)
+
+        assert decode_cursor(token, 'comments', secret=SECRET) is None
+
+    def test_legacy_id_is_not_a_token(self):
+        """Test that plain document IDs don't decode."""
+        assert decode_cursor('0b9c2f1e-5d0a-4d57-9a55-3f1c7f6a2e10', 'explore', secret=SECRET) is None
+
+
+class TestApplyCursor:
+    """Test suite for apply_cursor with a mock query."""
+
+    @pytest.fixture(autouse=True)
+    def secret(self, monkeypatch):
+        monkeypatch.setattr('config.settings.SECRET_KEY', SECRET)
+
+    @pytest.fixture
+    def collection(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def query(self):
+        return MagicMock()
+
+    def test_token_skips_cursor_read(self, query, collection):
+        """Test that a token positions the query from its own values."""
+        token = encode_cursor(PUBLISHED_AT, 'creation-1', 'explore')
+
+        apply_cursor(query, collection, token, 'publishedAt', 'DESCENDING', 'explore')
+
+        collection.document.assert_not_called()
+        query.order_by.assert_called_once_with('__name__', direction='DESCENDING')
+        query.order_by.return_value.start_after.assert_called_once_with(
+            {'publishedAt': PUBLISHED_AT, '__name__': 'creation-1'}
+        )
+
+    def test_legacy_id_still_works(self, query, collection):
+        """Test that an old document-ID cursor falls back to the read."""
+        cursor_doc = collection.document.return_value.get.return_value
+        cursor_doc.exists = True
+
+        apply_cursor(query, collection, 'creation-1', 'publishedAt', 'DESCENDING', 'explore')
+
+        collection.document.assert_called_once_with('creation-1')
+        query.start_after.assert_called_once_with(cursor_doc)
+
+    def test_legacy_ids_can_be_disabled(self, query, collection, monkeypatch):
+        """Test that CURSOR_ACCEPT_LEGACY_IDS=0 ends the transition."""
+        monkeypatch.setenv('CURSOR_ACCEPT_LEGACY_IDS', '0')
+
+        assert apply_cursor(query, collection, 'creation-1', 'publishedAt', 'DESCENDING', 'explore') is query
+        assert cursor_doc_id('creation-1', 'explore') is None
+        collection.document.assert_not_called()
+
+    def test_cursor_doc_id(self):
+        """Test that the feed cache can look up either cursor form."""
+        token = encode_cursor(PUBLISHED_AT, 'creation-1', 'explore')
+
+        assert cursor_doc_id(token, 'explore') == 'creation-1'
+        assert cursor_doc_id('creation-2', 'explore') == 'creation-2'
+        assert cursor_doc_id(None, 'explore') is None
@@ -0,0 +1,134 @@
+"""
+Tests for the materialized Explore feed cache.
+
+These tests verify that the first pages of the feed are served from one
+cached window per page size, that deeper pages fall back to Firestore, and
+that invalidation (publish, caption edit, account deletion) forces a rebuild
+on every instance sharing the cache backend.
+
+Run with: pytest tests/test_feed_cache.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.cache_service.memory_backend import MemoryCache
+from services.feed_cache import ExploreFeedCache
+
+
+def make_doc(i):
+    doc = MagicMock()
+    doc.id = f'c{i}'
+    doc.to_dict.return_value = {
+        'userId': f'u{i % 3}',
+        'username': f'user{i % 3}',
+        'prompt': f'secret prompt {i}',
+        'mediaUrl': f'https://cdn.example.com/{i}.mp4',
+        'status': 'published',
+        'publishedAt': datetime(2025, 1, 1, tzinfo=timezone.utc) - timedelta(minutes=i),
+    }
+    return doc
+
+
+class TestExploreFeedCache:
+    """Test suite for ExploreFeedCache."""
+
+    @pytest.fixture
+    def published(self):
+        """Published creations, newest first."""
+        return [make_doc(i) for i in range(10)]
+
+    @pytest.fixture
+    def mock_db(self, published):
+        db = MagicMock()
+        query = db.collection.return_value.where.return_value.order_by.return_value.select.return_value
+
+        def limited(n):
+            result = MagicMock()
+            result.stream.side_effect = lambda: iter(published[:n])
+            return result
+
+        query.limit.side_effect = limited
+        return db
+
+    @pytest.fixture
+    def shared(self):
+        return MemoryCache()
+
+    @pytest.fixture
+    def feed_cache(self, mock_db, shared):
+        return ExploreFeedCache(db=mock_db, cache=shared, pages=2, ttl=60, local_ttl=5)
+
+    def test_first_pages_share_one_query(self, feed_cache, mock_db):
+        """Test that pages 1..K come from a single window query."""
+        first, has_more = feed_cache.get_page(3)
+        second, _ = feed_cache.get_page(3, cursor=first[-1]['creationId'])
+
+        assert [i['creationId'] for i in first] == ['c0', 'c1', 'c2']
+        assert [i['creationId'] for i in second] == ['c3', 'c4', 'c5']
+        assert has_more is True
+        query = mock_db.collection.return_value.where.return_value.order_by.return_value.select.return_value
+        query.limit.assert_called_once_with(7)  # pages * limit + 1
+        assert feed_cache.get_stats()['builds'] == 1
+
+    def test_repeat_views_are_local(self, feed_cache, shared):
+        """Test that a repeat view doesn't touch the shared backend."""
+        feed_cache.get_page(3)
+        shared.get = MagicMock(side_effect=AssertionError('shared backend read'))
+
+        items, _ = feed_cache.get_page(3)
+
+        assert len(items) == 3
+
+    def test_deep_page_falls_back(self, feed_cache):
+        """Test that a page past the window (or unknown cursor) is a miss."""
+        assert feed_cache.get_page(3, cursor='c5') is None
+        assert feed_cache.get_page(3, cursor='not-cached') is None
+        assert feed_cache.get_stats()['window_misses'] == 2
+
+    def test_short_feed_is_complete(self, feed_cache, published):
+        """Test that the window knows when it holds the whole feed."""
+        del published[4:]
+
+        items, has_more = feed_cache.get_page(3, cursor='c2')
+
+        assert [i['creationId'] for i in items] == ['c3']
+        assert has_more is False
+
+    def test_page_sizes_are_cached_separately(self, feed_cache):
+        """Test that each limit gets its own window."""
+        feed_cache.get_page(3)
+        feed_cache.get_page(5)
+
+        assert feed_cache.get_stats()['builds'] == 2
+
+    def test_prompt_is_kept_for_privacy_filtering(self, feed_cache):
+        """Test that cached items keep the prompt for the owner check."""
+        items, _ = feed_cache.get_page(3)
+
+        assert items[0]['prompt'] == 'secret prompt 0'
+        assert items[0]['userId'] == 'u0'
+
+    def test_invalidate_rebuilds_on_every_instance(self, mock_db, shared, published):
+        """Test that invalidation reaches other instances through the shared backend."""
+        instance_a = ExploreFeedCache(db=mock_db, cache=shared, pages=2, local_ttl=0)
+        instance_b = ExploreFeedCache(db=mock_db, cache=shared, pages=2, local_ttl=0)
+        instance_a.get_page(3)
+        assert instance_b.get_page(3)[0][0]['creationId'] == 'c0'
+        assert instance_b.get_stats()['builds'] == 0  # served from the shared window
+
+        published.insert(0, make_doc(99))
+        instance_a.invalidate('published c99')
+
+        assert instance_b.get_page(3)[0][0]['creationId'] == 'c99'
+
+    def test_backend_error_falls_back(self, mock_db):
+        """Test that a broken cache backend lets the route query Firestore."""
+        broken = MagicMock()
+        broken.get.side_effect = Exception('unavailable')
+        feed_cache = ExploreFeedCache(db=mock_db, cache=broken)
+
+        assert feed_cache.get_page(3) is None
+        assert feed_cache.get_stats()['errors'] == 1
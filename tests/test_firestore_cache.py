@@ -0,0 +1,138 @@
+"""
+Tests for FirestoreCache multi-key operations.
+
+These tests verify that get_many/set_many/delete_many use get_all and
+batched writes (max 500 operations per batch) instead of one RPC per key.
+
+Run with: pytest tests/test_firestore_cache.py -v
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from services.cache_service.access_tracker import MAX_BATCH_SIZE
+from services.cache_service.interface import CacheServiceInterface
+
+
+def make_snapshot(key, data=None, expires_in=3600):
+    doc = MagicMock()
+    doc.id = key
+    doc.exists = data is not None
+    doc.to_dict.return_value = {
+        'data': data,
+        'expires_at': datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+    }
+    return doc
+
+
+class TestFirestoreCacheBatch:
+    """Test suite for FirestoreCache batch operations."""
+
+    @pytest.fixture
+    def mock_db(self):
+        with patch('services.cache_service.firestore_backend.firestore.client') as client:
+            yield client.return_value
+
+    @pytest.fixture
+    def cache(self, mock_db):
+        from services.cache_service.firestore_backend import FirestoreCache
+        return FirestoreCache("cache_test", track_access=False)
+
+    def test_get_many_uses_single_get_all(self, cache, mock_db):
+        """Test that hits are returned from one get_all call."""
+        mock_db.get_all.return_value = [
+            make_snapshot("a", {"v": 1}),
+            make_snapshot("b", None),
+        ]
+
+        assert cache.get_many(["a", "b", "a"]) == {"a": {"v": 1}}
+        mock_db.get_all.assert_called_once()
+        assert len(mock_db.get_all.call_args[0][0]) == 2
+        mock_db.collection.return_value.document.return_value.get.assert_not_called()
+
+    def test_get_many_drops_and_deletes_expired(self, cache, mock_db):
+        """Test that expired entries are misses and are batch-deleted."""
+        mock_db.get_all.return_value = [
+            make_snapshot("fresh", {"v": 1}),
+            make_snapshot("stale", {"v": 2}, expires_in=-10),
+        ]
+
+        assert cache.get_many(["fresh", "stale"]) == {"fresh": {"v": 1}}
+        batch = mock_db.batch.return_value
+        batch.delete.assert_called_once()
+        batch.commit.assert_called_once()
+
+    def test_get_many_chunks_large_requests(self, cache, mock_db):
+        """Test that more than 500 keys are split across get_all calls."""
+        mock_db.get_all.return_value = []
+
+        cache.get_many([f"k{i}" for i in range(MAX_BATCH_SIZE + 1)])
+
+        assert mock_db.get_all.call_count == 2
+
+    def test_set_many_respects_per_key_ttl(self, cache, mock_db):
+        """Test that set_many writes one batch with per-entry expiry."""
+        cache.set_many({"a": {"v": 1}, "b": {"v": 2}}, ttl=3600, ttls={"b": 60})
+
+        batch = mock_db.batch.return_value
+        assert batch.set.call_count == 2
+        batch.commit.assert_called_once()
+        entries = [c.args[1] for c in batch.set.call_args_list]
+        lifetimes = sorted((e['expires_at'] - e['created_at']).total_seconds() for e in entries)
+        assert lifetimes == [60, 3600]
+
+    def test_set_many_chunks_at_batch_limit(self, cache, mock_db):
+        """Test that more than 500 entries are split across batches."""
+        cache.set_many({f"k{i}": {"v": i} for i in range(MAX_BATCH_SIZE + 1)})
+
+        assert mock_db.batch.call_count == 2
+
+    def test_set_many_reports_failure(self, cache, mock_db):
+        """Test that a failed commit returns False."""
+        mock_db.batch.return_value.commit.side_effect = Exception("unavailable")
+
+        assert cache.set_many({"a": {"v": 1}}) is False
+
+    def test_delete_many_is_blind_batched(self, cache, mock_db):
+        """Test that delete_many does no reads and commits one batch."""
+        assert cache.delete_many(["a", "b", "a"]) == 2
+
+        batch = mock_db.batch.return_value
+        assert batch.delete.call_count == 2
+        mock_db.collection.return_value.document.return_value.get.assert_not_called()
+
+
+class TestInterfaceDefaults:
+    """Test the default multi-key implementations on the interface."""
+
+    class DictCache(CacheServiceInterface):
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def set(self, key, value, ttl=2592000):
+            self.data[key] = value
+            return True
+
+        def delete(self, key):
+            return self.data.pop(key, None) is not None
+
+        def exists(self, key):
+            return key in self.data
+
+        def update_access_time(self, key):
+            return key in self.data
+
+        def get_metadata(self, key):
+            return None
+
+    def test_defaults_loop_over_single_key_methods(self):
+        """Test that backends without overrides still support batch calls."""
+        cache = self.DictCache()
+
+        assert cache.set_many({"a": {"v": 1}, "b": {"v": 2}})
+        assert cache.get_many(["a", "c"]) == {"a": {"v": 1}}
+        assert cache.delete_many(["a", "b", "c"]) == 2
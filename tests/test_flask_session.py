@@ -0,0 +1,160 @@
+"""
+Tests for lazy session loading in CacheSessionInterface.
+
+These tests verify that requests which never touch the session skip the
+cache backend entirely, and that read-only requests only re-save the session
+(and rewrite the cookie) once its remaining TTL drops below the threshold.
+
+Run with: pytest tests/test_flask_session.py -v
+"""
+
+import time
+
+import pytest
+from flask import Flask, jsonify, session
+
+from services.cache_service.codec import MsgpackSessionCodec
+from services.cache_service.flask_adapter import CacheSessionInterface, EPHEMERAL_SID_PREFIX
+from services.cache_service.memory_backend import MemoryCache
+
+
+COOKIE_NAME = '__session'
+PREFIX = 'test:session:'
+LIFETIME = 30 * 86400
+
+
+def build_app():
+    app = Flask(__name__)
+    app.secret_key = 'test-secret'
+    app.config['SESSION_COOKIE_NAME'] = COOKIE_NAME
+
+    cache = MemoryCache()
+    app.session_interface = CacheSessionInterface(
+        key_prefix=PREFIX, permanent_lifetime=LIFETIME, cache=cache, refresh_interval=86400
+    )
+
+    @app.route('/asset')
+    def asset():
+        return 'ok'
+
+    @app.route('/me')
+    def me():
+        return jsonify({'user_id': session.get('user_id')})
+
+    @app.route('/login', methods=['POST'])
+    def login():
+        session.permanent = True
+        session['user_id'] = 'u1'
+        return jsonify({'success': True})
+
+    @app.route('/logout', methods=['POST'])
+    def logout():
+        session.clear()
+        return jsonify({'success': True})
+
+    return app, cache
+
+
+def set_cookie_headers(resp):
+    return [h for h in resp.headers.getlist('Set-Cookie') if h.startswith(COOKIE_NAME)]
+
+
+class TestLazySession:
+    """Test suite for lazy session loading."""
+
+    @pytest.fixture
+    def app_and_cache(self):
+        return build_app()
+
+    @pytest.fixture
+    def cache(self, app_and_cache):
+        return app_and_cache[1]
+
+    @pytest.fixture
+    def client(self, app_and_cache):
+        client = app_and_cache[0].test_client()
+        client.post('/login')
+        return client
+
+    def _sid(self, client):
+        return client.get_cookie(COOKIE_NAME).value
+
+    def test_login_stores_expiry_with_session(self, client, cache):
+        """Test that the stored value records its own expiry."""
+        stored = cache.get(f"{PREFIX}{self._sid(client)}")
+
+        assert MsgpackSessionCodec().loads(stored['session_data'])['user_id'] == 'u1'
+        assert stored['expires_at'] == pytest.approx(time.time() + LIFETIME, abs=5)
+
+    def test_untouched_session_skips_backend(self, client, cache):
+        """Test that a request that never reads the session does no I/O."""
+        before = cache.get_stats()
+
+        resp = client.get('/asset')
+
+        after = cache.get_stats()
+        assert after['reads'] == before['reads']
+        assert after['writes'] == before['writes']
+        assert set_cookie_headers(resp) == []
+
+    def test_read_only_session_is_not_resaved(self, client, cache):
+        """Test that reading a fresh session costs one read and no write."""
+        before = cache.get_stats()
+
+        resp = client.get('/me')
+
+        after = cache.get_stats()
+        assert resp.get_json()['user_id'] == 'u1'
+        assert after['reads'] == before['reads'] + 1
+        assert after['writes'] == before['writes']
+        assert set_cookie_headers(resp) == []
+
+    def test_session_refreshed_when_ttl_crosses_threshold(self, client, cache):
+        """Test that a read-only session is extended once it has aged past the threshold."""
+        key = f"{PREFIX}{self._sid(client)}"
+        stored = cache.get(key)
+        stored['expires_at'] = time.time() + LIFETIME - 2 * 86400
+        cache.set(key, stored, ttl=LIFETIME)
+        writes = cache.get_stats()['writes']
+
+        resp = client.get('/me')
+
+        assert cache.get_stats()['writes'] == writes + 1
+        assert len(set_cookie_headers(resp)) == 1
+        assert cache.get(key)['expires_at'] == pytest.approx(time.time() + LIFETIME, abs=5)
+
+    def test_legacy_entry_without_expiry_is_rewritten_once(self, client, cache):
+        """Test that sessions stored before expiry tracking get it on next read."""
+        key = f"{PREFIX}{self._sid(client)}"
+        cache.set(key, {'session_data': cache.get(key)['session_data']}, ttl=LIFETIME)
+        writes = cache.get_stats()['writes']
+
+        client.get('/me')
+        client.get('/me')
+
+        assert cache.get_stats()['writes'] == writes + 1
+
+    def test_logout_deletes_session(self, client, cache):
+        """Test that clearing the session removes it and its cookie."""
+        key = f"{PREFIX}{self._sid(client)}"
+
+        resp = client.post('/logout')
+
+        assert cache.get(key) is None
+        assert 'Expires=Thu, 01 Jan 1970' in set_cookie_headers(resp)[0]
+
+    def test_stale_cookie_is_dropped_and_not_reused(self, app_and_cache, cache):
+        """Test that an unknown sid is read once, then the cookie is removed."""
+        client = app_and_cache[0].test_client()
+        planted = '11111111-2222-4333-8444-555555555555'
+        client.set_cookie(COOKIE_NAME, planted)
+
+        resp = client.get('/me')
+        assert 'Expires=Thu, 01 Jan 1970' in set_cookie_headers(resp)[0]
+
+        client.set_cookie(COOKIE_NAME, planted)
+        client.post('/login')
+        new_sid = self._sid(client)
+        assert new_sid != planted
+        assert not new_sid.startswith(EPHEMERAL_SID_PREFIX)
+        assert cache.get(f"{PREFIX}{planted}") is None
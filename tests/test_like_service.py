@@ -0,0 +1,141 @@
+"""
+Tests for the like service.
+
+These tests verify that likes and unlikes are idempotent single batches on
+deterministic edge IDs, that counts are spread over shard documents and
+summed on read, that the creation's likeCount roll-up is throttled, and
+that isLiked for a page is one get_all.
+
+Run with: pytest tests/test_like_service.py -v
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.like_service import CreationNotLikeableError, LikeService
+
+
+class TestLikeService:
+    """Test suite for LikeService."""
+
+    @pytest.fixture
+    def db(self, fake_firestore):
+        fake_firestore.docs.update({
+            'creations/c1': {'status': 'published', 'likeCount': 0},
+            'creations/draft': {'status': 'draft'},
+        })
+        return fake_firestore
+
+    @pytest.fixture
+    def service(self, db):
+        return LikeService(db=db, shard_count=4, rollup_interval=60)
+
+    def shard_docs(self, db):
+        return {path: doc for path, doc in db.docs.items() if '/like_shards/' in path}
+
+    def test_like_writes_edge_and_shard(self, service, db):
+        """Test that a like is one batch: a deterministic edge plus one shard increment."""
+        result = service.like('u1', 'c1')
+
+        assert result == {'liked': True, 'likeCount': 1}
+        assert len(db.commits) == 1
+        assert db.docs['likes/u1_c1']['userId'] == 'u1'
+        assert db.docs['likes/u1_c1']['creationId'] == 'c1'
+        assert sum(doc['count'] for doc in self.shard_docs(db).values()) == 1
+
+    def test_like_is_idempotent(self, service, db):
+        """Test that liking twice counts once."""
+        service.like('u1', 'c1')
+        result = service.like('u1', 'c1')
+
+        assert result['likeCount'] == 1
+        assert service.get_stats()['duplicates'] == 1
+
+    def test_unlike_is_idempotent(self, service, db):
+        """Test that unliking twice (or without a like) never goes negative."""
+        service.like('u1', 'c1')
+        service.unlike('u1', 'c1')
+        result = service.unlike('u1', 'c1')
+
+        assert result == {'liked': False, 'likeCount': 0}
+        assert 'likes/u1_c1' not in db.docs
+        assert service.get_stats()['unlikes'] == 1
+
+    def test_count_sums_shards(self, service, db):
+        """Test that likes spread over shards and the total is one get_all."""
+        for i in range(20):
+            service.like(f'u{i}', 'c1')
+        db.get_all_calls.clear()
+
+        assert service.get_like_count('c1') == 20
+        assert len(self.shard_docs(db)) > 1
+        assert len(db.get_all_calls) == 1
+        assert len(db.get_all_calls[0]) == 4
+
+    def test_rollup_is_throttled(self, service, db):
+        """Test that likeCount on the creation is rewritten once per interval."""
+        service.like('u1', 'c1')
+        service.like('u2', 'c1')
+        service.like('u3', 'c1')
+
+        assert db.docs['creations/c1']['likeCount'] == 1
+        assert service.get_stats()['rollups'] == 1
+
+    def test_trailing_rollup(self, db):
+        """Test that a burst's last likes reach likeCount after the interval."""
+        service = LikeService(db=db, shard_count=4, rollup_interval=0.05)
+        service.like('u1', 'c1')
+        service.like('u2', 'c1')
+
+        service._trailing_roll_up('c1')  # What the scheduled timer runs
+
+        assert db.docs['creations/c1']['likeCount'] == 2
+
+    def test_only_published_creations(self, service, db):
+        """Test that drafts and missing creations can't be liked."""
+        with pytest.raises(CreationNotLikeableError):
+            service.like('u1', 'draft')
+        with pytest.raises(CreationNotLikeableError):
+            service.like('u1', 'missing')
+
+        assert db.commits == []
+
+    def test_is_liked_is_one_get_all(self, service, db):
+        """Test that a page resolves isLiked with a single get_all of edge IDs."""
+        db.docs['creations/c2'] = {'status': 'published'}
+        service.like('u1', 'c2')
+        db.get_all_calls.clear()
+        items = [{'creationId': 'c1'}, {'creationId': 'c2'}, {'creationId': 'c3'}]
+
+        result = service.attach_is_liked(items, 'u1')
+
+        assert [item['isLiked'] for item in result] == [False, True, False]
+        assert db.get_all_calls == [['likes/u1_c1', 'likes/u1_c2', 'likes/u1_c3']]
+        assert 'isLiked' not in items[0]  # Cached items are not modified
+
+    def test_anonymous_viewers_get_no_is_liked(self, service, db):
+        """Test that anonymous pages skip the lookup."""
+        items = [{'creationId': 'c1'}]
+
+        assert service.attach_is_liked(items, None) is items
+        assert db.get_all_calls == []
+
+    def test_lookup_error_returns_items(self, service, db):
+        """Test that a failed lookup doesn't fail the response."""
+        db.get_all = MagicMock(side_effect=Exception('unavailable'))
+        items = [{'creationId': 'c1'}]
+
+        assert service.attach_is_liked(items, 'u1') is items
+
+    def test_remove_all_likes(self, service, db):
+        """Test that account deletion withdraws the user's likes and their counts."""
+        db.docs['creations/c2'] = {'status': 'published'}
+        service.like('u1', 'c1')
+        service.like('u1', 'c2')
+        service.like('u2', 'c1')
+
+        assert service.remove_all_likes('u1') == 2
+        assert service.get_like_count('c1') == 1
+        assert service.get_like_count('c2') == 0
+        assert 'likes/u2_c1' in db.docs
@@ -0,0 +1,168 @@
+"""
+Tests for single-transaction rate limit evaluation.
+
+These tests verify that FirestoreLimiterStorage.incr_many reads every limit
+document with one get_all and commits once, and that install_limit_prefetch
+makes Flask-Limiter's per-limit incr() calls free within a request.
+
+Run with: pytest tests/test_limiter_batching.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask, request
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+
+def make_snapshot(doc_id, count=None, expires_in=3600):
+    snap = MagicMock()
+    snap.id = doc_id
+    snap.exists = count is not None
+    snap.to_dict.return_value = {
+        'count': count,
+        'expiry': datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+    }
+    return snap
+
+
+@pytest.fixture
+def mock_db():
+    with patch('services.cache_service.limiter_storage.firestore.client') as client, \
+            patch('services.cache_service.limiter_storage.firestore.transactional', lambda fn: fn):
+        yield client.return_value
+
+
+class TestIncrMany:
+    """Test suite for FirestoreLimiterStorage.incr_many."""
+
+    @pytest.fixture
+    def storage(self, mock_db):
+        from services.cache_service.limiter_storage import FirestoreLimiterStorage
+        return FirestoreLimiterStorage(collection_name='rate_limits_test')
+
+    def test_one_read_one_commit(self, storage, mock_db):
+        """Test that all keys are read together and written in one transaction."""
+        transaction = mock_db.transaction.return_value
+        transaction.get_all.return_value = [make_snapshot('LIMITER__ip__day', 7)]
+
+        results = storage.incr_many([
+            ('LIMITER/ip/hour', 3600, 1, 50),
+            ('LIMITER/ip/day', 86400, 1, 200),
+        ])
+
+        assert results == {'LIMITER/ip/hour': 1, 'LIMITER/ip/day': 8}
+        transaction.get_all.assert_called_once()
+        assert len(transaction.get_all.call_args[0][0]) == 2
+        transaction.set.assert_called_once()
+        transaction.update.assert_called_once()
+        mock_db.collection.return_value.document.return_value.get.assert_not_called()
+
+    def test_stops_after_first_breach(self, storage, mock_db):
+        """Test that limits after a breached one are not charged."""
+        transaction = mock_db.transaction.return_value
+        transaction.get_all.return_value = [make_snapshot('LIMITER__ip__minute', 5)]
+
+        results = storage.incr_many([
+            ('LIMITER/ip/minute', 60, 1, 5),
+            ('LIMITER/ip/hour', 3600, 1, 50),
+        ])
+
+        assert results == {'LIMITER/ip/minute': 6}
+        transaction.set.assert_not_called()
+        transaction.update.assert_called_once()
+
+    def test_expired_window_restarts(self, storage, mock_db):
+        """Test that an expired document starts a fresh window."""
+        transaction = mock_db.transaction.return_value
+        transaction.get_all.return_value = [make_snapshot('LIMITER__ip__hour', 49, expires_in=-1)]
+
+        assert storage.incr_many([('LIMITER/ip/hour', 3600, 1, 50)]) == {'LIMITER/ip/hour': 1}
+        assert transaction.set.call_args[0][1]['count'] == 1
+
+    def test_error_returns_empty(self, storage, mock_db):
+        """Test that a failed transaction lets callers fall back to incr."""
+        mock_db.transaction.return_value.get_all.side_effect = Exception('contention')
+
+        assert storage.incr_many([('LIMITER/ip/hour', 3600, 1, 50)]) == {}
+
+    def test_prefetched_counts_are_served_once(self, storage, mock_db):
+        """Test that incr() uses a prefetched count, then goes back to Firestore."""
+        mock_db.transaction.return_value.get_all.return_value = []
+        storage.prefetch([('LIMITER/ip/hour', 3600, 1, 50), ('LIMITER/ip/day', 86400, 1, 200)])
+        calls = mock_db.transaction.call_count
+
+        assert storage.incr('LIMITER/ip/hour', 3600) == 1
+        assert mock_db.transaction.call_count == calls
+
+        storage.clear_prefetch()
+        storage.incr('LIMITER/ip/day', 86400)
+        assert mock_db.transaction.call_count == calls + 1
+
+
+class TestLimitPrefetch:
+    """Test install_limit_prefetch with a real Flask-Limiter."""
+
+    @pytest.fixture
+    def app(self, mock_db):
+        from services.cache_service.limiter_storage import install_limit_prefetch
+        mock_db.transaction.return_value.get_all.return_value = []
+
+        app = Flask(__name__)
+        limiter = Limiter(
+            app=app,
+            key_func=get_remote_address,
+            default_limits=["200 per day", "50 per hour"],
+            storage_uri="firestore://",
+            storage_options={"collection_name": "rate_limits_test"},
+        )
+
+        @app.route('/transfer', methods=['POST'])
+        def transfer():
+            return 'ok'
+
+        @app.route('/feed')
+        def feed():
+            return 'ok'
+
+        @app.before_request
+        def redirect_setup():
+            if request.args.get('setup'):
+                return 'redirected', 302
+
+        app.view_functions['transfer'] = limiter.limit("5 per hour", override_defaults=False)(
+            app.view_functions['transfer']
+        )
+        assert install_limit_prefetch(app, limiter)
+        return app
+
+    @pytest.mark.parametrize('method,path,limits', [('post', '/transfer', 3), ('get', '/feed', 2)])
+    def test_one_transaction_per_request(self, app, mock_db, method, path, limits):
+        """Test that every limit of a request is charged in a single transaction."""
+        transaction = mock_db.transaction.return_value
+
+        resp = getattr(app.test_client(), method)(path)
+
+        assert resp.status_code == 200
+        assert mock_db.transaction.call_count == 1
+        assert transaction.set.call_count == limits
+
+    def test_answered_before_the_view_charges_nothing(self, app, mock_db):
+        """Test that a request another before_request hook answers isn't charged."""
+        resp = app.test_client().get('/feed?setup=1')
+
+        assert resp.status_code == 302
+        assert mock_db.transaction.call_count == 0
+
+    def test_route_limit_enforced(self, app, mock_db):
+        """Test that a breached route limit still rejects the request."""
+        mock_db.transaction.return_value.get_all.side_effect = lambda refs: [
+            make_snapshot(ref.id, 5) for ref in refs if ref.id.endswith('transfer__5__1__hour')
+        ]
+        mock_db.collection.return_value.document.side_effect = lambda doc_id: MagicMock(id=doc_id)
+
+        resp = app.test_client().post('/transfer')
+
+        assert resp.status_code == 429
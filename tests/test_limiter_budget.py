@@ -0,0 +1,177 @@
+"""
+Tests for the latency-budgeted limiter storage.
+
+These tests verify that slow or failing Firestore calls are answered by the
+conservative in-memory fallback, that repeated failures open the circuit
+breaker, that a successful check() probe closes it, and that the breaker
+state is exposed through get_stats().
+
+Run with: pytest tests/test_limiter_budget.py -v
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.strategies import FixedWindowRateLimiter
+
+
+KEY = 'LIMITER/203.0.113.7/5/1/minute'
+
+
+class TestBudgetedLimiterStorage:
+    """Test suite for BudgetedLimiterStorage."""
+
+    @pytest.fixture
+    def storage(self):
+        with patch('services.cache_service.limiter_storage.firestore.client'):
+            from services.cache_service.limiter_storage import BudgetedLimiterStorage
+            storage = BudgetedLimiterStorage(
+                collection_name='rate_limits_test', latency_budget=0.05,
+                failure_threshold=3, probe_interval=0, fallback_cost=2
+            )
+        storage.primary = MagicMock()
+        yield storage
+        storage._executor.shutdown(wait=False)
+        storage._probe_executor.shutdown(wait=False)
+
+    def _slow(self, *args, **kwargs):
+        time.sleep(0.2)
+        return 1
+
+    def test_fast_primary_is_used(self, storage):
+        """Test that calls within budget return Firestore's answer."""
+        storage.primary.incr.return_value = 7
+
+        assert storage.incr(KEY, 60) == 7
+        stats = storage.get_stats()
+        assert stats['primary_calls'] == 1
+        assert stats['fallback_calls'] == 0
+
+    def test_slow_primary_falls_back(self, storage):
+        """Test that a call over budget is answered locally."""
+        storage.primary.incr.side_effect = self._slow
+
+        start = time.monotonic()
+        assert storage.incr(KEY, 60) == 1
+        assert time.monotonic() - start < 0.2
+
+        stats = storage.get_stats()
+        assert stats['timeouts'] == 1
+        assert stats['fallback_calls'] == 1
+        assert stats['state'] == 'closed'
+
+    def test_late_primary_commit_is_counted_once(self, storage):
+        """Test that a timed-out incr that still commits takes the local hit back."""
+        storage.primary.incr.side_effect = self._slow
+
+        assert storage.incr(KEY, 60) == 1
+        storage._executor.shutdown(wait=True)
+
+        assert storage.fallback.get(KEY) == 0
+        assert storage.get_stats()['late_commits'] == 1
+
+    def test_late_primary_failure_keeps_local_hit(self, storage):
+        """Test that a timed-out incr that fails leaves the fallback as the only count."""
+        def slow_failure(*args, **kwargs):
+            time.sleep(0.2)
+            raise Exception('deadline exceeded')
+        storage.primary.incr.side_effect = slow_failure
+
+        storage.incr(KEY, 60)
+        storage._executor.shutdown(wait=True)
+
+        assert storage.fallback.get(KEY) == 1
+        assert storage.get_stats()['late_commits'] == 0
+
+    def test_probe_does_not_queue_behind_stuck_calls(self, storage):
+        """Test that the health probe runs even when every pool thread is stuck."""
+        release = threading.Event()
+        storage._executor = ThreadPoolExecutor(max_workers=1)
+        storage._executor.submit(release.wait)
+        storage.primary.incr.side_effect = Exception('unavailable')
+        storage.primary.check.return_value = True
+        storage.state = storage.OPEN
+
+        storage.incr(KEY, 60)  # Answered locally; starts the probe
+        storage._probe_executor.shutdown(wait=True)
+        release.set()
+
+        assert storage.get_stats()['state'] == 'closed'
+
+    def test_fallback_is_conservative(self, storage):
+        """Test that the local fallback lets about limit / fallback_cost through."""
+        storage.primary.incr.side_effect = Exception('unavailable')
+        storage.primary.get_expiry.side_effect = Exception('unavailable')
+        storage.primary.check.return_value = False
+        limiter = FixedWindowRateLimiter(storage)
+        item = RateLimitItemPerMinute(5)
+
+        assert [limiter.hit(item, 'u1') for _ in range(5)] == [True, True, True, False, False]
+
+    def test_breaker_opens_after_threshold(self, storage):
+        """Test that consecutive failures stop calls to Firestore."""
+        storage.probe_interval = 60
+        storage.primary.incr.side_effect = Exception('unavailable')
+
+        for _ in range(3):
+            storage.incr(KEY, 60)
+        assert storage.get_stats()['state'] == 'open'
+        assert storage.get_stats()['trips'] == 1
+
+        storage.incr(KEY, 60)
+        assert storage.primary.incr.call_count == 3
+
+    def test_probe_closes_breaker(self, storage):
+        """Test that a healthy check() puts Firestore back on the request path."""
+        storage.primary.incr.side_effect = Exception('unavailable')
+        storage.primary.check.return_value = True
+        for _ in range(3):
+            storage.incr(KEY, 60)
+
+        storage.incr(KEY, 60)  # Answered locally; starts the probe
+        storage._probe_executor.shutdown(wait=True)
+
+        stats = storage.get_stats()
+        assert stats['probes'] == 1
+        assert stats['state'] == 'closed'
+        assert stats['consecutive_failures'] == 0
+
+    def test_failed_probe_stays_open(self, storage):
+        """Test that an unhealthy check() keeps the fallback in place."""
+        storage.primary.incr.side_effect = Exception('unavailable')
+        storage.primary.check.return_value = False
+        for _ in range(4):
+            storage.incr(KEY, 60)
+        storage._probe_executor.shutdown(wait=True)
+
+        assert storage.get_stats()['state'] == 'open'
+
+    def test_primary_raises_instead_of_failing_open(self):
+        """Test that the wrapped storage surfaces errors rather than returning 1."""
+        with patch('services.cache_service.limiter_storage.firestore.client') as client:
+            from services.cache_service.limiter_storage import FirestoreLimiterStorage
+            client.return_value.transaction.side_effect = Exception('deadline exceeded')
+            client.return_value.collection.return_value.document.return_value.get.side_effect = \
+                Exception('deadline exceeded')
+            storage = FirestoreLimiterStorage(collection_name='rate_limits_test', fail_open=False)
+
+            with pytest.raises(Exception, match='deadline exceeded'):
+                storage.incr(KEY, 60)
+
+    def test_budget_config(self, monkeypatch):
+        """Test that RATE_LIMIT_LATENCY_BUDGET_MS selects the budgeted storage."""
+        from services.cache_service.limiter_storage import get_limiter_storage_config
+        monkeypatch.setenv('CACHE_BACKEND', 'firestore')
+        monkeypatch.delenv('RATE_LIMIT_MODE', raising=False)
+        monkeypatch.setenv('RATE_LIMIT_LATENCY_BUDGET_MS', '150')
+
+        with patch('services.cache_service.limiter_storage.register_firestore_storage'):
+            uri, options = get_limiter_storage_config()
+
+        assert uri == 'firestore+budget://'
+        assert options['latency_budget'] == 0.15
+        assert options['fallback_cost'] == 2
@@ -0,0 +1,156 @@
+"""
+Tests for hot-key sharding in FirestoreLimiterStorage.
+
+These tests verify that a key hit faster than the promotion threshold (or
+whose transaction fails) is counted with blind increments on shard
+documents, and that reads aggregate the base document and its shards.
+
+Run with: pytest tests/test_limiter_sharding.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+KEY = 'LIMITER/203.0.113.7/feed/50/1/hour'
+DOC_KEY = 'LIMITER__203.0.113.7__feed__50__1__hour'
+
+
+def make_snapshot(doc_id, data):
+    snap = MagicMock()
+    snap.id = doc_id
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+class TestHotKeySharding:
+    """Test suite for sharded rate limit counters."""
+
+    @pytest.fixture
+    def docs(self):
+        """Stored documents by ID."""
+        return {}
+
+    @pytest.fixture
+    def mock_db(self, docs):
+        with patch('services.cache_service.limiter_storage.firestore.client') as client, \
+                patch('services.cache_service.limiter_storage.firestore.transactional', lambda fn: fn):
+            db = client.return_value
+
+            def document(doc_id):
+                ref = MagicMock()
+                ref.id = doc_id
+                ref.get.side_effect = lambda **_: make_snapshot(doc_id, docs.get(doc_id))
+                return ref
+
+            db.collection.return_value.document.side_effect = document
+            db.get_all.side_effect = lambda refs: [make_snapshot(r.id, docs.get(r.id)) for r in refs]
+            yield db
+
+    @pytest.fixture
+    def storage(self, mock_db):
+        from services.cache_service.limiter_storage import FirestoreLimiterStorage
+        return FirestoreLimiterStorage(
+            collection_name='rate_limits_test', shard_count=4, hot_key_threshold=3
+        )
+
+    def _window(self, count, shards=None):
+        data = {'count': count, 'expiry': datetime.now(timezone.utc) + timedelta(hours=1)}
+        if shards:
+            data['shards'] = shards
+        return data
+
+    def test_cold_key_uses_transaction(self, storage, mock_db):
+        """Test that keys below the threshold stay on one document."""
+        transaction = mock_db.transaction.return_value
+
+        assert storage.incr(KEY, 3600) == 1
+
+        assert 'shards' not in transaction.set.call_args[0][1]
+
+    def test_hot_key_is_promoted(self, storage, mock_db, docs):
+        """Test that crossing the threshold marks the base document as sharded."""
+        docs[DOC_KEY] = self._window(3)
+        transaction = mock_db.transaction.return_value
+        for _ in range(3):
+            storage.incr(KEY, 3600)
+        transaction.update.reset_mock()
+
+        storage.incr(KEY, 3600)
+
+        assert transaction.update.call_args[0][1]['shards'] == 4
+
+    def test_sharded_incr_skips_transaction(self, storage, mock_db, docs):
+        """Test that hits on a sharded key are blind increments plus one get_all."""
+        docs[DOC_KEY] = self._window(7, shards=4)
+        storage.incr(KEY, 3600)  # learns the key is sharded
+        window = int(docs[DOC_KEY]['expiry'].timestamp())
+        docs[f'{DOC_KEY}__{window}__shard2'] = {'count': 5}
+        transactions = mock_db.transaction.call_count
+
+        count = storage.incr(KEY, 3600)
+
+        assert mock_db.transaction.call_count == transactions
+        assert count == 12
+        refs = mock_db.get_all.call_args[0][0]
+        assert len(refs) == 5
+        assert all(r.id.startswith(f'{DOC_KEY}__{window}__shard') for r in refs[1:])
+
+    def test_failed_transaction_shards_instead_of_failing_open(self, storage, mock_db, docs):
+        """Test that contention promotes the key rather than returning 1."""
+        docs[DOC_KEY] = self._window(40)
+        mock_db.transaction.side_effect = Exception('Too much contention on these documents')
+
+        with patch.object(storage, '_incr_sharded', return_value=41) as incr_sharded:
+            assert storage.incr(KEY, 3600) == 41
+
+        assert incr_sharded.call_args[0][3] == 4
+        assert storage._sharded_window(DOC_KEY) is not None
+
+    def test_new_window_starts_unsharded(self, storage, mock_db, docs):
+        """Test that a key sharded last window is counted on one document again."""
+        docs[DOC_KEY] = {'count': 90, 'shards': 4,
+                         'expiry': datetime.now(timezone.utc) - timedelta(seconds=1)}
+        transaction = mock_db.transaction.return_value
+
+        assert storage.incr(KEY, 3600) == 1
+
+        assert 'shards' not in transaction.set.call_args[0][1]
+        assert storage._sharded_window(DOC_KEY) is None
+
+    def test_incr_many_new_window_starts_unsharded(self, storage, mock_db, docs):
+        """Test that the batched path doesn't carry the marker over either."""
+        docs[DOC_KEY] = {'count': 90, 'shards': 4,
+                         'expiry': datetime.now(timezone.utc) - timedelta(seconds=1)}
+        transaction = mock_db.transaction.return_value
+        transaction.get_all.side_effect = mock_db.get_all.side_effect
+
+        assert storage.incr_many([(KEY, 3600, 1, 50)]) == {KEY: 1}
+
+        assert 'shards' not in transaction.set.call_args[0][1]
+
+    def test_sharded_key_hit_recorded_once(self, storage, mock_db, docs):
+        """Test that a key incr_many leaves to incr() counts as one hit."""
+        docs[DOC_KEY] = self._window(7, shards=4)
+        transaction = mock_db.transaction.return_value
+        transaction.get_all.side_effect = mock_db.get_all.side_effect
+
+        with patch.object(storage, '_incr_sharded', return_value=8):
+            storage.prefetch([(KEY, 3600, 1, 50)])
+            storage.incr(KEY, 3600)
+            storage.clear_prefetch()
+
+        assert storage._hits[DOC_KEY][1] == 1
+
+    def test_get_aggregates_shards(self, storage, docs):
+        """Test that reads sum the base document and this window's shards."""
+        docs[DOC_KEY] = self._window(10, shards=4)
+        window = int(docs[DOC_KEY]['expiry'].timestamp())
+        docs[f'{DOC_KEY}__{window}__shard0'] = {'count': 3}
+        docs[f'{DOC_KEY}__{window}__shard3'] = {'count': 4}
+        docs[f'{DOC_KEY}__{window - 3600}__shard1'] = {'count': 99}  # previous window
+
+        assert storage.get(KEY) == 17
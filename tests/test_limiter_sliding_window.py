@@ -0,0 +1,149 @@
+"""
+Tests for sliding-window-counter support in FirestoreLimiterStorage.
+
+These tests verify that both sub-window counts live in one document, that
+the previous window's count is weighted by the time left in the current
+one, and that Flask-Limiter can run the sliding-window-counter strategy on
+the Firestore storage.
+
+Run with: pytest tests/test_limiter_sliding_window.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from limits import RateLimitItemPerMinute
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+
+KEY = 'LIMITER/203.0.113.7/5/1/minute'
+DOC_KEY = 'LIMITER__203.0.113.7__5__1__minute'
+WINDOW = 60 * 16_666_667  # An epoch-aligned minute
+
+
+def make_snapshot(data):
+    snap = MagicMock()
+    snap.exists = data is not None
+    snap.to_dict.return_value = data
+    return snap
+
+
+@pytest.fixture
+def docs():
+    """Stored documents by ID."""
+    return {}
+
+
+@pytest.fixture
+def mock_db(docs):
+    with patch('services.cache_service.limiter_storage.firestore.client') as client, \
+            patch('services.cache_service.limiter_storage.firestore.transactional', lambda fn: fn):
+        db = client.return_value
+
+        def document(doc_id):
+            ref = MagicMock()
+            ref.id = doc_id
+            ref.get.side_effect = lambda **_: make_snapshot(docs.get(doc_id))
+            return ref
+
+        db.collection.return_value.document.side_effect = document
+        db.transaction.return_value.set.side_effect = lambda ref, data: docs.__setitem__(ref.id, data)
+        yield db
+
+
+@pytest.fixture
+def clock():
+    """Pin the storage's clock to a point in the window."""
+    with patch('services.cache_service.limiter_storage.time.time') as now:
+        now.return_value = WINDOW
+        yield now
+
+
+class TestSlidingWindowCounter:
+    """Test suite for the sliding window counter methods."""
+
+    @pytest.fixture
+    def storage(self, mock_db):
+        from services.cache_service.limiter_storage import FirestoreLimiterStorage
+        return FirestoreLimiterStorage(collection_name='rate_limits_test')
+
+    def test_first_hit_creates_one_document(self, storage, docs, clock):
+        """Test that both sub-windows are stored on a single document."""
+        assert storage.acquire_sliding_window_entry(KEY, 5, 60) is True
+
+        assert docs[DOC_KEY]['window_start'] == WINDOW
+        assert docs[DOC_KEY]['curr_count'] == 1
+        assert docs[DOC_KEY]['prev_count'] == 0
+        assert docs[DOC_KEY]['expiry'].timestamp() == WINDOW + 120
+
+    def test_previous_window_is_weighted(self, storage, docs, clock):
+        """Test that half-way through, half of the previous count still applies."""
+        docs[DOC_KEY] = {'window_start': WINDOW - 60, 'prev_count': 0, 'curr_count': 8}
+        clock.return_value = WINDOW + 30
+
+        # floor(8 * 0.5) + 0 = 4: one more fits under 5, the next doesn't
+        assert storage.acquire_sliding_window_entry(KEY, 5, 60) is True
+        assert docs[DOC_KEY]['prev_count'] == 8
+        assert docs[DOC_KEY]['curr_count'] == 1
+        assert storage.acquire_sliding_window_entry(KEY, 5, 60) is False
+
+    def test_no_boundary_burst(self, storage, docs, clock):
+        """Test that a full previous window blocks the start of the next one."""
+        limiter = SlidingWindowCounterRateLimiter(storage)
+        item = RateLimitItemPerMinute(3)
+        clock.return_value = WINDOW + 59
+
+        assert [limiter.hit(item, 'u1') for _ in range(4)] == [True, True, True, False]
+
+        # A fixed window would allow 3 more here; floor(3 * 59/60) leaves room for 1
+        clock.return_value = WINDOW + 61
+        assert [limiter.hit(item, 'u1') for _ in range(3)] == [True, False, False]
+
+    def test_stale_document_resets(self, storage, docs, clock):
+        """Test that counts from two or more windows ago are ignored."""
+        docs[DOC_KEY] = {'window_start': WINDOW - 120, 'prev_count': 5, 'curr_count': 5}
+
+        assert storage.acquire_sliding_window_entry(KEY, 5, 60) is True
+        assert docs[DOC_KEY]['prev_count'] == 0
+        assert docs[DOC_KEY]['curr_count'] == 1
+
+    def test_get_sliding_window(self, storage, docs, clock):
+        """Test that reads roll the window over like writes do."""
+        docs[DOC_KEY] = {'window_start': WINDOW - 60, 'prev_count': 2, 'curr_count': 4}
+        clock.return_value = WINDOW + 15
+
+        assert storage.get_sliding_window(KEY, 60) == (4, 45, 0, 105)
+
+    def test_error_is_permissive(self, storage, mock_db, clock):
+        """Test that a failed transaction doesn't block the user."""
+        mock_db.transaction.side_effect = Exception('unavailable')
+
+        assert storage.acquire_sliding_window_entry(KEY, 5, 60) is True
+
+    def test_flask_limiter_strategy(self, mock_db, docs, clock):
+        """Test that Flask-Limiter runs the sliding window strategy on Firestore."""
+        from services.cache_service.limiter_storage import install_limit_prefetch
+
+        app = Flask(__name__)
+        limiter = Limiter(
+            app=app,
+            key_func=get_remote_address,
+            default_limits=["2 per minute"],
+            storage_uri="firestore://",
+            storage_options={"collection_name": "rate_limits_test"},
+            strategy="sliding-window-counter",
+        )
+
+        @app.route('/feed')
+        def feed():
+            return 'ok'
+
+        # Sliding windows don't count through incr(), so nothing to prefetch
+        assert install_limit_prefetch(app, limiter) is False
+
+        client = app.test_client()
+        assert [client.get('/feed').status_code for _ in range(3)] == [200, 200, 429]
+        assert any(doc.get('curr_count') == 2 for doc in docs.values())
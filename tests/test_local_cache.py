@@ -0,0 +1,186 @@
+"""
+Tests for the in-process L1 cache tier.
+
+These tests verify LocalCache (LRU + TTL + versions) and TieredCache
+write-through behavior using a mock backend.
+
+Run with: pytest tests/test_local_cache.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from services.cache_service.local_cache import LocalCache, TieredCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalCache:
+    """Test suite for LocalCache."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def local(self, clock):
+        return LocalCache(max_entries=3, default_ttl=10, clock=clock)
+
+    def test_get_returns_stored_value(self, local):
+        """Test that set values are returned by get."""
+        local.set("a", {"x": 1})
+        assert local.get("a") == {"x": 1}
+
+    def test_get_returns_copy(self, local):
+        """Test that callers can't mutate the cached value."""
+        local.set("a", {"x": 1})
+        local.get("a")["x"] = 2
+        assert local.get("a") == {"x": 1}
+
+    def test_entry_expires_after_ttl(self, local, clock):
+        """Test that entries disappear once their TTL has passed."""
+        local.set("a", {"x": 1}, ttl=5)
+        clock.now += 6
+        assert local.get("a") is None
+        assert local.get_stats()['expirations'] == 1
+
+    def test_lru_eviction(self, local):
+        """Test that the least recently used key is evicted at capacity."""
+        local.set("a", {"v": 1})
+        local.set("b", {"v": 2})
+        local.set("c", {"v": 3})
+        local.get("a")  # a is now most recently used
+        local.set("d", {"v": 4})
+
+        assert local.get("b") is None
+        assert local.get("a") == {"v": 1}
+        assert local.get_stats()['evictions'] == 1
+
+    def test_older_version_does_not_overwrite_newer(self, local):
+        """Test that a fill started before a write can't replace it."""
+        read_version = local.next_version()
+        local.set("a", {"v": "new"})  # write-through with a newer version
+
+        stored = local.set("a", {"v": "old"}, version=read_version)
+
+        assert stored is False
+        assert local.get("a") == {"v": "new"}
+        assert local.get_stats()['stale_fills'] == 1
+
+    def test_delete_blocks_older_fill(self, local):
+        """Test that a tombstone rejects fills from reads started before the delete."""
+        read_version = local.next_version()
+        local.delete("a")
+
+        assert local.set("a", {"v": "old"}, version=read_version) is False
+        assert local.get("a") is None
+
+    def test_hit_and_miss_counters(self, local):
+        """Test that hits and misses are counted."""
+        local.set("a", {"v": 1})
+        local.get("a")
+        local.get("missing")
+
+        stats = local.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+
+class TestTieredCache:
+    """Test suite for TieredCache."""
+
+    @pytest.fixture
+    def backend(self):
+        backend = MagicMock()
+        backend.set.return_value = True
+        backend.delete.return_value = True
+        return backend
+
+    @pytest.fixture
+    def cache(self, backend):
+        return TieredCache(backend, max_entries=10, ttl=30)
+
+    def test_repeat_get_served_from_l1(self, cache, backend):
+        """Test that only the first get reaches the backend."""
+        backend.get.return_value = {"session_data": b"abc"}
+
+        assert cache.get("k") == {"session_data": b"abc"}
+        assert cache.get("k") == {"session_data": b"abc"}
+
+        backend.get.assert_called_once_with("k")
+
+    def test_backend_miss_is_not_cached(self, cache, backend):
+        """Test that a backend miss is retried on the next get."""
+        backend.get.return_value = None
+
+        cache.get("k")
+        cache.get("k")
+
+        assert backend.get.call_count == 2
+
+    def test_set_writes_through(self, cache, backend):
+        """Test that set writes the backend and then serves from L1."""
+        cache.set("k", {"v": 1}, ttl=3600)
+
+        backend.set.assert_called_once_with("k", {"v": 1}, 3600)
+        assert cache.get("k") == {"v": 1}
+        backend.get.assert_not_called()
+
+    def test_failed_set_invalidates_l1(self, cache, backend):
+        """Test that a failed backend write doesn't leave a stale L1 copy."""
+        cache.set("k", {"v": 1})
+        backend.set.return_value = False
+        backend.get.return_value = {"v": 1}
+
+        cache.set("k", {"v": 2})
+
+        assert cache.get("k") == {"v": 1}
+        backend.get.assert_called_once_with("k")
+
+    def test_delete_invalidates_l1(self, cache, backend):
+        """Test that delete removes the L1 copy."""
+        cache.set("k", {"v": 1})
+        backend.get.return_value = None
+
+        cache.delete("k")
+
+        assert cache.get("k") is None
+        backend.delete.assert_called_once_with("k")
+
+    def test_get_many_only_fetches_l1_misses(self, cache, backend):
+        """Test that get_many serves L1 hits and batches the rest."""
+        cache.set("a", {"v": 1})
+        backend.get_many.return_value = {"b": {"v": 2}}
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": {"v": 1}, "b": {"v": 2}}
+        backend.get_many.assert_called_once_with(["b", "c"])
+        assert cache.get("b") == {"v": 2}
+        backend.get.assert_not_called()
+
+    def test_set_many_and_delete_many_write_through(self, cache, backend):
+        """Test that batch writes go to the backend and keep L1 in sync."""
+        backend.set_many.return_value = True
+        backend.get.return_value = None
+
+        cache.set_many({"a": {"v": 1}, "b": {"v": 2}}, ttl=60, ttls={"b": 5})
+        assert cache.get("a") == {"v": 1}
+
+        cache.delete_many(["a", "b"])
+        assert cache.get("a") is None
+        backend.set_many.assert_called_once_with({"a": {"v": 1}, "b": {"v": 2}}, 60, {"b": 5})
+        backend.delete_many.assert_called_once_with(["a", "b"])
+
+    def test_get_stats_includes_backend(self, cache, backend):
+        """Test that stats report the backend type."""
+        stats = cache.get_stats()
+        assert stats['backend'] == type(backend).__name__
+        assert stats['max_entries'] == 10
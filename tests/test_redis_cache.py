@@ -0,0 +1,153 @@
+"""
+Tests for the Redis cache backend.
+
+These tests run RedisCache against fakeredis (an in-process Redis server),
+including as the backend of CacheSessionInterface.
+
+Run with: pytest tests/test_redis_cache.py -v
+"""
+
+import pickle
+import zlib
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask, session
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from services.cache_service.codec import FORMAT_MSGPACK, FORMAT_MSGPACK_ZLIB
+from services.cache_service.redis_backend import RedisCache
+from services.cache_service.flask_adapter import CacheSessionInterface
+
+
+class TestRedisCache:
+    """Test suite for RedisCache."""
+
+    @pytest.fixture
+    def client(self):
+        return fakeredis.FakeRedis()
+
+    @pytest.fixture
+    def cache(self, client):
+        return RedisCache(client=client, namespace="test:")
+
+    def test_set_and_get(self, cache):
+        """Test that stored values round-trip."""
+        assert cache.set("k", {"user_id": "u1", "blob": b"\x00\x01"}, ttl=60)
+        assert cache.get("k") == {"user_id": "u1", "blob": b"\x00\x01"}
+
+    def test_get_missing_returns_none(self, cache):
+        """Test that a missing key returns None."""
+        assert cache.get("missing") is None
+
+    def test_set_uses_native_ttl(self, cache, client):
+        """Test that entries get a Redis expiry."""
+        cache.set("k", {"v": 1}, ttl=120)
+        assert 0 < client.ttl("test:k") <= 120
+
+    def test_namespace_is_applied(self, cache, client):
+        """Test that keys are stored under the namespace."""
+        cache.set("k", {"v": 1})
+        assert client.exists("test:k") == 1
+        assert client.exists("k") == 0
+
+    def test_large_values_are_compressed(self, client):
+        """Test that values above the threshold are stored compressed."""
+        cache = RedisCache(client=client, compress_threshold=64)
+        value = {"text": "a" * 4096}
+
+        cache.set("big", value)
+
+        stored = client.hget("big", "v")
+        assert stored[0] == FORMAT_MSGPACK_ZLIB
+        assert len(stored) < 4096
+        assert cache.get("big") == value
+
+    def test_values_use_the_msgpack_codec(self, cache, client):
+        """Test that values are stored as versioned msgpack, datetimes included."""
+        created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        cache.set("k", {"value": {"createdAt": created}, "expiry": 1.5})
+
+        assert client.hget("test:k", "v")[0] == FORMAT_MSGPACK
+        assert cache.get("k") == {"value": {"createdAt": created}, "expiry": 1.5}
+
+    def test_pre_codec_entries_are_misses(self, cache, client):
+        """Test that zlib-compressed pickles from before the codec read as misses."""
+        client.hset("test:old", "v", zlib.compress(pickle.dumps({"v": "a" * 2048})))
+        cache.set("new", {"v": 1})
+
+        assert cache.get("old") is None
+        assert cache.get_many(["old", "new"]) == {"new": {"v": 1}}
+
+    def test_delete(self, cache):
+        """Test delete reports whether the key existed."""
+        cache.set("k", {"v": 1})
+        assert cache.delete("k") is True
+        assert cache.delete("k") is False
+        assert cache.exists("k") is False
+
+    def test_update_access_time_on_missing_key(self, cache, client):
+        """Test that touching a missing key doesn't create a TTL-less entry."""
+        assert cache.update_access_time("missing") is False
+        assert client.exists("test:missing") == 0
+
+    def test_get_metadata(self, cache):
+        """Test metadata includes creation and expiry times."""
+        cache.set("k", {"v": 1}, ttl=60)
+        cache.update_access_time("k")
+
+        metadata = cache.get_metadata("k")
+
+        assert metadata['created_at'] is not None
+        assert metadata['expires_at'] > metadata['created_at']
+        assert metadata['last_accessed'] >= metadata['created_at']
+        assert metadata['is_expired'] is False
+
+    def test_multi_key_operations(self, cache):
+        """Test pipelined set_many/get_many/delete_many."""
+        assert cache.set_many({"a": {"v": 1}, "b": {"v": 2}}, ttl=60)
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": {"v": 1}, "b": {"v": 2}}
+        assert cache.delete_many(["a", "b", "c"]) == 2
+        assert cache.get_many(["a", "b"]) == {}
+
+    def test_set_many_per_key_ttls(self, cache, client):
+        """Test that per-key TTL overrides are applied."""
+        cache.set_many({"a": {"v": 1}, "b": {"v": 2}}, ttl=60, ttls={"b": 5})
+
+        assert 55 <= client.ttl("test:a") <= 60
+        assert client.ttl("test:b") <= 5
+
+
+class TestRedisSessionInterface:
+    """Test CacheSessionInterface backed by RedisCache."""
+
+    @pytest.fixture
+    def app(self):
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = 'test'
+        app.session_interface = CacheSessionInterface(
+            key_prefix='test:session:',
+            cache=RedisCache(client=fakeredis.FakeRedis())
+        )
+
+        @app.route('/login')
+        def login():
+            session['user_id'] = 'u1'
+            return 'ok'
+
+        @app.route('/whoami')
+        def whoami():
+            return session.get('user_id', 'anonymous')
+
+        return app
+
+    def test_session_persists_across_requests(self, app):
+        """Test that a session written on one request is read on the next."""
+        client = app.test_client()
+
+        client.get('/login')
+        response = client.get('/whoami')
+
+        assert response.data == b'u1'
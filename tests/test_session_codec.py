@@ -0,0 +1,126 @@
+"""
+Tests for the versioned session codec.
+
+These tests verify the msgpack wire format, compression, and that legacy
+pickle session blobs are still readable after the switch.
+
+Run with: pytest tests/test_session_codec.py -v
+"""
+
+import pickle
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify, session
+
+from services.cache_service.codec import (
+    FORMAT_MSGPACK,
+    FORMAT_MSGPACK_ZLIB,
+    MsgpackSessionCodec,
+    PickleSessionCodec,
+    get_session_codec,
+)
+from services.cache_service.flask_adapter import CacheSessionInterface
+from services.cache_service.memory_backend import MemoryCache
+
+
+SESSION = {
+    'user_id': 'abc123',
+    'user_email': 'someone@example.com',
+    'csrf_token': 'tok',
+    'oauth_state': {'csrf': 'xyz', 'next': '/explore'},
+    '_permanent': True,
+}
+
+
+class TestMsgpackSessionCodec:
+    """Test suite for MsgpackSessionCodec."""
+
+    @pytest.fixture
+    def codec(self):
+        return MsgpackSessionCodec(compress_threshold=512)
+
+    def test_round_trip(self, codec):
+        """Test that a session dict survives encode/decode."""
+        blob = codec.dumps(SESSION)
+
+        assert blob[0] == FORMAT_MSGPACK
+        assert codec.loads(blob) == SESSION
+
+    def test_smaller_than_pickle(self, codec):
+        """Test that the encoding is more compact than pickle."""
+        assert len(codec.dumps(SESSION)) < len(pickle.dumps(SESSION))
+
+    def test_large_payload_is_compressed(self, codec):
+        """Test that payloads over the threshold use the zlib format."""
+        data = dict(SESSION, id_token='a' * 2000)
+
+        blob = codec.dumps(data)
+
+        assert blob[0] == FORMAT_MSGPACK_ZLIB
+        assert len(blob) < 500
+        assert codec.loads(blob) == data
+
+    def test_reads_legacy_pickle(self, codec):
+        """Test that blobs written by the old pickle serializer still load."""
+        assert codec.loads(pickle.dumps(SESSION)) == SESSION
+
+    def test_datetime_and_tuple_values(self, codec):
+        """Test that datetimes round-trip and tuples come back as lists."""
+        now = datetime(2025, 1, 2, 3, 4, 5)
+        data = {'seen': now, '_flashes': [('info', 'hi')]}
+
+        decoded = codec.loads(codec.dumps(data))
+
+        assert decoded['seen'] == now
+        assert decoded['_flashes'] == [['info', 'hi']]
+
+    def test_unknown_format_byte_raises(self, codec):
+        """Test that unrecognised blobs are rejected."""
+        with pytest.raises(ValueError):
+            codec.loads(b'\x7fgarbage')
+
+    def test_unsupported_value_raises(self, codec):
+        """Test that arbitrary objects are not silently pickled."""
+        with pytest.raises(TypeError):
+            codec.dumps({'obj': object()})
+
+
+class TestCodecSelection:
+    """Test codec factory and session interface wiring."""
+
+    def test_get_session_codec(self):
+        """Test that codecs are selected by name."""
+        assert isinstance(get_session_codec('msgpack'), MsgpackSessionCodec)
+        assert isinstance(get_session_codec('pickle'), PickleSessionCodec)
+        with pytest.raises(ValueError):
+            get_session_codec('json')
+
+    def test_pickle_codec_reads_msgpack(self):
+        """Test that the legacy codec can read sessions written by the new one."""
+        blob = MsgpackSessionCodec().dumps(SESSION)
+
+        assert PickleSessionCodec().loads(blob) == SESSION
+
+    def test_legacy_session_upgraded_on_save(self):
+        """Test that a pickled session is loaded and rewritten as msgpack."""
+        app = Flask(__name__)
+        app.secret_key = 'test-secret'
+        app.config['SESSION_COOKIE_NAME'] = '__session'
+        cache = MemoryCache()
+        app.session_interface = CacheSessionInterface(key_prefix='s:', cache=cache)
+
+        @app.route('/touch', methods=['POST'])
+        def touch():
+            session['visits'] = session.get('visits', 0) + 1
+            return jsonify({'user_id': session.get('user_id')})
+
+        sid = '11111111-2222-4333-8444-555555555555'
+        cache.set(f's:{sid}', {'session_data': pickle.dumps({'user_id': 'legacy'})})
+        client = app.test_client()
+        client.set_cookie('__session', sid)
+
+        resp = client.post('/touch')
+
+        assert resp.get_json()['user_id'] == 'legacy'
+        assert cache.get(f's:{sid}')['session_data'][0] == FORMAT_MSGPACK
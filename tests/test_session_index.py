@@ -0,0 +1,241 @@
+"""
+Tests for the user -> session index.
+
+These tests verify that CacheSessionInterface records sessions per user as
+they gain a user_id, and that listing/revoking sessions only touches that
+user's sessions.
+
+Run with: pytest tests/test_session_index.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from flask import Flask, jsonify, session
+
+from services.cache_service.firestore_backend import FirestoreCache
+from services.cache_service.flask_adapter import CacheSessionInterface
+from services.cache_service.local_cache import TieredCache
+from services.cache_service.memory_backend import MemoryCache
+from services.cache_service.redis_backend import RedisCache
+from services.cache_service.session_index import (
+    FirestoreSessionIndex,
+    MemorySessionIndex,
+    RedisSessionIndex,
+    UserSessions,
+    create_session_index,
+)
+
+
+COOKIE_NAME = '__session'
+PREFIX = 'test:session:'
+
+
+def build_app():
+    app = Flask(__name__)
+    app.secret_key = 'test-secret'
+    app.config['SESSION_COOKIE_NAME'] = COOKIE_NAME
+
+    cache = MemoryCache()
+    app.session_interface = CacheSessionInterface(key_prefix=PREFIX, cache=cache)
+
+    @app.route('/login/<user_id>', methods=['POST'])
+    def login(user_id):
+        session['user_id'] = user_id
+        return jsonify({'success': True})
+
+    @app.route('/logout', methods=['POST'])
+    def logout():
+        session.clear()
+        return jsonify({'success': True})
+
+    @app.route('/me')
+    def me():
+        return jsonify({'user_id': session.get('user_id')})
+
+    return app, cache
+
+
+class TestSessionIndexing:
+    """Test index maintenance by CacheSessionInterface."""
+
+    @pytest.fixture
+    def app_and_cache(self):
+        return build_app()
+
+    @pytest.fixture
+    def user_sessions(self, app_and_cache):
+        return app_and_cache[0].session_interface.user_sessions
+
+    def _login(self, app, user_id, user_agent='test-agent'):
+        client = app.test_client()
+        client.post(f'/login/{user_id}', headers={'User-Agent': user_agent})
+        return client, client.get_cookie(COOKIE_NAME).value
+
+    def test_login_registers_session(self, app_and_cache, user_sessions):
+        """Test that gaining a user_id adds the session to the index."""
+        app, _ = app_and_cache
+        _, sid = self._login(app, 'u1', user_agent='Firefox')
+
+        sessions = user_sessions.list_sessions('u1')
+
+        assert list(sessions) == [sid]
+        assert sessions[sid]['user_agent'] == 'Firefox'
+
+    def test_logout_unregisters_session(self, app_and_cache, user_sessions):
+        """Test that clearing the session removes it from the index."""
+        app, _ = app_and_cache
+        client, sid = self._login(app, 'u1')
+
+        client.post('/logout')
+
+        assert user_sessions.index.members('u1') == {}
+
+    def test_read_only_requests_do_not_touch_index(self, app_and_cache, user_sessions):
+        """Test that the index is only written when user_id changes."""
+        app, _ = app_and_cache
+        client, _ = self._login(app, 'u1')
+        user_sessions.index = MagicMock(wraps=user_sessions.index)
+
+        client.get('/me')
+
+        user_sessions.index.add.assert_not_called()
+
+    def test_revoke_others_keeps_current(self, app_and_cache, user_sessions):
+        """Test that logging out other devices leaves the caller signed in."""
+        app, _ = app_and_cache
+        phone, phone_sid = self._login(app, 'u1')
+        laptop, laptop_sid = self._login(app, 'u1')
+        _, other_user_sid = self._login(app, 'u2')
+
+        revoked = user_sessions.revoke_others('u1', keep_sid=laptop_sid)
+
+        assert revoked == 1
+        assert phone.get('/me').get_json()['user_id'] is None
+        assert laptop.get('/me').get_json()['user_id'] == 'u1'
+        assert list(user_sessions.list_sessions('u2')) == [other_user_sid]
+
+    def test_revoke_all(self, app_and_cache, user_sessions):
+        """Test that revoke_all deletes every session of the user."""
+        app, cache = app_and_cache
+        first, _ = self._login(app, 'u1')
+        second, _ = self._login(app, 'u1')
+
+        assert user_sessions.revoke_all('u1') == 2
+        assert first.get('/me').get_json()['user_id'] is None
+        assert second.get('/me').get_json()['user_id'] is None
+        assert user_sessions.list_sessions('u1') == {}
+
+    def test_list_prunes_expired_sessions(self, app_and_cache, user_sessions):
+        """Test that sessions gone from the cache are dropped from the index."""
+        app, cache = app_and_cache
+        _, sid = self._login(app, 'u1')
+        cache.delete(f'{PREFIX}{sid}')
+
+        assert user_sessions.list_sessions('u1') == {}
+        assert user_sessions.index.members('u1') == {}
+
+
+class TestPreIndexSessions:
+    """Test sessions stored before the index existed."""
+
+    def _store_legacy_session(self, app, cache, sid, user_id):
+        interface = app.session_interface
+        cache.set(f'{PREFIX}{sid}', {
+            'session_data': interface.serializer.dumps({'user_id': user_id}),
+            'expires_at': None
+        })
+
+    def test_first_load_backfills_index(self):
+        """Test that loading an unindexed session registers it."""
+        app, cache = build_app()
+        sid = '11111111-2222-4333-8444-555555555555'
+        self._store_legacy_session(app, cache, sid, 'u1')
+        client = app.test_client()
+        client.set_cookie(COOKIE_NAME, sid)
+
+        assert client.get('/me').get_json()['user_id'] == 'u1'
+
+        user_sessions = app.session_interface.user_sessions
+        assert list(user_sessions.index.members('u1')) == [sid]
+        assert user_sessions.revoke_all('u1') == 1
+        assert client.get('/me').get_json()['user_id'] is None
+
+    def test_backfill_checks_index_once_per_session(self):
+        """Test that repeat loads don't re-read the index."""
+        index = MagicMock(wraps=MemorySessionIndex())
+        user_sessions = UserSessions(MagicMock(), PREFIX, index=index)
+
+        user_sessions.backfill('u1', 'a')
+        user_sessions.backfill('u1', 'a')
+
+        index.members.assert_called_once_with('u1')
+        index.add.assert_called_once()
+
+    def test_revocation_never_scans_the_store(self):
+        """Test that revocation only touches the user's indexed sessions."""
+        backend = MagicMock(spec=FirestoreCache)
+        backend.collection = MagicMock()
+        backend.delete_many.return_value = 1
+        index = MemorySessionIndex()
+        index.add('u1', 'a', {})
+
+        assert UserSessions(backend, PREFIX, index=index).revoke_all('u1') == 1
+        backend.collection.stream.assert_not_called()
+
+
+class TestUserSessionsCost:
+    """Test that operations only touch the user's own keys."""
+
+    def test_revoke_all_uses_one_batch_delete(self):
+        """Test that revocation is a single delete_many of the user's keys."""
+        cache = MagicMock()
+        index = MemorySessionIndex()
+        index.add('u1', 'a', {})
+        index.add('u1', 'b', {})
+        cache.delete_many.return_value = 2
+
+        assert UserSessions(cache, PREFIX, index=index).revoke_all('u1') == 2
+        cache.delete_many.assert_called_once()
+        assert sorted(cache.delete_many.call_args[0][0]) == [f'{PREFIX}a', f'{PREFIX}b']
+
+
+class TestIndexBackends:
+    """Test the Firestore and Redis index implementations."""
+
+    def test_firestore_add_merges_and_remove_deletes_field(self):
+        """Test that Firestore updates touch only the affected map entries."""
+        db = MagicMock()
+        index = FirestoreSessionIndex(db)
+        doc = db.collection.return_value.document.return_value
+
+        index.add('u1', 'abc-123', {'created_at': 1})
+        index.remove('u1', ['abc-123'])
+
+        doc.set.assert_called_once_with({'sessions': {'abc-123': {'created_at': 1}}}, merge=True)
+        assert list(doc.update.call_args[0][0]) == ['sessions.`abc-123`']
+
+    def test_factory_unwraps_tiered_redis_subclass(self):
+        """Test that a Redis subclass behind an L1 tier gets the Redis index."""
+        fakeredis = pytest.importorskip('fakeredis')
+
+        class NamespacedRedisCache(RedisCache):
+            pass
+
+        backend = NamespacedRedisCache(client=fakeredis.FakeRedis(), namespace='test:')
+        index = create_session_index(TieredCache(backend))
+
+        assert isinstance(index, RedisSessionIndex)
+        assert index.namespace == 'test:'
+
+    def test_redis_index_round_trip(self):
+        """Test add/members/remove/clear on a Redis hash."""
+        fakeredis = pytest.importorskip('fakeredis')
+        index = RedisSessionIndex(fakeredis.FakeRedis(), namespace='test:')
+
+        index.add('u1', 'a', {'created_at': 1})
+        index.add('u1', 'b', {'created_at': 2})
+        index.remove('u1', ['a'])
+
+        assert index.members('u1') == {'b': {'created_at': 2}}
+        index.clear('u1')
+        assert index.members('u1') == {}
@@ -0,0 +1,190 @@
+"""
+Tests for single-flight loading and get_or_compute.
+
+These tests verify that concurrent misses for one key run the loader once,
+that errors reach every waiting caller, and that XFetch early refresh only
+kicks in close to expiry.
+
+Run with: pytest tests/test_single_flight.py -v
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services.cache_service.local_cache import TieredCache
+from services.cache_service.memory_backend import MemoryCache
+from services.cache_service.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test per-key call collapsing."""
+
+    def _run_concurrently(self, n, target):
+        results, errors = [], []
+        barrier = threading.Barrier(n)
+
+        def worker():
+            barrier.wait()
+            try:
+                results.append(target())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_calls_collapse(self):
+        """Test that 8 concurrent callers share one execution."""
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results, _ = self._run_concurrently(8, lambda: flight.do('k', slow))
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * 7
+        assert flight.get_stats()['collapsed'] == 7
+        assert flight.get_stats()['in_flight'] == 0
+
+    def test_error_reaches_all_waiters(self):
+        """Test that followers see the leader's exception."""
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.2)
+            raise RuntimeError('backend down')
+
+        results, errors = self._run_concurrently(4, lambda: flight.do('k', failing))
+
+        assert results == []
+        assert len(errors) == 4
+        assert not flight.in_flight('k')
+
+    def test_follower_gives_up_after_timeout(self):
+        """Test that a stuck leader doesn't block followers forever."""
+        flight = SingleFlight(wait_timeout=0.05)
+        release = threading.Event()
+        leader = threading.Thread(target=lambda: flight.do('k', release.wait))
+        leader.start()
+        while not flight.in_flight('k'):
+            time.sleep(0.001)
+
+        assert flight.do('k', lambda: 'own') == ('own', False)
+        assert flight.get_stats()['wait_timeouts'] == 1
+
+        release.set()
+        leader.join()
+
+
+class TestGetOrCompute:
+    """Test read-through loading on cache backends."""
+
+    @pytest.fixture
+    def cache(self):
+        return MemoryCache()
+
+    def test_miss_then_hit(self, cache):
+        """Test that the loader runs on a miss and not on the next call."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {'posts': [1, 2]}
+
+        assert cache.get_or_compute('feed', loader, ttl=60) == {'posts': [1, 2]}
+        assert cache.get_or_compute('feed', loader, ttl=60) == {'posts': [1, 2]}
+
+        assert len(calls) == 1
+        stats = cache.get_compute_stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+
+    def test_concurrent_misses_load_once(self, cache):
+        """Test that a stampede on one key hits the loader once."""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'n': 1}
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(cache.get_or_compute('feed', loader, ttl=60))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [{'n': 1}] * 8
+        assert cache.get_compute_stats()['collapsed'] == 7
+
+    def test_callers_get_independent_copies(self, cache):
+        """Test that mutating a result doesn't change the cached value."""
+        cache.get_or_compute('profile', lambda: {'tags': ['a']}, ttl=60)
+
+        first = cache.get_or_compute('profile', lambda: None, ttl=60)
+        first['tags'].append('b')
+
+        assert cache.get_or_compute('profile', lambda: None, ttl=60) == {'tags': ['a']}
+
+    def test_none_is_not_cached(self, cache):
+        """Test that a None result is returned but not stored."""
+        assert cache.get_or_compute('missing', lambda: None, ttl=60) is None
+        assert cache.get('missing') is None
+
+    def test_no_early_refresh_far_from_expiry(self, cache):
+        """Test that a fresh entry is served even with an unlucky draw."""
+        cache.get_or_compute('feed', lambda: {'v': 1}, ttl=300)
+
+        with patch('services.cache_service.interface.random.random', return_value=0.999):
+            assert cache.get_or_compute('feed', lambda: {'v': 2}, ttl=300) == {'v': 1}
+
+    def test_early_refresh_near_expiry(self, cache):
+        """Test that an entry close to expiry is rebuilt before it expires."""
+        cache.get_or_compute('feed', lambda: {'v': 1}, ttl=300)
+        entry = cache.get('feed')
+        entry['delta'] = 2.0
+        entry['expiry'] = time.time() + 1
+        cache.set('feed', entry, ttl=300)
+
+        with patch('services.cache_service.interface.random.random', return_value=0.9):
+            assert cache.get_or_compute('feed', lambda: {'v': 2}, ttl=300) == {'v': 2}
+
+        assert cache.get_compute_stats()['early_refreshes'] == 1
+
+    def test_beta_zero_disables_early_refresh(self, cache):
+        """Test that beta=0 only reloads after expiry."""
+        cache.get_or_compute('feed', lambda: {'v': 1}, ttl=300)
+        entry = cache.get('feed')
+        entry['expiry'] = time.time() + 0.5
+        cache.set('feed', entry, ttl=300)
+
+        assert cache.get_or_compute('feed', lambda: {'v': 2}, ttl=300, beta=0) == {'v': 1}
+
+    def test_tiered_cache_serves_from_l1(self):
+        """Test that TieredCache hits don't reach the backend."""
+        backend = MemoryCache()
+        tiered = TieredCache(backend, ttl=60)
+        tiered.get_or_compute('feed', lambda: {'v': 1}, ttl=300)
+        reads = backend.get_stats()['reads']
+
+        assert tiered.get_or_compute('feed', lambda: {'v': 2}, ttl=300) == {'v': 1}
+        assert backend.get_stats()['reads'] == reads
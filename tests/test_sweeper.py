@@ -0,0 +1,118 @@
+"""
+Tests for the expired-entry sweeper.
+
+These tests verify that the sweeper pages through expired documents with
+cursors, deletes them through a BulkWriter, and checkpoints so an
+interrupted run resumes where it stopped.
+
+Run with: pytest tests/test_sweeper.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.cache_service.sweeper import ExpiredEntrySweeper
+
+
+def make_doc(doc_id, expires_at):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.get.return_value = expires_at
+    return doc
+
+
+def make_pages(count, page_size, field_age_hours=48):
+    oldest = datetime.now(timezone.utc) - timedelta(hours=field_age_hours)
+    docs = [make_doc(f'doc{i:04d}', oldest + timedelta(seconds=i)) for i in range(count)]
+    return [docs[i:i + page_size] for i in range(0, count, page_size)]
+
+
+class TestExpiredEntrySweeper:
+    """Test suite for ExpiredEntrySweeper."""
+
+    @pytest.fixture
+    def db(self):
+        db = MagicMock()
+        target, checkpoints = MagicMock(), MagicMock()
+        db.collection.side_effect = lambda name: checkpoints if name == 'sweeper_checkpoints' else target
+        checkpoints.document.return_value.get.return_value.exists = False
+
+        query = MagicMock()
+        target.where.return_value.order_by.return_value.order_by.return_value \
+            .select.return_value.limit.return_value = query
+        query.start_after.return_value = query
+
+        db.query = query
+        db.checkpoint = checkpoints.document.return_value
+        db.writer = db.bulk_writer.return_value
+        return db
+
+    def test_deletes_all_pages_and_clears_checkpoint(self, db):
+        """Test a full sweep across several pages."""
+        db.query.stream.side_effect = [iter(p) for p in make_pages(25, 10)]
+
+        stats = ExpiredEntrySweeper(db, 'cache_sessions', page_size=10).run()
+
+        assert stats['deleted'] == 25
+        assert stats['pages'] == 3
+        assert stats['complete'] is True
+        assert stats['lag_seconds'] == pytest.approx(48 * 3600, abs=60)
+        assert db.writer.delete.call_count == 25
+        db.writer.close.assert_called_once()
+        db.checkpoint.delete.assert_called_once()
+
+    def test_pages_continue_after_last_document(self, db):
+        """Test that each page starts after the previous page's last doc."""
+        pages = make_pages(20, 10)
+        db.query.stream.side_effect = [iter(p) for p in pages] + [iter([])]
+
+        ExpiredEntrySweeper(db, 'rate_limits', page_size=10).run()
+
+        cursor = db.query.start_after.call_args_list[0][0][0]
+        assert cursor == {'expiry': pages[0][-1].get.return_value, '__name__': 'doc0009'}
+
+    def test_budget_stop_saves_checkpoint(self, db):
+        """Test that stopping early records the cursor and progress."""
+        db.query.stream.side_effect = [iter(p) for p in make_pages(30, 10)]
+
+        stats = ExpiredEntrySweeper(db, 'cache_sessions', page_size=10).run(max_docs=10)
+
+        assert stats['complete'] is False
+        saved = db.checkpoint.set.call_args[0][0]
+        assert saved['cursor_id'] == 'doc0009'
+        assert saved['deleted'] == 10
+        db.checkpoint.delete.assert_not_called()
+
+    def test_resumes_from_checkpoint(self, db):
+        """Test that a new run continues from the saved cutoff and cursor."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+        cursor_value = cutoff - timedelta(days=3)
+        db.checkpoint.get.return_value.exists = True
+        db.checkpoint.get.return_value.to_dict.return_value = {
+            'cutoff': cutoff, 'cursor_value': cursor_value, 'cursor_id': 'doc0042', 'deleted': 42,
+        }
+        db.query.stream.side_effect = [iter([])]
+        target = db.collection('cache_sessions')
+
+        stats = ExpiredEntrySweeper(db, 'cache_sessions').run()
+
+        assert stats['resumed'] is True
+        assert target.where.call_args.kwargs['filter'].value == cutoff
+        db.query.start_after.assert_called_once_with({'expires_at': cursor_value, '__name__': 'doc0042'})
+
+    def test_dry_run_does_not_delete(self, db):
+        """Test that a dry run only counts expired documents."""
+        db.query.stream.side_effect = [iter(p) for p in make_pages(5, 10)]
+
+        stats = ExpiredEntrySweeper(db, 'cache_sessions', page_size=10).run(dry_run=True)
+
+        assert stats['deleted'] == 5
+        db.bulk_writer.assert_not_called()
+        db.checkpoint.set.assert_not_called()
+
+    def test_unknown_collection_requires_field(self, db):
+        """Test that collections without a known expiry field are rejected."""
+        with pytest.raises(ValueError):
+            ExpiredEntrySweeper(db, 'creations')
@@ -0,0 +1,178 @@
+"""
+Tests for fan-out-on-write home timelines.
+
+These tests verify that publishing pushes entries to every follower's
+timeline in batches, that authors above the celebrity threshold are read on
+demand instead, and that a timeline page is one keyset range read merged
+with celebrity posts - including for users following more than 30 creators.
+
+Run with: pytest tests/test_timeline_service.py -v
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import timeline_service
+from services.creation_dto import FEED_FIELDS
+from services.cursor_codec import encode_cursor
+from services.timeline_service import TimelineService
+
+
+T0 = datetime(2025, 11, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class TestTimelineService:
+    """Test suite for TimelineService."""
+
+    @pytest.fixture(autouse=True)
+    def secret(self, monkeypatch):
+        monkeypatch.setattr('config.settings.SECRET_KEY', 'test-secret')
+
+    @pytest.fixture
+    def db(self, fake_firestore):
+        return fake_firestore
+
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        yield executor
+        executor.shutdown(wait=True)
+
+    @pytest.fixture
+    def service(self, db, executor):
+        return TimelineService(db=db, celebrity_threshold=3, executor=executor)
+
+    def add_user(self, db, uid, followers=()):
+        db.docs[f'users/{uid}'] = {'followers': list(followers), 'followersCount': len(followers)}
+
+    def publish(self, db, service, creation_id, author, minutes):
+        published_at = T0 + timedelta(minutes=minutes)
+        db.docs[f'creations/{creation_id}'] = {
+            'userId': author, 'status': 'published', 'publishedAt': published_at,
+        }
+        return service.fan_out(creation_id, author, published_at).result()
+
+    def test_fan_out_writes_every_follower(self, db, service):
+        """Test that publishing pushes a lightweight entry to each follower."""
+        self.add_user(db, 'author', followers=['f1', 'f2'])
+
+        assert self.publish(db, service, 'c1', 'author', 0) == 2
+
+        assert db.docs['timelines/f1/entries/c1'] == {
+            'creationId': 'c1', 'authorId': 'author', 'publishedAt': T0,
+        }
+        assert 'timelines/f2/entries/c1' in db.docs
+        assert db.commits == [2]
+
+    def test_fan_out_is_batched(self, db, executor, monkeypatch):
+        """Test that large follower lists are written in bounded batches."""
+        monkeypatch.setattr(timeline_service, 'MAX_BATCH_SIZE', 2)
+        service = TimelineService(db=db, celebrity_threshold=10, executor=executor)
+        self.add_user(db, 'author', followers=['f1', 'f2', 'f3', 'f4', 'f5'])
+
+        assert self.publish(db, service, 'c1', 'author', 0) == 5
+        assert db.commits == [2, 2, 1]
+
+    def test_celebrity_falls_back_to_read(self, db, service):
+        """Test that authors over the threshold aren't fanned out."""
+        self.add_user(db, 'star', followers=['f1', 'f2', 'f3', 'f4'])
+
+        assert self.publish(db, service, 'c1', 'star', 0) == 0
+
+        assert not any(path.startswith('timelines/') for path in db.docs)
+        assert db.docs['timeline_meta/celebrities'] == {'authorIds': ['star']}
+        assert service.get_stats()['celebrity_skips'] == 1
+
+    def test_page_merges_celebrity_posts(self, db, service):
+        """Test that a page interleaves timeline entries with celebrity reads."""
+        self.add_user(db, 'author', followers=['reader'])
+        self.add_user(db, 'star', followers=['reader', 'a', 'b', 'c'])
+        self.publish(db, service, 'c1', 'author', 0)
+        self.publish(db, service, 's1', 'star', 1)
+        self.publish(db, service, 'c2', 'author', 2)
+
+        creations, has_more, _ = service.get_page('reader', ['author', 'star'], 10)
+
+        assert [cid for cid, _ in creations] == ['c2', 's1', 'c1']
+        assert has_more is False
+        assert len(db.get_all_calls) == 1
+        assert set(db.selects) == {FEED_FIELDS}  # Projected reads only
+
+    def test_more_than_thirty_follows(self, db, service):
+        """Test that every followed author appears, not just the first 30."""
+        authors = [f'author{i:02d}' for i in range(40)]
+        for i, author in enumerate(authors):
+            self.add_user(db, author, followers=['reader'])
+            self.publish(db, service, f'c{i:02d}', author, i)
+
+        creations, has_more, _ = service.get_page('reader', authors, 50)
+
+        assert len(creations) == 40
+        assert creations[0][0] == 'c39'
+        assert has_more is False
+
+    def test_more_than_thirty_celebrities(self, db, service):
+        """Test that followed celebrities are read across chunked `in` queries."""
+        stars = [f'star{i:02d}' for i in range(35)]
+        for i, star in enumerate(stars):
+            self.add_user(db, star, followers=['reader', 'a', 'b', 'c'])
+            self.publish(db, service, f's{i:02d}', star, i)
+
+        creations, has_more, _ = service.get_page('reader', stars, 40)
+
+        assert [cid for cid, _ in creations] == [f's{i:02d}' for i in reversed(range(35))]
+        assert has_more is False
+
+    def test_keyset_pagination(self, db, service):
+        """Test that next pages start after the cursor with no gaps or repeats."""
+        self.add_user(db, 'author', followers=['reader'])
+        self.add_user(db, 'star', followers=['reader', 'a', 'b', 'c'])
+        for i in range(5):
+            self.publish(db, service, f'c{i}', 'author', 2 * i)
+            self.publish(db, service, f's{i}', 'star', 2 * i + 1)
+
+        seen, cursor = [], None
+        while True:
+            creations, has_more, position = service.get_page('reader', ['author', 'star'], 3, cursor)
+            seen.extend(cid for cid, _ in creations)
+            if not has_more:
+                break
+            cursor = encode_cursor(*position, 'following')
+
+        assert seen == ['s4', 'c4', 's3', 'c3', 's2', 'c2', 's1', 'c1', 's0', 'c0']
+
+    def test_stale_entries_are_dropped(self, db, service):
+        """Test that unpublished creations and unfollowed authors are filtered."""
+        self.add_user(db, 'author', followers=['reader'])
+        self.add_user(db, 'gone', followers=['reader'])
+        self.publish(db, service, 'c1', 'author', 0)
+        self.publish(db, service, 'c2', 'author', 1)
+        self.publish(db, service, 'g1', 'gone', 2)
+        db.docs['creations/c2']['status'] = 'deleted'
+
+        creations, _, _ = service.get_page('reader', ['author'], 10)
+
+        assert [cid for cid, _ in creations] == ['c1']
+
+    def test_follow_backfills_and_unfollow_trims(self, db, service):
+        """Test that follow copies recent posts and unfollow removes them."""
+        self.add_user(db, 'author')
+        self.publish(db, service, 'c1', 'author', 0)
+        self.publish(db, service, 'c2', 'author', 1)
+
+        assert service.backfill_author('reader', 'author').result() == 2
+        assert service.get_page('reader', ['author'], 10)[0][0][0] == 'c2'
+
+        assert service.remove_author('reader', 'author').result() == 2
+        assert not any(path.startswith('timelines/reader/') for path in db.docs)
+
+    def test_fan_out_error_is_contained(self, service):
+        """Test that a failing fan-out is logged and counted, not raised."""
+        service.db = MagicMock()
+        service.db.collection.side_effect = Exception('unavailable')
+
+        assert service.fan_out('c1', 'author', T0).result() == 0
+        assert service.get_stats()['errors'] == 1